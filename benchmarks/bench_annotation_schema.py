@@ -0,0 +1,88 @@
+"""Benchmark the size and cost of schemas for Optional, Union and Literal types.
+
+Each annotation is compared against a direct translation with one anyOf branch
+per union member. The compact schema merges literals into one enum, adds
+'null' to the type of optional parameters and lists the types of unions whose
+branches do not overlap. Mapping is memoized per annotation object, so
+repeated inference of the same annotations is a dict lookup.
+
+Run with: python -m benchmarks.bench_annotation_schema
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Literal, Optional, Union
+
+from openai_function_calling import annotation_schema
+from openai_function_calling.annotation_schema import annotation_to_json_schema
+
+ANNOTATIONS: dict[str, tuple[Any, dict[str, Any]]] = {
+    "Optional[int]": (
+        Optional[int],
+        {"anyOf": [{"type": "integer"}, {"type": "null"}]},
+    ),
+    "Literal[5 values]": (
+        Literal["xs", "s", "m", "l", "xl"],
+        {
+            "anyOf": [
+                {"type": "string", "enum": [value]}
+                for value in ["xs", "s", "m", "l", "xl"]
+            ]
+        },
+    ),
+    "Optional[Literal[3 values]]": (
+        Optional[Literal["low", "medium", "high"]],
+        {
+            "anyOf": [
+                *(
+                    {"type": "string", "enum": [value]}
+                    for value in ["low", "medium", "high"]
+                ),
+                {"type": "null"},
+            ]
+        },
+    ),
+    "int | str | None": (
+        Union[int, str, None],
+        {"anyOf": [{"type": "integer"}, {"type": "string"}, {"type": "null"}]},
+    ),
+}
+
+
+def main() -> None:
+    naive_total: int = 0
+    compact_total: int = 0
+
+    for label, (annotation, naive_schema) in ANNOTATIONS.items():
+        naive: int = len(json.dumps(naive_schema))
+        compact: int = len(json.dumps(annotation_to_json_schema(annotation)))
+        naive_total += naive
+        compact_total += compact
+        print(f"{label:28} {naive:4} -> {compact:4} bytes")
+
+    print(f"{'total':28} {naive_total:4} -> {compact_total:4} bytes")
+
+    rounds: int = 10_000
+    annotations: list[Any] = [annotation for annotation, _ in ANNOTATIONS.values()]
+
+    for memoized in [False, True]:
+        start: float = time.perf_counter()
+
+        for _ in range(rounds):
+            if not memoized:
+                annotation_schema._SCHEMAS.clear()  # noqa: SLF001
+
+            for annotation in annotations:
+                annotation_to_json_schema(annotation)
+
+        seconds: float = time.perf_counter() - start
+        print(
+            f"{'memoized' if memoized else 'unmemoized':10} "
+            f"{seconds / (rounds * len(annotations)) * 1e6:6.2f} us per annotation"
+        )
+
+
+if __name__ == "__main__":
+    main()
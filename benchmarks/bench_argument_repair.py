@@ -0,0 +1,89 @@
+"""Benchmark local repair of malformed tool call arguments.
+
+Reports how many arguments of the malformed corpus in the tests decode with
+strict json.loads and with repair_arguments, and the time per decode. Every
+repaired decode saves a retry round trip to the model.
+
+Run with: python -m benchmarks.bench_argument_repair
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from openai_function_calling import Function, Parameter
+from openai_function_calling.argument_repair import repair_arguments
+
+CORPUS_PATH: Path = (
+    Path(__file__).parent.parent / "tests" / "data" / "malformed_tool_arguments.jsonl"
+)
+ROUNDS: int = 2_000
+
+SEARCH_FLIGHTS = Function(
+    name="search_flights",
+    description="Search for flights.",
+    parameters=[
+        Parameter("origin", "string"),
+        Parameter("destination", "string"),
+        Parameter("passengers", "integer"),
+        Parameter("cabin", "string", enum=["economy", "business", "first"]),
+        Parameter("nonstop", "boolean"),
+        Parameter("max_price", "number"),
+        Parameter("dates", "array", array_item_type="string"),
+        Parameter("notes", "string"),
+    ],
+    required_parameters=["origin", "destination"],
+)
+
+
+def strict_decode(arguments: str) -> Any:
+    try:
+        return json.loads(arguments)
+    except json.JSONDecodeError:
+        return None
+
+
+def repair(arguments: str) -> Any:
+    return repair_arguments(arguments, SEARCH_FLIGHTS)
+
+
+def time_per_decode_us(function: Any, arguments: list[str]) -> float:
+    start: float = time.perf_counter()
+
+    for _ in range(ROUNDS):
+        for argument in arguments:
+            function(argument)
+
+    return (time.perf_counter() - start) / (ROUNDS * len(arguments)) * 1_000_000
+
+
+def main() -> None:
+    corpus: list[dict[str, Any]] = [
+        json.loads(line) for line in CORPUS_PATH.read_text().splitlines()
+    ]
+    arguments: list[str] = [case["arguments"] for case in corpus]
+    strict: int = sum(
+        strict_decode(case["arguments"]) == case["expected"] for case in corpus
+    )
+    repaired: int = sum(
+        repair(case["arguments"]).arguments == case["expected"] for case in corpus
+    )
+    valid: list[str] = [json.dumps(case["expected"]) for case in corpus]
+
+    print(f"corpus of {len(corpus)} malformed arguments")
+    print(f"strict json.loads: {strict:>3} decoded correctly")
+    print(f"repair_arguments:  {repaired:>3} decoded correctly")
+    malformed_us: float = time_per_decode_us(repair, arguments)
+    strict_us: float = time_per_decode_us(json.loads, valid)
+    valid_us: float = time_per_decode_us(repair, valid)
+
+    print(f"malformed arguments: {malformed_us:.1f} us per repair")
+    print(
+        f"valid arguments: json.loads {strict_us:.1f} us, "
+        f"repair_arguments {valid_us:.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
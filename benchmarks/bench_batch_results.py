@@ -0,0 +1,79 @@
+"""Benchmark the Batch API result processor throughput.
+
+Generates a synthetic Batch API output file with one tool call per line and
+reports the number of lines processed per second.
+
+Run with: python -m benchmarks.bench_batch_results [line_count]
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from openai_function_calling.batch import BatchProcessingStats, BatchResultProcessor
+from openai_function_calling.tool_executor import ToolExecutor
+
+DEFAULT_LINE_COUNT: int = 1_000_000
+
+
+def get_current_weather(location: str, unit: str = "fahrenheit") -> str:
+    return f"It is currently sunny in {location} and 75 degrees {unit}."
+
+
+def write_synthetic_results(path: Path, line_count: int) -> None:
+    with path.open("w") as output_file:
+        for i in range(line_count):
+            tool_call: dict = {
+                "id": f"call_{i}",
+                "type": "function",
+                "function": {
+                    "name": "get_current_weather",
+                    "arguments": json.dumps({"location": f"City {i}"}),
+                },
+            }
+            line: dict = {
+                "id": f"batch_req_{i}",
+                "custom_id": f"request-{i}",
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "choices": [
+                            {
+                                "message": {
+                                    "role": "assistant",
+                                    "tool_calls": [tool_call],
+                                }
+                            }
+                        ]
+                    },
+                },
+                "error": None,
+            }
+            output_file.write(json.dumps(line) + "\n")
+
+
+def main() -> None:
+    line_count: int = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_LINE_COUNT
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = Path(directory) / "results.jsonl"
+        write_synthetic_results(input_path, line_count)
+        size_mb: float = input_path.stat().st_size / 1024 / 1024
+        print(f"input: {line_count:,} lines, {size_mb:.0f} MB")
+
+        for chunk_size in (1_000, 10_000):
+            processor = BatchResultProcessor(
+                ToolExecutor([get_current_weather]), chunk_size=chunk_size
+            )
+            stats: BatchProcessingStats = processor.process(
+                input_path, Path(directory) / f"output-{chunk_size}.jsonl"
+            )
+            print(
+                f"chunk size {chunk_size:>6,}: {stats.lines_per_second:>10,.0f} "
+                f"lines/s ({stats.elapsed_seconds:.1f} s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
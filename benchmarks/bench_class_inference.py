@@ -0,0 +1,90 @@
+"""Benchmark inferring the methods of per-request service instances.
+
+The baseline infers every bound method of every new instance, as each request
+did before. infer_from_instance infers the methods once per class and only
+binds them to later instances.
+
+Run with: python -m benchmarks.bench_class_inference [instances]
+"""
+
+import sys
+import time
+
+from openai_function_calling import FunctionInferrer
+
+
+class WeatherService:
+    """Weather tools bound to an API key."""
+
+    def __init__(self, api_key: str) -> None:
+        """Create a new service."""
+        self.api_key: str = api_key
+
+    def get_current_weather(self, location: str, unit: str = "celsius") -> str:
+        """Get the current weather.
+
+        Args:
+            location: The city and state, e.g. San Francisco, CA.
+            unit: The temperature unit.
+
+        """
+        return f"{self.api_key}: sunny in {location}, 22 degrees {unit}"
+
+    def get_forecast(self, location: str, days: int = 3) -> list[str]:
+        """Get the weather forecast.
+
+        Args:
+            location: The city and state, e.g. San Francisco, CA.
+            days: The number of days to forecast.
+
+        """
+        return [self.get_current_weather(location)] * days
+
+    def get_alerts(self, region: str, *, severe_only: bool = False) -> list[str]:
+        """Get the weather alerts of a region.
+
+        Args:
+            region: The region to get the alerts of.
+            severe_only: If only severe alerts should be returned.
+
+        """
+        return [region] if severe_only else []
+
+
+METHODS: tuple[str, ...] = ("get_current_weather", "get_forecast", "get_alerts")
+
+
+def main() -> None:
+    instances: int = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+
+    start: float = time.perf_counter()
+
+    for i in range(instances):
+        service = WeatherService(str(i))
+        [
+            FunctionInferrer.infer_from_function_reference(getattr(service, name))
+            for name in METHODS
+        ]
+
+    per_method_seconds: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+
+    for i in range(instances):
+        FunctionInferrer.infer_from_instance(WeatherService(str(i)))
+
+    cached_seconds: float = time.perf_counter() - start
+
+    print(f"{instances} instances with {len(METHODS)} methods each")
+    print(
+        f"infer each bound method: {per_method_seconds:6.3f} s "
+        f"({per_method_seconds / instances * 1_000_000:7.1f} us per instance)"
+    )
+    print(
+        f"infer_from_instance:     {cached_seconds:6.3f} s "
+        f"({cached_seconds / instances * 1_000_000:7.1f} us per instance)"
+    )
+
+
+if __name__ == "__main__":
+    main()
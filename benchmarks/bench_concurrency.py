@@ -0,0 +1,152 @@
+"""Benchmark shared tool catalogs read by many threads while tools are added.
+
+Every thread executes tool calls and reads the tool params of one shared
+executor and the function definitions of one shared registry. Reads use the
+published snapshots without locks, and the baseline serializes the same work
+on a global lock, as wrapping a catalog in a lock would. With the GIL both
+scale alike. On a free-threaded build (python3.13t or later) the lock-free
+reads scale with the number of cores.
+
+A stress phase then registers tools in both while the readers run, and counts
+errors and results that do not match.
+
+Run with: python -m benchmarks.bench_concurrency [operations]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any
+
+from openai_function_calling.tool_executor import ToolExecutor
+from openai_function_calling.tool_registry import ToolRegistry, tool
+
+if TYPE_CHECKING:
+    from contextlib import AbstractContextManager
+
+TOOLS: int = 50
+THREAD_COUNTS: tuple[int, ...] = (1, 2, 4, 8)
+
+
+def add(a: int, b: int) -> int:
+    """Add two numbers.
+
+    Args:
+        a: The first number.
+        b: The second number.
+
+    """
+    return a + b
+
+
+def catalogs() -> tuple[ToolExecutor, ToolRegistry]:
+    executor = ToolExecutor({f"add_{index}": add for index in range(TOOLS)})
+    registry = ToolRegistry()
+
+    for index in range(TOOLS):
+        tool(name=f"add_{index}", registry=registry)(add)
+
+    executor.warmup()
+    registry.warmup()
+
+    return executor, registry
+
+
+def read(
+    executor: ToolExecutor,
+    registry: ToolRegistry,
+    operations: int,
+    lock: AbstractContextManager[Any],
+) -> int:
+    mismatches: int = 0
+
+    for index in range(operations):
+        with lock:
+            name: str = f"add_{index % TOOLS}"
+            mismatches += executor.execute(name, {"a": index, "b": 1}) != index + 1
+            mismatches += len(executor.tool_params) < TOOLS
+            mismatches += registry.get(name).function.name != name
+
+    return mismatches
+
+
+def throughput(threads: int, operations: int, *, locked: bool) -> float:
+    executor, registry = catalogs()
+    lock: AbstractContextManager[Any] = threading.Lock() if locked else nullcontext()
+    start: float = time.perf_counter()
+
+    with ThreadPoolExecutor(threads) as pool:
+        futures = [
+            pool.submit(read, executor, registry, operations, lock)
+            for _ in range(threads)
+        ]
+        mismatches: int = sum(future.result() for future in futures)
+
+    seconds: float = time.perf_counter() - start
+
+    if mismatches:
+        raise RuntimeError(f"{mismatches} reads returned wrong results.")
+
+    return threads * operations / seconds
+
+
+def stress(threads: int, operations: int) -> tuple[int, int]:
+    executor, registry = catalogs()
+    errors: list[BaseException] = []
+    mismatches: list[int] = []
+
+    def reader() -> None:
+        try:
+            mismatches.append(read(executor, registry, operations, nullcontext()))
+        except Exception as error:  # noqa: BLE001
+            errors.append(error)
+
+    def writer() -> None:
+        for index in range(TOOLS, TOOLS + operations // 10):
+            executor.register(add, name=f"add_{index}")
+            tool(name=f"add_{index}", registry=registry)(add)
+
+    workers: list[threading.Thread] = [
+        threading.Thread(target=reader) for _ in range(threads)
+    ]
+    workers.append(threading.Thread(target=writer))
+
+    for worker in workers:
+        worker.start()
+
+    for worker in workers:
+        worker.join()
+
+    return len(errors), sum(mismatches)
+
+
+def main() -> None:
+    operations: int = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    is_gil_enabled: Any = getattr(sys, "_is_gil_enabled", None)
+    gil: str = "enabled" if is_gil_enabled is None or is_gil_enabled() else "disabled"
+
+    print(
+        f"Python {sys.version.split()[0]}, GIL {gil}, {os.cpu_count()} CPUs,"
+        f" {operations} operations per thread"
+    )
+    print("threads  global lock ops/s  lock-free ops/s")
+
+    for threads in THREAD_COUNTS:
+        locked: float = throughput(threads, operations, locked=True)
+        lock_free: float = throughput(threads, operations, locked=False)
+        print(f"{threads:7}  {locked:17,.0f}  {lock_free:15,.0f}")
+
+    errors, mismatches = stress(max(THREAD_COUNTS), operations)
+    print(
+        f"stress with concurrent registration: {errors} errors,"
+        f" {mismatches} mismatched reads"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark the docstring parsing backends.
+
+Compares the native Google style parser against docstring_parser for docstrings
+documenting between 1 and 100 parameters. Memoization is bypassed so each
+iteration measures a full parse.
+
+Run with: python -m benchmarks.bench_docstring_parsing
+"""
+
+import timeit
+
+from openai_function_calling.docstring_parsing import (
+    DocstringBackend,
+    _parse_uncached,
+    parse_docstring,
+)
+
+PARAMETER_COUNTS: list[int] = [1, 5, 10, 25, 50, 100]
+ITERATIONS: int = 200
+
+
+def build_docstring(parameter_count: int) -> str:
+    parameter_lines: str = "\n".join(
+        f"        param_{i} (int): The value for parameter {i}.\n"
+        "            It spans a second line."
+        for i in range(parameter_count)
+    )
+
+    return (
+        "Do something with many parameters.\n\n"
+        "    A longer description of the function.\n\n"
+        f"    Args:\n{parameter_lines}\n\n"
+        "    Returns:\n"
+        "        The result.\n\n"
+        "    "
+    )
+
+
+def time_backend(docstring: str, backend: DocstringBackend) -> float:
+    seconds: float = timeit.timeit(
+        lambda: _parse_uncached(docstring, backend), number=ITERATIONS
+    )
+    return seconds / ITERATIONS * 1_000_000
+
+
+def main() -> None:
+    print(f"{'params':>6} {'native (us)':>12} {'reference (us)':>15} {'speedup':>8}")
+
+    for parameter_count in PARAMETER_COUNTS:
+        docstring: str = build_docstring(parameter_count)
+        native: float = time_backend(docstring, DocstringBackend.AUTO)
+        reference: float = time_backend(docstring, DocstringBackend.DOCSTRING_PARSER)
+        print(
+            f"{parameter_count:>6} {native:>12.1f} {reference:>15.1f} "
+            f"{reference / native:>7.1f}x"
+        )
+
+    docstring = build_docstring(100)
+    parse_docstring(docstring)
+    memoized: float = (
+        timeit.timeit(lambda: parse_docstring(docstring), number=ITERATIONS)
+        / ITERATIONS
+        * 1_000_000
+    )
+    print(f"memoized lookup of a 100 parameter docstring: {memoized:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark the schema size and latency of tools with very large enums.
+
+A tool takes a SKU from an enum with thousands of members. Inline, every
+value is part of the schema sent with each request. The pattern and
+description policies replace the values by a few dozen bytes, and the
+executor checks arguments against a frozenset of the values instead. Enum
+values and the annotation schema are extracted once per class, so repeated
+inference no longer scales with the number of members.
+
+Run with: python -m benchmarks.bench_enum_policy [members]
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from enum import Enum
+from typing import Any
+
+from openai_function_calling import FunctionInferrer
+from openai_function_calling.enum_policy import EnumOverflow, EnumPolicy
+from openai_function_calling.tool_executor import ToolExecutor
+
+ROUNDS: int = 200
+
+
+def build_tool(members: int) -> Any:
+    sku = Enum("Sku", {f"SKU_{index}": f"SKU-{index:06d}" for index in range(members)})
+
+    def order(sku: Enum, quantity: int = 1) -> str:
+        """Order an item.
+
+        Args:
+            sku: The item to order.
+            quantity: The number of items.
+
+        """
+        return f"{quantity} x {sku}"
+
+    order.__annotations__ = {"sku": sku, "quantity": int, "return": str}
+
+    return order
+
+
+def main() -> None:
+    members: int = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    tool: Any = build_tool(members)
+    policies: dict[str, EnumPolicy] = {
+        "inline": EnumPolicy(max_inline_members=members),
+        "pattern": EnumPolicy(),
+        "description": EnumPolicy(overflow=EnumOverflow.DESCRIPTION),
+    }
+
+    print(f"enum with {members} members")
+
+    for label, policy in policies.items():
+        FunctionInferrer.enum_policy = policy
+        FunctionInferrer.infer_from_function_reference(tool)
+
+        start: float = time.perf_counter()
+        for _ in range(ROUNDS):
+            schema: dict = FunctionInferrer.infer_from_function_reference(
+                tool
+            ).to_json_schema()
+        infer_us: float = (time.perf_counter() - start) / ROUNDS * 1e6
+
+        executor = ToolExecutor([tool])
+        executor.execute("order", {"sku": "SKU-000001"})
+
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            executor.execute("order", {"sku": f"SKU-{members - 1:06d}"})
+        dispatch_us: float = (time.perf_counter() - start) / ROUNDS * 1e6
+
+        print(
+            f"{label:12} {len(json.dumps(schema)):7} bytes, "
+            f"inference {infer_us:8.1f} us, dispatch {dispatch_us:5.1f} us"
+        )
+
+    FunctionInferrer.enum_policy = EnumPolicy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark loading throughput of Function objects from schema files.
+
+Writes tool definitions as JSON Lines and as a JSON array, then loads them
+back with and without validation. Round trips are checked to be exact.
+
+Run with: python -m benchmarks.bench_function_loader [definitions]
+"""
+
+import json
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from openai_function_calling import Function, JsonSchemaType, Parameter
+from openai_function_calling.function_loader import load_functions
+from openai_function_calling.tool_helpers import ToolHelpers
+
+
+def build_function(index: int) -> Function:
+    return Function(
+        name=f"tool_{index}",
+        description=f"Run tool number {index} against the loaded data set.",
+        parameters=[
+            Parameter("query", JsonSchemaType.STRING, "The query to run."),
+            Parameter("limit", JsonSchemaType.INTEGER, "The maximum result count."),
+            Parameter(
+                "order",
+                JsonSchemaType.STRING,
+                "The result order.",
+                enum=["asc", "desc"],
+            ),
+            Parameter(
+                "fields",
+                JsonSchemaType.ARRAY,
+                "The fields to return.",
+                array_item_type=JsonSchemaType.STRING,
+            ),
+        ],
+        required_parameters=["query"],
+    )
+
+
+def functions(count: int) -> Iterator[Function]:
+    return (build_function(index) for index in range(count))
+
+
+def main() -> None:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_lines_path: Path = Path(directory) / "tools.jsonl"
+        json_path: Path = Path(directory) / "tools.json"
+
+        with json_lines_path.open("w", encoding="utf-8") as file:
+            for function in functions(count):
+                file.write(json.dumps(function.to_json_schema()) + "\n")
+
+        ToolHelpers.write_tool_params(
+            ToolHelpers.iter_from_functions(functions(count)), json_path
+        )
+
+        for path in (json_lines_path, json_path):
+            size_mb: float = path.stat().st_size / 1024 / 1024
+
+            for validate in (False, True):
+                start: float = time.perf_counter()
+                loaded: int = sum(1 for _ in load_functions(path, validate=validate))
+                elapsed: float = time.perf_counter() - start
+                print(
+                    f"{path.name:<12} {size_mb:6.1f} MB, validate={validate!s:<5}: "
+                    f"{loaded / elapsed:>9,.0f} functions/s ({elapsed:.2f} s)"
+                )
+
+        exact: bool = all(
+            loaded.to_json_schema() == original.to_json_schema()
+            for loaded, original in zip(load_functions(json_path), functions(count))
+        )
+        print(f"exact round trip of {count:,} definitions: {exact}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark the overhead of the instrumentation hooks.
+
+Measures inference and serialization with no hooks registered, which must be
+near zero overhead, and with an in-memory metrics collector registered.
+
+Run with: python -m benchmarks.bench_instrumentation
+"""
+
+import timeit
+
+from openai_function_calling.instrumentation import (
+    MetricsCollector,
+    add_hook,
+    remove_hook,
+    span,
+)
+from openai_function_calling.tool_helpers import ToolHelpers
+
+ITERATIONS: int = 5_000
+
+
+def get_current_weather(location: str, unit: str = "fahrenheit") -> str:
+    """Get the current weather.
+
+    Args:
+        location: The city and state, e.g. San Francisco, CA.
+        unit: The temperature unit to use.
+
+    """
+    return f"It is sunny in {location} and 75 degrees {unit}."
+
+
+def infer_and_serialize() -> None:
+    ToolHelpers.infer_from_function_refs([get_current_weather])
+
+
+def noop_span() -> None:
+    with span("operation"):
+        pass
+
+
+def empty() -> None:
+    pass
+
+
+def time_per_call(function: object) -> float:
+    return timeit.timeit(function, number=ITERATIONS) / ITERATIONS * 1e9  # type: ignore[arg-type]
+
+
+def main() -> None:
+    empty_ns: float = time_per_call(empty)
+    noop_span_ns: float = time_per_call(noop_span) - empty_ns
+    print(f"no-op span overhead: {noop_span_ns:.0f} ns per span")
+
+    without_hooks: float = time_per_call(infer_and_serialize)
+    collector = MetricsCollector()
+    add_hook(collector)
+    with_hooks: float = time_per_call(infer_and_serialize)
+    remove_hook(collector)
+
+    spans_per_call: int = (
+        sum(statistics.count for statistics in collector.spans.values()) // ITERATIONS
+    )
+    print(f"infer + serialize without hooks: {without_hooks / 1000:.1f} us")
+    print(f"infer + serialize with collector: {with_hooks / 1000:.1f} us")
+    print(
+        f"no-hook instrumentation share: "
+        f"{spans_per_call * noop_span_ns / without_hooks:.2%} "
+        f"({spans_per_call} spans per call)"
+    )
+
+
+if __name__ == "__main__":
+    main()
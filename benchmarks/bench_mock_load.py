@@ -0,0 +1,58 @@
+"""Load test the full tool cycle against the local mock server.
+
+Each cycle sends a request, executes the returned tool calls and sends the
+follow-up request. Reports p50/p99 latency and throughput per configuration.
+
+Run with: python -m benchmarks.bench_mock_load
+"""
+
+from openai_function_calling.load_testing import run_load_test
+from openai_function_calling.mock_server import (
+    MockChatCompletionsServer,
+    MockServerClient,
+)
+from openai_function_calling.tool_executor import ToolExecutor
+from openai_function_calling.tool_helpers import ToolHelpers
+
+CYCLES: int = 500
+
+
+def get_current_weather(location: str, unit: str = "fahrenheit") -> str:
+    """Get the current weather.
+
+    Args:
+        location: The city and state, e.g. San Francisco, CA.
+        unit: The temperature unit to use.
+
+    """
+    return f"It is currently sunny in {location} and 75 degrees {unit}."
+
+
+def main() -> None:
+    tools = ToolHelpers.infer_from_function_refs([get_current_weather])
+    executor = ToolExecutor([get_current_weather])
+    messages: list[dict] = [{"role": "user", "content": "What's the weather?"}]
+
+    for latency_seconds in (0.0, 0.01):
+        with MockChatCompletionsServer(latency_seconds=latency_seconds) as server:
+            client = MockServerClient(server.base_url)
+
+            for concurrency in (1, 8, 32):
+                report = run_load_test(
+                    client,
+                    executor,
+                    tools,
+                    messages,
+                    cycles=CYCLES,
+                    concurrency=concurrency,
+                )
+                print(
+                    f"latency {latency_seconds * 1000:>4.0f} ms, "
+                    f"concurrency {concurrency:>2}: {report.summary()}"
+                )
+
+    executor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark forked workers with and without warming up the tools in the master.
+
+A master process registers many tools and forks workers, as gunicorn does with
+preload_app. Without warmup every worker infers and serializes the tool
+definitions on its first request, each in its own private memory. With
+ToolExecutor.warmup(freeze_gc=True) in the master the workers inherit the
+definitions, and frozen objects are not written to by the garbage collector,
+so their pages stay shared. Reports the first request latency and the memory
+of each worker, where USS is the memory only that worker uses. Needs Linux.
+
+Run with: python -m benchmarks.bench_prefork_warmup [tools]
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from openai_function_calling.tool_executor import ToolExecutor
+
+WORKERS: int = 4
+TOOL_SOURCE: str = '''
+def tool_{index}(query: str, limit: int = 10, exact: bool = False) -> str:
+    """Search data set {index} for matching records.
+
+    Args:
+        query: The text to search for.
+        limit: The maximum number of records to return.
+        exact: If only exact matches should be returned.
+
+    """
+    return query
+'''
+
+
+def build_tools(count: int) -> list[Callable]:
+    namespace: dict[str, Any] = {}
+
+    for index in range(count):
+        exec(TOOL_SOURCE.format(index=index), namespace)  # noqa: S102
+
+    return [namespace[f"tool_{index}"] for index in range(count)]
+
+
+def memory_kib() -> dict[str, int]:
+    with Path("/proc/self/smaps_rollup").open() as file:
+        fields: dict[str, int] = {
+            line.split(":")[0]: int(line.split()[1])
+            for line in file
+            if line.endswith("kB\n")
+        }
+
+    return {
+        "rss": fields["Rss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def first_request(executor: ToolExecutor) -> dict[str, float]:
+    start: float = time.perf_counter()
+    body: bytes = executor.tools_json_bytes
+    executor.execute("tool_0", {"query": "x"})
+    # A full collection, as happens eventually in a busy worker.
+    gc.collect()
+
+    return {"ms": (time.perf_counter() - start) * 1000, "bytes": len(body)}
+
+
+def run_workers(executor: ToolExecutor) -> list[dict[str, float]]:
+    reports: list[dict[str, float]] = []
+
+    for _ in range(WORKERS):
+        read_fd, write_fd = os.pipe()
+        pid: int = os.fork()
+
+        if pid == 0:
+            os.close(read_fd)
+            report: dict[str, float] = first_request(executor)
+            report.update(memory_kib())
+            os.write(write_fd, json.dumps(report).encode())
+            os._exit(0)
+
+        os.close(write_fd)
+
+        with os.fdopen(read_fd) as file:
+            reports.append(json.loads(file.read()))
+
+        os.waitpid(pid, 0)
+
+    return reports
+
+
+def main() -> None:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    print(f"{count} tools, {WORKERS} forked workers")
+
+    for warmup in [False, True]:
+        executor = ToolExecutor(build_tools(count))
+
+        if warmup:
+            start: float = time.perf_counter()
+            executor.warmup(freeze_gc=True)
+            print(f"warmup in master: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        reports: list[dict[str, float]] = run_workers(executor)
+        gc.unfreeze()
+
+        def mean(key: str, reports: list[dict[str, float]] = reports) -> float:
+            return sum(report[key] for report in reports) / len(reports)
+
+        print(
+            f"{'warmed up' if warmup else 'lazy':10} first request "
+            f"{mean('ms'):7.2f} ms, RSS {mean('rss') / 1024:6.1f} MiB, "
+            f"USS {mean('uss') / 1024:6.1f} MiB per worker"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark CPU-bound tools on the thread backend and the process pool backend.
+
+Every batch runs the same CPU-bound tool calls through a ToolExecutor. The
+thread backend runs them in its thread pool, where the GIL serializes them.
+The process backend runs them in warm worker processes. A second comparison
+passes a large byte payload through shared memory and through a pickle.
+
+Run with: python -m benchmarks.bench_process_pool [calls]
+"""
+
+import json
+import os
+import sys
+import time
+
+from openai_function_calling.process_pool import ProcessToolPool
+from openai_function_calling.tool_executor import ToolExecutor
+
+TOOL: str = "benchmarks.bench_process_pool:count_primes"
+PAYLOAD_TOOL: str = "benchmarks.bench_process_pool:checksum"
+LIMIT: int = 60_000
+PAYLOAD_BYTES: int = 64 * 1024 * 1024
+
+
+def count_primes(limit: int) -> int:
+    """Count the prime numbers below a limit.
+
+    Args:
+        limit: The exclusive upper bound.
+
+    """
+    return sum(all(n % d for d in range(2, int(n**0.5) + 1)) for n in range(2, limit))
+
+
+def checksum(data: bytes) -> int:
+    """Get a checksum of a payload.
+
+    Args:
+        data: The payload.
+
+    """
+    return sum(data[::4096])
+
+
+def tool_calls(count: int) -> list[dict]:
+    return [
+        {
+            "id": f"call_{i}",
+            "function": {
+                "name": "count_primes",
+                "arguments": json.dumps({"limit": LIMIT}),
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def time_batch(executor: ToolExecutor, calls: list[dict]) -> float:
+    start: float = time.perf_counter()
+    executor.execute_tool_calls(calls)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    calls: list[dict] = tool_calls(int(sys.argv[1]) if len(sys.argv) > 1 else 8)
+    cpu_count: int = os.cpu_count() or 1
+    worker_counts: list[int] = sorted({1, 2, 4, cpu_count})
+
+    print(f"{len(calls)} calls of count_primes({LIMIT}) on {cpu_count} CPUs")
+
+    for workers in worker_counts:
+        with ToolExecutor(max_workers=workers) as thread_executor:
+            thread_executor.register(count_primes)
+            thread_seconds: float = time_batch(thread_executor, calls)
+
+        with ProcessToolPool(max_workers=workers) as pool:
+            process_executor = ToolExecutor(max_workers=workers)
+            process_executor.register(pool.tool(TOOL), name="count_primes")
+            pool.warmup()
+            process_seconds: float = time_batch(process_executor, calls)
+            process_executor.close()
+
+        print(
+            f"{workers} workers: threads {thread_seconds:6.2f} s, "
+            f"processes {process_seconds:6.2f} s "
+            f"({thread_seconds / process_seconds:4.1f}x)"
+        )
+
+    payload: bytes = os.urandom(PAYLOAD_BYTES)
+
+    for label, threshold in [("shared memory", 1), ("pickle", PAYLOAD_BYTES + 1)]:
+        with ProcessToolPool(max_workers=1, shared_memory_threshold=threshold) as pool:
+            pool.warmup()
+            start: float = time.perf_counter()
+
+            for _ in range(5):
+                pool.call(PAYLOAD_TOOL, {"data": payload})
+
+            seconds: float = (time.perf_counter() - start) / 5
+
+        print(
+            f"{PAYLOAD_BYTES >> 20} MB argument via {label}: {seconds * 1000:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
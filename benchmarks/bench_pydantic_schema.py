@@ -0,0 +1,131 @@
+"""Benchmark inferring tools that take Pydantic models, with and without the cache.
+
+Many tools share a few models, as tools of one service usually do. Without the
+cache every tool pays for model_json_schema and the reference inlining of its
+model again. With the cache each model class is converted once and later tools
+reuse its object schema.
+
+Run with: python -m benchmarks.bench_pydantic_schema [tools]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from typing import Any, Callable
+
+from pydantic import BaseModel, Field
+
+from openai_function_calling import FunctionInferrer, pydantic_models
+from openai_function_calling.pydantic_models import model_object_schema
+
+TOOL_SOURCE: str = '''
+def tool_{index}(request: {model}, dry_run: bool = False) -> str:
+    """Run operation {index} of the service.
+
+    Args:
+        request: The request to run.
+        dry_run: If the request should only be validated.
+
+    """
+    return ""
+'''
+
+
+class Address(BaseModel):
+    """A postal address."""
+
+    street: str
+    city: str = Field(description="The city name.")
+    country: str = "US"
+
+
+class Customer(BaseModel):
+    """A customer."""
+
+    name: str
+    email: str
+    address: Address
+    tags: list[str] = []
+
+
+class LineItem(BaseModel):
+    """An item of an order."""
+
+    sku: str
+    quantity: int = 1
+    price: float
+
+
+class Order(BaseModel):
+    """An order."""
+
+    customer: Customer
+    items: list[LineItem]
+    billing: Address
+
+
+class Refund(BaseModel):
+    """A refund of an order."""
+
+    order: Order
+    reason: str
+    amount: float
+
+
+MODELS: tuple[type[BaseModel], ...] = (Address, Customer, LineItem, Order, Refund)
+
+
+def build_tools(count: int) -> list[Callable]:
+    namespace: dict[str, Any] = {model.__name__: model for model in MODELS}
+
+    for index in range(count):
+        model: str = MODELS[index % len(MODELS)].__name__
+        exec(TOOL_SOURCE.format(index=index, model=model), namespace)  # noqa: S102
+
+    return [namespace[f"tool_{index}"] for index in range(count)]
+
+
+def infer(tools: list[Callable], *, cached: bool) -> float:
+    pydantic_models._MODEL_SCHEMAS.clear()  # noqa: SLF001
+    start: float = time.perf_counter()
+
+    for tool in tools:
+        if not cached:
+            pydantic_models._MODEL_SCHEMAS.clear()  # noqa: SLF001
+
+        FunctionInferrer.infer_from_function_reference(tool).to_json_schema()
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    start: float = time.perf_counter()
+    for model in MODELS * 100:
+        model.model_json_schema()
+    generate_us: float = (time.perf_counter() - start) / (len(MODELS) * 100) * 1e6
+
+    for model in MODELS:
+        model_object_schema(model)
+
+    start = time.perf_counter()
+    for model in MODELS * 100:
+        model_object_schema(model)
+    cached_us: float = (time.perf_counter() - start) / (len(MODELS) * 100) * 1e6
+
+    print(f"model_json_schema: {generate_us:7.1f} us per call")
+    print(f"cached schema:     {cached_us:7.1f} us per call")
+
+    print(f"inferring {count} tools over {len(MODELS)} models")
+    for cached in [False, True]:
+        seconds: float = infer(build_tools(count), cached=cached)
+        print(
+            f"{'cached' if cached else 'uncached':9} {seconds * 1000:7.1f} ms, "
+            f"{seconds / count * 1e6:6.1f} us per tool"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark answering repeated chat completion requests from a response cache.
+
+Replays deterministic requests, drawn with repeats from a fixed set of prompts,
+against the mock server with a per-request latency. Without a cache every
+request reaches the server. With an in-memory or SQLite cache repeated
+requests with the same messages and tools are answered locally.
+
+Run with: python -m benchmarks.bench_response_cache [requests]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from openai_function_calling.mock_server import (
+    MockChatCompletionsServer,
+    MockServerClient,
+)
+from openai_function_calling.response_cache import (
+    CachedChatClient,
+    ResponseCache,
+    SqliteCacheStorage,
+)
+from openai_function_calling.tool_helpers import ToolHelpers
+
+PROMPTS: int = 20
+LATENCY_SECONDS: float = 0.02
+
+
+def get_current_weather(location: str, unit: str = "fahrenheit") -> str:
+    """Get the current weather in a location.
+
+    Args:
+        location: The city and state, e.g. San Francisco, CA.
+        unit: The temperature unit, celsius or fahrenheit.
+
+    """
+    return f"It is sunny in {location} and 75 degrees {unit}."
+
+
+def requests(count: int) -> list[dict[str, Any]]:
+    rng = random.Random(0)  # noqa: S311
+    tools: list = ToolHelpers.infer_from_function_refs([get_current_weather])
+
+    return [
+        {
+            "model": "mock",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": f"Weather in city {rng.randrange(PROMPTS)}?",
+                }
+            ],
+            "tools": tools,
+            "temperature": 0,
+        }
+        for _ in range(count)
+    ]
+
+
+def run(client: Any, work: list[dict[str, Any]]) -> float:
+    start: float = time.perf_counter()
+
+    for request in work:
+        client.chat.completions.create(**request)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    work: list[dict[str, Any]] = requests(count)
+
+    print(f"{count} requests over {PROMPTS} prompts, {LATENCY_SECONDS * 1000:.0f} ms")
+
+    with MockChatCompletionsServer(latency_seconds=LATENCY_SECONDS, seed=0) as server:
+        mock_client = MockServerClient(server.base_url)
+        seconds: float = run(mock_client, work)
+        print(f"no cache: {server.request_count:4} sent, {seconds:5.2f} s")
+
+        with tempfile.TemporaryDirectory() as directory:
+            for name, cache in [
+                ("memory", ResponseCache()),
+                ("sqlite", ResponseCache(SqliteCacheStorage(Path(directory) / "db"))),
+            ]:
+                sent: int = server.request_count
+                seconds = run(CachedChatClient(mock_client, cache), work)
+                print(
+                    f"{name}:   {server.request_count - sent:4} sent, "
+                    f"{seconds:5.2f} s, hit rate {cache.stats.hit_rate:.0%}"
+                )
+
+
+if __name__ == "__main__":
+    main()
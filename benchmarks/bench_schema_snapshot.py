@@ -0,0 +1,97 @@
+"""Benchmark detecting changed tool schemas between two deployments.
+
+The baseline regenerates the full JSON schema of every tool of both
+deployments and compares them. A snapshot keeps content hashes, which the
+function and parameter definitions cache, so taking it again after a change
+only hashes the changed definitions. Diffing two snapshots only descends into
+the Merkle tree groups whose hashes differ.
+
+Run with: python -m benchmarks.bench_schema_snapshot [tools]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+from openai_function_calling import Function, JsonSchemaType, Parameter
+from openai_function_calling.schema_snapshot import SchemaDiff, SchemaSnapshot
+
+CHANGED: int = 3
+
+
+def build_functions(count: int) -> list[Function]:
+    return [
+        Function(
+            name=f"tool_{index}",
+            description=f"Run operation {index} of the service.",
+            parameters=[
+                Parameter("query", JsonSchemaType.STRING, "The text to search for."),
+                Parameter("limit", JsonSchemaType.INTEGER, "The number of results."),
+                Parameter(
+                    "order",
+                    JsonSchemaType.STRING,
+                    "The sort order.",
+                    enum=["asc", "desc"],
+                ),
+            ],
+            required_parameters=["query"],
+        )
+        for index in range(count)
+    ]
+
+
+def full_dict_diff(old: list[Function], new: list[Function]) -> list[str]:
+    old_schemas: dict[str, dict] = {f.name: dict(f.to_json_schema()) for f in old}
+    new_schemas: dict[str, dict] = {f.name: dict(f.to_json_schema()) for f in new}
+
+    return [
+        name
+        for name in old_schemas.keys() | new_schemas.keys()
+        if old_schemas.get(name) != new_schemas.get(name)
+    ]
+
+
+def main() -> None:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    changed: int = CHANGED
+    old: list[Function] = build_functions(count)
+    new: list[Function] = build_functions(count)
+
+    for function in new[:changed]:
+        function.parameters[0].description = "The new description."
+
+    start: float = time.perf_counter()
+    changed_names: list[str] = full_dict_diff(old, new)
+    print(f"full dict comparison:   {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    start = time.perf_counter()
+    old_snapshot: SchemaSnapshot = SchemaSnapshot.from_functions(old)
+    print(f"first snapshot:         {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    new_snapshot: SchemaSnapshot = SchemaSnapshot.from_functions(new)
+
+    for function in new[changed : changed * 2]:
+        function.parameters[1].description = "The largest number of results."
+
+    start = time.perf_counter()
+    newer_snapshot: SchemaSnapshot = SchemaSnapshot.from_functions(new)
+    print(f"snapshot after change:  {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    start = time.perf_counter()
+    diff: SchemaDiff = old_snapshot.diff(new_snapshot)
+    print(f"snapshot diff:          {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    start = time.perf_counter()
+    old_snapshot.diff(old_snapshot)
+    print(f"diff of equal:          {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    print(
+        f"changed tools: {len(changed_names)} by full comparison, "
+        f"{len(diff.changed)} and {len(new_snapshot.diff(newer_snapshot).changed)} "
+        f"by snapshot diffs, of {count}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark deduplicating identical tool calls of concurrent conversations.
+
+Every conversation gets responses with repeated tool calls, and conversations
+running at the same time look up overlapping keys. Without deduplication every
+call runs. With a shared SingleFlight, repeats within a response and calls
+matching one already in flight share a single run.
+
+Run with: python -m benchmarks.bench_single_flight [conversations]
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai_function_calling.single_flight import SingleFlight
+from openai_function_calling.tool_executor import ToolExecutor
+
+RESPONSES: int = 5
+CALLS_PER_RESPONSE: int = 4
+KEYS: int = 20
+LOOKUP_SECONDS: float = 0.02
+
+
+def responses(conversations: int) -> list[list[list[dict]]]:
+    rng = random.Random(0)  # noqa: S311
+
+    def tool_call(index: int) -> dict:
+        return {
+            "id": f"call_{index}",
+            "function": {
+                "name": "lookup",
+                "arguments": json.dumps({"key": f"key_{rng.randrange(KEYS)}"}),
+            },
+        }
+
+    return [
+        [
+            [tool_call(i) for i in range(CALLS_PER_RESPONSE)]
+            + [tool_call(0) | {"id": "call_repeat"}]
+            for _ in range(RESPONSES)
+        ]
+        for _ in range(conversations)
+    ]
+
+
+def run(
+    single_flight: SingleFlight | None, work: list[list[list[dict]]]
+) -> tuple[int, float]:
+    runs: list[int] = [0]
+    lock = threading.Lock()
+
+    def lookup(key: str) -> str:
+        with lock:
+            runs[0] += 1
+
+        time.sleep(LOOKUP_SECONDS)
+        return f"value of {key}"
+
+    def converse(conversation: list[list[dict]]) -> None:
+        executor = ToolExecutor(
+            max_workers=CALLS_PER_RESPONSE, single_flight=single_flight
+        )
+        executor.register(lookup, idempotent=True)
+
+        with executor:
+            for tool_calls in conversation:
+                executor.execute_tool_calls(tool_calls)
+
+    start: float = time.perf_counter()
+
+    with ThreadPoolExecutor(len(work)) as pool:
+        list(pool.map(converse, work))
+
+    return runs[0], time.perf_counter() - start
+
+
+def main() -> None:
+    conversations: int = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    work: list[list[list[dict]]] = responses(conversations)
+    total: int = conversations * RESPONSES * (CALLS_PER_RESPONSE + 1)
+
+    print(f"{conversations} concurrent conversations, {total} tool calls")
+
+    runs, seconds = run(None, work)
+    print(f"no deduplication: {runs:5} lookups ran, {seconds:5.2f} s")
+
+    single_flight = SingleFlight()
+    runs, seconds = run(single_flight, work)
+    print(f"single flight:    {runs:5} lookups ran, {seconds:5.2f} s")
+    print(f"  {single_flight.stats}")
+
+
+if __name__ == "__main__":
+    main()
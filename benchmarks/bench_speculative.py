@@ -0,0 +1,121 @@
+"""Benchmark the time to result saved by speculative tool execution.
+
+The mock server streams three tool calls with a delay between chunks. The
+baseline consumes the whole stream and then runs the tool calls concurrently;
+the speculative runner starts each idempotent call as soon as its required
+arguments have streamed. The last call cannot start before the stream ends, so
+the saving shows in the mean time to each tool result.
+
+Run with: python -m benchmarks.bench_speculative
+"""
+
+import time
+from typing import Any
+
+from openai_function_calling.mock_server import (
+    MockChatCompletionsServer,
+    MockServerClient,
+)
+from openai_function_calling.speculative import SpeculativeToolRunner
+from openai_function_calling.tool_executor import ToolExecutor
+
+ROUNDS: int = 10
+TOOL_SECONDS: float = 0.05
+CHUNK_DELAY_SECONDS: float = 0.005
+
+completion_times: list[float] = []
+
+
+def search_documents(query: str) -> str:
+    """Search the documents.
+
+    Args:
+        query: The search query.
+
+    """
+    time.sleep(TOOL_SECONDS)
+    completion_times.append(time.perf_counter())
+    return f"Found 3 documents for {query!r}."
+
+
+SCRIPTED_RESPONSE: dict = {
+    "tool_calls": [
+        {
+            "name": "search_documents",
+            "arguments": {"query": f"quarterly revenue by region, part {i}"},
+        }
+        for i in range(3)
+    ]
+}
+
+
+def stream(client: MockServerClient) -> Any:
+    return client.chat.completions.create(
+        model="mock",
+        messages=[{"role": "user", "content": "Summarize the quarterly revenue."}],
+        stream=True,
+    )
+
+
+def consume_then_execute(client: MockServerClient, executor: ToolExecutor) -> None:
+    runner = SpeculativeToolRunner(executor)
+
+    for chunk in stream(client):
+        runner.feed(chunk)
+
+    executor.execute_tool_calls(runner.tool_calls)
+
+
+def speculative(client: MockServerClient, executor: ToolExecutor) -> None:
+    SpeculativeToolRunner(executor).run_stream(stream(client))
+
+
+def time_to_result_ms(function: Any, *args: Any) -> tuple[float, float]:
+    """Get the mean time to the last tool result and to each tool result."""
+    last: float = 0.0
+    each: float = 0.0
+
+    for _ in range(ROUNDS):
+        completion_times.clear()
+        start: float = time.perf_counter()
+        function(*args)
+        last += time.perf_counter() - start
+        each += sum(t - start for t in completion_times) / len(completion_times)
+
+    return last / ROUNDS * 1000, each / ROUNDS * 1000
+
+
+def main() -> None:
+    baseline_executor = ToolExecutor([search_documents])
+    speculative_executor = ToolExecutor()
+    speculative_executor.register(search_documents, idempotent=True)
+
+    with MockChatCompletionsServer(
+        scripted_responses=[SCRIPTED_RESPONSE],
+        stream_chunk_delay_seconds=CHUNK_DELAY_SECONDS,
+    ) as server:
+        client = MockServerClient(server.base_url)
+        baseline: tuple[float, float] = time_to_result_ms(
+            consume_then_execute, client, baseline_executor
+        )
+        speculated: tuple[float, float] = time_to_result_ms(
+            speculative, client, speculative_executor
+        )
+
+    for label, (last, each) in [
+        ("consume then execute", baseline),
+        ("speculative", speculated),
+    ]:
+        print(f"{label:<21} all results {last:6.1f} ms, each result {each:6.1f} ms")
+
+    print(
+        f"{'saved':<21} all results {baseline[0] - speculated[0]:6.1f} ms, "
+        f"each result {baseline[1] - speculated[1]:6.1f} ms"
+    )
+
+    baseline_executor.close()
+    speculative_executor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark strict mode schema generation with and without the cache.
+
+Run with: python -m benchmarks.bench_strict_schema
+"""
+
+import time
+from typing import Any
+
+from openai_function_calling import Function, JsonSchemaType, Parameter
+from openai_function_calling.strict_schema import to_strict_function_schema
+
+PARAMETER_COUNTS: list[int] = [1, 10, 50]
+ITERATIONS: int = 10_000
+
+
+def function_with(parameter_count: int) -> Function:
+    return Function(
+        name="example_function",
+        description="An example function.",
+        parameters=[
+            Parameter(
+                f"p{i}", JsonSchemaType.STRING, f"Parameter {i}.", enum=["a", "b"]
+            )
+            for i in range(parameter_count)
+        ],
+        required_parameters=["p0"],
+        strict=True,
+    )
+
+
+def time_per_call_us(function: Any) -> float:
+    start: float = time.perf_counter()
+
+    for _ in range(ITERATIONS):
+        function()
+
+    return (time.perf_counter() - start) / ITERATIONS * 1_000_000
+
+
+def main() -> None:
+    for parameter_count in PARAMETER_COUNTS:
+        function: Function = function_with(parameter_count)
+        plain: Function = function_with(parameter_count)
+        plain.strict = None
+        uncached: float = time_per_call_us(
+            lambda plain=plain: to_strict_function_schema(plain.to_json_schema())
+        )
+        cached: float = time_per_call_us(function.to_json_schema)
+        print(
+            f"{parameter_count:>3} parameters: transform {uncached:>7.1f} us, "
+            f"cached {cached:>6.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark per-tenant tool lists built separately and as catalog views.
+
+Every tenant selects a random subset of a shared set of tools. The baseline
+builds Function objects and tool params per tenant and serializes them on
+every request, as each tenant did before. The catalog compiles the tools
+once, and every tenant gets a view with cached JSON bytes.
+
+Run with: python -m benchmarks.bench_tool_catalog [tenants]
+"""
+
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+from openai_function_calling import Function, JsonSchemaType, Parameter
+from openai_function_calling.tool_catalog import ToolCatalog, ToolCatalogView
+from openai_function_calling.tool_helpers import ToolHelpers
+
+TOOL_COUNT: int = 2_000
+TOOLS_PER_TENANT: tuple[int, int] = (50, 150)
+REQUESTS: int = 10_000
+
+
+def build_function(index: int) -> Function:
+    return Function(
+        name=f"tool_{index}",
+        description=f"Run tool number {index} against the tenant's data.",
+        parameters=[
+            Parameter("query", JsonSchemaType.STRING, "The query to run."),
+            Parameter("limit", JsonSchemaType.INTEGER, "The maximum result count."),
+            Parameter(
+                "order",
+                JsonSchemaType.STRING,
+                "The result order.",
+                enum=["asc", "desc"],
+            ),
+        ],
+        required_parameters=["query"],
+    )
+
+
+def tenant_subsets(tenants: int) -> list[list[int]]:
+    rng = random.Random(0)  # noqa: S311
+
+    return [
+        rng.sample(range(TOOL_COUNT), rng.randint(*TOOLS_PER_TENANT))
+        for _ in range(tenants)
+    ]
+
+
+def measure(build: Any) -> tuple[Any, float, float]:
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    state: Any = build()
+    elapsed: float = time.perf_counter() - start
+    memory: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return state, elapsed, memory / 1024 / 1024
+
+
+def time_per_request_us(payload: Any, tenant_count: int) -> float:
+    start: float = time.perf_counter()
+
+    for request in range(REQUESTS):
+        payload(request % tenant_count)
+
+    return (time.perf_counter() - start) / REQUESTS * 1_000_000
+
+
+def main() -> None:
+    tenants: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    subsets: list[list[int]] = tenant_subsets(tenants)
+
+    per_tenant, per_tenant_seconds, per_tenant_mb = measure(
+        lambda: [
+            ToolHelpers.from_functions([build_function(i) for i in subset])
+            for subset in subsets
+        ]
+    )
+
+    def build_views() -> tuple[ToolCatalog, list[ToolCatalogView]]:
+        catalog = ToolCatalog(build_function(i) for i in range(TOOL_COUNT))
+        views: list[ToolCatalogView] = [
+            catalog.view(f"tool_{i}" for i in subset) for subset in subsets
+        ]
+
+        return catalog, views
+
+    (_, views), catalog_seconds, catalog_mb = measure(build_views)
+    _, warm_seconds, warm_mb = measure(
+        lambda: [view.tools_json_bytes for view in views]
+    )
+
+    print(f"{tenants} tenants over {TOOL_COUNT} tools")
+    print(
+        f"per tenant:    build {per_tenant_seconds:6.2f} s, "
+        f"retained {per_tenant_mb:7.1f} MB"
+    )
+    print(
+        f"catalog views: build {catalog_seconds:6.2f} s, retained {catalog_mb:7.1f} MB"
+    )
+    print(
+        f"view bytes:    cache {warm_seconds:6.2f} s, retained {warm_mb:7.1f} MB more"
+    )
+
+    per_tenant_us: float = time_per_request_us(
+        lambda tenant: json.dumps(per_tenant[tenant]).encode(), tenants
+    )
+    cached_us: float = time_per_request_us(
+        lambda tenant: views[tenant].tools_json_bytes, tenants
+    )
+    print(
+        f"tools payload per request: per tenant json.dumps {per_tenant_us:.1f} us, "
+        f"cached view bytes {cached_us:.2f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark peak memory of exporting large tool catalogs.
+
+The baseline builds every Function, converts them with from_functions and
+serializes the whole list. The streaming export creates functions from a
+generator and writes one tool param at a time with write_tool_params. Peak
+memory of the streaming export stays flat as the catalog grows.
+
+Run with: python -m benchmarks.bench_tool_export
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from collections.abc import Iterator
+from typing import Any
+
+from openai_function_calling import Function, JsonSchemaType, Parameter
+from openai_function_calling.tool_helpers import ToolHelpers
+
+TOOL_COUNTS: list[int] = [1_000, 10_000, 50_000]
+
+
+def build_function(index: int) -> Function:
+    return Function(
+        name=f"tool_{index}",
+        description=f"Run tool number {index} against the exported data set.",
+        parameters=[
+            Parameter("query", JsonSchemaType.STRING, "The query to run."),
+            Parameter("limit", JsonSchemaType.INTEGER, "The maximum result count."),
+            Parameter(
+                "order",
+                JsonSchemaType.STRING,
+                "The result order.",
+                enum=["asc", "desc"],
+            ),
+        ],
+        required_parameters=["query"],
+    )
+
+
+def functions(count: int) -> Iterator[Function]:
+    return (build_function(index) for index in range(count))
+
+
+def materialized_export(count: int, path: str) -> None:
+    tool_params: list = ToolHelpers.from_functions(list(functions(count)))
+
+    with open(path, "wb") as file:  # noqa: PTH123
+        file.write(json.dumps(tool_params).encode())
+
+
+def streaming_export(count: int, path: str) -> None:
+    ToolHelpers.write_tool_params(
+        ToolHelpers.iter_from_functions(functions(count)), path
+    )
+
+
+def measure(export: Any, count: int) -> tuple[float, float]:
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    export(count, os.devnull)
+    elapsed: float = time.perf_counter() - start
+    peak: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, peak / 1024 / 1024
+
+
+def main() -> None:
+    for count in TOOL_COUNTS:
+        materialized_seconds, materialized_mb = measure(materialized_export, count)
+        streaming_seconds, streaming_mb = measure(streaming_export, count)
+        print(
+            f"{count:>6} tools: materialized peak {materialized_mb:7.2f} MB "
+            f"({materialized_seconds:5.2f} s), streaming peak {streaming_mb:5.2f} MB "
+            f"({streaming_seconds:5.2f} s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
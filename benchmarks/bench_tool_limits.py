@@ -0,0 +1,89 @@
+"""Benchmark a healthy tool while another tool slows down, with and without limits.
+
+Both tools share one pool of workers. Without limits, calls to the slow tool
+occupy every worker, so calls to the healthy tool queue behind them. With an
+adaptive concurrency limit and a circuit breaker on the slow tool, its extra
+calls are rejected right away and the healthy tool keeps its latency.
+
+Run with: python -m benchmarks.bench_tool_limits [calls]
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai_function_calling.tool_executor import ToolExecutor
+from openai_function_calling.tool_limits import (
+    AdaptiveConcurrencyLimit,
+    CircuitBreaker,
+    LatencyHistogram,
+    ToolPolicy,
+)
+
+WORKERS: int = 16
+SLOW_SECONDS: float = 0.2
+
+
+def slow_lookup() -> str:
+    """Call a downstream service that has slowed down."""
+    time.sleep(SLOW_SECONDS)
+    return "slow"
+
+
+def healthy_lookup() -> str:
+    """Call a healthy downstream service."""
+    time.sleep(0.002)
+    return "healthy"
+
+
+def run(executor: ToolExecutor, calls: int) -> tuple[LatencyHistogram, int, float]:
+    """Submit all calls at once and time each healthy call from submission."""
+    waited = LatencyHistogram()
+    start: float = time.perf_counter()
+
+    def call(name: str) -> bool:
+        result = executor.execute_tool_call(
+            {"id": "call", "function": {"name": name, "arguments": "{}"}}
+        )
+
+        if name == "healthy_lookup":
+            waited.observe(time.perf_counter() - start)
+
+        return result.is_error
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        names: list[str] = [
+            "slow_lookup" if i % 2 else "healthy_lookup" for i in range(calls)
+        ]
+        rejected: int = sum(pool.map(call, names))
+
+    return waited, rejected, time.perf_counter() - start
+
+
+def main() -> None:
+    calls: int = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    unlimited = ToolExecutor([slow_lookup, healthy_lookup])
+    limited = ToolExecutor([healthy_lookup])
+    limited.register(
+        slow_lookup,
+        policy=ToolPolicy(
+            AdaptiveConcurrencyLimit(4, max_limit=8, latency_target_seconds=0.05),
+            CircuitBreaker(failure_threshold=20, reset_timeout_seconds=1),
+        ),
+    )
+
+    print(f"{calls} calls, half to a tool taking {SLOW_SECONDS} s, {WORKERS} workers")
+
+    for label, executor in [("no limits", unlimited), ("adaptive limit", limited)]:
+        waited, rejected, seconds = run(executor, calls)
+        slow = executor.latency_histograms["slow_lookup"]
+        print(
+            f"{label:14}: total {seconds:5.2f} s, healthy tool "
+            f"p50 <= {waited.quantile(0.5) * 1000:6.1f} ms, "
+            f"p99 <= {waited.quantile(0.99) * 1000:6.1f} ms; "
+            f"slow tool ran {slow.count}, rejected {rejected}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark the per-iteration overhead of the tool loop.
+
+Compares ToolLoop, which appends to the message history in place, with a loop
+that copies the history on every round trip, as most hand written loops do. The
+in-process client isolates the loop overhead; the mock server run shows the end
+to end cost per iteration.
+
+Run with: python -m benchmarks.bench_tool_loop
+"""
+
+import json
+import time
+from typing import Any
+
+from openai_function_calling.mock_server import (
+    MockChatCompletionsServer,
+    MockServerClient,
+)
+from openai_function_calling.tool_executor import ToolExecutor
+from openai_function_calling.tool_loop import ToolLoop
+
+HISTORY_SIZES: list[int] = [10, 100, 1_000, 10_000]
+ITERATIONS: int = 200
+
+
+def get_current_weather(location: str, unit: str = "fahrenheit") -> str:
+    """Get the current weather.
+
+    Args:
+        location: The city and state, e.g. San Francisco, CA.
+        unit: The temperature unit to use.
+
+    """
+    return f"It is currently sunny in {location} and 75 degrees {unit}."
+
+
+TOOL_CALL_RESPONSE: dict = {
+    "choices": [
+        {
+            "message": {
+                "role": "assistant",
+                "tool_calls": [
+                    {
+                        "id": "call_1",
+                        "type": "function",
+                        "function": {
+                            "name": "get_current_weather",
+                            "arguments": json.dumps({"location": "Boston"}),
+                        },
+                    }
+                ],
+            }
+        }
+    ]
+}
+
+
+class InProcessClient:
+    """A client that always returns the same tool call without any I/O."""
+
+    def __init__(self) -> None:
+        """Expose the client.chat.completions.create interface."""
+        self.chat = self
+        self.completions = self
+
+    def create(self, **_: Any) -> dict:
+        """Return the tool call response."""
+        return TOOL_CALL_RESPONSE
+
+
+def copying_loop(
+    client: Any, executor: ToolExecutor, messages: list, iterations: int
+) -> list:
+    for _ in range(iterations):
+        response: dict = client.chat.completions.create(messages=messages)
+        message: dict = response["choices"][0]["message"]
+        messages = [*messages, message]
+
+        for result in executor.execute_tool_calls(message["tool_calls"]):
+            messages = [*messages, result.to_message()]
+
+    return messages
+
+
+def history(size: int) -> list[dict]:
+    return [{"role": "user", "content": f"Message {i}"} for i in range(size)]
+
+
+def time_per_iteration_us(function: Any, iterations: int) -> float:
+    start: float = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main() -> None:
+    executor = ToolExecutor([get_current_weather])
+    client = InProcessClient()
+    loop = ToolLoop(client, executor, model="mock", max_iterations=ITERATIONS)
+
+    print("in-process client, overhead per iteration")
+    for size in HISTORY_SIZES:
+        in_place: float = time_per_iteration_us(
+            lambda size=size: loop.run(history(size)), ITERATIONS
+        )
+        copying: float = time_per_iteration_us(
+            lambda size=size: copying_loop(client, executor, history(size), ITERATIONS),
+            ITERATIONS,
+        )
+        print(
+            f"history {size:>6}: ToolLoop {in_place:>8.1f} us, "
+            f"copying loop {copying:>8.1f} us"
+        )
+
+    with MockChatCompletionsServer(seed=0) as server:
+        mock_loop = ToolLoop(MockServerClient(server.base_url), executor, model="mock")
+        start: float = time.perf_counter()
+        iterations: int = sum(
+            mock_loop.run(history(10)).iterations for _ in range(ITERATIONS)
+        )
+        elapsed: float = time.perf_counter() - start
+        print(
+            f"mock server end to end: {elapsed / iterations * 1000:.2f} ms "
+            "per iteration"
+        )
+
+    executor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark importing a large plugin suite with @tool versus eager inference.
+
+The plugin suite is simulated by executing the source of many tool functions.
+Eager registration infers every tool while the plugins are imported, as code
+that builds its tool params at module level does. With @tool the import only
+records references, and inference runs on the first request for tool params
+or in a background warmup thread while startup continues.
+
+Run with: python -m benchmarks.bench_tool_registry [tools]
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+from typing import Any
+
+from openai_function_calling.tool_helpers import ToolHelpers
+from openai_function_calling.tool_registry import ToolRegistry, tool
+
+TOOL_SOURCE: str = '''
+@decorate
+def plugin_tool_{index}(query: str, limit: int = 10, exact: bool = False) -> str:
+    """Run query {index} of the plugin.
+
+    Args:
+        query: The text to search for.
+        limit: The largest number of results.
+        exact: If only exact matches should be returned.
+
+    """
+    return query
+'''
+
+
+def import_plugins(count: int, decorate: Any) -> None:
+    namespace: dict[str, Any] = {"decorate": decorate}
+
+    for index in range(count):
+        exec(TOOL_SOURCE.format(index=index), namespace)  # noqa: S102
+
+
+def import_seconds(module: str) -> float:
+    start: float = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True)  # noqa: S603
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    for module in ["openai_function_calling.tool_registry", "openai"]:
+        print(f"python -c 'import {module}': {import_seconds(module) * 1000:6.0f} ms")
+
+    eager: list[Any] = []
+    start: float = time.perf_counter()
+    import_plugins(count, lambda f: eager.append(f) or f)
+    ToolHelpers.infer_from_function_refs(eager)
+    print(f"eager import of {count} tools:   {time.perf_counter() - start:6.3f} s")
+
+    registry = ToolRegistry()
+    start = time.perf_counter()
+    import_plugins(count, tool(registry=registry))
+    print(f"@tool import of {count} tools:   {time.perf_counter() - start:6.3f} s")
+
+    start = time.perf_counter()
+    registry.tool_params()
+    print(f"first tool_params request:      {time.perf_counter() - start:6.3f} s")
+
+    registry = ToolRegistry()
+    import_plugins(count, tool(registry=registry))
+    thread = registry.warmup(background=True)
+    start = time.perf_counter()
+    if thread is not None:
+        thread.join()
+    print(f"background warmup:              {time.perf_counter() - start:6.3f} s")
+
+    start = time.perf_counter()
+    registry.tool_params()
+    print(f"tool_params after warmup:       {time.perf_counter() - start:6.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark inferring per-request partials that bind a session and tenant.
+
+The baseline infers the function definition of every new partial from scratch
+by hand, as each request did before. infer_from_wrapper infers the wrapped
+function once and removes the bound parameters from a copy per request.
+
+Run with: python -m benchmarks.bench_wrapper_inference [requests]
+"""
+
+import functools
+import sys
+import time
+
+from openai_function_calling import Function, FunctionInferrer
+
+
+def get_orders(
+    session: object, tenant_id: str, customer_id: str, status: str = "open"
+) -> list[str]:
+    """Get the orders of a customer.
+
+    Args:
+        session: The database session.
+        tenant_id: The tenant of the customer.
+        customer_id: The customer to get the orders of.
+        status: The order status to filter by.
+
+    """
+    return [str(session), tenant_id, customer_id, status]
+
+
+BOUND: frozenset[str] = frozenset({"session", "tenant_id"})
+
+
+def infer_by_hand(session: object, tenant_id: str) -> Function:
+    functools.partial(get_orders, session, tenant_id)  # The tool that is run.
+    function: Function = FunctionInferrer.infer_from_function_reference(get_orders)
+    function.parameters = [p for p in function.parameters if p.name not in BOUND]
+    function.required_parameters = [
+        name for name in function.required_parameters if name not in BOUND
+    ]
+
+    return function
+
+
+def main() -> None:
+    requests: int = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    start: float = time.perf_counter()
+
+    for i in range(requests):
+        infer_by_hand(object(), str(i))
+
+    by_hand_seconds: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+
+    for i in range(requests):
+        FunctionInferrer.infer_from_function_reference(
+            functools.partial(get_orders, object(), str(i))
+        )
+
+    cached_seconds: float = time.perf_counter() - start
+
+    print(f"{requests} requests")
+    print(
+        f"re-infer per request: {by_hand_seconds:6.3f} s "
+        f"({by_hand_seconds / requests * 1_000_000:6.1f} us per request)"
+    )
+    print(
+        f"cached partial:       {cached_seconds:6.3f} s "
+        f"({cached_seconds / requests * 1_000_000:6.1f} us per request)"
+    )
+
+
+if __name__ == "__main__":
+    main()
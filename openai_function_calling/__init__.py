@@ -1,11 +1,13 @@
 """OpenAI Function Calling Package."""
 
+from openai_function_calling.docstring_parsing import DocstringBackend
 from openai_function_calling.function import Function, FunctionDict
 from openai_function_calling.function_inferrer import FunctionInferrer
 from openai_function_calling.json_schema_type import JsonSchemaType
 from openai_function_calling.parameter import Parameter, ParameterDict
 
 __all__: list[str] = [
+    "DocstringBackend",
     "Function",
     "FunctionDict",
     "FunctionInferrer",
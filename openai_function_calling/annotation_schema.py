@@ -0,0 +1,301 @@
+"""Map type annotations, including unions and literals, to compact JSON schemas."""
+
+from __future__ import annotations
+
+import dataclasses
+import threading
+import typing
+import weakref
+from enum import Enum
+from typing import Any, Literal, get_args, get_origin
+
+from openai_function_calling.helper_functions import (
+    UNION_TYPES,
+    python_type_to_json_schema_type,
+)
+from openai_function_calling.instrumentation import increment
+from openai_function_calling.json_schema_type import JsonSchemaType
+from openai_function_calling.pydantic_models import is_model, model_object_schema
+
+_NULL: str = JsonSchemaType.NULL.value
+_SCHEMAS_MAX_SIZE: int = 4096
+_SCHEMAS: dict[Any, dict[str, Any]] = {}
+_SCHEMAS_LOCK = threading.Lock()
+_ENUM_VALUES: weakref.WeakKeyDictionary[type[Enum], tuple[Any, ...]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def annotation_to_json_schema(annotation: Any) -> dict[str, Any]:
+    """Get the JSON schema of a parameter annotation, memoized per annotation.
+
+    Up to 4096 annotations are memoized, so annotations created at runtime,
+    e.g. literals of changing values, do not grow the memo without bound.
+
+    Literals and enums become an enum, Optional[T] becomes the schema of T
+    with 'null' added to its types, and other unions become a single schema
+    with a list of types when their branches do not overlap. Only unions that
+    cannot be merged, e.g. of two different literal types or two array types,
+    become an 'anyOf'. Literals of the same union are merged into one enum and
+    literals already allowed by another branch, as well as duplicate
+    branches, are left out.
+
+    Args:
+        annotation: The type annotation, e.g. from get_type_hints.
+
+    Raises:
+        ValueError: If a list annotation has no item type.
+
+    Returns:
+        The JSON schema. It is shared by every caller, so copy it before\
+            changes. Its type is 'null' if the annotation is not supported.\
+            Threads mapping the same annotation at once get the same schema.
+
+    """
+    try:
+        return _SCHEMAS[annotation]
+    except KeyError:
+        schema: dict[str, Any] = _annotation_schema(annotation) or {"type": _NULL}
+
+        # Reads are lock-free, but evicting iterates the memo, so writers take turns.
+        with _SCHEMAS_LOCK:
+            if len(_SCHEMAS) >= _SCHEMAS_MAX_SIZE:
+                _SCHEMAS.pop(next(iter(_SCHEMAS)))
+
+            schema = _SCHEMAS.setdefault(annotation, schema)
+    except TypeError:  # Not hashable, e.g. a literal of a list.
+        return _annotation_schema(annotation) or {"type": _NULL}
+
+    return schema
+
+
+def enum_values(enum_class: type[Enum]) -> tuple[Any, ...]:
+    """Get the values of the members of an enum, extracted once per class.
+
+    Args:
+        enum_class: The enum class.
+
+    Returns:
+        The values in definition order, without aliases.
+
+    """
+    values: tuple[Any, ...] | None = _ENUM_VALUES.get(enum_class)
+
+    if values is None:
+        increment("enum_cache.miss")
+        values = _ENUM_VALUES.setdefault(
+            enum_class, tuple(member.value for member in enum_class)
+        )
+    else:
+        increment("enum_cache.hit")
+
+    return values
+
+
+def _annotation_schema(annotation: Any) -> dict[str, Any] | None:
+    """Get the JSON schema of an annotation.
+
+    Args:
+        annotation: The type annotation.
+
+    Raises:
+        ValueError: If a list annotation has no item type.
+
+    Returns:
+        The JSON schema, or None if the annotation is not supported.
+
+    """
+    origin: Any = get_origin(annotation) or annotation
+    args: tuple[Any, ...] = get_args(annotation)
+
+    if origin in UNION_TYPES:
+        return _union_schema(args)
+
+    if origin is Literal:
+        return _enum_schema(list(args))
+
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return _enum_schema(list(enum_values(annotation)))
+
+    return _type_schema(annotation, origin, args)
+
+
+def _type_schema(
+    annotation: Any, origin: Any, args: tuple[Any, ...]
+) -> dict[str, Any] | None:
+    """Get the JSON schema of an annotation that is not a union or enum.
+
+    Args:
+        annotation: The type annotation.
+        origin: The unsubscripted annotation, e.g. list for list[int].
+        args: The arguments of the annotation, e.g. (int,) for list[int].
+
+    Raises:
+        ValueError: If a list annotation has no item type.
+
+    Returns:
+        The JSON schema, or None if the annotation is not supported.
+
+    """
+    if annotation is None or annotation is type(None):
+        return {"type": _NULL}
+
+    if is_model(annotation):
+        return {"type": JsonSchemaType.OBJECT.value, **model_object_schema(annotation)}
+
+    if origin in (list, typing.List):  # noqa: UP006
+        if not args:
+            raise ValueError("Expected list annotations to have an item type.")
+
+        return {
+            "type": JsonSchemaType.ARRAY.value,
+            "items": {"type": python_type_to_json_schema_type(_type_name(args[0]))},
+        }
+
+    if origin in (dict, typing.Dict) or dataclasses.is_dataclass(annotation):  # noqa: UP006
+        return {"type": JsonSchemaType.OBJECT.value}
+
+    schema_type: str = python_type_to_json_schema_type(_type_name(annotation))
+
+    return None if schema_type == _NULL else {"type": schema_type}
+
+
+def _union_schema(args: tuple[Any, ...]) -> dict[str, Any] | None:
+    """Merge the schemas of the members of a union into the smallest schema.
+
+    Args:
+        args: The members of the union.
+
+    Returns:
+        The merged schema, or None if a member is not supported.
+
+    """
+    branches: list[dict[str, Any]] = []
+    literal_values: list[Any] = []
+    literal_index: int | None = None
+    nullable: bool = False
+
+    for arg in args:
+        schema: dict[str, Any] | None = _annotation_schema(arg)
+
+        if schema is None:
+            return None
+
+        for branch in schema.get("anyOf", [schema]):
+            if branch == {"type": _NULL}:
+                nullable = True
+            elif "enum" in branch:
+                literal_index = (
+                    len(branches) if literal_index is None else literal_index
+                )
+                literal_values.extend(
+                    value
+                    for value in branch["enum"]
+                    if value is not None and value not in literal_values
+                )
+                nullable = nullable or None in branch["enum"]
+            elif branch not in branches:
+                branches.append(branch)
+
+    plain_types: set[Any] = {
+        branch["type"] for branch in branches if branch.keys() == {"type"}
+    }
+    literal_values = [
+        value for value in literal_values if _value_type(value) not in plain_types
+    ]
+
+    if literal_values:
+        branches.insert(literal_index or 0, _enum_schema(literal_values))
+
+    return _merge_branches(branches, nullable=nullable)
+
+
+def _merge_branches(
+    branches: list[dict[str, Any]], *, nullable: bool
+) -> dict[str, Any]:
+    """Merge union branches into one schema with a list of types if possible.
+
+    Args:
+        branches: The distinct schemas of the members, without 'null'.
+        nullable: If the union includes None.
+
+    Returns:
+        The merged schema, or an 'anyOf' of the branches.
+
+    """
+    if len(branches) == 1:
+        return _with_null(branches[0]) if nullable else branches[0]
+
+    branch_types: list[Any] = [branch["type"] for branch in branches]
+
+    # An enum applies to every type of a schema, and two branches of the same
+    # type may allow different items or properties, so neither can be merged.
+    if any("enum" in branch for branch in branches) or len(set(branch_types)) < len(
+        branch_types
+    ):
+        return {"anyOf": [*branches, {"type": _NULL}] if nullable else branches}
+
+    merged: dict[str, Any] = {}
+
+    for branch in branches:
+        merged.update(branch)
+
+    merged["type"] = [*branch_types, _NULL] if nullable else branch_types
+
+    return merged
+
+
+def _with_null(schema: dict[str, Any]) -> dict[str, Any]:
+    """Copy a schema with null added to its types and enum values.
+
+    Args:
+        schema: The schema of the type that is made nullable.
+
+    Returns:
+        The nullable copy of the schema.
+
+    """
+    schema_types: Any = schema["type"]
+    nullable: dict[str, Any] = {
+        **schema,
+        "type": [*schema_types, _NULL]
+        if isinstance(schema_types, list)
+        else [schema_types, _NULL],
+    }
+
+    if "enum" in schema:
+        nullable["enum"] = [*schema["enum"], None]
+
+    return nullable
+
+
+def _enum_schema(values: list[Any]) -> dict[str, Any] | None:
+    """Get the schema of a literal or enum with the given values.
+
+    Args:
+        values: The allowed values.
+
+    Returns:
+        The schema with the types of the values, or None if there are no values.
+
+    """
+    non_null_values: list[Any] = [value for value in values if value is not None]
+
+    if not non_null_values:
+        return {"type": _NULL} if values else None
+
+    value_types: list[str] = list(dict.fromkeys(map(_value_type, non_null_values)))
+    schema: dict[str, Any] = {
+        "type": value_types[0] if len(value_types) == 1 else value_types,
+        "enum": non_null_values,
+    }
+
+    return _with_null(schema) if len(non_null_values) < len(values) else schema
+
+
+def _value_type(value: Any) -> str:
+    return python_type_to_json_schema_type(type(value).__name__)
+
+
+def _type_name(annotation: Any) -> str:
+    return annotation.__name__ if hasattr(annotation, "__name__") else "Any"
@@ -0,0 +1,490 @@
+"""Repair malformed tool call arguments locally instead of asking the model again."""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+from enum import Enum
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from openai_function_calling.json_schema_type import JsonSchemaType
+
+if TYPE_CHECKING:  # pragma: no cover
+    from openai_function_calling.function import Function
+    from openai_function_calling.parameter import Parameter
+
+_CLOSERS: dict[str, str] = {"{": "}", "[": "]"}
+_OPENERS: dict[str, str] = {"}": "{", "]": "["}
+_JSON_LITERALS: frozenset[str] = frozenset(("true", "false", "null"))
+_PYTHON_LITERALS: dict[str, str] = {"True": "true", "False": "false", "None": "null"}
+_VALID_ESCAPES: frozenset[str] = frozenset('"\\/bfnrtu')
+_CONTROL_CHARACTERS: dict[str, str] = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_NUMBER_CHARACTERS: frozenset[str] = frozenset("0123456789+-.eE")
+_INTEGER_PATTERN: re.Pattern[str] = re.compile(r"[+-]?\d+")
+_WORD_PATTERN: re.Pattern[str] = re.compile(r"\w+")
+_PYTHON_TYPES: dict[str, tuple[type, ...]] = {
+    JsonSchemaType.STRING.value: (str,),
+    JsonSchemaType.INTEGER.value: (int,),
+    JsonSchemaType.NUMBER.value: (int, float),
+    JsonSchemaType.BOOLEAN.value: (bool,),
+    JsonSchemaType.ARRAY.value: (list,),
+    JsonSchemaType.OBJECT.value: (dict,),
+    JsonSchemaType.NULL.value: (type(None),),
+}
+
+
+class RepairKind(str, Enum):
+    """An enumeration of the repairs applied to malformed arguments."""
+
+    DOUBLE_ENCODED = "double_encoded"
+    SURROUNDING_TEXT = "surrounding_text"
+    SINGLE_QUOTES = "single_quotes"
+    PYTHON_LITERAL = "python_literal"
+    UNQUOTED_KEY = "unquoted_key"
+    UNQUOTED_STRING = "unquoted_string"
+    INVALID_ESCAPE = "invalid_escape"
+    CONTROL_CHARACTER = "control_character"
+    MISSING_COMMA = "missing_comma"
+    TRAILING_COMMA = "trailing_comma"
+    UNTERMINATED_STRING = "unterminated_string"
+    TRUNCATED_VALUE = "truncated_value"
+    UNCLOSED_BRACKETS = "unclosed_brackets"
+    COERCED_TYPE = "coerced_type"
+    ENUM_CASE = "enum_case"
+
+
+class ArgumentRepair(NamedTuple):
+    """A single repair applied to the arguments."""
+
+    kind: RepairKind
+    detail: str
+
+
+class RepairedArguments(NamedTuple):
+    """Decoded arguments and the repairs needed to decode them."""
+
+    arguments: dict[str, Any]
+    repairs: tuple[ArgumentRepair, ...]
+
+    @property
+    def repaired(self) -> bool:
+        """If any repair was applied."""
+        return bool(self.repairs)
+
+
+def repair_arguments(
+    arguments: str, function: Function | None = None
+) -> RepairedArguments:
+    """Decode tool call arguments, repairing common mistakes of the model.
+
+    Strict JSON is tried first. Text that fails to decode is rewritten by a
+    single lenient pass that fixes quoting, commas, Python literals and
+    truncation. When a function is given, values are then coerced to the types
+    of its parameters and enum values are matched case-insensitively.
+
+    Args:
+        arguments: The JSON encoded arguments.
+        function: The function the arguments are for.
+
+    Raises:
+        ValueError: If the arguments could not be repaired into a JSON object.
+
+    Returns:
+        The decoded arguments and the repairs applied, in order.
+
+    """
+    repairs: list[ArgumentRepair] = []
+    decoded: Any = _decode(arguments, repairs) if arguments.strip() else {}
+
+    if isinstance(decoded, str):
+        repairs.append(ArgumentRepair(RepairKind.DOUBLE_ENCODED, "decoded twice"))
+        decoded = _decode(decoded, repairs)
+
+    if not isinstance(decoded, dict):
+        raise ValueError("Expected tool call arguments to be a JSON object.")
+
+    if function is not None:
+        for parameter in function.parameters:
+            if parameter.name in decoded:
+                decoded[parameter.name] = _coerce_parameter(
+                    parameter, decoded[parameter.name], repairs
+                )
+
+    return RepairedArguments(decoded, tuple(repairs))
+
+
+def _decode(text: str, repairs: list[ArgumentRepair]) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    rewritten: str = _Rewriter(text, repairs).rewrite()
+
+    try:
+        return json.loads(rewritten)
+    except json.JSONDecodeError as error:
+        raise ValueError(f"Could not repair tool call arguments: {error}") from error
+
+
+class _Rewriter:
+    """Rewrite lenient JSON object text to strict JSON in a single pass."""
+
+    def __init__(self, text: str, repairs: list[ArgumentRepair]) -> None:
+        self.text: str = text
+        self.index: int = text.find("{")
+        self.tokens: list[str] = []
+        self.stack: list[str] = []
+        self.repairs: list[ArgumentRepair] = repairs
+        self._recorded: set[RepairKind] = set()
+
+    def rewrite(self) -> str:
+        if self.index < 0:
+            raise ValueError("Could not repair tool call arguments: no JSON object.")
+
+        if self.text[: self.index].strip():
+            self._record(RepairKind.SURROUNDING_TEXT)
+
+        while self.index < len(self.text):
+            self._read_token(self.text[self.index])
+
+            if not self.stack:
+                break
+
+        if self.stack:
+            self._close_unclosed()
+        elif self.text[self.index :].strip():
+            self._record(RepairKind.SURROUNDING_TEXT)
+
+        return "".join(self.tokens)
+
+    def _read_token(self, character: str) -> None:
+        if character.isspace():
+            self.index += 1
+        elif character in _CLOSERS:
+            self._append_value(character)
+            self.stack.append(character)
+            self.index += 1
+        elif character in _OPENERS:
+            self._close(character)
+        elif character == ",":
+            self._comma()
+        elif character == ":":
+            self._colon()
+        elif character in "\"'":
+            self._append_value(self._read_string(character))
+        elif character == "-" or character.isdigit():
+            self._read_number()
+        elif character.isalpha() or character == "_":
+            self._read_word()
+        else:
+            raise ValueError(
+                "Could not repair tool call arguments: unexpected character "
+                f"{character!r} at position {self.index}."
+            )
+
+    def _record(self, kind: RepairKind) -> None:
+        if kind not in self._recorded:
+            self._recorded.add(kind)
+            self.repairs.append(ArgumentRepair(kind, f"at position {self.index}"))
+
+    def _append_value(self, token: str) -> None:
+        if self.tokens and self.tokens[-1] not in ("{", "[", ",", ":"):
+            self._record(RepairKind.MISSING_COMMA)
+            self.tokens.append(",")
+
+        self.tokens.append(token)
+
+    def _colon(self) -> None:
+        if self.tokens[-1] in ("{", "[", ",", ":"):
+            raise ValueError(
+                "Could not repair tool call arguments: expected a key before ':' at"
+                f" position {self.index}."
+            )
+
+        self.tokens.append(":")
+        self.index += 1
+
+    def _comma(self) -> None:
+        if self.tokens[-1] in ("{", "[", ","):
+            self._record(RepairKind.TRAILING_COMMA)
+        else:
+            self.tokens.append(",")
+
+        self.index += 1
+
+    def _close(self, character: str) -> None:
+        if self.tokens[-1] == ",":
+            self._record(RepairKind.TRAILING_COMMA)
+            self.tokens.pop()
+
+        self.index += 1
+
+        if _OPENERS[character] not in self.stack:
+            self._record(RepairKind.SURROUNDING_TEXT)
+            return
+
+        while self.stack[-1] != _OPENERS[character]:
+            self._record(RepairKind.UNCLOSED_BRACKETS)
+            self.tokens.append(_CLOSERS[self.stack.pop()])
+
+        self.tokens.append(character)
+        self.stack.pop()
+
+    def _close_unclosed(self) -> None:
+        self._record(RepairKind.UNCLOSED_BRACKETS)
+
+        while self.stack:
+            if self.tokens[-1] == ",":
+                self.tokens.pop()
+
+            if self.tokens[-1] == ":":
+                self._record(RepairKind.TRUNCATED_VALUE)
+                del self.tokens[-2:]
+            elif (
+                self.stack[-1] == "{"
+                and self.tokens[-1].startswith('"')
+                and self.tokens[-2] in ("{", ",")
+            ):
+                self._record(RepairKind.TRUNCATED_VALUE)
+                self.tokens.pop()
+
+            if self.tokens[-1] == ",":
+                self.tokens.pop()
+
+            self.tokens.append(_CLOSERS[self.stack.pop()])
+
+    def _read_string(self, quote: str) -> str:
+        if quote == "'":
+            self._record(RepairKind.SINGLE_QUOTES)
+
+        text: str = self.text
+        characters: list[str] = ['"']
+        self.index += 1
+
+        while self.index < len(text):
+            character: str = text[self.index]
+            self.index += 1
+
+            if character == quote:
+                characters.append('"')
+                return "".join(characters)
+
+            if character == "\\":
+                characters.append(self._read_escape())
+            elif character == '"':
+                characters.append('\\"')
+            elif character in _CONTROL_CHARACTERS:
+                self._record(RepairKind.CONTROL_CHARACTER)
+                characters.append(_CONTROL_CHARACTERS[character])
+            else:
+                characters.append(character)
+
+        self._record(RepairKind.UNTERMINATED_STRING)
+        characters.append('"')
+
+        return "".join(characters)
+
+    def _read_escape(self) -> str:
+        escaped: str = self.text[self.index : self.index + 1]
+        self.index += 1
+
+        if escaped == "'":
+            self._record(RepairKind.INVALID_ESCAPE)
+            return "'"
+
+        if escaped in _VALID_ESCAPES and escaped:
+            return "\\" + escaped
+
+        self._record(RepairKind.INVALID_ESCAPE)
+
+        return "\\\\" + escaped
+
+    def _read_number(self) -> None:
+        start: int = self.index
+
+        while (
+            self.index < len(self.text) and self.text[self.index] in _NUMBER_CHARACTERS
+        ):
+            self.index += 1
+
+        number: str = self.text[start : self.index]
+
+        if self.index == len(self.text) and number[-1] in "+-.eE":
+            self._record(RepairKind.TRUNCATED_VALUE)
+            number = number.rstrip("+-.eE")
+
+        if number:
+            self._append_value(number)
+
+    def _read_word(self) -> None:
+        start: int = self.index
+        match: re.Match[str] = _WORD_PATTERN.match(self.text, start)  # type: ignore[assignment]
+        word: str = match.group()
+        self.index = match.end()
+
+        if word in _JSON_LITERALS:
+            self._append_value(word)
+        elif word in _PYTHON_LITERALS:
+            self._record(RepairKind.PYTHON_LITERAL)
+            self._append_value(_PYTHON_LITERALS[word])
+        elif self.index == len(self.text) and _complete_literal(word):
+            self._record(RepairKind.TRUNCATED_VALUE)
+            self._append_value(_complete_literal(word))  # type: ignore[arg-type]
+        elif self.text[self.index :].lstrip().startswith(":"):
+            self._record(RepairKind.UNQUOTED_KEY)
+            self._append_value(json.dumps(word))
+        else:
+            self._read_unquoted_string(start)
+
+    def _read_unquoted_string(self, start: int) -> None:
+        while self.index < len(self.text) and self.text[self.index] not in ",}]":
+            self.index += 1
+
+        self._record(RepairKind.UNQUOTED_STRING)
+        self._append_value(json.dumps(self.text[start : self.index].strip()))
+
+
+def _complete_literal(prefix: str) -> str | None:
+    for literal in _JSON_LITERALS:
+        if literal.startswith(prefix):
+            return literal
+
+    return None
+
+
+def _coerce_parameter(
+    parameter: Parameter, value: Any, repairs: list[ArgumentRepair]
+) -> Any:
+    coerced: Any = _coerce_to_types(value, parameter.type)
+    is_array: bool = parameter.type == JsonSchemaType.ARRAY or (
+        isinstance(parameter.type, list) and JsonSchemaType.ARRAY in parameter.type
+    )
+
+    if is_array and isinstance(coerced, list):
+        coerced = [_coerce_value(item, parameter.array_item_type) for item in coerced]
+
+    if coerced != value or type(coerced) is not type(value):
+        repairs.append(
+            ArgumentRepair(
+                RepairKind.COERCED_TYPE, f"{parameter.name!r}: {value!r} -> {coerced!r}"
+            )
+        )
+
+    if parameter.enum and coerced not in parameter.enum and isinstance(coerced, str):
+        matched: Any = _match_enum(coerced, parameter.enum)
+
+        if matched is not None:
+            repairs.append(
+                ArgumentRepair(
+                    RepairKind.ENUM_CASE,
+                    f"{parameter.name!r}: {coerced!r} -> {matched!r}",
+                )
+            )
+            coerced = matched
+
+    return coerced
+
+
+def _coerce_to_types(value: Any, schema_type: str | list[str] | None) -> Any:
+    """Coerce a value to a type, or to the first type of a list it converts to.
+
+    Args:
+        value: The decoded argument.
+        schema_type: The JSON schema type, or the list of types of a nullable\
+            parameter or union.
+
+    Returns:
+        The value unchanged if it already has one of the types, else the\
+            coerced value, or the value if it converts to none of them.
+
+    """
+    if not isinstance(schema_type, list):
+        return _coerce_value(value, schema_type)
+
+    if any(_has_type(value, member) for member in schema_type):
+        return value
+
+    for member in schema_type:
+        coerced: Any = _coerce_value(value, member)
+
+        if coerced is not value:
+            return coerced
+
+    return value
+
+
+def _has_type(value: Any, schema_type: str) -> bool:
+    if isinstance(value, bool):
+        return schema_type == JsonSchemaType.BOOLEAN
+
+    return isinstance(value, _PYTHON_TYPES.get(schema_type, ()))
+
+
+def _coerce_value(value: Any, schema_type: str | None) -> Any:  # noqa: PLR0911
+    if isinstance(value, str):
+        stripped: str = value.strip()
+
+        if schema_type == JsonSchemaType.INTEGER and _INTEGER_PATTERN.fullmatch(
+            stripped
+        ):
+            return int(stripped)
+
+        if schema_type == JsonSchemaType.NUMBER:
+            return _parse_number(stripped, value)
+
+        if schema_type == JsonSchemaType.BOOLEAN and stripped.lower() in (
+            "true",
+            "false",
+        ):
+            return stripped.lower() == "true"
+
+        if schema_type in (JsonSchemaType.ARRAY, JsonSchemaType.OBJECT):
+            return _parse_container(stripped, schema_type, value)
+
+        return value
+
+    if isinstance(value, bool):
+        return value
+
+    if schema_type == JsonSchemaType.INTEGER and isinstance(value, float):
+        return int(value) if value.is_integer() else value
+
+    if schema_type == JsonSchemaType.STRING and isinstance(value, (int, float)):
+        return str(value)
+
+    return value
+
+
+def _parse_number(text: str, original: str) -> Any:
+    if _INTEGER_PATTERN.fullmatch(text):
+        return int(text)
+
+    try:
+        number: float = float(text)
+    except ValueError:
+        return original
+
+    return number if math.isfinite(number) else original
+
+
+def _parse_container(text: str, schema_type: str, original: str) -> Any:
+    try:
+        decoded: Any = json.loads(text)
+    except json.JSONDecodeError:
+        return original
+
+    expected: type = list if schema_type == JsonSchemaType.ARRAY else dict
+
+    return decoded if isinstance(decoded, expected) else original
+
+
+def _match_enum(value: str, enum: list[Any]) -> Any:
+    folded: str = value.strip().casefold()
+
+    for member in enum:
+        if isinstance(member, str) and member.casefold() == folded:
+            return member
+
+    return None
@@ -0,0 +1,501 @@
+"""Helpers for the OpenAI Batch API JSONL file formats."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from http import HTTPStatus
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, NamedTuple, Union
+
+from openai_function_calling.instrumentation import span
+from openai_function_calling.tool_helpers import ToolHelpers
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable
+
+    from openai.types.chat import ChatCompletionToolParam
+
+    from openai_function_calling.function import Function
+    from openai_function_calling.tool_executor import ToolCallResult, ToolExecutor
+
+# The Batch API limits for a single input file.
+MAX_BATCH_LINES: int = 50_000
+MAX_BATCH_BYTES: int = 200 * 1024 * 1024
+
+_WRITE_BUFFER_SIZE: int = 1024 * 1024
+
+BatchRequest = Union[list[dict[str, Any]], tuple[str, list[dict[str, Any]]]]
+"""A list of messages, or a tuple of a custom ID and a list of messages."""
+
+
+def _dump_json_bytes(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+class BatchRequestWriter:
+    """Stream chat completion requests to Batch API input JSONL files.
+
+    The tools array is serialized once and the cached bytes are spliced into every
+    request line. Output is split into numbered files that respect the line and
+    size limits of a single batch.
+    """
+
+    def __init__(
+        self,
+        output_path: str | Path,
+        tools: list[ChatCompletionToolParam],
+        model: str,
+        *,
+        request_options: dict[str, Any] | None = None,
+        max_lines_per_file: int = MAX_BATCH_LINES,
+        max_bytes_per_file: int = MAX_BATCH_BYTES,
+        custom_id_prefix: str = "request-",
+        url: str = "/v1/chat/completions",
+    ) -> None:
+        """Create a new batch request writer.
+
+        Args:
+            output_path: The base path of the output files. A file index is added\
+                before the suffix, e.g. 'batch.jsonl' becomes 'batch-00000.jsonl'.
+            tools: The tool parameters to include in every request.
+            model: The model to use for every request.
+            request_options: Extra request body options, e.g. temperature.
+            max_lines_per_file: The maximum number of requests per file.
+            max_bytes_per_file: The maximum size of each file in bytes.
+            custom_id_prefix: The prefix of generated custom IDs.
+            url: The API endpoint each request is sent to.
+
+        Raises:
+            ValueError: If a file limit is not positive.
+
+        """
+        if max_lines_per_file <= 0 or max_bytes_per_file <= 0:
+            raise ValueError("Expected the file limits to be positive.")
+
+        self.output_path: Path = Path(output_path)
+        self.max_lines_per_file: int = max_lines_per_file
+        self.max_bytes_per_file: int = max_bytes_per_file
+        self.custom_id_prefix: str = custom_id_prefix
+
+        body_prefix: dict[str, Any] = {"model": model, **(request_options or {})}
+        self._line_prefix: bytes = (
+            b',"method":"POST","url":'
+            + _dump_json_bytes(url)
+            + b',"body":'
+            + _dump_json_bytes(body_prefix)[:-1]
+            + b',"messages":'
+        )
+        self._line_suffix: bytes = b',"tools":' + _dump_json_bytes(tools) + b"}}\n"
+
+    @classmethod
+    def from_functions(
+        cls,
+        output_path: str | Path,
+        functions: list[Function],
+        model: str,
+        **kwargs: Any,
+    ) -> BatchRequestWriter:
+        """Create a batch request writer from function definition objects.
+
+        Args:
+            output_path: The base path of the output files.
+            functions: The function definitions to include as tools.
+            model: The model to use for every request.
+            kwargs: Additional arguments passed to the constructor.
+
+        Returns:
+            A new batch request writer.
+
+        """
+        return cls(output_path, ToolHelpers.from_functions(functions), model, **kwargs)
+
+    def format_line(self, custom_id: str, messages: list[dict[str, Any]]) -> bytes:
+        """Format a single batch request line.
+
+        Args:
+            custom_id: The unique ID of the request within the batch.
+            messages: The chat messages of the request.
+
+        Returns:
+            The encoded JSONL line, including the trailing newline.
+
+        """
+        return b"".join(
+            (
+                b'{"custom_id":',
+                _dump_json_bytes(custom_id),
+                self._line_prefix,
+                _dump_json_bytes(messages),
+                self._line_suffix,
+            )
+        )
+
+    def file_path(self, index: int) -> Path:
+        """Get the path of an output file.
+
+        Args:
+            index: The index of the output file.
+
+        Returns:
+            The output file path.
+
+        """
+        return self.output_path.with_name(
+            f"{self.output_path.stem}-{index:05d}{self.output_path.suffix}"
+        )
+
+    def write(self, requests: Iterable[BatchRequest]) -> list[Path]:
+        """Write requests to one or more batch input files.
+
+        Args:
+            requests: Message lists, or tuples of a custom ID and a message list.
+
+        Raises:
+            ValueError: If a single request line exceeds the file size limit.
+
+        Returns:
+            The paths of the written files.
+
+        """
+        paths: list[Path] = []
+        output_file: BinaryIO | None = None
+        file_lines: int = 0
+        file_bytes: int = 0
+
+        with span("BatchRequestWriter.write") as current_span:
+            try:
+                for index, request in enumerate(requests):
+                    if isinstance(request, tuple):
+                        custom_id, messages = request
+                    else:
+                        custom_id = f"{self.custom_id_prefix}{index}"
+                        messages = request
+
+                    line: bytes = self.format_line(custom_id, messages)
+
+                    if len(line) > self.max_bytes_per_file:
+                        raise ValueError(
+                            f"Request '{custom_id}' is larger than the file size limit."
+                        )
+
+                    if (
+                        output_file is None
+                        or file_lines >= self.max_lines_per_file
+                        or file_bytes + len(line) > self.max_bytes_per_file
+                    ):
+                        if output_file is not None:
+                            output_file.close()
+
+                        paths.append(self.file_path(len(paths)))
+                        output_file = paths[-1].open("wb", buffering=_WRITE_BUFFER_SIZE)
+                        file_lines = 0
+                        file_bytes = 0
+
+                    output_file.write(line)
+                    file_lines += 1
+                    file_bytes += len(line)
+            finally:
+                if output_file is not None:
+                    output_file.close()
+
+            current_span.set_attribute("file_count", len(paths))
+
+        return paths
+
+
+class BatchProcessingStats(NamedTuple):
+    """Statistics about a batch result processing run."""
+
+    lines: int
+    tool_calls: int
+    errors: int
+    elapsed_seconds: float
+
+    @property
+    def lines_per_second(self) -> float:
+        """The number of input lines processed per second."""
+        return self.lines / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+class BatchResultProcessor:
+    """Execute the tool calls in Batch API output files.
+
+    The output file is streamed line by line, tool calls are routed by name to a
+    tool executor through a bounded worker pool and results are written to an
+    output JSONL file. Progress is checkpointed after every chunk so that an
+    interrupted run resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        executor: ToolExecutor,
+        *,
+        max_workers: int = 8,
+        chunk_size: int = 1_000,
+    ) -> None:
+        """Create a new batch result processor.
+
+        Args:
+            executor: The executor used to run the tool calls.
+            max_workers: The maximum number of tool calls run concurrently.
+            chunk_size: The number of input lines processed between checkpoints.
+
+        Raises:
+            ValueError: If the worker count or chunk size is not positive.
+
+        """
+        if max_workers <= 0 or chunk_size <= 0:
+            raise ValueError("Expected the worker count and chunk size to be positive.")
+
+        self.executor: ToolExecutor = executor
+        self.max_workers: int = max_workers
+        self.chunk_size: int = chunk_size
+
+    def process(
+        self,
+        input_path: str | Path,
+        output_path: str | Path,
+        *,
+        checkpoint_path: str | Path | None = None,
+    ) -> BatchProcessingStats:
+        """Execute every tool call in a batch output file.
+
+        Each output line holds the custom ID of the request along with the tool
+        call ID, name and result content. Failed requests are written with their
+        error instead. The checkpoint file is removed once the run completes.
+
+        Args:
+            input_path: The Batch API output JSONL file.
+            output_path: The file to write tool call results to.
+            checkpoint_path: The checkpoint file. Defaults to the output path with\
+                a '.checkpoint' suffix added.
+
+        Returns:
+            Statistics about the lines processed in this run.
+
+        """
+        output_path = Path(output_path)
+        checkpoint: Path = (
+            Path(checkpoint_path)
+            if checkpoint_path is not None
+            else output_path.with_name(output_path.name + ".checkpoint")
+        )
+        input_offset, output_offset = _read_checkpoint(checkpoint)
+        start: float = time.perf_counter()
+
+        with span("BatchResultProcessor.process") as current_span, ExitStack() as stack:
+            input_file: BinaryIO = stack.enter_context(Path(input_path).open("rb"))
+            output_file: BinaryIO = stack.enter_context(
+                output_path.open("r+b" if output_offset else "wb")
+            )
+            thread_pool: ThreadPoolExecutor = stack.enter_context(
+                ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="batch-results"
+                )
+            )
+            input_file.seek(input_offset)
+            output_file.truncate(output_offset)
+            output_file.seek(output_offset)
+
+            lines: int = 0
+            tool_calls: int = 0
+            errors: int = 0
+
+            while chunk := list(islice(input_file, self.chunk_size)):
+                output_lines, chunk_tool_calls, chunk_errors = self._process_chunk(
+                    chunk, thread_pool
+                )
+                output_file.writelines(output_lines)
+                output_file.flush()
+                os.fsync(output_file.fileno())
+
+                input_offset += sum(len(line) for line in chunk)
+                _write_checkpoint(checkpoint, input_offset, output_file.tell())
+
+                lines += len(chunk)
+                tool_calls += chunk_tool_calls
+                errors += chunk_errors
+
+            current_span.set_attribute("lines", lines)
+            current_span.set_attribute("tool_calls", tool_calls)
+
+        checkpoint.unlink(missing_ok=True)
+
+        return BatchProcessingStats(
+            lines=lines,
+            tool_calls=tool_calls,
+            errors=errors,
+            elapsed_seconds=time.perf_counter() - start,
+        )
+
+    def _process_chunk(
+        self,
+        chunk: list[bytes],
+        thread_pool: ThreadPoolExecutor,
+    ) -> tuple[list[bytes], int, int]:
+        pending: list[tuple[str, Future[ToolCallResult] | None, str | None]] = []
+
+        for line in chunk:
+            if not line.strip():
+                continue
+
+            custom_id, tool_calls, error = _decode_result_line(line)
+
+            if error is not None:
+                pending.append((custom_id, None, error))
+                continue
+
+            for tool_call, tool_call_error in tool_calls:
+                if tool_call_error is not None:
+                    pending.append((custom_id, None, tool_call_error))
+                    continue
+
+                pending.append(
+                    (
+                        custom_id,
+                        thread_pool.submit(self.executor.execute_tool_call, tool_call),
+                        None,
+                    )
+                )
+
+        output_lines: list[bytes] = []
+        tool_call_count: int = 0
+        error_count: int = 0
+
+        for custom_id, future, error in pending:
+            if future is None:
+                error_count += 1
+                output_lines.append(
+                    _dump_json_bytes({"custom_id": custom_id, "error": error}) + b"\n"
+                )
+                continue
+
+            result: ToolCallResult = future.result()
+            tool_call_count += 1
+            error_count += result.is_error
+            output_lines.append(
+                _dump_json_bytes(
+                    {
+                        "custom_id": custom_id,
+                        "tool_call_id": result.tool_call_id,
+                        "name": result.name,
+                        "content": result.content,
+                        "is_error": result.is_error,
+                    }
+                )
+                + b"\n"
+            )
+
+        return output_lines, tool_call_count, error_count
+
+
+def _decode_result_line(  # noqa: PLR0911
+    line: bytes,
+) -> tuple[str, list[tuple[Any, str | None]], str | None]:
+    """Decode a Batch API output line.
+
+    Args:
+        line: The encoded output line.
+
+    Returns:
+        A tuple of the custom ID, the tool calls each with an error message if\
+            the tool call is malformed, and an error message if the request\
+            failed.
+
+    """
+    try:
+        result: dict[str, Any] = json.loads(line)
+    except json.JSONDecodeError as error:
+        return "", [], f"Invalid output line: {error}"
+
+    if not isinstance(result, dict):
+        return "", [], "Invalid output line: expected a JSON object."
+
+    custom_id: str = result.get("custom_id", "")
+    response: dict[str, Any] | None = result.get("response")
+
+    if result.get("error") or response is None:
+        return custom_id, [], json.dumps(result.get("error"))
+
+    if not isinstance(response, dict):
+        return custom_id, [], "Invalid output line: expected a response object."
+
+    if response.get("status_code") != HTTPStatus.OK:
+        return (
+            custom_id,
+            [],
+            f"Request failed with status {response.get('status_code')}.",
+        )
+
+    tool_calls: list[Any] = []
+
+    try:
+        for choice in response["body"].get("choices", []):
+            message_tool_calls: Any = choice["message"].get("tool_calls") or []
+
+            if not isinstance(message_tool_calls, list):
+                return (
+                    custom_id,
+                    [],
+                    "Invalid output line: expected the tool calls to be a list.",
+                )
+
+            tool_calls.extend(message_tool_calls)
+    except (AttributeError, KeyError, TypeError):
+        return (
+            custom_id,
+            [],
+            "Invalid output line: expected a response body with choices that"
+            " have a message.",
+        )
+
+    return (
+        custom_id,
+        [(tool_call, _tool_call_error(tool_call)) for tool_call in tool_calls],
+        None,
+    )
+
+
+def _tool_call_error(tool_call: Any) -> str | None:
+    """Describe what is wrong with a decoded tool call.
+
+    Args:
+        tool_call: A tool call decoded from an output line.
+
+    Returns:
+        An error message if the tool call is malformed, otherwise None.
+
+    """
+    function: Any = tool_call.get("function") if isinstance(tool_call, dict) else None
+
+    if not isinstance(function, dict) or not isinstance(function.get("name"), str):
+        return "Invalid tool call: expected a function with a name."
+
+    if not isinstance(function.get("arguments", ""), (str, dict)):
+        return "Invalid tool call: expected the arguments to be a string or object."
+
+    return None
+
+
+def _read_checkpoint(checkpoint_path: Path) -> tuple[int, int]:
+    if not checkpoint_path.exists():
+        return 0, 0
+
+    checkpoint: dict[str, int] = json.loads(checkpoint_path.read_text())
+
+    return checkpoint["input_offset"], checkpoint["output_offset"]
+
+
+def _write_checkpoint(
+    checkpoint_path: Path, input_offset: int, output_offset: int
+) -> None:
+    temporary_path: Path = checkpoint_path.with_name(checkpoint_path.name + ".tmp")
+    temporary_path.write_text(
+        json.dumps({"input_offset": input_offset, "output_offset": output_offset})
+    )
+    temporary_path.replace(checkpoint_path)
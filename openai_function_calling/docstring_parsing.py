@@ -0,0 +1,329 @@
+"""Parse function docstrings into the fields used for inference."""
+
+from __future__ import annotations
+
+import inspect
+import re
+import threading
+from enum import Enum
+from typing import NamedTuple
+
+from docstring_parser import parser
+
+from openai_function_calling.instrumentation import increment
+
+_PARSE_CACHE_MAX_SIZE: int = 4096
+
+_GOOGLE_PARAMETER_SECTIONS: frozenset[str] = frozenset(
+    {
+        "args",
+        "arguments",
+        "parameters",
+        "params",
+        "keyword args",
+        "keyword arguments",
+        "kwargs",
+        "other parameters",
+    }
+)
+_NUMPY_PARAMETER_SECTIONS: frozenset[str] = frozenset(
+    {"parameters", "other parameters", "keyword arguments"}
+)
+
+_GOOGLE_SECTION_PATTERN: re.Pattern[str] = re.compile(r"^([A-Z][A-Za-z ]*):\s*$")
+_NUMPY_UNDERLINE_PATTERN: re.Pattern[str] = re.compile(r"^-{3,}\s*$")
+_GOOGLE_PARAMETER_PATTERN: re.Pattern[str] = re.compile(
+    r"^(\*{0,2}\w+)\s*(?:\(([^)]*)\))?\s*:\s*(.*)$"
+)
+_NUMPY_PARAMETER_PATTERN: re.Pattern[str] = re.compile(
+    r"^(\*{0,2}\w+)\s*(?::\s*(.*))?$"
+)
+_OTHER_STYLE_PATTERN: re.Pattern[str] = re.compile(r"^\s*[:@](param|type|arg)\b")
+
+
+class DocstringBackend(str, Enum):
+    """An enumeration of the available docstring parsing backends."""
+
+    AUTO = "auto"
+    """Use the native parser and fall back to docstring_parser when ambiguous."""
+
+    NATIVE = "native"
+    """Only use the native single pass Google/NumPy style parser."""
+
+    DOCSTRING_PARSER = "docstring_parser"
+    """Only use the docstring_parser package."""
+
+
+class ParsedParameter(NamedTuple):
+    """A parameter documented in a docstring."""
+
+    name: str
+    type_name: str | None
+    description: str | None
+
+
+class ParsedDocstring(NamedTuple):
+    """The docstring fields used when inferring a function definition."""
+
+    short_description: str | None
+    long_description: str | None
+    params: tuple[ParsedParameter, ...]
+
+
+class _AmbiguousDocstringError(Exception):
+    """Raised when the native parser cannot confidently parse a docstring."""
+
+
+_parse_cache: dict[tuple[str, DocstringBackend], ParsedDocstring] = {}
+_parse_cache_lock = threading.Lock()
+
+
+def parse_docstring(
+    docstring: str,
+    backend: DocstringBackend | str = DocstringBackend.AUTO,
+) -> ParsedDocstring:
+    """Parse a docstring, memoizing the result per docstring and backend.
+
+    Args:
+        docstring: The raw docstring to parse.
+        backend: The parsing backend to use.
+
+    Returns:
+        The parsed docstring fields.
+
+    """
+    backend = DocstringBackend(backend)
+    cache_key: tuple[str, DocstringBackend] = (docstring, backend)
+    cached: ParsedDocstring | None = _parse_cache.get(cache_key)
+
+    if cached is not None:
+        increment("docstring_cache.hit")
+        return cached
+
+    increment("docstring_cache.miss")
+    parsed_docstring: ParsedDocstring = _parse_uncached(docstring, backend)
+
+    # Reads are lock-free, but evicting iterates the cache, so writers take turns.
+    with _parse_cache_lock:
+        if len(_parse_cache) >= _PARSE_CACHE_MAX_SIZE:
+            _parse_cache.pop(next(iter(_parse_cache)))
+
+        return _parse_cache.setdefault(cache_key, parsed_docstring)
+
+
+def clear_docstring_cache() -> None:
+    """Remove all memoized docstring parse results."""
+    _parse_cache.clear()
+
+
+def _parse_uncached(docstring: str, backend: DocstringBackend) -> ParsedDocstring:
+    if backend == DocstringBackend.DOCSTRING_PARSER:
+        return _parse_with_docstring_parser(docstring)
+
+    try:
+        return _parse_native(docstring, strict=backend == DocstringBackend.AUTO)
+    except _AmbiguousDocstringError:
+        return _parse_with_docstring_parser(docstring)
+
+
+def _parse_with_docstring_parser(docstring: str) -> ParsedDocstring:
+    parsed = parser.parse(docstring)
+
+    return ParsedDocstring(
+        short_description=parsed.short_description,
+        long_description=parsed.long_description,
+        params=tuple(
+            ParsedParameter(
+                name=param.arg_name,
+                type_name=param.type_name,
+                description=param.description,
+            )
+            for param in parsed.params
+        ),
+    )
+
+
+def _parse_native(docstring: str, *, strict: bool) -> ParsedDocstring:
+    """Parse a Google or NumPy style docstring in a single pass over its lines.
+
+    Args:
+        docstring: The raw docstring to parse.
+        strict: If an ambiguous docstring should raise instead of being parsed on a\
+            best effort basis.
+
+    Raises:
+        _AmbiguousDocstringError: If strict and the docstring style is ambiguous.
+
+    Returns:
+        The parsed docstring fields.
+
+    """
+    return _NativeDocstringParser(docstring, strict=strict).parse()
+
+
+class _NativeDocstringParser:
+    """Single pass parser for Google and NumPy style docstrings."""
+
+    def __init__(self, docstring: str, *, strict: bool) -> None:
+        self.lines: list[str] = inspect.cleandoc(docstring).splitlines()
+        self.strict: bool = strict
+        self.description_lines: list[str] = []
+        self.params: list[ParsedParameter] = []
+        self.styles_seen: set[str] = set()
+
+        # The style of the current section, None while in the description.
+        self.section_style: str | None = None
+        self.in_parameter_section: bool = False
+        self.entry_indent: int | None = None
+
+        # The parameter entry currently being parsed.
+        self.name: str | None = None
+        self.type_name: str | None = None
+        self.description_parts: list[str] = []
+
+    def parse(self) -> ParsedDocstring:
+        index: int = 0
+
+        while index < len(self.lines):
+            index = self._parse_line(index)
+
+        self._flush_entry()
+
+        if self.strict and len(self.styles_seen) > 1:
+            raise _AmbiguousDocstringError
+
+        return _build_parsed_docstring(self.description_lines, self.params)
+
+    def _parse_line(self, index: int) -> int:
+        """Parse the line at the given index and return the next index to parse."""
+        line: str = self.lines[index]
+        stripped: str = line.strip()
+        indent: int = len(line) - len(line.lstrip())
+
+        if _OTHER_STYLE_PATTERN.match(line):
+            self._ambiguous()
+            return index + 1
+
+        if indent == 0 and stripped:
+            next_index: int | None = self._parse_section_header(index)
+
+            if next_index is not None:
+                return next_index
+
+        if self.section_style is None:
+            self.description_lines.append(stripped)
+        elif self.in_parameter_section and stripped:
+            self._parse_parameter_line(stripped, indent)
+
+        return index + 1
+
+    def _parse_section_header(self, index: int) -> int | None:
+        line: str = self.lines[index]
+        google_match: re.Match[str] | None = _GOOGLE_SECTION_PATTERN.match(line)
+        is_numpy_header: bool = index + 1 < len(self.lines) and bool(
+            _NUMPY_UNDERLINE_PATTERN.match(self.lines[index + 1])
+        )
+
+        if google_match is None and not is_numpy_header:
+            return None
+
+        self._flush_entry()
+        self.name = None
+        self.entry_indent = None
+
+        if is_numpy_header:
+            self.section_style = "numpy"
+            self.in_parameter_section = (
+                line.strip().lower() in _NUMPY_PARAMETER_SECTIONS
+            )
+            next_index: int = index + 2
+        else:
+            self.section_style = "google"
+            self.in_parameter_section = (
+                google_match.group(1).lower()  # type: ignore[union-attr]
+                in _GOOGLE_PARAMETER_SECTIONS
+            )
+            next_index = index + 1
+
+        self.styles_seen.add(self.section_style)
+
+        return next_index
+
+    def _parse_parameter_line(self, stripped: str, indent: int) -> None:
+        if self.entry_indent is None:
+            self.entry_indent = indent
+
+        if indent > self.entry_indent:
+            if self.name is None:
+                self._ambiguous()
+            else:
+                self.description_parts.append(stripped)
+            return
+
+        self._flush_entry()
+        self.name = None
+
+        is_numpy: bool = self.section_style == "numpy"
+        pattern: re.Pattern[str] = (
+            _NUMPY_PARAMETER_PATTERN if is_numpy else _GOOGLE_PARAMETER_PATTERN
+        )
+        entry_match: re.Match[str] | None = pattern.match(stripped)
+
+        if entry_match is None:
+            self._ambiguous()
+            return
+
+        self.name = entry_match.group(1)
+        self.type_name = _clean_type_name(entry_match.group(2))
+        self.description_parts = []
+
+        if not is_numpy and entry_match.group(3):
+            self.description_parts.append(entry_match.group(3))
+
+    def _flush_entry(self) -> None:
+        if self.name is None:
+            return
+
+        description: str | None = "\n".join(self.description_parts)
+
+        if self.section_style == "numpy" and not self.description_parts:
+            description = None
+
+        self.params.append(ParsedParameter(self.name, self.type_name, description))
+
+    def _ambiguous(self) -> None:
+        if self.strict:
+            raise _AmbiguousDocstringError
+
+
+def _clean_type_name(type_name: str | None) -> str | None:
+    if not type_name:
+        return None
+
+    type_name = type_name.strip()
+
+    if type_name.endswith(", optional"):
+        type_name = type_name[: -len(", optional")].strip()
+
+    return type_name or None
+
+
+def _build_parsed_docstring(
+    description_lines: list[str],
+    params: list[ParsedParameter],
+) -> ParsedDocstring:
+    while description_lines and not description_lines[-1]:
+        description_lines.pop()
+
+    short_description: str | None = description_lines[0] if description_lines else None
+    long_description: str | None = (
+        "\n".join(description_lines[1:]).strip() or None
+        if len(description_lines) > 1
+        else None
+    )
+
+    return ParsedDocstring(
+        short_description=short_description or None,
+        long_description=long_description,
+        params=tuple(params),
+    )
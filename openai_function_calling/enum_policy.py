@@ -0,0 +1,252 @@
+"""Keep the values of oversized enums out of tool schemas.
+
+Enums with thousands of members, e.g. SKUs or region codes, make a tool schema
+larger than the rest of the prompt. Past the inline limit of an EnumPolicy the
+values are replaced by a 'pattern' that matches their shape, or by a short
+description with a few examples, and the arguments are checked against the
+full set of values when the tool is called.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+from enum import Enum
+from typing import TYPE_CHECKING, Any, NamedTuple, get_type_hints
+
+from openai_function_calling.annotation_schema import annotation_to_json_schema
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable, Collection, Iterable, Mapping
+
+    from openai_function_calling.parameter import Parameter
+
+_CHARACTER_CLASSES: tuple[tuple[str, str], ...] = (
+    ("[A-Z]", "ABCDEFGHIJKLMNOPQRSTUVWXYZ"),
+    ("[a-z]", "abcdefghijklmnopqrstuvwxyz"),
+    ("[0-9]", "0123456789"),
+)
+_REGEX_SPECIAL_CHARACTERS: str = "\\^$.|?*+()[]{}"
+_PATTERNS: dict[tuple[Any, ...], str | None] = {}
+
+
+class EnumOverflow(str, Enum):
+    """How enums with more members than the inline limit are encoded."""
+
+    PATTERN = "pattern"
+    """A 'pattern' matching the shape of the values, or a description if the\
+        values have no common shape."""
+    DESCRIPTION = "description"
+    """A description with the number of values and a few examples."""
+
+
+class EnumPolicy(NamedTuple):
+    """When and how to leave the values of large enums out of a schema."""
+
+    max_inline_members: int = 250
+    """The largest number of values that is kept as an 'enum'."""
+    overflow: EnumOverflow = EnumOverflow.PATTERN
+    """How larger enums are encoded."""
+    examples: int = 3
+    """The number of values given as examples in the description."""
+
+
+def apply_enum_policy(parameter: Parameter, policy: EnumPolicy) -> None:
+    """Replace the enum of a parameter in place if it is larger than allowed.
+
+    The pattern of the same values is derived once and reused.
+
+    Args:
+        parameter: The parameter to change.
+        policy: The policy with the inline limit and the overflow encoding.
+
+    """
+    if parameter.enum is None or len(parameter.enum) <= policy.max_inline_members:
+        return
+
+    values: tuple[Any, ...] = tuple(
+        value for value in parameter.enum if value is not None
+    )
+    pattern: str | None = None
+
+    if policy.overflow == EnumOverflow.PATTERN:
+        try:
+            pattern = _PATTERNS[values]
+        except KeyError:
+            pattern = _PATTERNS.setdefault(values, values_pattern(values))
+        except TypeError:  # Not hashable, so not strings with a pattern either.
+            pattern = None
+
+    examples: str = ", ".join(repr(value) for value in values[: policy.examples])
+    note: str = f"One of {len(values)} values, e.g. {examples}."
+
+    parameter.enum = None
+    parameter.pattern = pattern
+
+    if pattern is None:
+        parameter.description = (
+            f"{parameter.description} {note}" if parameter.description else note
+        )
+
+
+def values_pattern(values: Iterable[Any]) -> str | None:
+    """Get a regular expression matching the common shape of string values.
+
+    Runs of upper case letters, lower case letters and digits become character
+    classes and other characters are matched literally, e.g. 'SKU-0042' and
+    'SKU-17' give '^[A-Z]{3}-[0-9]{2,4}$'. The pattern can match more values
+    than given, so arguments still need to be checked against the values.
+
+    Args:
+        values: The values to match.
+
+    Returns:
+        The anchored pattern, or None if a value is not a string or the values\
+            do not share a shape.
+
+    """
+    classes: list[str] | None = None
+    lengths: list[list[int]] = []
+
+    for value in values:
+        if not isinstance(value, str):
+            return None
+
+        runs: list[tuple[str, int]] = _character_runs(value)
+
+        if classes is None:
+            classes = [character_class for character_class, _ in runs]
+            lengths = [[length, length] for _, length in runs]
+        elif [character_class for character_class, _ in runs] != classes:
+            return None
+        else:
+            for bounds, (_, length) in zip(lengths, runs):
+                bounds[0] = min(bounds[0], length)
+                bounds[1] = max(bounds[1], length)
+
+    if not classes:
+        return None
+
+    return (
+        "^"
+        + "".join(
+            character_class + _quantifier(low, high)
+            for character_class, (low, high) in zip(classes, lengths)
+        )
+        + "$"
+    )
+
+
+def oversized_enum_parameters(
+    function_reference: Callable, policy: EnumPolicy
+) -> dict[str, Collection[Any]]:
+    """Get the allowed values of parameters whose enum the policy leaves out.
+
+    Args:
+        function_reference: The callable, a partial or a wrapper of a function.
+        policy: The policy used to infer the function definition.
+
+    Returns:
+        The allowed values by parameter name, empty if there are none or the\
+            type hints cannot be resolved.
+
+    """
+    while isinstance(function_reference, functools.partial):
+        function_reference = function_reference.func
+
+    try:
+        hints: dict[str, Any] = get_type_hints(inspect.unwrap(function_reference))
+    except (NameError, TypeError):
+        return {}
+
+    allowed: dict[str, Collection[Any]] = {}
+
+    for name, hint in hints.items():
+        if name == "return":
+            continue
+
+        try:
+            values: list[Any] | None = annotation_to_json_schema(hint).get("enum")
+        except ValueError:  # Not an enum, e.g. a list without an item type.
+            continue
+
+        if values is None:
+            continue
+
+        if len(values) > policy.max_inline_members:
+            try:
+                allowed[name] = frozenset(values)
+            except TypeError:  # Unhashable values are checked one by one.
+                allowed[name] = tuple(values)
+
+    return allowed
+
+
+def validate_enum_arguments(
+    arguments: Mapping[str, Any], allowed: Mapping[str, Collection[Any]]
+) -> None:
+    """Check decoded arguments against the values of oversized enums.
+
+    Args:
+        arguments: The decoded keyword arguments of a tool call.
+        allowed: The allowed values by parameter name, e.g. from\
+            oversized_enum_parameters.
+
+    Raises:
+        ValueError: If an argument is not one of the allowed values.
+
+    """
+    for name, values in allowed.items():
+        if name not in arguments:
+            continue
+
+        value: Any = arguments[name]
+
+        try:
+            is_allowed: bool = value in values
+        except TypeError:  # Unhashable, so not in a set of hashable values.
+            is_allowed = False
+
+        if not is_allowed:
+            raise ValueError(
+                f"Invalid argument '{name}': expected one of {len(values)} values,"
+                f" got {value!r}."
+            )
+
+
+def _character_runs(value: str) -> list[tuple[str, int]]:
+    """Split a string into runs of the same character class.
+
+    Args:
+        value: The string to split.
+
+    Returns:
+        The character class or escaped literal character of each run with its\
+            length.
+
+    """
+    runs: list[tuple[str, int]] = []
+
+    for character in value:
+        character_class: str = next(
+            (
+                pattern
+                for pattern, characters in _CHARACTER_CLASSES
+                if character in characters
+            ),
+            "\\" + character if character in _REGEX_SPECIAL_CHARACTERS else character,
+        )
+
+        if runs and runs[-1][0] == character_class:
+            runs[-1] = (character_class, runs[-1][1] + 1)
+        else:
+            runs.append((character_class, 1))
+
+    return runs
+
+
+def _quantifier(low: int, high: int) -> str:
+    if low == high:
+        return "" if low == 1 else f"{{{low}}}"
+
+    return f"{{{low},{high}}}"
@@ -2,14 +2,26 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, TypedDict
+import json
+from typing import TYPE_CHECKING, Any, TypedDict
 
 from typing_extensions import NotRequired, deprecated  # type: ignore[attr-defined]
 
+from openai_function_calling.helper_functions import json_digest
+from openai_function_calling.instrumentation import span
 from openai_function_calling.json_schema_type import JsonSchemaType
+from openai_function_calling.parameter import Parameter, ParameterDict
+from openai_function_calling.strict_schema import to_strict_function_schema
 
 if TYPE_CHECKING:  # pragma: no cover
-    from openai_function_calling.parameter import Parameter, ParameterDict
+    from collections.abc import Mapping
+
+_FUNCTION_KEYS: frozenset[str] = frozenset(
+    ("name", "description", "parameters", "strict")
+)
+_PARAMETERS_KEYS: frozenset[str] = frozenset(
+    ("type", "properties", "required", "additionalProperties")
+)
 
 
 class ParametersDict(TypedDict):
@@ -18,6 +30,7 @@ class ParametersDict(TypedDict):
     type: str
     properties: dict[str, ParameterDict]
     required: NotRequired[list[str]]
+    additionalProperties: NotRequired[bool | dict[str, Any]]
 
 
 class FunctionDict(TypedDict):
@@ -39,6 +52,8 @@ class Function:
         parameters: list[Parameter] | None = None,
         required_parameters: list[str] | None = None,
         strict: bool | None = None,
+        metadata: dict[str, Any] | None = None,
+        additional_properties: bool | dict[str, Any] | None = None,
     ) -> None:
         """Create a new function instance.
 
@@ -48,7 +63,13 @@ class Function:
             parameters: A list of parameters.
             required_parameters: A list of parameter names that are required to run the\
                 function.
-            strict: If the function should enforce strict parameters.
+            strict: If the function should enforce strict parameters. The JSON\
+                schema is then rewritten into the form strict mode accepts.
+            metadata: Extra data about the function that is not sent to the model,\
+                e.g. the ToolPolicy a ToolExecutor applies to it.
+            additional_properties: The 'additionalProperties' of the parameters\
+                object, if arguments other than the parameters are allowed or\
+                their schema. Strict functions always set it to false.
 
         """
         self.name: str = name
@@ -56,11 +77,93 @@ class Function:
         self.parameters: list[Parameter] = parameters or []
         self.required_parameters: list[str] = required_parameters or []
         self.strict: bool | None = strict
+        self.metadata: dict[str, Any] = metadata or {}
+        self.additional_properties: bool | dict[str, Any] | None = additional_properties
+        self._strict_schema_cache: tuple[Any, FunctionDict] | None = None
+        self._content_hash_cache: tuple[Any, str] | None = None
 
         self.validate()
 
+    @classmethod
+    def from_json_schema(
+        cls,
+        json_schema: FunctionDict | Mapping[str, Any],
+        *,
+        validate: bool = True,
+    ) -> Function:
+        """Create a function from its JSON schema, the reverse of to_json_schema.
+
+        Converting the result of a validated schema back with to_json_schema
+        gives an equal schema.
+
+        Args:
+            json_schema: The JSON schema of the function.
+            validate: If the schema should be checked for keys that cannot be\
+                represented. Unchecked keys are ignored, an empty 'required'\
+                list is left out and a missing 'description' or 'parameters'\
+                becomes empty.
+
+        Raises:
+            ValueError: If validating and the schema has unsupported keys, is\
+                not an object schema with 'properties', has an empty 'required'\
+                list outside strict mode or has no 'description' or\
+                'parameters'.
+
+        Returns:
+            The function.
+
+        """
+        parameters: Mapping[str, Any] = json_schema.get("parameters") or {}
+
+        if validate:
+            _check_keys(json_schema, _FUNCTION_KEYS, "function")
+            _check_keys(parameters, _PARAMETERS_KEYS, "function parameters")
+
+            if "parameters" in json_schema:
+                if parameters.get("type") != JsonSchemaType.OBJECT:
+                    raise ValueError(
+                        "Expected the function parameters to be an object."
+                    )
+
+                if "properties" not in parameters:
+                    raise ValueError(
+                        "Expected the function parameters to have 'properties'."
+                    )
+
+            # Only strict schemas list every parameter, even when there are none.
+            if parameters.get("required") == [] and not json_schema.get("strict"):
+                raise ValueError(
+                    "Expected the 'required' parameters to be left out instead of"
+                    " empty."
+                )
+
+            # to_json_schema always writes both, so they must not be missing.
+            for key in ("description", "parameters"):
+                if key not in json_schema:
+                    raise ValueError(f"Expected the function to have a '{key}'.")
+
+        return cls(
+            name=json_schema["name"],
+            description=json_schema.get("description", ""),
+            parameters=[
+                Parameter.from_json_schema(name, schema, validate=validate)
+                for name, schema in parameters.get("properties", {}).items()
+            ],
+            required_parameters=list(parameters.get("required", ())),
+            strict=json_schema.get("strict"),
+            additional_properties=parameters.get("additionalProperties"),
+        )
+
     def validate(self) -> None:
         """Validate the function properties."""
+        if self.strict:
+            for parameter in self.parameters:
+                if parameter.type == JsonSchemaType.ANY:
+                    raise ValueError(
+                        f"Cannot use strict mode with the parameter "
+                        f"'{parameter.name}' of type 'any'."
+                    )
+
         if not self.required_parameters:
             return
 
@@ -92,6 +195,10 @@ class Function:
     def to_json_schema(self) -> FunctionDict:
         """Convert the function instance to a JSON schema dict.
 
+        Strict functions are rewritten into the strict mode form. That output is
+        cached until the function changes and shared between calls, so copy it
+        before modifying it.
+
         Raises:
             ValueError: If a parameter is marked as required, but it not defined.
 
@@ -99,6 +206,85 @@ class Function:
             A JSON schema representation of the function.
 
         """
+        with span("Function.to_json_schema", function=self.name) as current_span:
+            output_dict: FunctionDict = self._to_json_schema()
+
+            if current_span.recording:
+                current_span.set_attribute(
+                    "schema_size_bytes", len(json.dumps(output_dict))
+                )
+
+        return output_dict
+
+    @property
+    def content_hash(self) -> str:
+        """The SHA-256 hex digest of the function, built from parameter hashes.
+
+        It covers everything sent to the model, but not the metadata. Only the
+        hashes of changed parameters are computed again, as in a Merkle tree,
+        and the result is cached until the function changes.
+        """
+        state: tuple[Any, ...] = (
+            self.name,
+            self.description,
+            tuple(self.required_parameters),
+            self.strict,
+            tuple(p.content_hash for p in self.parameters),
+            json_digest(self.additional_properties),
+        )
+
+        cache: tuple[Any, str] | None = self._content_hash_cache
+
+        if cache is None or cache[0] != state:
+            name, description, required, strict, parameter_hashes, _ = state
+            fields: dict[str, Any] = {
+                "name": name,
+                "description": description,
+                "required": required,
+                "strict": strict,
+                "parameters": parameter_hashes,
+            }
+
+            if self.additional_properties is not None:
+                fields["additionalProperties"] = self.additional_properties
+
+            cache = self._content_hash_cache = (state, json_digest(fields))
+
+        return cache[1]
+
+    def _to_json_schema(self) -> FunctionDict:
+        if self.strict:
+            return self._to_strict_json_schema()
+
+        return self._to_plain_json_schema()
+
+    def _to_strict_json_schema(self) -> FunctionDict:
+        cache_key: Any = self._cache_key()
+
+        # The cache is replaced as a whole and read once, so a thread never
+        # returns the schema of a key that another thread stored meanwhile.
+        cache: tuple[Any, FunctionDict] | None = self._strict_schema_cache
+
+        if cache is None or cache[0] != cache_key:
+            cache = self._strict_schema_cache = (
+                cache_key,
+                to_strict_function_schema(self._to_plain_json_schema()),
+            )
+
+        return cache[1]
+
+    def _cache_key(self) -> Any:
+        # The parameter hashes cover every field of a parameter, and are only
+        # computed again for parameters that changed.
+        return (
+            self.name,
+            self.description,
+            tuple(self.required_parameters),
+            tuple(p.content_hash for p in self.parameters),
+            json_digest(self.additional_properties),
+        )
+
+    def _to_plain_json_schema(self) -> FunctionDict:
         self.validate()
 
         parameters_dict: dict[str, ParameterDict] = {
@@ -117,6 +303,11 @@ class Function:
         if self.strict is not None:
             output_dict["strict"] = self.strict
 
+        if self.additional_properties is not None:
+            output_dict["parameters"]["additionalProperties"] = (
+                self.additional_properties
+            )
+
         if self.required_parameters is None or len(self.required_parameters) == 0:
             return output_dict
 
@@ -149,11 +340,9 @@ class Function:
         if other_required_parameters == self.required_parameters:
             return
 
-        required_parameters_set = set(self.required_parameters)
-        other_required_parameters_set = set(other_required_parameters)
-
+        # Keep the order deterministic, so equal functions have equal schemas.
         self.required_parameters = list(
-            required_parameters_set.union(other_required_parameters_set)
+            dict.fromkeys([*self.required_parameters, *other_required_parameters])
         )
 
     def _merge_parameters(self, other_parameters: list[Parameter]) -> None:
@@ -170,3 +359,12 @@ class Function:
                     current_parameters[parameter_name].merge(other_parameter)
             else:
                 self.parameters.append(other_parameter)
+
+
+def _check_keys(
+    json_schema: Mapping[str, Any], keys: frozenset[str], name: str
+) -> None:
+    if not keys.issuperset(json_schema):
+        raise ValueError(
+            f"Unsupported keys in the {name} schema: {sorted(set(json_schema) - keys)}."
+        )
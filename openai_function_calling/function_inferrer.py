@@ -2,33 +2,102 @@
 
 from __future__ import annotations
 
+import copy
 import dataclasses
+import functools
 import inspect
 import typing
+import weakref
 from enum import EnumMeta
-from typing import TYPE_CHECKING, Any, get_args, get_origin, get_type_hints
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    NamedTuple,
+    TypeVar,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 from warnings import warn
 
-from docstring_parser import Docstring, parser
-
+from openai_function_calling.annotation_schema import annotation_to_json_schema
+from openai_function_calling.docstring_parsing import (
+    DocstringBackend,
+    ParsedDocstring,
+    parse_docstring,
+)
+from openai_function_calling.enum_policy import EnumPolicy, apply_enum_policy
 from openai_function_calling.function import Function
 from openai_function_calling.helper_functions import python_type_to_json_schema_type
+from openai_function_calling.instrumentation import increment, span
 from openai_function_calling.json_schema_type import JsonSchemaType
 from openai_function_calling.parameter import Parameter
 
 if TYPE_CHECKING:  # pragma: no cover
-    from collections.abc import Callable
+    from collections.abc import Callable, Collection
+
+_INJECTED_ATTRIBUTE: str = "__injected_parameters__"
+_INFERRED_FUNCTIONS: weakref.WeakKeyDictionary[Callable, Function] = (
+    weakref.WeakKeyDictionary()
+)
+_INFERRED_CLASSES: weakref.WeakKeyDictionary[type, dict[str, Function]] = (
+    weakref.WeakKeyDictionary()
+)
+
+_CallableT = TypeVar("_CallableT", bound="Callable[..., Any]")
+
+
+def injected_parameters(*names: str) -> Callable[[_CallableT], _CallableT]:
+    """Declare parameters that are supplied by a wrapper instead of the model.
+
+    Inference leaves the declared parameters out of the function definition.
+
+    Args:
+        names: The names of the injected parameters.
+
+    Returns:
+        A decorator that marks a function or wrapper with the parameters.
+
+    """
+
+    def decorator(function_reference: _CallableT) -> _CallableT:
+        declared: frozenset[str] = getattr(
+            function_reference, _INJECTED_ATTRIBUTE, frozenset()
+        )
+        setattr(function_reference, _INJECTED_ATTRIBUTE, declared | frozenset(names))
+
+        return function_reference
+
+    return decorator
+
+
+class InferredMethod(NamedTuple):
+    """A method of an instance with the function definition of its class."""
+
+    function: Function
+    method: Callable
 
 
 class FunctionInferrer:
     """Class to help inferring a function definition from a reference."""
 
+    docstring_backend: ClassVar[DocstringBackend] = DocstringBackend.AUTO
+    """The backend used to parse docstrings. See DocstringBackend for options."""
+
+    enum_policy: ClassVar[EnumPolicy] = EnumPolicy()
+    """When enums are left out of inferred schemas. Set it before inference,\
+        since inferred definitions are cached. See EnumPolicy for options."""
+
     @staticmethod
     def infer_from_function_reference(function_reference: Callable) -> Function:
         """Infer a function definition given a function reference.
 
         The type hints and docstring are used to infer the type and descriptions.
 
+        Partials and functions with injected parameters are inferred with
+        infer_from_wrapper.
+
         Args:
             function_reference: The function reference to generate a definition for.
 
@@ -36,21 +105,217 @@ class FunctionInferrer:
             An instance of Function with inferred values.
 
         """
-        inferred_from_annotations: Function = FunctionInferrer._infer_from_annotations(
-            function_reference
-        )
-        inferred_from_docstring: Function = FunctionInferrer._infer_from_docstring(
-            function_reference
-        )
-        inferred_from_inspection: Function = FunctionInferrer._infer_from_inspection(
-            function_reference
+        if isinstance(function_reference, functools.partial) or hasattr(
+            function_reference, _INJECTED_ATTRIBUTE
+        ):
+            return FunctionInferrer.infer_from_wrapper(function_reference)
+
+        return FunctionInferrer._infer(function_reference)
+
+    @staticmethod
+    def infer_from_wrapper(
+        function_reference: Callable,
+        *,
+        injected_parameters: Collection[str] = (),
+    ) -> Function:
+        """Infer a function definition of a partial or wrapper of a function.
+
+        The definition of the wrapped function is inferred once and cached.
+        Parameters bound by partials or declared as injected are then removed
+        from a copy of it, so new wrappers of the same function cost no new
+        inference.
+
+        Args:
+            function_reference: A functools.partial, a wrapper made with\
+                functools.wraps or a function with injected parameters.
+            injected_parameters: Names of more parameters supplied by the wrapper.
+
+        Raises:
+            ValueError: If an injected parameter is not a parameter of the function.
+
+        Returns:
+            The function definition without bound or injected parameters, with\
+                copies of the parameters of the cached definition.
+
+        """
+        declared: set[str] = set(injected_parameters)
+        bound: set[str] = set()
+        wrapped: Any = function_reference
+
+        while True:
+            declared.update(getattr(wrapped, _INJECTED_ATTRIBUTE, ()))
+
+            if isinstance(wrapped, functools.partial):
+                bound.update(wrapped.keywords)
+                bound.update(_positional_parameter_names(wrapped.func, wrapped.args))
+                wrapped = wrapped.func
+            elif hasattr(wrapped, "__wrapped__"):
+                wrapped = wrapped.__wrapped__
+            else:
+                break
+
+        function: Function = FunctionInferrer._infer_cached(wrapped)
+        parameter_names: set[str] = {p.name for p in function.parameters}
+
+        for name in declared:
+            if name not in parameter_names:
+                raise ValueError(
+                    f"Unknown injected parameter '{name}' of '{function.name}'."
+                )
+
+        removed: set[str] = declared | bound
+
+        return Function(
+            name=function.name,
+            description=function.description,
+            parameters=[
+                copy.deepcopy(p) for p in function.parameters if p.name not in removed
+            ],
+            required_parameters=[
+                name for name in function.required_parameters if name not in removed
+            ],
+            strict=function.strict,
         )
 
-        inferred_from_annotations.merge(inferred_from_docstring)
-        inferred_from_annotations.merge(inferred_from_inspection)
+    @staticmethod
+    def _infer_cached(function_reference: Callable) -> Function:
+        """Infer a function definition, reusing the result for the same callable.
+
+        Args:
+            function_reference: The function reference to use for inference.
+
+        Returns:
+            The cached function definition. Do not change it. Threads inferring\
+                the same callable at once get the definition published first.
+
+        """
+        try:
+            function: Function | None = _INFERRED_FUNCTIONS.get(function_reference)
+        except TypeError:  # Not weakly referenceable, e.g. a builtin.
+            return FunctionInferrer._infer(function_reference)
+
+        if function is None:
+            increment("inference_cache.miss")
+            function = _INFERRED_FUNCTIONS.setdefault(
+                function_reference, FunctionInferrer._infer(function_reference)
+            )
+        else:
+            increment("inference_cache.hit")
+
+        return function
+
+    @staticmethod
+    def _infer(function_reference: Callable) -> Function:
+        """Infer a function definition from type hints, docstring and signature.
+
+        Args:
+            function_reference: The function reference to use for inference.
+
+        Returns:
+            The inferred Function instance.
+
+        """
+        with span(
+            "FunctionInferrer.infer_from_function_reference",
+            function=getattr(function_reference, "__qualname__", None),
+        ):
+            with span("FunctionInferrer.infer_from_annotations"):
+                inferred_from_annotations: Function = (
+                    FunctionInferrer._infer_from_annotations(function_reference)
+                )
+            with span("FunctionInferrer.infer_from_docstring"):
+                inferred_from_docstring: Function = (
+                    FunctionInferrer._infer_from_docstring(function_reference)
+                )
+            with span("FunctionInferrer.infer_from_inspection"):
+                inferred_from_inspection: Function = (
+                    FunctionInferrer._infer_from_inspection(function_reference)
+                )
+            with span("FunctionInferrer.merge"):
+                inferred_from_annotations.merge(inferred_from_docstring)
+                inferred_from_annotations.merge(inferred_from_inspection)
+
+            for parameter in inferred_from_annotations.parameters:
+                apply_enum_policy(parameter, FunctionInferrer.enum_policy)
 
         return inferred_from_annotations
 
+    @staticmethod
+    def infer_from_class(class_reference: type) -> dict[str, Function]:
+        """Infer the function definitions of the public methods of a class.
+
+        Each method is inferred once per class and the result is cached per
+        class, so subclasses get their own cache. The self and cls parameters
+        of instance and class methods are left out.
+
+        Args:
+            class_reference: The class to infer the methods of.
+
+        Returns:
+            The function definitions by method name, in definition order. They\
+                are shared by every caller, so copy them before changes.
+
+        """
+        methods: dict[str, Function] | None = _INFERRED_CLASSES.get(class_reference)
+
+        if methods is None:
+            with span(
+                "FunctionInferrer.infer_from_class",
+                cls=class_reference.__qualname__,
+            ):
+                methods = _INFERRED_CLASSES.setdefault(
+                    class_reference,
+                    {
+                        name: FunctionInferrer._infer_from_method(method)
+                        for name, method in _iter_public_methods(class_reference)
+                    },
+                )
+
+        return dict(methods)
+
+    @staticmethod
+    def infer_from_instance(instance: object) -> list[InferredMethod]:
+        """Get the public methods of an instance with their function definitions.
+
+        The definitions come from infer_from_class, so only the first instance
+        of a class pays for inference and later instances are only bound.
+
+        Args:
+            instance: The object to get the methods of.
+
+        Returns:
+            The bound methods with their shared function definitions.
+
+        """
+        methods: dict[str, Function] = FunctionInferrer.infer_from_class(type(instance))
+
+        return [
+            InferredMethod(function, getattr(instance, name))
+            for name, function in methods.items()
+        ]
+
+    @staticmethod
+    def _infer_from_method(method: Any) -> Function:
+        """Infer a function definition from a method as found in a class namespace.
+
+        Args:
+            method: A function, staticmethod or classmethod from a class namespace.
+
+        Returns:
+            The inferred Function instance without the self or cls parameter.
+
+        """
+        if isinstance(method, staticmethod):
+            return FunctionInferrer.infer_from_function_reference(method.__func__)
+
+        if isinstance(method, classmethod):
+            method = method.__func__
+
+        function: Function = FunctionInferrer.infer_from_function_reference(method)
+        bound_parameter: str = next(iter(inspect.signature(method).parameters), "")
+
+        return _without_parameters(function, {bound_parameter})
+
     @staticmethod
     def _infer_from_docstring(function_reference: Callable) -> Function:
         """Infer a function definition from a docstring.
@@ -73,7 +338,9 @@ class FunctionInferrer:
             return function_definition
 
         docstring: str = function_reference.__doc__
-        parsed_docstring: Docstring = parser.parse(docstring)
+        parsed_docstring: ParsedDocstring = parse_docstring(
+            docstring, FunctionInferrer.docstring_backend
+        )
 
         function_definition.description = (
             parsed_docstring.short_description
@@ -84,7 +351,7 @@ class FunctionInferrer:
         for param in parsed_docstring.params:
             function_definition.parameters.append(
                 Parameter(
-                    name=param.arg_name,
+                    name=param.name,
                     type=python_type_to_json_schema_type(param.type_name),
                     description=param.description,
                 )
@@ -111,35 +378,18 @@ class FunctionInferrer:
                 continue
 
             origin = get_origin(annotation_type) or annotation_type
-            args: tuple[Any, ...] = get_args(annotation_type)
 
-            if origin in [list, typing.List]:  # noqa: UP006
-                if not args:
-                    raise ValueError(
-                        f"Expected array parameter '{param_name}' to have an item type."
-                    )
-                item_type = args[0]
-                parameter_type = JsonSchemaType.ARRAY.value
-                array_item_type = python_type_to_json_schema_type(
-                    item_type.__name__ if hasattr(item_type, "__name__") else "Any"
-                )
-            elif origin in [dict, typing.Dict]:  # noqa: UP006
-                parameter_type = JsonSchemaType.OBJECT.value
-                array_item_type = None
-            else:
-                parameter_type = python_type_to_json_schema_type(
-                    annotation_type.__name__
-                    if hasattr(annotation_type, "__name__")
-                    else "Any"
+            if origin in [list, typing.List] and not get_args(annotation_type):  # noqa: UP006
+                raise ValueError(
+                    f"Expected array parameter '{param_name}' to have an item type."
                 )
 
-                array_item_type = None
-
+            # The memoized schema is shared, so the parameter gets its own copy.
             parameters.append(
-                Parameter(
-                    name=param_name,
-                    type=parameter_type,
-                    array_item_type=array_item_type,
+                Parameter.from_json_schema(
+                    param_name,
+                    copy.deepcopy(annotation_to_json_schema(annotation_type)),
+                    validate=False,
                 )
             )
 
@@ -169,16 +419,21 @@ class FunctionInferrer:
         inspected_parameters = inspected_signature.parameters
 
         for name, parameter in inspected_parameters.items():
-            parameter_type: str = python_type_to_json_schema_type(parameter.kind.name)
-            enum_values: list[str] | None = None
+            parameter_type: str | list[str] = python_type_to_json_schema_type(
+                parameter.kind.name
+            )
+            enum_values: list[Any] | None = None
 
             if parameter.default is inspect.Parameter.empty:
                 function_definition.required_parameters.append(name)
 
             if parameter_type == "null":
                 if isinstance(parameter.annotation, EnumMeta):
-                    enum_values = list(parameter.annotation._value2member_map_.keys())
-                    parameter_type = FunctionInferrer._infer_list_item_type(enum_values)
+                    schema: dict[str, Any] = copy.deepcopy(
+                        annotation_to_json_schema(parameter.annotation)
+                    )
+                    enum_values = schema.get("enum")
+                    parameter_type = schema["type"]
                 elif dataclasses.is_dataclass(parameter.annotation):
                     parameter_type = JsonSchemaType.OBJECT.value
 
@@ -188,14 +443,80 @@ class FunctionInferrer:
 
         return function_definition
 
-    @staticmethod
-    def _infer_list_item_type(list_of_items: list[Any]) -> str:
-        if len(list_of_items) == 0:
-            return JsonSchemaType.NULL.value
 
-        # Check if all items are the same type.
-        if len({type(item).__name__ for item in list_of_items}) == 1:
-            item: Any = type(list_of_items[0]).__name__
-            return python_type_to_json_schema_type(item)
+def _iter_public_methods(cls: type) -> list[tuple[str, Any]]:
+    """Get the public methods of a class, letting subclasses override bases.
+
+    Args:
+        cls: The class to get the methods of.
+
+    Returns:
+        The method names with the methods as found in the class namespaces.
+
+    """
+    methods: dict[str, Any] = {}
+
+    for base in reversed(inspect.getmro(cls)):
+        if base is object:
+            continue
+
+        for name, attribute in vars(base).items():
+            if name.startswith("_"):
+                continue
+
+            if inspect.isfunction(attribute) or isinstance(
+                attribute, (staticmethod, classmethod)
+            ):
+                methods[name] = attribute
+            else:
+                methods.pop(name, None)
+
+    return list(methods.items())
+
+
+def _positional_parameter_names(
+    function_reference: Callable, args: tuple[Any, ...]
+) -> list[str]:
+    """Get the names of the parameters that positional arguments are bound to.
+
+    Args:
+        function_reference: The callable the arguments are passed to.
+        args: The positional arguments.
+
+    Returns:
+        The names of the bound parameters.
+
+    """
+    if not args:
+        return []
+
+    positional_kinds: tuple[Any, ...] = (
+        inspect.Parameter.POSITIONAL_ONLY,
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+    )
+    names: list[str] = [
+        name
+        for name, parameter in inspect.signature(function_reference).parameters.items()
+        if parameter.kind in positional_kinds
+    ]
+
+    return names[: len(args)]
+
+
+def _without_parameters(function: Function, names: Collection[str]) -> Function:
+    """Remove parameters from a function definition in place.
+
+    Args:
+        function: The function definition to change.
+        names: The names of the parameters to remove.
+
+    Returns:
+        The same function definition.
+
+    """
+    function.parameters = [p for p in function.parameters if p.name not in names]
+    function.required_parameters = [
+        name for name in function.required_parameters if name not in names
+    ]
 
-        return JsonSchemaType.ANY.value
+    return function
@@ -0,0 +1,133 @@
+"""Load Function objects in bulk from JSON and JSON Lines schema files."""
+
+from __future__ import annotations
+
+import json
+import mmap
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from openai_function_calling.function import Function
+
+if TYPE_CHECKING:  # pragma: no cover
+    import os
+    from collections.abc import Iterable, Iterator, Mapping
+
+_JSON_LINES_SUFFIXES: frozenset[str] = frozenset((".jsonl", ".ndjson"))
+_CHUNK_SIZE: int = 1024 * 1024
+_JSON_WHITESPACE: str = " \t\n\r"
+
+
+def load_functions(
+    path: str | os.PathLike[str],
+    *,
+    validate: bool = False,
+    chunk_size: int = _CHUNK_SIZE,
+) -> Iterator[Function]:
+    """Lazily load functions from a JSON or JSON Lines file.
+
+    JSON Lines files (.jsonl, .ndjson) hold one schema per line and are memory
+    mapped. Other files hold a JSON array of schemas, or a single schema, and
+    are parsed incrementally in chunks. Schemas may be function schemas or tool
+    params wrapping them, e.g. the output of ToolHelpers.write_tool_params.
+
+    Args:
+        path: The file to load.
+        validate: If every schema should be checked for keys that cannot be\
+            represented. Functions are otherwise validated when converted back\
+            to JSON schemas.
+        chunk_size: The number of characters read at a time from JSON files.
+
+    Raises:
+        ValueError: If a JSON array is not terminated, or validating and a\
+            schema is not supported.
+
+    Returns:
+        An iterator of the functions, loading each one as it is consumed.
+
+    """
+    path = Path(path)
+
+    if path.suffix in _JSON_LINES_SUFFIXES:
+        schemas: Iterator[Any] = _iter_json_lines(path)
+    else:
+        schemas = _iter_json_array(path, chunk_size)
+
+    return functions_from_json_schemas(schemas, validate=validate)
+
+
+def functions_from_json_schemas(
+    json_schemas: Iterable[Mapping[str, Any]],
+    *,
+    validate: bool = False,
+) -> Iterator[Function]:
+    """Lazily create functions from function schemas or tool params.
+
+    Args:
+        json_schemas: Function schemas, or tool params wrapping them.
+        validate: If every schema should be checked for keys that cannot be\
+            represented.
+
+    Yields:
+        The function of each schema.
+
+    """
+    for json_schema in json_schemas:
+        function_schema: Mapping[str, Any] = (
+            json_schema["function"]
+            if json_schema.get("type") == "function" and "function" in json_schema
+            else json_schema
+        )
+
+        yield Function.from_json_schema(function_schema, validate=validate)
+
+
+def _iter_json_lines(path: Path) -> Iterator[Any]:
+    with path.open("rb") as file:
+        if not path.stat().st_size:
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for line in iter(mapped.readline, b""):
+                if not line.isspace():
+                    yield json.loads(line)
+
+
+def _iter_json_array(path: Path, chunk_size: int) -> Iterator[Any]:
+    with path.open(encoding="utf-8") as file:
+        buffer: str = file.read(chunk_size).lstrip(_JSON_WHITESPACE)
+
+        if not buffer.startswith("["):
+            yield json.loads(buffer + file.read())
+            return
+
+        yield from _iter_array_items(file, buffer, chunk_size)
+
+
+def _iter_array_items(file: IO[str], buffer: str, chunk_size: int) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    position: int = 1
+
+    while True:
+        while position < len(buffer) and buffer[position] in _JSON_WHITESPACE + ",":
+            position += 1
+
+        if position < len(buffer) and buffer[position] == "]":
+            return
+
+        try:
+            if position == len(buffer):
+                raise json.JSONDecodeError("Expected a value", buffer, position)
+
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as error:
+            chunk: str = file.read(chunk_size)
+
+            if not chunk:
+                raise ValueError(f"Invalid JSON array of schemas: {error}") from error
+
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        yield item
@@ -2,8 +2,23 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import json
+import types
+from typing import TYPE_CHECKING, Any, Union
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Awaitable, Callable
+
 from openai_function_calling.json_schema_type import JsonSchemaType
 
+UNION_TYPES: tuple[Any, ...] = (
+    (Union, types.UnionType) if hasattr(types, "UnionType") else (Union,)
+)
+"""The origins of union annotations, with X | Y on Python 3.10 and later."""
+
 
 def python_type_to_json_schema_type(python_type: str | None) -> str:
     """Convert a python type string to a value JSON schema type.
@@ -39,3 +54,77 @@ def python_type_to_json_schema_type(python_type: str | None) -> str:
         json_schema_type = JsonSchemaType.ARRAY.value
 
     return json_schema_type
+
+
+def json_digest(value: Any) -> str:
+    """Get the SHA-256 hex digest of a value as canonical JSON.
+
+    Args:
+        value: A JSON serializable value.
+
+    Returns:
+        The hex digest, the same for equal values regardless of key order.
+
+    """
+    canonical_json: str = json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+    return hashlib.sha256(canonical_json.encode()).hexdigest()
+
+
+def callable_name(function_reference: Callable) -> str:
+    """Get the name of a callable, looking through partials.
+
+    Args:
+        function_reference: A function or a partial of one.
+
+    Returns:
+        The name of the function.
+
+    """
+    while isinstance(function_reference, functools.partial):
+        function_reference = function_reference.func
+
+    return function_reference.__name__
+
+
+def run_awaitable(awaitable: Awaitable[Any]) -> Any:
+    """Run an awaitable to completion in a new event loop.
+
+    Args:
+        awaitable: A coroutine or another awaitable, e.g. a tool result.
+
+    Returns:
+        The result of the awaitable.
+
+    """
+    return asyncio.run(_await(awaitable))
+
+
+class ChatNamespace:
+    """The chat attribute of a client that is called like an OpenAI client."""
+
+    def __init__(self, create: Callable[..., Any]) -> None:
+        """Expose a create method as chat.completions.create.
+
+        Args:
+            create: The method creating a chat completion.
+
+        """
+        self.completions: CompletionsNamespace = CompletionsNamespace(create)
+
+
+class CompletionsNamespace:
+    """The chat.completions attribute of a client."""
+
+    def __init__(self, create: Callable[..., Any]) -> None:
+        """Expose a create method as completions.create.
+
+        Args:
+            create: The method creating a chat completion.
+
+        """
+        self.create: Callable[..., Any] = create
+
+
+async def _await(awaitable: Awaitable[Any]) -> Any:
+    return await awaitable
@@ -0,0 +1,354 @@
+"""Lightweight instrumentation hooks for timing and counting package operations.
+
+Spans and counters are only materialized when at least one hook is registered, so
+instrumented code paths cost a single global lookup when instrumentation is unused.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:  # pragma: no cover
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+
+class InstrumentationHook(Protocol):
+    """A receiver of finished spans and counter increments."""
+
+    def on_span_end(self, span: Span) -> None:
+        """Handle a finished span.
+
+        Args:
+            span: The finished span.
+
+        """
+
+    def on_counter(self, name: str, value: int, attributes: dict[str, Any]) -> None:
+        """Handle a counter increment.
+
+        Args:
+            name: The counter name.
+            value: The amount to increment by.
+            attributes: Attributes describing the increment.
+
+        """
+
+
+class Span:
+    """A timed operation reported to the registered hooks when it ends.
+
+    The start time is read from the wall clock for exporting, and the duration
+    from the monotonic performance counter, so clock adjustments, e.g. by NTP,
+    do not change it. The end time is the start time plus the duration.
+    """
+
+    __slots__ = (
+        "_hooks",
+        "_start_counter_ns",
+        "attributes",
+        "end_time_ns",
+        "name",
+        "start_time_ns",
+    )
+
+    recording: bool = True
+    """If the span is reported to hooks. Use to skip computing costly attributes."""
+
+    def __init__(
+        self,
+        name: str,
+        attributes: dict[str, Any],
+        hooks: tuple[InstrumentationHook, ...],
+    ) -> None:
+        """Create a new span instance.
+
+        Args:
+            name: The name of the operation.
+            attributes: Attributes describing the operation.
+            hooks: The hooks to report the span to when it ends.
+
+        """
+        self.name: str = name
+        self.attributes: dict[str, Any] = attributes
+        self.start_time_ns: int = 0
+        self.end_time_ns: int = 0
+        self._start_counter_ns: int = 0
+        self._hooks: tuple[InstrumentationHook, ...] = hooks
+
+    @property
+    def duration_seconds(self) -> float:
+        """The duration of the span in seconds."""
+        return (self.end_time_ns - self.start_time_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute on the span.
+
+        Args:
+            key: The attribute name.
+            value: The attribute value.
+
+        """
+        self.attributes[key] = value
+
+    def __enter__(self) -> Self:
+        """Start timing the span."""
+        self.start_time_ns = time.time_ns()
+        self._start_counter_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop timing the span and report it to the hooks."""
+        self.end_time_ns = self.start_time_ns + (
+            time.perf_counter_ns() - self._start_counter_ns
+        )
+
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+
+        for hook in self._hooks:
+            hook.on_span_end(self)
+
+
+class _NoopSpan:
+    """A shared span used when no hooks are registered."""
+
+    __slots__ = ()
+
+    recording: bool = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+# Replaced as a whole rather than mutated so readers never need a lock.
+_hooks: tuple[InstrumentationHook, ...] = ()
+_hooks_lock = threading.Lock()
+
+
+def add_hook(hook: InstrumentationHook) -> None:
+    """Register a hook to receive spans and counters.
+
+    Args:
+        hook: The hook to register.
+
+    """
+    global _hooks  # noqa: PLW0603
+
+    with _hooks_lock:
+        _hooks = (*_hooks, hook)
+
+
+def remove_hook(hook: InstrumentationHook) -> None:
+    """Unregister a previously registered hook.
+
+    Args:
+        hook: The hook to unregister.
+
+    Raises:
+        ValueError: If the hook is not registered.
+
+    """
+    global _hooks  # noqa: PLW0603
+
+    with _hooks_lock:
+        if hook not in _hooks:
+            raise ValueError("Cannot remove a hook that is not registered.")
+
+        _hooks = tuple(h for h in _hooks if h is not hook)
+
+
+def is_enabled() -> bool:
+    """Check if any hook is registered.
+
+    Returns:
+        If instrumentation is enabled.
+
+    """
+    return bool(_hooks)
+
+
+def span(name: str, **attributes: Any) -> Span | _NoopSpan:
+    """Create a span to use as a context manager around an operation.
+
+    Args:
+        name: The name of the operation.
+        attributes: Attributes describing the operation.
+
+    Returns:
+        A span, or a shared no-op span when no hooks are registered.
+
+    """
+    hooks: tuple[InstrumentationHook, ...] = _hooks
+
+    if not hooks:
+        return _NOOP_SPAN
+
+    return Span(name, attributes, hooks)
+
+
+def increment(name: str, value: int = 1, **attributes: Any) -> None:
+    """Increment a counter on every registered hook.
+
+    Args:
+        name: The counter name.
+        value: The amount to increment by.
+        attributes: Attributes describing the increment.
+
+    """
+    for hook in _hooks:
+        hook.on_counter(name, value, attributes)
+
+
+class SpanStatistics:
+    """Aggregated durations for spans sharing a name."""
+
+    def __init__(self) -> None:
+        """Create an empty statistics instance."""
+        self.count: int = 0
+        self.total_seconds: float = 0.0
+        self.min_seconds: float = float("inf")
+        self.max_seconds: float = 0.0
+        self.last_attributes: dict[str, Any] = {}
+
+    @property
+    def mean_seconds(self) -> float:
+        """The mean span duration in seconds."""
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def add(self, span: Span) -> None:
+        """Add a finished span to the statistics.
+
+        Args:
+            span: The finished span.
+
+        """
+        duration: float = span.duration_seconds
+        self.count += 1
+        self.total_seconds += duration
+        self.min_seconds = min(self.min_seconds, duration)
+        self.max_seconds = max(self.max_seconds, duration)
+        self.last_attributes = span.attributes
+
+
+class MetricsCollector:
+    """An in-memory hook aggregating span durations and counters."""
+
+    def __init__(self) -> None:
+        """Create an empty metrics collector."""
+        self.spans: dict[str, SpanStatistics] = {}
+        self.counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def on_span_end(self, span: Span) -> None:
+        """Aggregate a finished span.
+
+        Args:
+            span: The finished span.
+
+        """
+        with self._lock:
+            self.spans.setdefault(span.name, SpanStatistics()).add(span)
+
+    def on_counter(self, name: str, value: int, attributes: dict[str, Any]) -> None:  # noqa: ARG002
+        """Aggregate a counter increment.
+
+        Args:
+            name: The counter name.
+            value: The amount to increment by.
+            attributes: Attributes describing the increment.
+
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        """Remove all aggregated metrics."""
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+
+
+class OpenTelemetryHook:
+    """Forward spans and counters to OpenTelemetry style tracers and meters.
+
+    The tracer and meter are duck typed so OpenTelemetry is not a dependency. The
+    tracer must provide `start_span(name, start_time=..., attributes=...)` returning
+    a span with `end(end_time=...)`. The meter must provide `create_counter(name)`
+    returning a counter with `add(value, attributes=...)`.
+    """
+
+    def __init__(self, tracer: Any = None, meter: Any = None) -> None:
+        """Create a new OpenTelemetry adapter.
+
+        Args:
+            tracer: An OpenTelemetry style tracer to export spans to.
+            meter: An OpenTelemetry style meter to export counters to.
+
+        """
+        self.tracer: Any = tracer
+        self.meter: Any = meter
+        self._counters: dict[str, Any] = {}
+        self._counters_lock = threading.Lock()
+
+    def on_span_end(self, span: Span) -> None:
+        """Export a finished span.
+
+        Args:
+            span: The finished span.
+
+        """
+        if self.tracer is None:
+            return
+
+        exported_span: Any = self.tracer.start_span(
+            span.name,
+            start_time=span.start_time_ns,
+            attributes=span.attributes,
+        )
+        exported_span.end(end_time=span.end_time_ns)
+
+    def on_counter(self, name: str, value: int, attributes: dict[str, Any]) -> None:
+        """Export a counter increment.
+
+        Args:
+            name: The counter name.
+            value: The amount to increment by.
+            attributes: Attributes describing the increment.
+
+        """
+        if self.meter is None:
+            return
+
+        counter: Any = self._counters.get(name)
+
+        if counter is None:
+            # Concurrent first increments of a counter create one instrument.
+            with self._counters_lock:
+                counter = self._counters.get(name)
+
+                if counter is None:
+                    counter = self._counters[name] = self.meter.create_counter(name)
+
+        counter.add(value, attributes=attributes)
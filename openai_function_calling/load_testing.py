@@ -0,0 +1,155 @@
+"""Generate load against a chat completions endpoint through full tool cycles."""
+
+from __future__ import annotations
+
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from openai_function_calling.tool_loop import ToolLoop
+
+if TYPE_CHECKING:  # pragma: no cover
+    from openai.types.chat import ChatCompletionToolParam
+
+    from openai_function_calling.tool_executor import ToolExecutor
+
+
+class LoadTestReport(NamedTuple):
+    """Latency and throughput of a load test run."""
+
+    cycles: int
+    errors: int
+    elapsed_seconds: float
+    latencies: tuple[float, ...]
+
+    @property
+    def throughput(self) -> float:
+        """The number of completed cycles per second."""
+        return self.cycles / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def p50(self) -> float:
+        """The median cycle latency in seconds."""
+        return self.percentile(50)
+
+    @property
+    def p99(self) -> float:
+        """The 99th percentile cycle latency in seconds."""
+        return self.percentile(99)
+
+    def percentile(self, percent: float) -> float:
+        """Get a cycle latency percentile using the nearest rank method.
+
+        Args:
+            percent: The percentile to get, between 0 and 100.
+
+        Returns:
+            The latency in seconds, or zero if no cycle completed.
+
+        """
+        if not self.latencies:
+            return 0.0
+
+        ordered: list[float] = sorted(self.latencies)
+        rank: int = max(math.ceil(percent / 100 * len(ordered)), 1)
+
+        return ordered[rank - 1]
+
+    def summary(self) -> str:
+        """Format the report as a single line.
+
+        Returns:
+            The formatted report.
+
+        """
+        return (
+            f"{self.cycles} cycles, {self.errors} errors, "
+            f"{self.throughput:.1f} cycles/s, "
+            f"p50 {self.p50 * 1000:.1f} ms, p99 {self.p99 * 1000:.1f} ms"
+        )
+
+
+def run_tool_cycle(
+    client: Any,
+    executor: ToolExecutor,
+    tools: list[ChatCompletionToolParam],
+    messages: list[dict[str, Any]],
+    *,
+    model: str = "mock",
+    max_rounds: int = 5,
+) -> list[dict[str, Any]]:
+    """Run one request, tool execution and follow-up cycle.
+
+    Args:
+        client: A client with a `chat.completions.create` method returning dicts.
+        executor: The executor used to run the tool calls.
+        tools: The tool parameters sent with every request.
+        messages: The initial messages. The list is not modified.
+        model: The model to request.
+        max_rounds: The maximum number of requests in the cycle.
+
+    Returns:
+        The full message history of the cycle.
+
+    """
+    return (
+        ToolLoop(
+            client, executor, model=model, max_iterations=max_rounds, tool_params=tools
+        )
+        .run(list(messages))
+        .messages
+    )
+
+
+def run_load_test(
+    client: Any,
+    executor: ToolExecutor,
+    tools: list[ChatCompletionToolParam],
+    messages: list[dict[str, Any]],
+    *,
+    model: str = "mock",
+    cycles: int = 100,
+    concurrency: int = 8,
+) -> LoadTestReport:
+    """Run full tool cycles concurrently and report latency and throughput.
+
+    Args:
+        client: A client with a `chat.completions.create` method returning dicts,\
+            e.g. a MockServerClient.
+        executor: The executor used to run the tool calls.
+        tools: The tool parameters sent with every request.
+        messages: The initial messages of every cycle.
+        model: The model to request.
+        cycles: The total number of cycles to run.
+        concurrency: The number of cycles run at the same time.
+
+    Returns:
+        The load test report.
+
+    """
+
+    def timed_cycle(_: int) -> float | None:
+        start: float = time.perf_counter()
+
+        try:
+            run_tool_cycle(client, executor, tools, messages, model=model)
+        except Exception:  # noqa: BLE001
+            return None
+
+        return time.perf_counter() - start
+
+    start: float = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as thread_pool:
+        results: list[float | None] = list(thread_pool.map(timed_cycle, range(cycles)))
+
+    elapsed_seconds: float = time.perf_counter() - start
+    latencies: tuple[float, ...] = tuple(r for r in results if r is not None)
+
+    return LoadTestReport(
+        cycles=len(latencies),
+        errors=len(results) - len(latencies),
+        elapsed_seconds=elapsed_seconds,
+        latencies=latencies,
+    )
@@ -0,0 +1,551 @@
+"""A local stand-in for the chat completions API used for testing tool loops.
+
+The server speaks the chat completions wire format, including streaming, and
+answers with scripted messages or tool calls generated from the request tools.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import itertools
+import json
+import random
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+
+from openai_function_calling.helper_functions import ChatNamespace
+from openai_function_calling.json_schema_type import JsonSchemaType
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterator, Mapping
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+_RECORDED_REQUESTS: int = 1_000
+_COMPLETIONS_PATHS: frozenset[str] = frozenset(
+    {"/chat/completions", "/v1/chat/completions"}
+)
+
+
+def generate_arguments(
+    parameters_schema: Mapping[str, Any],
+    rng: random.Random,
+) -> dict[str, Any]:
+    """Generate random arguments matching a function parameters schema.
+
+    Required parameters are always included, optional ones half of the time.
+
+    Args:
+        parameters_schema: The JSON schema of the function parameters.
+        rng: The random number generator to use.
+
+    Returns:
+        The generated arguments.
+
+    """
+    properties: Mapping[str, Any] = parameters_schema.get("properties", {})
+    required: set[str] = set(parameters_schema.get("required", []))
+
+    return {
+        name: generate_value(schema, rng)
+        for name, schema in properties.items()
+        if name in required or rng.random() < 0.5  # noqa: PLR2004
+    }
+
+
+def generate_value(schema: Mapping[str, Any], rng: random.Random) -> Any:  # noqa: PLR0911
+    """Generate a random value matching a JSON schema.
+
+    Args:
+        schema: The JSON schema of the value.
+        rng: The random number generator to use.
+
+    Returns:
+        The generated value.
+
+    """
+    if schema.get("enum"):
+        return rng.choice(schema["enum"])
+
+    schema_type: Any = schema.get("type")
+
+    if isinstance(schema_type, list):
+        schema_type = rng.choice(schema_type)
+
+    if schema_type == JsonSchemaType.STRING:
+        return f"value-{rng.randrange(1000)}"
+    if schema_type == JsonSchemaType.INTEGER:
+        return rng.randrange(100)
+    if schema_type == JsonSchemaType.NUMBER:
+        return round(rng.uniform(0, 100), 2)
+    if schema_type == JsonSchemaType.BOOLEAN:
+        return rng.random() < 0.5  # noqa: PLR2004
+    if schema_type == JsonSchemaType.ARRAY:
+        return [generate_value(schema.get("items", {}), rng) for _ in range(2)]
+    if schema_type == JsonSchemaType.OBJECT:
+        return generate_arguments(schema, rng)
+
+    return None
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class MockChatCompletionsServer:
+    """A threaded HTTP server that mimics the chat completions endpoint.
+
+    Responses are taken in order from the scripted responses when given. Otherwise
+    a final assistant message is returned when the last message is a tool result
+    or no tools were sent, and random tool calls drawn from the request tools are
+    returned in all other cases.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        scripted_responses: list[dict[str, Any]] | None = None,
+        latency_seconds: float = 0.0,
+        latency_jitter_seconds: float = 0.0,
+        tool_calls_per_response: int = 1,
+        stream_chunk_size: int = 8,
+        stream_chunk_delay_seconds: float = 0.0,
+        final_content: str = "Done.",
+        seed: int | None = None,
+    ) -> None:
+        """Create a new mock server. Call start to begin serving.
+
+        Args:
+            host: The host to bind to.
+            port: The port to bind to. Zero selects a free port.
+            scripted_responses: Assistant messages to return in order, each with\
+                either a 'content' string or a 'tool_calls' list of dicts with a\
+                'name' and 'arguments'. Cycles when exhausted.
+            latency_seconds: The delay before each response.
+            latency_jitter_seconds: The maximum random delay added to the latency.
+            tool_calls_per_response: The number of generated tool calls.
+            stream_chunk_size: The number of characters per streamed delta.
+            stream_chunk_delay_seconds: The delay between streamed chunks.
+            final_content: The content of generated final assistant messages.
+            seed: The seed for generated tool calls.
+
+        """
+        self.latency_seconds: float = latency_seconds
+        self.latency_jitter_seconds: float = latency_jitter_seconds
+        self.tool_calls_per_response: int = tool_calls_per_response
+        self.stream_chunk_size: int = stream_chunk_size
+        self.stream_chunk_delay_seconds: float = stream_chunk_delay_seconds
+        self.final_content: str = final_content
+        # The most recent requests are kept for assertions in tests.
+        self.request_count: int = 0
+        self.requests: deque[dict[str, Any]] = deque(maxlen=_RECORDED_REQUESTS)
+
+        self._scripted_responses: Iterator[dict[str, Any]] | None = (
+            itertools.cycle(scripted_responses) if scripted_responses else None
+        )
+        self._rng = random.Random(seed)  # noqa: S311
+        self._lock = threading.Lock()
+        self._ids: Iterator[int] = itertools.count()
+        self._server = _MockHTTPServer((host, port), _create_handler(self))
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """The base URL to configure clients with, e.g. OpenAI(base_url=...)."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> None:
+        """Start serving requests in a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="mock-chat-server",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving requests and close the socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._server.server_close()
+
+    def __enter__(self) -> Self:
+        """Start the server when used as a context manager."""
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the server."""
+        self.stop()
+
+    def create_completion(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Create a chat completion response for a request.
+
+        Args:
+            request: The decoded request body.
+
+        Returns:
+            The chat completion response body.
+
+        """
+        with self._lock:
+            self.request_count += 1
+            self.requests.append(request)
+            completion_id: int = next(self._ids)
+            message: dict[str, Any] = self._next_message(request)
+
+        return {
+            "id": f"chatcmpl-mock-{completion_id}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls"
+                    if "tool_calls" in message
+                    else "stop",
+                    "logprobs": None,
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    def stream_completion(self, completion: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """Split a chat completion response into streamed chunks.
+
+        Args:
+            completion: The chat completion response body.
+
+        Yields:
+            The chat completion chunks.
+
+        """
+        choice: dict[str, Any] = completion["choices"][0]
+        message: dict[str, Any] = choice["message"]
+        size: int = self.stream_chunk_size
+
+        def chunk(delta: dict[str, Any], finish_reason: str | None = None) -> dict:
+            return {
+                "id": completion["id"],
+                "object": "chat.completion.chunk",
+                "created": completion["created"],
+                "model": completion["model"],
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+
+        yield chunk({"role": "assistant", "content": None})
+
+        content: str = message.get("content") or ""
+
+        for start in range(0, len(content), size):
+            yield chunk({"content": content[start : start + size]})
+
+        for index, tool_call in enumerate(message.get("tool_calls", [])):
+            yield chunk(
+                {
+                    "tool_calls": [
+                        {
+                            "index": index,
+                            "id": tool_call["id"],
+                            "type": "function",
+                            "function": {
+                                "name": tool_call["function"]["name"],
+                                "arguments": "",
+                            },
+                        }
+                    ]
+                }
+            )
+            arguments: str = tool_call["function"]["arguments"]
+
+            for start in range(0, len(arguments), size):
+                yield chunk(
+                    {
+                        "tool_calls": [
+                            {
+                                "index": index,
+                                "function": {
+                                    "arguments": arguments[start : start + size]
+                                },
+                            }
+                        ]
+                    }
+                )
+
+        yield chunk({}, choice["finish_reason"])
+
+    def response_delay(self) -> float:
+        """Get the delay before the next response.
+
+        Returns:
+            The delay in seconds.
+
+        """
+        if not self.latency_jitter_seconds:
+            return self.latency_seconds
+
+        with self._lock:
+            return self.latency_seconds + self._rng.uniform(
+                0, self.latency_jitter_seconds
+            )
+
+    def _next_message(self, request: dict[str, Any]) -> dict[str, Any]:
+        if self._scripted_responses is not None:
+            return self._format_message(next(self._scripted_responses))
+
+        messages: list[dict[str, Any]] = request.get("messages", [])
+        tools: list[dict[str, Any]] = request.get("tools") or []
+
+        if not tools or (messages and messages[-1].get("role") == "tool"):
+            return {"role": "assistant", "content": self.final_content}
+
+        tool_calls: list[dict[str, Any]] = []
+
+        for _ in range(self.tool_calls_per_response):
+            function: dict[str, Any] = self._rng.choice(tools)["function"]
+            arguments: dict[str, Any] = generate_arguments(
+                function.get("parameters", {}), self._rng
+            )
+            tool_calls.append({"name": function["name"], "arguments": arguments})
+
+        return self._format_message({"tool_calls": tool_calls})
+
+    def _format_message(self, scripted: dict[str, Any]) -> dict[str, Any]:
+        if "tool_calls" not in scripted:
+            return {"role": "assistant", "content": scripted.get("content", "")}
+
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_mock_{next(self._ids)}",
+                    "type": "function",
+                    "function": {
+                        "name": tool_call["name"],
+                        "arguments": tool_call["arguments"]
+                        if isinstance(tool_call["arguments"], str)
+                        else json.dumps(tool_call["arguments"]),
+                    },
+                }
+                for tool_call in scripted["tool_calls"]
+            ],
+        }
+
+
+def _create_handler(server: MockChatCompletionsServer) -> type[BaseHTTPRequestHandler]:
+    class MockChatCompletionsHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately, so avoid delayed ACK stalls.
+        disable_nagle_algorithm = True
+
+        def do_POST(self) -> None:  # noqa: N802
+            body: bytes = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            if urlsplit(self.path).path not in _COMPLETIONS_PATHS:
+                self._send_json(
+                    HTTPStatus.NOT_FOUND, {"error": {"message": "Not found"}}
+                )
+                return
+
+            try:
+                request: dict[str, Any] = json.loads(body)
+            except json.JSONDecodeError:
+                self._send_json(
+                    HTTPStatus.BAD_REQUEST, {"error": {"message": "Invalid JSON body"}}
+                )
+                return
+
+            time.sleep(server.response_delay())
+            completion: dict[str, Any] = server.create_completion(request)
+
+            if request.get("stream"):
+                self._send_stream(server.stream_completion(completion))
+            else:
+                self._send_json(HTTPStatus.OK, completion)
+
+        def _send_json(self, status: HTTPStatus, body: dict[str, Any]) -> None:
+            encoded: bytes = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def _send_stream(self, chunks: Iterator[dict[str, Any]]) -> None:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            for chunk in chunks:
+                self.wfile.write(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+                self.wfile.flush()
+
+                if server.stream_chunk_delay_seconds:
+                    time.sleep(server.stream_chunk_delay_seconds)
+
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return MockChatCompletionsHandler
+
+
+class MockServerClient:
+    """A minimal, dependency-free chat completions client.
+
+    Mirrors the `client.chat.completions.create(...)` interface of the OpenAI
+    client, returning decoded dicts instead of response objects. Each thread keeps
+    its own persistent connection.
+    """
+
+    def __init__(self, base_url: str, *, timeout: float = 60.0) -> None:
+        """Create a new client.
+
+        Args:
+            base_url: The base URL of the API, e.g. 'http://127.0.0.1:8000/v1'.
+            timeout: The socket timeout in seconds.
+
+        """
+        parsed_url = urlsplit(base_url)
+        self.host: str = parsed_url.hostname or "127.0.0.1"
+        self.port: int | None = parsed_url.port
+        self.path: str = parsed_url.path.rstrip("/") + "/chat/completions"
+        self.timeout: float = timeout
+        self.chat = ChatNamespace(self.create)
+        self._local = threading.local()
+
+    def create(self, **kwargs: Any) -> Any:
+        """Create a chat completion.
+
+        Args:
+            kwargs: The request body parameters.
+
+        Raises:
+            RuntimeError: If the server responds with an error status.
+
+        Returns:
+            The response dict, or an iterator of chunk dicts when streaming.
+
+        """
+        body: bytes = json.dumps(kwargs).encode()
+        headers: dict[str, str] = {"Content-Type": "application/json"}
+
+        if kwargs.get("stream"):
+            connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+            connection.request("POST", self.path, body, headers)
+            response: http.client.HTTPResponse = connection.getresponse()
+            _raise_for_status(response)
+            return _iterate_events(connection, response)
+
+        connection = self._connection()
+
+        try:
+            connection.request("POST", self.path, body, headers)
+            response = connection.getresponse()
+            payload: bytes = response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self._local.connection = None
+            raise
+
+        _raise_for_status(response, payload)
+
+        return json.loads(payload)
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection: http.client.HTTPConnection | None = getattr(
+            self._local, "connection", None
+        )
+
+        if connection is None:
+            connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+            self._local.connection = connection
+
+        return connection
+
+
+class AsyncMockServerClient:
+    """An asyncio version of MockServerClient that runs requests in threads."""
+
+    def __init__(self, base_url: str, *, timeout: float = 60.0) -> None:
+        """Create a new client.
+
+        Args:
+            base_url: The base URL of the API, e.g. 'http://127.0.0.1:8000/v1'.
+            timeout: The socket timeout in seconds.
+
+        """
+        self._client = MockServerClient(base_url, timeout=timeout)
+        self.chat = ChatNamespace(self.create)
+
+    async def create(self, **kwargs: Any) -> Any:
+        """Create a chat completion without blocking the event loop.
+
+        Args:
+            kwargs: The request body parameters.
+
+        Returns:
+            The response dict. Streaming is not supported.
+
+        """
+        return await asyncio.to_thread(self._client.create, **kwargs)
+
+
+def _raise_for_status(response: http.client.HTTPResponse, payload: bytes = b"") -> None:
+    if response.status != HTTPStatus.OK:
+        payload = payload or response.read()
+        raise RuntimeError(
+            f"Request failed with status {response.status}: {payload.decode()}"
+        )
+
+
+def _iterate_events(
+    connection: http.client.HTTPConnection,
+    response: http.client.HTTPResponse,
+) -> Iterator[dict[str, Any]]:
+    try:
+        for line in response:
+            if not line.startswith(b"data: "):
+                continue
+
+            data: bytes = line[len(b"data: ") :].strip()
+
+            if data == b"[DONE]":
+                break
+
+            yield json.loads(data)
+    finally:
+        connection.close()
@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
+import copy
 from typing import TYPE_CHECKING, Any, TypedDict
 
+from openai_function_calling.helper_functions import json_digest
 from openai_function_calling.json_schema_type import JsonSchemaType
 
 if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Mapping
+
     from typing_extensions import NotRequired
 
+_OBJECT_SCHEMA_KEYS: frozenset[str] = frozenset(
+    ("properties", "required", "additionalProperties")
+)
+_PARAMETER_KEYS: frozenset[str] = (
+    frozenset(("type", "description", "enum", "items", "anyOf", "pattern"))
+    | _OBJECT_SCHEMA_KEYS
+)
+
 
 class ItemsDict(TypedDict):
     """JSON Schema representation of array items."""
@@ -19,10 +31,15 @@ class ItemsDict(TypedDict):
 class ParameterDict(TypedDict):
     """JSON Schema representation of a parameter."""
 
-    type: str
+    type: str | list[str]
     description: NotRequired[str]
     enum: NotRequired[list[Any]]
     items: NotRequired[ItemsDict]
+    properties: NotRequired[dict[str, Any]]
+    required: NotRequired[list[str]]
+    additionalProperties: NotRequired[bool | dict[str, Any]]
+    anyOf: NotRequired[list[dict[str, Any]]]
+    pattern: NotRequired[str]
 
 
 class Parameter:
@@ -31,55 +48,195 @@ class Parameter:
     def __init__(
         self,
         name: str,
-        type: JsonSchemaType | str,
+        type: JsonSchemaType | str | list[str],
         description: str | None = None,
         *,
         enum: list[Any] | None = None,
         array_item_type: str | None = None,
+        object_schema: Mapping[str, Any] | None = None,
+        any_of: list[dict[str, Any]] | None = None,
+        pattern: str | None = None,
     ) -> None:
         """Create a new parameter instance.
 
         Args:
             name: The name of the parameter as defined in the function.
-            type: The JSON schema type of the parameter.
+            type: The JSON schema type of the parameter, or a list of types, e.g.\
+                for a nullable parameter.
             description: A description of the parameter.
             enum: A list of allowed values for the parameter.
             array_item_type: If the type is set to 'array', the JSON\
                 schema type of the items it contains.
+            object_schema: If the type is set to 'object', the 'properties',\
+                'required' and 'additionalProperties' of the object, e.g. from a\
+                Pydantic model.
+            any_of: The schemas of the members of a union that cannot be merged\
+                into one schema. The 'type' then lists the types of the members\
+                and is left out of the JSON schema.
+            pattern: A regular expression the string values of the parameter\
+                must match, e.g. instead of an enum with too many values.
 
         Raises:
             ValueError: If the 'type' is set to 'array', but 'array_item_type' argument\
                 is not set.
             ValueError: If the 'array_item_type' argument is set, but the 'type' is not\
                 'array'.
+            ValueError: If the 'object_schema' argument is set, but the 'type' is not\
+                'object' or it has other keys.
+            ValueError: If the 'any_of' argument is set with 'enum',\
+                'array_item_type' or 'object_schema'.
+            ValueError: If the 'pattern' argument is set, but the 'type' is not\
+                'string'.
 
         """
         self.name: str = name
-        self.type: str = type
+        self.type: str | list[str] = type
         self.description: str | None = description
         self.enum: list[Any] | None = enum
         self.array_item_type: str | None = array_item_type
+        self.object_schema: Mapping[str, Any] | None = object_schema
+        self.any_of: list[dict[str, Any]] | None = any_of
+        self.pattern: str | None = pattern
+        self._content_hash_cache: tuple[tuple[Any, ...], str] | None = None
 
         self.validate()
 
+    @classmethod
+    def from_json_schema(
+        cls,
+        name: str,
+        json_schema: ParameterDict | Mapping[str, Any],
+        *,
+        validate: bool = True,
+    ) -> Parameter:
+        """Create a parameter from its JSON schema, the reverse of to_json_schema.
+
+        Converting the result of a validated schema back with to_json_schema
+        gives an equal schema.
+
+        Args:
+            name: The name of the parameter.
+            json_schema: The JSON schema of the parameter.
+            validate: If the schema should be checked for keys that cannot be\
+                represented, including keys of 'items' other than 'type'.\
+                Unchecked keys are ignored, as are an empty 'description' or\
+                'enum' and a 'type' next to an 'anyOf'.
+
+        Raises:
+            ValueError: If the schema has neither a 'type' nor an 'anyOf'.
+            ValueError: If validating and the schema has unsupported keys, both\
+                a 'type' and an 'anyOf', or an empty 'description' or 'enum'.
+
+        Returns:
+            The parameter.
+
+        """
+        if validate and not _PARAMETER_KEYS.issuperset(json_schema):
+            unsupported: list[str] = sorted(set(json_schema) - _PARAMETER_KEYS)
+            raise ValueError(
+                f"Unsupported keys in the schema of parameter '{name}': {unsupported}."
+            )
+
+        items: Mapping[str, Any] | None = json_schema.get("items")
+
+        if validate and items is not None and set(items) != {"type"}:
+            raise ValueError(
+                f"Expected the 'items' of parameter '{name}' to only have a 'type',"
+                f" got {sorted(items)}."
+            )
+
+        if validate:
+            _check_representable(name, json_schema)
+
+        object_schema: dict[str, Any] = {
+            key: value
+            for key, value in json_schema.items()
+            if key in _OBJECT_SCHEMA_KEYS
+        }
+
+        any_of: list[dict[str, Any]] | None = json_schema.get("anyOf")
+
+        if "type" not in json_schema and any_of is None:
+            raise ValueError(
+                f"Expected the schema of parameter '{name}' to have a 'type' or"
+                " an 'anyOf'."
+            )
+
+        return cls(
+            name=name,
+            type=json_schema["type"]
+            if "type" in json_schema
+            else _any_of_types(any_of),  # type: ignore[arg-type]
+            description=json_schema.get("description"),
+            enum=json_schema.get("enum"),
+            array_item_type=items.get("type") if items is not None else None,
+            object_schema=object_schema or None,
+            any_of=any_of,
+            pattern=json_schema.get("pattern"),
+        )
+
     def validate(self) -> None:
         """Validate the parameter has valid properties.
 
         Raises:
             ValueError: If 'array_item_type' is not set, but 'type' is array.
             ValueError: If 'array_item_type' is set, but 'type' is not array.
+            ValueError: If 'object_schema' is set, but 'type' is not object or it\
+                has other keys.
+            ValueError: If 'any_of' is set with 'enum', 'array_item_type' or\
+                'object_schema'.
+            ValueError: If 'pattern' is set, but 'type' is not string.
 
         """
-        if self.type == JsonSchemaType.ARRAY and self.array_item_type is None:
+        if self.pattern is not None and not (
+            self.type == JsonSchemaType.STRING
+            or (isinstance(self.type, list) and JsonSchemaType.STRING in self.type)
+        ):
+            raise ValueError(
+                "Unexpected 'pattern' value since type is not set to 'string'.",
+            )
+
+        if self.any_of is not None:
+            if self.enum or self.array_item_type or self.object_schema:
+                raise ValueError(
+                    "Unexpected 'enum', 'array_item_type' or 'object_schema' value"
+                    " since 'any_of' is set.",
+                )
+
+            return
+
+        is_array: bool = self.type == JsonSchemaType.ARRAY or (
+            isinstance(self.type, list) and JsonSchemaType.ARRAY in self.type
+        )
+
+        if is_array and self.array_item_type is None:
             raise ValueError(
                 "Expected 'array_item_type' value since type is set to 'array'.",
             )
 
-        if self.type != JsonSchemaType.ARRAY and self.array_item_type is not None:
+        if not is_array and self.array_item_type is not None:
             raise ValueError(
                 "Unexpected 'array_item_type' value since type is not set to 'array'.",
             )
 
+        if self.object_schema is None:
+            return
+
+        is_object: bool = self.type == JsonSchemaType.OBJECT or (
+            isinstance(self.type, list) and JsonSchemaType.OBJECT in self.type
+        )
+
+        if not is_object:
+            raise ValueError(
+                "Unexpected 'object_schema' value since type is not set to 'object'.",
+            )
+
+        if not _OBJECT_SCHEMA_KEYS.issuperset(self.object_schema):
+            raise ValueError(
+                "Expected 'object_schema' to only have the keys 'properties',"
+                " 'required' and 'additionalProperties'.",
+            )
+
     def to_json_schema(self) -> ParameterDict:
         """Convert to a JSON schema dict object.
 
@@ -92,9 +249,11 @@ class Parameter:
         """
         self.validate()
 
-        output_dict: ParameterDict = {
-            "type": self.type,
-        }
+        output_dict: ParameterDict = (
+            {"anyOf": self.any_of}  # type: ignore[typeddict-item]
+            if self.any_of is not None
+            else {"type": self.type}
+        )
 
         if self.description:
             output_dict["description"] = self.description
@@ -105,8 +264,48 @@ class Parameter:
         if self.array_item_type:
             output_dict["items"] = {"type": self.array_item_type}
 
+        if self.object_schema:
+            output_dict.update(self.object_schema)  # type: ignore[typeddict-item]
+
+        if self.pattern is not None:
+            output_dict["pattern"] = self.pattern
+
         return output_dict
 
+    @property
+    def content_hash(self) -> str:
+        """The SHA-256 hex digest of the name and JSON schema of the parameter.
+
+        Equal parameters have the same hash. It is cached until the parameter
+        changes.
+        """
+        state: tuple[Any, ...] = self._hash_state()
+
+        cache: tuple[tuple[Any, ...], str] | None = self._content_hash_cache
+
+        if cache is None or cache[0] != state:
+            cache = self._content_hash_cache = (
+                tuple(
+                    copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+                    for value in state
+                ),
+                json_digest({"name": self.name, **self.to_json_schema()}),
+            )
+
+        return cache[1]
+
+    def _hash_state(self) -> tuple[Any, ...]:
+        return (
+            self.name,
+            self.type,
+            self.description,
+            self.enum,
+            self.array_item_type,
+            self.object_schema,
+            self.any_of,
+            self.pattern,
+        )
+
     def merge(self, other_parameter: Parameter) -> None:
         """Merge another parameter into the current instance.
 
@@ -134,6 +333,15 @@ class Parameter:
         if self.array_item_type is None or self.array_item_type == JsonSchemaType.NULL:
             self.array_item_type = other_parameter.array_item_type
 
+        if self.object_schema is None:
+            self.object_schema = other_parameter.object_schema
+
+        if self.any_of is None:
+            self.any_of = other_parameter.any_of
+
+        if self.pattern is None:
+            self.pattern = other_parameter.pattern
+
     def __eq__(self, other: object) -> bool:
         """Test if an object is equivalent to the parameter.
 
@@ -153,4 +361,56 @@ class Parameter:
             and self.description == other.description
             and self.enum == other.enum
             and self.array_item_type == other.array_item_type
+            and self.object_schema == other.object_schema
+            and self.any_of == other.any_of
+            and self.pattern == other.pattern
+        )
+
+
+def _any_of_types(any_of: list[dict[str, Any]]) -> list[str]:
+    """Get the distinct types of the members of a union in order.
+
+    Args:
+        any_of: The schemas of the members.
+
+    Returns:
+        The types of the members.
+
+    """
+    types: dict[str, None] = {}
+
+    for schema in any_of:
+        schema_types: Any = schema.get("type", JsonSchemaType.ANY.value)
+        types.update(
+            dict.fromkeys(
+                schema_types if isinstance(schema_types, list) else [schema_types]
+            )
         )
+
+    return list(types)
+
+
+def _check_representable(name: str, json_schema: Mapping[str, Any]) -> None:
+    """Check that to_json_schema would write a parameter schema back unchanged.
+
+    Args:
+        name: The name of the parameter.
+        json_schema: The JSON schema of the parameter.
+
+    Raises:
+        ValueError: If the schema has both a 'type' and an 'anyOf', or an\
+            empty 'description' or 'enum'.
+
+    """
+    if "type" in json_schema and "anyOf" in json_schema:
+        raise ValueError(
+            f"Expected the schema of parameter '{name}' to have a 'type' or an"
+            " 'anyOf', not both."
+        )
+
+    for key in ("description", "enum"):
+        if key in json_schema and not json_schema[key]:
+            raise ValueError(
+                f"Expected the '{key}' of parameter '{name}' to be left out"
+                " instead of empty."
+            )
@@ -0,0 +1,378 @@
+"""Run CPU-bound tools in a pool of warm worker processes."""
+
+from __future__ import annotations
+
+import array
+import functools
+import importlib
+import inspect
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
+
+from openai_function_calling.helper_functions import run_awaitable
+from openai_function_calling.instrumentation import increment, span
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable, Mapping
+    from multiprocessing.context import BaseContext
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+DEFAULT_SHARED_MEMORY_THRESHOLD: int = 1024 * 1024
+"""Byte payloads of at least this size are passed through shared memory."""
+
+_worker_tools: dict[str, Callable] = {}
+"""The tools resolved by a worker process, by import path."""
+
+
+class SharedBuffer(NamedTuple):
+    """A reference to a byte or array payload stored in shared memory."""
+
+    name: str
+    size: int
+    kind: str
+    """The payload type, "bytes", "bytearray" or an array.array typecode."""
+
+
+class ProcessToolPool:
+    """Route tool calls by import path to a pool of warm worker processes.
+
+    Workers import the tool modules once at startup and keep the resolved
+    callables, so calls only transfer the arguments and results. Top level
+    arguments and results that are bytes, bytearray or array.array payloads of
+    at least the threshold size are passed through shared memory instead of
+    being pickled through a pipe.
+    """
+
+    def __init__(
+        self,
+        import_paths: Iterable[str] = (),
+        *,
+        max_workers: int | None = None,
+        shared_memory_threshold: int = DEFAULT_SHARED_MEMORY_THRESHOLD,
+        mp_context: BaseContext | None = None,
+    ) -> None:
+        """Create a new process pool. Workers start on first use or warmup.
+
+        Args:
+            import_paths: Import paths of tools to import when workers start,\
+                e.g. "package.module:function".
+            max_workers: The number of worker processes. Defaults to the CPU count.
+            shared_memory_threshold: The minimum size in bytes of a payload to\
+                pass through shared memory.
+            mp_context: The multiprocessing context used to start workers.
+
+        """
+        self.max_workers: int = max_workers or os.cpu_count() or 1
+        self.shared_memory_threshold: int = shared_memory_threshold
+        self.mp_context: BaseContext | None = mp_context
+        self._import_paths: list[str] = []
+        self._executor: ProcessPoolExecutor | None = None
+
+        for import_path in import_paths:
+            _split_import_path(import_path)
+            self._import_paths.append(import_path)
+
+    @property
+    def import_paths(self) -> list[str]:
+        """The import paths of the tools imported when workers start."""
+        return list(self._import_paths)
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """The process pool executor, created on first use."""
+        if self._executor is None:
+            # Workers must share the tracker of this process, or each of them
+            # reports the shared memory it created as leaked when it exits.
+            resource_tracker.ensure_running()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self.mp_context,
+                initializer=_initialize_worker,
+                initargs=(tuple(self._import_paths),),
+            )
+
+        return self._executor
+
+    def tool(self, function_reference: Callable | str) -> ProcessTool:
+        """Get a callable that runs a tool in the pool.
+
+        The callable wraps the function, so its definition is inferred from the
+        function and it can be registered with a ToolExecutor.
+
+        Args:
+            function_reference: A module level function or its import path.
+
+        Raises:
+            ValueError: If the function cannot be imported by its import path.
+
+        Returns:
+            The callable running the tool in a worker process.
+
+        """
+        if isinstance(function_reference, str):
+            import_path: str = function_reference
+            function_reference = _import_tool(import_path)
+        else:
+            import_path = get_import_path(function_reference)
+
+        if self._executor is None and import_path not in self._import_paths:
+            self._import_paths.append(import_path)
+
+        return ProcessTool(self, import_path, function_reference)
+
+    def call(self, import_path: str, arguments: Mapping[str, Any]) -> Any:
+        """Run a tool in a worker process and return its result.
+
+        Args:
+            import_path: The import path of the tool.
+            arguments: The keyword arguments of the tool.
+
+        Returns:
+            The value returned by the tool.
+
+        """
+        with span("ProcessToolPool.call", tool=import_path):
+            buffers: list[shared_memory.SharedMemory] = []
+
+            try:
+                shared_arguments: dict[str, Any] = {
+                    name: self._share(value, buffers)
+                    for name, value in arguments.items()
+                }
+                result: Any = self.executor.submit(
+                    _run_tool,
+                    import_path,
+                    shared_arguments,
+                    self.shared_memory_threshold,
+                ).result()
+            finally:
+                for buffer in buffers:
+                    buffer.close()
+                    buffer.unlink()
+
+            if isinstance(result, SharedBuffer):
+                increment("process_pool.shared_memory_bytes", result.size)
+                result = _read_shared_buffer(result, unlink=True)
+
+        return result
+
+    def warmup(self) -> int:
+        """Start the worker processes and import the tool modules in them.
+
+        Returns:
+            The number of worker processes that answered.
+
+        """
+        with span("ProcessToolPool.warmup", max_workers=self.max_workers):
+            return len(set(self.executor.map(_worker_pid, range(self.max_workers * 2))))
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> Self:
+        """Use the pool as a context manager that closes on exit."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the pool."""
+        self.close()
+
+    def _share(self, value: Any, buffers: list[shared_memory.SharedMemory]) -> Any:
+        shared_buffer: SharedBuffer | None = _write_shared_buffer(
+            value, self.shared_memory_threshold, buffers
+        )
+
+        if shared_buffer is None:
+            return value
+
+        increment("process_pool.shared_memory_bytes", shared_buffer.size)
+        return shared_buffer
+
+
+class ProcessTool:
+    """A callable running a tool in a process pool, wrapping the tool function."""
+
+    def __init__(
+        self, pool: ProcessToolPool, import_path: str, function_reference: Callable
+    ) -> None:
+        """Create a new process tool. Use ProcessToolPool.tool to create one.
+
+        Args:
+            pool: The pool to run the tool in.
+            import_path: The import path of the tool.
+            function_reference: The tool function, used for its definition.
+
+        """
+        self.pool: ProcessToolPool = pool
+        self.import_path: str = import_path
+        functools.update_wrapper(self, function_reference)
+
+    def __call__(self, **arguments: Any) -> Any:
+        """Run the tool in the pool with keyword arguments."""
+        return self.pool.call(self.import_path, arguments)
+
+
+def get_import_path(function_reference: Callable) -> str:
+    """Get the import path of a module level function.
+
+    Args:
+        function_reference: The function.
+
+    Raises:
+        ValueError: If the function cannot be imported by its import path.
+
+    Returns:
+        The import path, e.g. "package.module:function".
+
+    """
+    import_path: str = (
+        f"{function_reference.__module__}:{function_reference.__qualname__}"
+    )
+
+    if (
+        function_reference.__module__ == "__main__"
+        or "<locals>" in function_reference.__qualname__
+        or _import_tool(import_path) is not function_reference
+    ):
+        raise ValueError(
+            f"Expected an importable module level function, got '{import_path}'."
+        )
+
+    return import_path
+
+
+def _split_import_path(import_path: str) -> tuple[str, str]:
+    module_name, separator, qualname = import_path.partition(":")
+
+    if not separator or not module_name or not qualname:
+        raise ValueError(
+            f"Expected an import path like 'package.module:function', "
+            f"got '{import_path}'."
+        )
+
+    return module_name, qualname
+
+
+def _import_tool(import_path: str) -> Callable:
+    module_name, qualname = _split_import_path(import_path)
+    tool: Any = importlib.import_module(module_name)
+
+    for attribute in qualname.split("."):
+        tool = getattr(tool, attribute)
+
+    return tool
+
+
+def _initialize_worker(import_paths: tuple[str, ...]) -> None:
+    for import_path in import_paths:
+        _worker_tools[import_path] = _import_tool(import_path)
+
+
+def _worker_pid(_: int) -> int:
+    return os.getpid()
+
+
+def _run_tool(import_path: str, arguments: dict[str, Any], threshold: int) -> Any:
+    tool: Callable | None = _worker_tools.get(import_path)
+
+    if tool is None:
+        tool = _worker_tools[import_path] = _import_tool(import_path)
+
+    result: Any = tool(
+        **{
+            name: _read_shared_buffer(value)
+            if isinstance(value, SharedBuffer)
+            else value
+            for name, value in arguments.items()
+        }
+    )
+
+    if inspect.isawaitable(result):
+        result = run_awaitable(result)
+
+    buffers: list[shared_memory.SharedMemory] = []
+    shared_result: SharedBuffer | None = _write_shared_buffer(
+        result, threshold, buffers
+    )
+
+    for buffer in buffers:
+        buffer.close()
+
+    return result if shared_result is None else shared_result
+
+
+def _write_shared_buffer(
+    value: Any, threshold: int, buffers: list[shared_memory.SharedMemory]
+) -> SharedBuffer | None:
+    """Copy a large byte or array payload into a new shared memory block.
+
+    Args:
+        value: The payload.
+        threshold: The minimum size in bytes to share.
+        buffers: The list to add the created shared memory block to.
+
+    Returns:
+        The reference to the shared payload, or None if it is not shared.
+
+    """
+    if isinstance(value, array.array):
+        kind: str = value.typecode
+    elif isinstance(value, (bytes, bytearray)):
+        kind = type(value).__name__
+    else:
+        return None
+
+    with memoryview(value).cast("B") as view:
+        if view.nbytes < threshold:
+            return None
+
+        buffer = shared_memory.SharedMemory(create=True, size=view.nbytes)
+        buffers.append(buffer)
+        buffer.buf[: view.nbytes] = view
+
+        return SharedBuffer(buffer.name, view.nbytes, kind)
+
+
+def _read_shared_buffer(
+    shared_buffer: SharedBuffer, *, unlink: bool = False
+) -> bytes | bytearray | array.array:
+    """Copy a payload out of shared memory.
+
+    Args:
+        shared_buffer: The reference to the shared payload.
+        unlink: If the shared memory block should be freed after reading.
+
+    Returns:
+        The payload as its original type.
+
+    """
+    buffer = shared_memory.SharedMemory(name=shared_buffer.name)
+
+    try:
+        with buffer.buf[: shared_buffer.size] as data:
+            if shared_buffer.kind == "bytes":
+                value: bytes | bytearray | array.array = bytes(data)
+            elif shared_buffer.kind == "bytearray":
+                value = bytearray(data)
+            else:
+                value = array.array(shared_buffer.kind)
+                value.frombytes(data)
+    finally:
+        buffer.close()
+
+        if unlink:
+            buffer.unlink()
+
+    return value
@@ -0,0 +1,259 @@
+"""Optional support for tool parameters typed with Pydantic models.
+
+Pydantic is not a dependency of this package and is never imported by it. Until
+the application imports Pydantic no annotation is treated as a model and
+arguments are passed through unchanged.
+"""
+
+from __future__ import annotations
+
+import copy
+import functools
+import inspect
+import sys
+import weakref
+from typing import TYPE_CHECKING, Any, get_args, get_origin, get_type_hints
+
+from openai_function_calling.helper_functions import UNION_TYPES
+from openai_function_calling.instrumentation import increment
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable, Mapping
+
+_DEFINITIONS_PREFIX: str = "#/$defs/"
+_SUBSCHEMA_KEYS: tuple[str, ...] = ("items", "additionalProperties")
+_SUBSCHEMA_LIST_KEYS: tuple[str, ...] = ("anyOf", "allOf", "oneOf")
+# Keywords that strict mode rejects. Defaults are applied by model validation.
+_LEFT_OUT_KEYS: frozenset[str] = frozenset({"title", "$defs", "default"})
+_OBJECT_SCHEMA_KEYS: tuple[str, ...] = (
+    "properties",
+    "required",
+    "additionalProperties",
+)
+_MODEL_SCHEMAS: weakref.WeakKeyDictionary[type, dict[str, Any]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def is_model(annotation: Any) -> bool:
+    """Check if an annotation is a Pydantic model class.
+
+    Args:
+        annotation: The annotation of a parameter.
+
+    Returns:
+        If Pydantic is imported and the annotation is a subclass of BaseModel.
+
+    """
+    pydantic: Any = sys.modules.get("pydantic")
+
+    return (
+        pydantic is not None
+        and isinstance(annotation, type)
+        and issubclass(annotation, pydantic.BaseModel)
+    )
+
+
+def model_object_schema(model: type) -> dict[str, Any]:
+    """Get the object schema of a Pydantic model, generated once per class.
+
+    The schema of model_json_schema is reduced to the 'properties', 'required'
+    and 'additionalProperties' of the model. References to nested models are
+    inlined and titles are left out, since a parameter schema cannot hold
+    definitions and titles only add tokens. Defaults are left out and tuple
+    'prefixItems' become 'items' that allow any of the item schemas, since
+    strict mode rejects both keywords.
+
+    Args:
+        model: The Pydantic model class.
+
+    Raises:
+        ValueError: If the model references itself.
+
+    Returns:
+        A copy of the object schema.
+
+    """
+    schema: dict[str, Any] | None = _MODEL_SCHEMAS.get(model)
+
+    if schema is None:
+        increment("model_schema_cache.miss")
+        json_schema: dict[str, Any] = model.model_json_schema()  # type: ignore[attr-defined]
+        inlined: dict[str, Any] = _inline(json_schema, json_schema.get("$defs", {}), ())
+        schema = _MODEL_SCHEMAS.setdefault(
+            model,
+            {key: inlined[key] for key in _OBJECT_SCHEMA_KEYS if key in inlined},
+        )
+    else:
+        increment("model_schema_cache.hit")
+
+    return copy.deepcopy(schema)
+
+
+def model_parameters(function_reference: Callable) -> dict[str, type]:
+    """Get the parameters of a callable that are typed with Pydantic models.
+
+    Args:
+        function_reference: The callable, a partial or a wrapper of a function.
+
+    Returns:
+        The model classes by parameter name, including parameters typed with\
+            an Optional model, empty if there are none or the type hints cannot\
+            be resolved.
+
+    """
+    if "pydantic" not in sys.modules:
+        return {}
+
+    while isinstance(function_reference, functools.partial):
+        function_reference = function_reference.func
+
+    try:
+        hints: dict[str, Any] = get_type_hints(inspect.unwrap(function_reference))
+    except (NameError, TypeError):
+        return {}
+
+    models: dict[str, type] = {}
+
+    for name, hint in hints.items():
+        model: type | None = _annotation_model(hint)
+
+        if name != "return" and model is not None:
+            models[name] = model
+
+    return models
+
+
+def validate_model_arguments(
+    arguments: Mapping[str, Any], models: Mapping[str, type]
+) -> dict[str, Any]:
+    """Validate decoded arguments of model typed parameters into model instances.
+
+    Args:
+        arguments: The decoded keyword arguments of a tool call.
+        models: The model classes by parameter name, e.g. from model_parameters.
+
+    Raises:
+        ValueError: If an argument does not validate against its model.
+
+    Returns:
+        A copy of the arguments with model instances for model typed parameters.
+
+    """
+    validated: dict[str, Any] = dict(arguments)
+
+    for name, model in models.items():
+        value: Any = validated.get(name)
+
+        if value is None or isinstance(value, model):
+            continue
+
+        try:
+            validated[name] = model.model_validate(value)  # type: ignore[attr-defined]
+        except ValueError as error:  # Pydantic's ValidationError is a ValueError.
+            raise ValueError(f"Invalid argument '{name}': {error}") from error
+
+    return validated
+
+
+def _annotation_model(annotation: Any) -> type | None:
+    """Get the model of an annotation that is a model or a union of one model.
+
+    Args:
+        annotation: The type annotation of a parameter.
+
+    Returns:
+        The model class, e.g. of Optional[Model], or None if there is none or\
+            the union has other members than the model and None.
+
+    """
+    if is_model(annotation):
+        return annotation
+
+    if get_origin(annotation) not in UNION_TYPES:
+        return None
+
+    members: list[Any] = [
+        member for member in get_args(annotation) if member is not type(None)
+    ]
+
+    return members[0] if len(members) == 1 and is_model(members[0]) else None
+
+
+def _inline(
+    schema: Mapping[str, Any],
+    definitions: Mapping[str, Any],
+    expanding: tuple[str, ...],
+) -> dict[str, Any]:
+    """Copy a schema with references inlined and unsupported keywords left out.
+
+    Args:
+        schema: The schema to copy.
+        definitions: The '$defs' of the model schema.
+        expanding: The names of the definitions being inlined, to stop cycles.
+
+    Raises:
+        ValueError: If a definition references itself.
+
+    Returns:
+        The copied schema.
+
+    """
+    inlined: dict[str, Any] = {}
+    reference: str = schema.get("$ref", "")
+
+    # Keys next to a reference, e.g. a field description, override the target.
+    if reference.startswith(_DEFINITIONS_PREFIX):
+        name: str = reference[len(_DEFINITIONS_PREFIX) :]
+
+        if name in expanding:
+            raise ValueError(
+                f"Expected a model without recursive references, got '{name}'."
+            )
+
+        inlined = _inline(definitions[name], definitions, (*expanding, name))
+
+    for key, value in schema.items():
+        if key == "$ref" and reference.startswith(_DEFINITIONS_PREFIX):
+            continue
+
+        if key == "properties":
+            inlined[key] = {
+                property_name: _inline(subschema, definitions, expanding)
+                for property_name, subschema in value.items()
+            }
+        elif key in _SUBSCHEMA_KEYS and isinstance(value, dict):
+            inlined[key] = _inline(value, definitions, expanding)
+        elif key in _SUBSCHEMA_LIST_KEYS:
+            inlined[key] = [
+                _inline(subschema, definitions, expanding) for subschema in value
+            ]
+        elif key == "prefixItems":
+            if value and "items" not in schema:
+                inlined["items"] = _items_of_prefix(
+                    [_inline(subschema, definitions, expanding) for subschema in value]
+                )
+        elif key not in _LEFT_OUT_KEYS:
+            inlined[key] = value
+
+    return inlined
+
+
+def _items_of_prefix(prefix_items: list[dict[str, Any]]) -> dict[str, Any]:
+    """Merge the item schemas of a tuple into one schema for all items.
+
+    Args:
+        prefix_items: The inlined schemas of the tuple positions.
+
+    Returns:
+        The item schema if all positions have the same one, otherwise an\
+            'anyOf' of the distinct item schemas.
+
+    """
+    distinct: list[dict[str, Any]] = []
+
+    for item in prefix_items:
+        if item not in distinct:
+            distinct.append(item)
+
+    return distinct[0] if len(distinct) == 1 else {"anyOf": distinct}
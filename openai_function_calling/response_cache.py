@@ -0,0 +1,556 @@
+"""Cache chat completions of deterministic requests over the same tools."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Protocol
+
+from openai_function_calling.helper_functions import ChatNamespace
+from openai_function_calling.instrumentation import increment, span
+from openai_function_calling.tool_helpers import ToolHelpers
+
+if TYPE_CHECKING:  # pragma: no cover
+    import os
+    from collections.abc import Mapping
+
+_TRANSPORT_OPTIONS: frozenset[str] = frozenset(
+    {"stream", "timeout", "extra_headers", "extra_query", "extra_body"}
+)
+"""Request options that do not change the completion, left out of cache keys."""
+
+_DICT_FORMAT: str = "dict"
+_CHAT_COMPLETION_FORMAT: str = "chat_completion"
+
+
+class CacheEntry(NamedTuple):
+    """A cached response serialized as JSON with the time it was stored."""
+
+    value: str
+    created_at: float
+
+
+class CacheStorage(Protocol):
+    """The storage of a response cache. Implementations must be thread safe."""
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Get the entry stored under a key, or None if there is none."""
+        ...  # pragma: no cover
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry under a key, replacing any previous entry."""
+        ...  # pragma: no cover
+
+    def delete(self, key: str) -> None:
+        """Remove the entry stored under a key if there is one."""
+        ...  # pragma: no cover
+
+
+class MemoryCacheStorage:
+    """An in-memory storage evicting the least recently used entries."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        """Create an empty storage.
+
+        Args:
+            max_entries: The number of entries kept before evicting.
+
+        """
+        self.max_entries: int = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of stored entries."""
+        return len(self._entries)
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Get the entry stored under a key, marking it as recently used.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The entry, or None if there is none.
+
+        """
+        with self._lock:
+            entry: CacheEntry | None = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the least recently used entry when full.
+
+        Args:
+            key: The cache key.
+            entry: The entry to store.
+
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove the entry stored under a key if there is one.
+
+        Args:
+            key: The cache key.
+
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SqliteCacheStorage:
+    """An on-disk storage in a SQLite database, shared between processes."""
+
+    def __init__(
+        self, path: str | os.PathLike[str], *, max_entries: int | None = None
+    ) -> None:
+        """Open or create the database.
+
+        Args:
+            path: The database file path, or ":memory:".
+            max_entries: The number of entries kept before the oldest are\
+                evicted. Unlimited if not set.
+
+        """
+        self.max_entries: int | None = max_entries
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def __len__(self) -> int:
+        """Get the number of stored entries."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()[0]
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Get the entry stored under a key.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The entry, or None if there is none.
+
+        """
+        with self._lock:
+            row: tuple[str, float] | None = self._connection.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+        return None if row is None else CacheEntry(*row)
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the oldest entries when full.
+
+        Args:
+            key: The cache key.
+            entry: The entry to store.
+
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, entry.value, entry.created_at),
+            )
+
+            if self.max_entries is not None:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE key NOT IN "
+                    "(SELECT key FROM responses ORDER BY created_at DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+
+    def delete(self, key: str) -> None:
+        """Remove the entry stored under a key if there is one.
+
+        Args:
+            key: The cache key.
+
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+class CacheLookup(str, Enum):
+    """The outcomes of looking up a request in a response cache."""
+
+    HIT = "hit"
+    """A fresh response was returned."""
+    STALE_HIT = "stale_hit"
+    """An expired response was returned while it is refreshed."""
+    MISS = "miss"
+    """No usable response was cached, so the request was sent."""
+    BYPASS = "bypass"
+    """The request is not cacheable, e.g. streaming or not deterministic."""
+
+
+class ResponseCacheStats(NamedTuple):
+    """Counts of response cache lookups by outcome."""
+
+    hits: int
+    stale_hits: int
+    misses: int
+    bypassed: int
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of cacheable requests answered from the cache."""
+        lookups: int = self.hits + self.stale_hits + self.misses
+
+        return (self.hits + self.stale_hits) / lookups if lookups else 0.0
+
+
+def cache_key(request: Mapping[str, Any]) -> str:
+    """Get the cache key of a chat completion request.
+
+    The key covers the model, messages, tool choice and every other option that
+    changes the completion, with the tools reduced to their fingerprint.
+
+    Args:
+        request: The keyword arguments of chat.completions.create.
+
+    Returns:
+        The SHA-256 hex digest of the request as canonical JSON.
+
+    """
+    canonical_request: dict[str, Any] = {
+        name: value
+        for name, value in request.items()
+        if name not in _TRANSPORT_OPTIONS and name != "tools"
+    }
+
+    if request.get("tools"):
+        canonical_request["tools"] = ToolHelpers.fingerprint(request["tools"])
+
+    canonical_json: str = json.dumps(
+        canonical_request, sort_keys=True, separators=(",", ":"), default=_to_json
+    )
+
+    return hashlib.sha256(canonical_json.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Store chat completions by request, with a TTL and stale while revalidate.
+
+    Only requests that are not streamed are cached. By default the request
+    must also be deterministic, with a temperature of 0 and a single choice.
+    """
+
+    def __init__(
+        self,
+        storage: CacheStorage | None = None,
+        *,
+        ttl_seconds: float = 3600.0,
+        stale_while_revalidate_seconds: float = 0.0,
+        deterministic_only: bool = True,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Create a new response cache.
+
+        Args:
+            storage: Where responses are stored. Defaults to an in-memory LRU.
+            ttl_seconds: How long a response is fresh.
+            stale_while_revalidate_seconds: How long after expiring a response is\
+                still returned while a new one is requested in the background.
+            deterministic_only: If only requests with a temperature of 0 and a\
+                single choice are cached.
+            clock: The wall clock used to age entries, in seconds.
+
+        """
+        self.storage: CacheStorage = (
+            storage if storage is not None else MemoryCacheStorage()
+        )
+        self.ttl_seconds: float = ttl_seconds
+        self.stale_while_revalidate_seconds: float = stale_while_revalidate_seconds
+        self.deterministic_only: bool = deterministic_only
+        self.clock: Callable[[], float] = clock
+        self._counts: dict[CacheLookup, int] = dict.fromkeys(CacheLookup, 0)
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> ResponseCacheStats:
+        """The counts of lookups by outcome so far."""
+        return ResponseCacheStats(
+            self._counts[CacheLookup.HIT],
+            self._counts[CacheLookup.STALE_HIT],
+            self._counts[CacheLookup.MISS],
+            self._counts[CacheLookup.BYPASS],
+        )
+
+    def is_cacheable(self, request: Mapping[str, Any]) -> bool:
+        """Check if the response of a request may be cached.
+
+        Args:
+            request: The keyword arguments of chat.completions.create.
+
+        Returns:
+            If the request is not streamed and, when required, deterministic.
+
+        """
+        if request.get("stream"):
+            return False
+
+        return not self.deterministic_only or (
+            request.get("temperature") == 0 and request.get("n") in (None, 1)
+        )
+
+    def lookup(self, key: str) -> tuple[CacheLookup, Any]:
+        """Look up the cached response of a request.
+
+        Args:
+            key: The cache key of the request.
+
+        Returns:
+            HIT or STALE_HIT with the response, or MISS with None.
+
+        """
+        entry: CacheEntry | None = self.storage.get(key)
+        outcome: CacheLookup = CacheLookup.MISS
+
+        if entry is not None:
+            age: float = self.clock() - entry.created_at
+
+            if age < self.ttl_seconds:
+                outcome = CacheLookup.HIT
+            elif age < self.ttl_seconds + self.stale_while_revalidate_seconds:
+                outcome = CacheLookup.STALE_HIT
+
+        self.record(outcome)
+
+        if outcome is CacheLookup.MISS:
+            return outcome, None
+
+        return outcome, _deserialize_response(entry.value)  # type: ignore[union-attr]
+
+    def store(self, key: str, response: Any) -> None:
+        """Store the response of a request.
+
+        Args:
+            key: The cache key of the request.
+            response: The response dict or ChatCompletion object.
+
+        """
+        self.storage.set(key, CacheEntry(_serialize_response(response), self.clock()))
+
+    def record(self, outcome: CacheLookup) -> None:
+        """Count a lookup outcome.
+
+        Args:
+            outcome: The outcome.
+
+        """
+        increment(f"response_cache.{outcome.value}")
+
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def start_refresh(self, key: str) -> bool:
+        """Claim the refresh of a stale response, so it is only requested once.
+
+        Args:
+            key: The cache key of the request.
+
+        Returns:
+            If the caller should refresh the response and call finish_refresh.
+
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+
+            self._refreshing.add(key)
+
+        return True
+
+    def finish_refresh(self, key: str) -> None:
+        """Release the claim on the refresh of a response.
+
+        Args:
+            key: The cache key of the request.
+
+        """
+        with self._lock:
+            self._refreshing.discard(key)
+
+
+class CachedChatClient:
+    """Wrap a chat completions client to answer repeated requests from a cache.
+
+    The wrapper mirrors client.chat.completions.create, so it can replace the
+    client in a ToolLoop.
+    """
+
+    def __init__(self, client: Any, cache: ResponseCache | None = None) -> None:
+        """Create a new cached client.
+
+        Args:
+            client: A client with a chat.completions.create method, such as the\
+                OpenAI client.
+            cache: The response cache. Defaults to an in-memory cache.
+
+        """
+        self.client: Any = client
+        self.cache: ResponseCache = cache if cache is not None else ResponseCache()
+        self.chat = ChatNamespace(self.create)
+
+    def create(self, **kwargs: Any) -> Any:
+        """Create a chat completion, or return the cached one.
+
+        Args:
+            kwargs: The request parameters.
+
+        Returns:
+            The response of the wrapped client.
+
+        """
+        if not self.cache.is_cacheable(kwargs):
+            self.cache.record(CacheLookup.BYPASS)
+            return self.client.chat.completions.create(**kwargs)
+
+        with span("CachedChatClient.create") as current_span:
+            key: str = cache_key(kwargs)
+            outcome, response = self.cache.lookup(key)
+            current_span.set_attribute("outcome", outcome.value)
+
+            if outcome is CacheLookup.STALE_HIT and self.cache.start_refresh(key):
+                # The caller may extend its messages in place once this returns,
+                # so the refresh requests a copy of the request as it is now.
+                threading.Thread(
+                    target=self._refresh, args=(key, copy.deepcopy(kwargs)), daemon=True
+                ).start()
+
+            if outcome is CacheLookup.MISS:
+                response = self.client.chat.completions.create(**kwargs)
+                self.cache.store(key, response)
+
+        return response
+
+    def _refresh(self, key: str, kwargs: dict[str, Any]) -> None:
+        try:
+            self.cache.store(key, self.client.chat.completions.create(**kwargs))
+        except Exception:  # noqa: BLE001
+            increment("response_cache.refresh_failed")
+        finally:
+            self.cache.finish_refresh(key)
+
+
+class AsyncCachedChatClient:
+    """Wrap an async chat completions client to answer repeated requests from a cache.
+
+    The wrapper mirrors client.chat.completions.create, so it can replace the
+    client in a ToolLoop.
+    """
+
+    def __init__(self, client: Any, cache: ResponseCache | None = None) -> None:
+        """Create a new cached client.
+
+        Args:
+            client: A client with an async chat.completions.create method, such\
+                as the AsyncOpenAI client.
+            cache: The response cache. Defaults to an in-memory cache.
+
+        """
+        self.client: Any = client
+        self.cache: ResponseCache = cache if cache is not None else ResponseCache()
+        self.chat = ChatNamespace(self.create)
+        self._refresh_tasks: set[asyncio.Task[None]] = set()
+
+    async def create(self, **kwargs: Any) -> Any:
+        """Create a chat completion, or return the cached one.
+
+        Args:
+            kwargs: The request parameters.
+
+        Returns:
+            The response of the wrapped client.
+
+        """
+        if not self.cache.is_cacheable(kwargs):
+            self.cache.record(CacheLookup.BYPASS)
+            return await self.client.chat.completions.create(**kwargs)
+
+        with span("AsyncCachedChatClient.create") as current_span:
+            key: str = cache_key(kwargs)
+            outcome, response = self.cache.lookup(key)
+            current_span.set_attribute("outcome", outcome.value)
+
+            if outcome is CacheLookup.STALE_HIT and self.cache.start_refresh(key):
+                task: asyncio.Task[None] = asyncio.ensure_future(
+                    self._refresh(key, copy.deepcopy(kwargs))
+                )
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+
+            if outcome is CacheLookup.MISS:
+                response = await self.client.chat.completions.create(**kwargs)
+                self.cache.store(key, response)
+
+        return response
+
+    async def _refresh(self, key: str, kwargs: dict[str, Any]) -> None:
+        try:
+            self.cache.store(key, await self.client.chat.completions.create(**kwargs))
+        except Exception:  # noqa: BLE001
+            increment("response_cache.refresh_failed")
+        finally:
+            self.cache.finish_refresh(key)
+
+
+def _to_json(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+
+    return str(value)
+
+
+def _serialize_response(response: Any) -> str:
+    if isinstance(response, dict):
+        return json.dumps({"format": _DICT_FORMAT, "response": response})
+
+    return json.dumps(
+        {
+            "format": _CHAT_COMPLETION_FORMAT,
+            "response": response.model_dump(mode="json"),
+        }
+    )
+
+
+def _deserialize_response(value: str) -> Any:
+    stored: dict[str, Any] = json.loads(value)
+
+    if stored["format"] == _DICT_FORMAT:
+        return stored["response"]
+
+    from openai.types.chat import ChatCompletion
+
+    return ChatCompletion.model_validate(stored["response"])
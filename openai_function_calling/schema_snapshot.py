@@ -0,0 +1,272 @@
+"""Fingerprint tool schemas and diff them across deployments.
+
+A snapshot keeps the content hash of each tool and of each of its parameters,
+not the schemas themselves, so it is small enough to store with a deployment.
+The tools are grouped into a fixed two level Merkle tree by the hash of their
+name. Comparing two snapshots only descends into the groups whose hashes
+differ, so the cost of a diff grows with the number of changed tools instead
+of the size of the catalog.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from openai_function_calling.helper_functions import json_digest
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable, Mapping
+
+    from openai_function_calling.function import Function
+
+_SNAPSHOT_VERSION: int = 1
+_EMPTY_HASH: str = json_digest([])
+_HEX_DIGITS: str = "0123456789abcdef"
+
+
+class ToolHashes(NamedTuple):
+    """The content hashes of a tool and of its parameters."""
+
+    content_hash: str
+    parameters: dict[str, str]
+
+
+class ToolChange(NamedTuple):
+    """How the schema of a tool changed between two snapshots.
+
+    If no parameter was added, removed or changed, the description, the
+    required parameters, the strict flag or the parameter order changed.
+    """
+
+    name: str
+    added_parameters: list[str]
+    removed_parameters: list[str]
+    changed_parameters: list[str]
+
+
+class SchemaDiff(NamedTuple):
+    """The tools added, removed and changed between two snapshots, by name."""
+
+    added: list[str]
+    removed: list[str]
+    changed: list[ToolChange]
+
+    @property
+    def is_empty(self) -> bool:
+        """If the snapshots have the same tools with the same schemas."""
+        return not (self.added or self.removed or self.changed)
+
+
+class SchemaSnapshot:
+    """The content hashes of a set of tools with a Merkle fingerprint."""
+
+    def __init__(self, tools: Mapping[str, ToolHashes]) -> None:
+        """Create a new snapshot. Use from_functions or from_dict to build one.
+
+        Args:
+            tools: The hashes of the tools by tool name.
+
+        """
+        self._tools: dict[str, ToolHashes] = dict(tools)
+        self._buckets: dict[str, dict[str, str]] = {}
+
+        for name, hashes in self._tools.items():
+            self._buckets.setdefault(_bucket(name), {})[name] = hashes.content_hash
+
+        self._bucket_hashes: dict[str, str] = {
+            bucket: json_digest(sorted(entries.items()))
+            for bucket, entries in self._buckets.items()
+        }
+        group_entries: dict[str, list[tuple[str, str]]] = {}
+
+        for bucket, bucket_hash in sorted(self._bucket_hashes.items()):
+            group_entries.setdefault(bucket[0], []).append((bucket, bucket_hash))
+
+        self._group_hashes: dict[str, str] = {
+            group: json_digest(entries) for group, entries in group_entries.items()
+        }
+        self._fingerprint: str = (
+            json_digest(sorted(self._group_hashes.items()))
+            if self._tools
+            else _EMPTY_HASH
+        )
+
+    @classmethod
+    def from_functions(cls, functions: Iterable[Function]) -> SchemaSnapshot:
+        """Take a snapshot of function definitions.
+
+        Args:
+            functions: The function definitions of the tools.
+
+        Raises:
+            ValueError: If two functions have the same name.
+
+        Returns:
+            The snapshot.
+
+        """
+        tools: dict[str, ToolHashes] = {}
+
+        for function in functions:
+            if function.name in tools:
+                raise ValueError(f"Duplicate tool '{function.name}'.")
+
+            tools[function.name] = ToolHashes(
+                function.content_hash,
+                {p.name: p.content_hash for p in function.parameters},
+            )
+
+        return cls(tools)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> SchemaSnapshot:
+        """Load a snapshot stored with to_dict, e.g. by an earlier deployment.
+
+        Args:
+            data: The stored snapshot.
+
+        Raises:
+            ValueError: If the snapshot was stored in an unsupported version.
+
+        Returns:
+            The snapshot.
+
+        """
+        if data.get("version") != _SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Expected a snapshot of version {_SNAPSHOT_VERSION},"
+                f" got {data.get('version')!r}."
+            )
+
+        return cls(
+            {
+                name: ToolHashes(tool["hash"], dict(tool["parameters"]))
+                for name, tool in data["tools"].items()
+            }
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the snapshot to a JSON serializable dict.
+
+        Returns:
+            The version, fingerprint and hashes of the snapshot.
+
+        """
+        return {
+            "version": _SNAPSHOT_VERSION,
+            "fingerprint": self._fingerprint,
+            "tools": {
+                name: {"hash": hashes.content_hash, "parameters": hashes.parameters}
+                for name, hashes in self._tools.items()
+            },
+        }
+
+    @property
+    def fingerprint(self) -> str:
+        """The root hash of the snapshot, independent of the tool order."""
+        return self._fingerprint
+
+    @property
+    def names(self) -> list[str]:
+        """The tool names."""
+        return list(self._tools)
+
+    def __len__(self) -> int:
+        """Get the number of tools in the snapshot."""
+        return len(self._tools)
+
+    def __eq__(self, other: object) -> bool:
+        """Check if another snapshot has the same fingerprint."""
+        if not isinstance(other, SchemaSnapshot):
+            return False
+
+        return self._fingerprint == other._fingerprint
+
+    def __hash__(self) -> int:
+        """Get a hash of the fingerprint."""
+        return hash(self._fingerprint)
+
+    def tool_hashes(self, name: str) -> ToolHashes:
+        """Get the hashes of a tool.
+
+        Args:
+            name: The tool name.
+
+        Raises:
+            ValueError: If the tool is not in the snapshot.
+
+        Returns:
+            The content hash of the tool and the hashes of its parameters.
+
+        """
+        try:
+            return self._tools[name]
+        except KeyError:
+            raise ValueError(f"Unknown tool '{name}'.") from None
+
+    def diff(self, other: SchemaSnapshot) -> SchemaDiff:
+        """Get the changes from this snapshot to a newer one.
+
+        Args:
+            other: The newer snapshot.
+
+        Returns:
+            The added, removed and changed tools, each sorted by name.
+
+        """
+        added: list[str] = []
+        removed: list[str] = []
+        changed: list[ToolChange] = []
+
+        if self._fingerprint == other._fingerprint:
+            return SchemaDiff(added, removed, changed)
+
+        for group in sorted(self._group_hashes.keys() | other._group_hashes.keys()):
+            if self._group_hashes.get(group) == other._group_hashes.get(group):
+                continue
+
+            for bucket in (group + digit for digit in _HEX_DIGITS):
+                if self._bucket_hashes.get(bucket) == other._bucket_hashes.get(bucket):
+                    continue
+
+                old: dict[str, str] = self._buckets.get(bucket, {})
+                new: dict[str, str] = other._buckets.get(bucket, {})
+                added.extend(new.keys() - old.keys())
+                removed.extend(old.keys() - new.keys())
+                changed.extend(
+                    self._tool_change(name, other)
+                    for name in old.keys() & new.keys()
+                    if old[name] != new[name]
+                )
+
+        return SchemaDiff(
+            sorted(added), sorted(removed), sorted(changed, key=lambda c: c.name)
+        )
+
+    def _tool_change(self, name: str, other: SchemaSnapshot) -> ToolChange:
+        old: dict[str, str] = self._tools[name].parameters
+        new: dict[str, str] = other._tools[name].parameters
+
+        return ToolChange(
+            name,
+            added_parameters=sorted(new.keys() - old.keys()),
+            removed_parameters=sorted(old.keys() - new.keys()),
+            changed_parameters=sorted(
+                p for p in old.keys() & new.keys() if old[p] != new[p]
+            ),
+        )
+
+
+def _bucket(name: str) -> str:
+    """Get the leaf of the Merkle tree a tool belongs to.
+
+    Args:
+        name: The tool name.
+
+    Returns:
+        The first two hex digits of the SHA-256 digest of the name. The first\
+            digit selects one of 16 groups, both one of 256 buckets.
+
+    """
+    return hashlib.sha256(name.encode()).hexdigest()[:2]
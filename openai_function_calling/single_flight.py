@@ -0,0 +1,189 @@
+"""Run identical tool calls once and share the result with every caller."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
+
+from openai_function_calling.instrumentation import increment
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Awaitable, Hashable, Mapping
+
+
+class _AbandonedCallError(Exception):
+    """Raised to waiting callers when the running call was cancelled."""
+
+
+class SingleFlightStats(NamedTuple):
+    """Counts of tool calls run and deduplicated by a single flight."""
+
+    executed: int
+    """Calls that ran."""
+    within_response: int
+    """Calls that repeated another call of the same response."""
+    in_flight: int
+    """Calls that waited for an identical call already running."""
+
+
+def call_key(name: str, arguments: Mapping[str, Any]) -> str:
+    """Get the key identifying a tool call by its name and arguments.
+
+    Args:
+        name: The tool name.
+        arguments: The decoded arguments.
+
+    Returns:
+        The name with the arguments as canonical JSON, with sorted keys.
+
+    """
+    return name + json.dumps(
+        arguments, sort_keys=True, separators=(",", ":"), default=str
+    )
+
+
+class SingleFlight:
+    """Share the result of a running call with identical calls made meanwhile.
+
+    Calls are matched by key and may come from threads and event loops alike.
+    The first call runs and every identical call made before it finishes
+    waits for its result or error instead of running again. If the running
+    call is cancelled or interrupted instead, the waiting calls run it again
+    themselves, so one caller's cancellation does not reach the others.
+    """
+
+    def __init__(self) -> None:
+        """Create a new single flight without running calls."""
+        self._calls: dict[Hashable, Future[Any]] = {}
+        self._lock = threading.Lock()
+        self._executed: int = 0
+        self._within_response: int = 0
+        self._in_flight: int = 0
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        """The counts of calls run and deduplicated so far."""
+        return SingleFlightStats(self._executed, self._within_response, self._in_flight)
+
+    def run(self, key: Hashable, function: Callable[..., Any], *args: Any) -> Any:
+        """Run a call, or wait for the identical call already running.
+
+        Args:
+            key: The key identifying the call, e.g. from call_key.
+            function: The function to run.
+            args: The positional arguments of the function.
+
+        Returns:
+            The value returned by the call, shared with every waiting caller.
+
+        """
+        while True:
+            future, leader = self._join(key)
+
+            if leader:
+                break
+
+            try:
+                return future.result()
+            except _AbandonedCallError:
+                continue
+
+        try:
+            result: Any = function(*args)
+        except Exception as error:
+            self._finish(key, future, error=error)
+            raise
+        except BaseException:
+            self._finish(key, future, error=_AbandonedCallError())
+            raise
+
+        self._finish(key, future, result=result)
+        return result
+
+    async def arun(
+        self, key: Hashable, function: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        """Run a call from an event loop, or wait for the identical running call.
+
+        Args:
+            key: The key identifying the call, e.g. from call_key.
+            function: The coroutine function to run.
+            args: The positional arguments of the function.
+
+        Returns:
+            The value returned by the call, shared with every waiting caller.
+
+        """
+        while True:
+            future, leader = self._join(key)
+
+            if leader:
+                break
+
+            try:
+                # Shielded, so cancelling this caller does not cancel the shared
+                # future of the others.
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _AbandonedCallError:
+                continue
+
+        try:
+            result: Any = await function(*args)
+        except Exception as error:
+            self._finish(key, future, error=error)
+            raise
+        except BaseException:
+            self._finish(key, future, error=_AbandonedCallError())
+            raise
+
+        self._finish(key, future, result=result)
+        return result
+
+    def record_within_response(self, count: int) -> None:
+        """Count calls left out because they repeat a call of the same response.
+
+        Args:
+            count: The number of repeated calls.
+
+        """
+        if count:
+            increment("single_flight.deduplicated", count, scope="within_response")
+
+            with self._lock:
+                self._within_response += count
+
+    def _join(self, key: Hashable) -> tuple[Future[Any], bool]:
+        with self._lock:
+            future: Future[Any] | None = self._calls.get(key)
+
+            if future is not None:
+                self._in_flight += 1
+                leader: bool = False
+            else:
+                future = self._calls[key] = Future()
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            increment("single_flight.deduplicated", scope="in_flight")
+
+        return future, leader
+
+    def _finish(
+        self,
+        key: Hashable,
+        future: Future[Any],
+        *,
+        result: Any = None,
+        error: Exception | None = None,
+    ) -> None:
+        with self._lock:
+            del self._calls[key]
+
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
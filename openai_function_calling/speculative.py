@@ -0,0 +1,289 @@
+"""Start idempotent tools while the model is still streaming their arguments."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from openai_function_calling.instrumentation import increment, span
+from openai_function_calling.tool_executor import (
+    ToolCallResult,
+    ToolExecutor,
+    serialize_tool_error,
+    serialize_tool_result,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+_VALUE_END_CHARACTERS: frozenset[str] = frozenset('"]}el')
+
+
+def parse_complete_arguments(partial_arguments: str) -> dict[str, Any] | None:
+    """Parse the members of a partially streamed JSON object that are complete.
+
+    Members followed by a comma are complete. The last member is only used when
+    its value can be known to be complete, i.e. it is not a number.
+
+    Args:
+        partial_arguments: The JSON object text streamed so far.
+
+    Returns:
+        The complete members, or None if none could be parsed.
+
+    """
+    depth: int = 0
+    in_string: bool = False
+    escaped: bool = False
+    last_member_end: int | None = None
+
+    for index, character in enumerate(partial_arguments):
+        if in_string:
+            in_string = escaped or character != '"'
+            escaped = not escaped and character == "\\"
+        elif character == '"':
+            in_string = True
+        elif character in "[{":
+            depth += 1
+        elif character in "]}":
+            depth -= 1
+
+            if depth == 0:
+                return _loads_object(partial_arguments[: index + 1])
+        elif character == "," and depth == 1:
+            last_member_end = index
+
+    if depth == 1 and not in_string:
+        arguments: dict[str, Any] | None = _loads_open_object(partial_arguments)
+
+        if arguments is not None:
+            return arguments
+
+    if last_member_end is None:
+        return None
+
+    return _loads_object(partial_arguments[:last_member_end] + "}")
+
+
+def _loads_open_object(partial_arguments: str) -> dict[str, Any] | None:
+    stripped: str = partial_arguments.rstrip()
+
+    if not stripped or stripped[-1] not in _VALUE_END_CHARACTERS:
+        return None
+
+    return _loads_object(stripped + "}")
+
+
+def _loads_object(text: str) -> dict[str, Any] | None:
+    try:
+        value: Any = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+    return value if isinstance(value, dict) else None
+
+
+class SpeculationStats(NamedTuple):
+    """Counts of speculative tool executions."""
+
+    started: int
+    hits: int
+    misses: int
+
+
+class _StreamedToolCall:
+    def __init__(self) -> None:
+        self.id: str = ""
+        self.name: str = ""
+        self.arguments: str = ""
+        self.speculative_arguments: dict[str, Any] | None = None
+        self.future: Future[Any] | None = None
+
+
+class SpeculativeToolRunner:
+    """Run tool calls from a chat completion stream, starting early when safe.
+
+    Once the streamed arguments of an idempotent tool contain every required
+    parameter, the tool starts with those arguments. When the stream ends the
+    speculative arguments are compared to the final arguments. Matching runs are
+    used as is; otherwise the speculative run is cancelled, or discarded if it
+    already started, and the tool runs again with the final arguments.
+    Non-idempotent tools only run after the stream ends.
+    """
+
+    def __init__(
+        self,
+        executor: ToolExecutor,
+        *,
+        thread_pool: ThreadPoolExecutor | None = None,
+    ) -> None:
+        """Create a new speculative runner for a single stream.
+
+        Args:
+            executor: The executor with the registered tools.
+            thread_pool: The thread pool to run speculative calls in. Defaults to\
+                the thread pool of the executor.
+
+        """
+        self.executor: ToolExecutor = executor
+        self.thread_pool: ThreadPoolExecutor = thread_pool or executor.thread_pool
+        self._tool_calls: dict[int, _StreamedToolCall] = {}
+        self._started: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+
+    @property
+    def stats(self) -> SpeculationStats:
+        """Counts of speculative executions started, reused and repeated."""
+        return SpeculationStats(self._started, self._hits, self._misses)
+
+    @property
+    def tool_calls(self) -> list[dict[str, Any]]:
+        """The tool calls streamed so far, in the assistant message format."""
+        return [
+            {
+                "id": tool_call.id,
+                "type": "function",
+                "function": {"name": tool_call.name, "arguments": tool_call.arguments},
+            }
+            for _, tool_call in sorted(self._tool_calls.items())
+        ]
+
+    def feed(self, chunk: Any) -> None:
+        """Process a streamed chat completion chunk.
+
+        Args:
+            chunk: A chunk dict or an OpenAI chat completion chunk object.
+
+        """
+        for choice in _get(chunk, "choices") or []:
+            delta: Any = _get(choice, "delta")
+
+            for tool_call_delta in (_get(delta, "tool_calls") if delta else None) or []:
+                self._feed_tool_call_delta(tool_call_delta)
+
+    def finish(self) -> list[ToolCallResult]:
+        """Complete every streamed tool call once the stream has ended.
+
+        Returns:
+            The tool call results in the order of the tool calls.
+
+        """
+        with span("SpeculativeToolRunner.finish") as current_span:
+            tool_calls: list[_StreamedToolCall] = [
+                tool_call for _, tool_call in sorted(self._tool_calls.items())
+            ]
+            results: list[ToolCallResult | None] = [None] * len(tool_calls)
+            repeated: list[int] = []
+
+            for position, tool_call in enumerate(tool_calls):
+                if tool_call.future is None:
+                    repeated.append(position)
+                elif self._speculation_matches(tool_call):
+                    results[position] = self._future_result(tool_call)
+                else:
+                    repeated.append(position)
+
+            repeated_results: list[ToolCallResult] = self.executor.execute_tool_calls(
+                self.tool_calls[position] for position in repeated
+            )
+
+            for position, result in zip(repeated, repeated_results):
+                results[position] = result
+
+            current_span.set_attribute("speculation_hits", self._hits)
+            current_span.set_attribute("speculation_misses", self._misses)
+
+        return results  # type: ignore[return-value]
+
+    def run_stream(self, stream: Iterable[Any]) -> list[ToolCallResult]:
+        """Feed every chunk of a stream and complete its tool calls.
+
+        Args:
+            stream: The chat completion chunks.
+
+        Returns:
+            The tool call results in the order of the tool calls.
+
+        """
+        for chunk in stream:
+            self.feed(chunk)
+
+        return self.finish()
+
+    def _feed_tool_call_delta(self, tool_call_delta: Any) -> None:
+        index: int = _get(tool_call_delta, "index") or 0
+        tool_call: _StreamedToolCall = self._tool_calls.setdefault(
+            index, _StreamedToolCall()
+        )
+        function_delta: Any = _get(tool_call_delta, "function")
+        tool_call.id = _get(tool_call_delta, "id") or tool_call.id
+
+        if function_delta:
+            tool_call.name += _get(function_delta, "name") or ""
+            tool_call.arguments += _get(function_delta, "arguments") or ""
+
+        if tool_call.future is None and self.executor.is_idempotent(tool_call.name):
+            self._maybe_speculate(tool_call)
+
+    def _maybe_speculate(self, tool_call: _StreamedToolCall) -> None:
+        arguments: dict[str, Any] | None = parse_complete_arguments(tool_call.arguments)
+
+        if arguments is None:
+            return
+
+        required: list[str] = self.executor.function(tool_call.name).required_parameters
+
+        if not all(name in arguments for name in required):
+            return
+
+        tool_call.speculative_arguments = arguments
+        tool_call.future = self.thread_pool.submit(
+            self.executor.execute, tool_call.name, arguments
+        )
+        self._started += 1
+        increment("speculative_execution.started", tool=tool_call.name)
+
+    def _speculation_matches(self, tool_call: _StreamedToolCall) -> bool:
+        """Check if a speculative run used the final arguments, cancelling if not."""
+        try:
+            final_arguments: dict[str, Any] | None = self.executor.decode_arguments(
+                tool_call.name, tool_call.arguments
+            )
+        except Exception:  # noqa: BLE001
+            final_arguments = None
+
+        if final_arguments == tool_call.speculative_arguments:
+            self._hits += 1
+            increment("speculative_execution.hit", tool=tool_call.name)
+            return True
+
+        tool_call.future.cancel()  # type: ignore[union-attr]
+        self._misses += 1
+        increment("speculative_execution.miss", tool=tool_call.name)
+
+        return False
+
+    @staticmethod
+    def _future_result(tool_call: _StreamedToolCall) -> ToolCallResult:
+        try:
+            result: Any = tool_call.future.result()  # type: ignore[union-attr]
+        except Exception as error:  # noqa: BLE001
+            return ToolCallResult(
+                tool_call.id,
+                tool_call.name,
+                serialize_tool_error(error),
+                True,  # noqa: FBT003
+            )
+
+        return ToolCallResult(
+            tool_call.id, tool_call.name, serialize_tool_result(result)
+        )
+
+
+def _get(value: Any, key: str) -> Any:
+    if isinstance(value, dict):
+        return value.get(key)
+
+    return getattr(value, key, None)
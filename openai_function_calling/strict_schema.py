@@ -0,0 +1,224 @@
+"""Rewrite function schemas into the form accepted by OpenAI strict mode.
+
+Strict mode constrains decoding to the schema, but only accepts schemas where
+every object disallows additional properties and lists all of its properties as
+required. Optional properties are kept optional by making them nullable, while
+free-form objects, e.g. of dict parameters, cannot be expressed at all.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from openai_function_calling.json_schema_type import JsonSchemaType
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Mapping
+
+    from openai_function_calling.function import FunctionDict
+
+_SUPPORTED_TYPES: frozenset[str] = frozenset(
+    schema_type.value
+    for schema_type in JsonSchemaType
+    if schema_type != JsonSchemaType.ANY
+)
+_SUBSCHEMA_LIST_KEYS: tuple[str, ...] = ("anyOf", "allOf", "oneOf")
+_SUBSCHEMA_MAP_KEYS: tuple[str, ...] = ("$defs", "definitions")
+_UNSUPPORTED_KEYS: tuple[str, ...] = (
+    "allOf",
+    "not",
+    "if",
+    "then",
+    "else",
+    "default",
+    "prefixItems",
+    "patternProperties",
+    "dependentRequired",
+    "dependentSchemas",
+)
+
+
+def to_strict_function_schema(function_schema: FunctionDict) -> FunctionDict:
+    """Rewrite a function JSON schema into a strict mode compliant form.
+
+    Args:
+        function_schema: The function JSON schema to rewrite. It is not modified.
+
+    Raises:
+        ValueError: If the rewritten schema is still not strict mode compliant.
+
+    Returns:
+        A strict mode compliant copy of the function JSON schema.
+
+    """
+    strict_schema: FunctionDict = {
+        **function_schema,
+        "parameters": make_strict(function_schema["parameters"]),  # type: ignore[typeddict-item]
+        "strict": True,
+    }
+    validate_strict_schema(strict_schema["parameters"])  # type: ignore[arg-type]
+
+    return strict_schema
+
+
+def make_strict(schema: Mapping[str, Any]) -> dict[str, Any]:
+    """Rewrite a JSON schema and its nested schemas into a strict mode form.
+
+    Every object gets 'additionalProperties' set to false and all of its
+    properties listed as required. Properties that were not required become
+    nullable.
+
+    Args:
+        schema: The JSON schema to rewrite. It is not modified.
+
+    Raises:
+        ValueError: If an object is free-form, i.e. it has no 'properties' or\
+            allows additional properties with a schema or true, since making\
+            it strict would only allow an empty object.
+
+    Returns:
+        The rewritten copy of the schema.
+
+    """
+    return _make_strict(schema, "parameters", nullable=False)
+
+
+def validate_strict_schema(schema: Mapping[str, Any]) -> None:
+    """Validate a parameters JSON schema is accepted by strict mode.
+
+    Args:
+        schema: The parameters JSON schema to validate.
+
+    Raises:
+        ValueError: If the schema is not compliant, listing every violation.
+
+    """
+    errors: list[str] = []
+
+    if schema.get("type") != JsonSchemaType.OBJECT.value or "anyOf" in schema:
+        errors.append("parameters: expected the root schema to be an object")
+
+    _collect_errors(schema, "parameters", errors)
+
+    if errors:
+        raise ValueError(
+            "Expected the schema to be strict mode compliant: " + "; ".join(errors)
+        )
+
+
+def _make_strict(
+    schema: Mapping[str, Any], path: str, *, nullable: bool
+) -> dict[str, Any]:
+    strict_schema: dict[str, Any] = dict(schema)
+
+    if _has_type(schema, JsonSchemaType.OBJECT.value):
+        if "properties" not in schema or schema.get("additionalProperties") not in (
+            None,
+            False,
+        ):
+            raise ValueError(
+                f"Expected the object at {path} to declare its properties and"
+                " disallow other properties, since strict mode does not support"
+                " free-form objects."
+            )
+
+        properties: Mapping[str, Any] = schema["properties"]
+        required: set[str] = set(schema.get("required", ()))
+        strict_schema["properties"] = {
+            name: _make_strict(
+                subschema, f"{path}.{name}", nullable=name not in required
+            )
+            for name, subschema in properties.items()
+        }
+        strict_schema["required"] = list(properties)
+        strict_schema["additionalProperties"] = False
+
+    if "items" in schema:
+        strict_schema["items"] = _make_strict(
+            schema["items"], f"{path}[]", nullable=False
+        )
+
+    for key in _SUBSCHEMA_LIST_KEYS:
+        if key in schema:
+            strict_schema[key] = [
+                _make_strict(subschema, f"{path}.{key}[{index}]", nullable=False)
+                for index, subschema in enumerate(schema[key])
+            ]
+
+    for key in _SUBSCHEMA_MAP_KEYS:
+        if key in schema:
+            strict_schema[key] = {
+                name: _make_strict(subschema, f"{path}.{key}.{name}", nullable=False)
+                for name, subschema in schema[key].items()
+            }
+
+    if nullable:
+        _make_nullable(strict_schema)
+
+    return strict_schema
+
+
+def _make_nullable(schema: dict[str, Any]) -> None:
+    null_type: str = JsonSchemaType.NULL.value
+
+    if "anyOf" in schema:
+        if {"type": null_type} not in schema["anyOf"]:
+            schema["anyOf"] = [*schema["anyOf"], {"type": null_type}]
+    elif "$ref" in schema:
+        schema["anyOf"] = [{"$ref": schema.pop("$ref")}, {"type": null_type}]
+    elif isinstance(schema.get("type"), list):
+        if null_type not in schema["type"]:
+            schema["type"] = [*schema["type"], null_type]
+    elif "type" in schema and schema["type"] != null_type:
+        schema["type"] = [schema["type"], null_type]
+
+    if "enum" in schema and None not in schema["enum"]:
+        schema["enum"] = [*schema["enum"], None]
+
+
+def _has_type(schema: Mapping[str, Any], schema_type: str) -> bool:
+    types: Any = schema.get("type")
+
+    return types == schema_type or (isinstance(types, list) and schema_type in types)
+
+
+def _collect_errors(schema: Mapping[str, Any], path: str, errors: list[str]) -> None:
+    types: Any = schema.get("type")
+
+    if types is None and not (
+        {"anyOf", "allOf", "oneOf", "$ref", "enum", "const"} & schema.keys()
+    ):
+        errors.append(f"{path}: expected a type")
+
+    for schema_type in types if isinstance(types, list) else [types]:
+        if schema_type is not None and schema_type not in _SUPPORTED_TYPES:
+            errors.append(f"{path}: unsupported type '{schema_type}'")
+
+    errors.extend(
+        f"{path}: unsupported keyword '{key}'"
+        for key in _UNSUPPORTED_KEYS
+        if key in schema
+    )
+
+    if _has_type(schema, JsonSchemaType.OBJECT.value):
+        properties: Mapping[str, Any] = schema.get("properties", {})
+
+        if schema.get("additionalProperties") is not False:
+            errors.append(f"{path}: expected 'additionalProperties' to be false")
+
+        if set(schema.get("required", ())) != set(properties):
+            errors.append(f"{path}: expected every property to be required")
+
+        for name, subschema in properties.items():
+            _collect_errors(subschema, f"{path}.{name}", errors)
+
+    if "items" in schema:
+        _collect_errors(schema["items"], f"{path}[]", errors)
+
+    for key in _SUBSCHEMA_LIST_KEYS:
+        for index, subschema in enumerate(schema.get(key, ())):
+            _collect_errors(subschema, f"{path}.{key}[{index}]", errors)
+
+    for key in _SUBSCHEMA_MAP_KEYS:
+        for name, subschema in schema.get(key, {}).items():
+            _collect_errors(subschema, f"{path}.{key}.{name}", errors)
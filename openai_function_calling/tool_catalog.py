@@ -0,0 +1,249 @@
+"""Share one compiled tool catalog between many per-tenant tool subsets."""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import TYPE_CHECKING, Callable
+
+from openai_function_calling.function_inferrer import FunctionInferrer
+from openai_function_calling.schema_snapshot import SchemaSnapshot
+from openai_function_calling.tool_helpers import ToolHelpers
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable, Iterator
+
+    from openai.types.chat import ChatCompletionToolParam
+
+    from openai_function_calling.function import Function
+
+
+class ToolCatalog:
+    """An immutable store of tools compiled once into tool params and JSON bytes.
+
+    Views select a subset of the tools with a bitmask over the store, so they
+    reference the shared tool params instead of copying them. Views of the same
+    subset are interned, so tenants with identical subsets share one view and
+    its cached bytes.
+    """
+
+    def __init__(self, functions: Iterable[Function]) -> None:
+        """Compile a new catalog.
+
+        Args:
+            functions: The function definitions of the tools.
+
+        Raises:
+            ValueError: If two functions have the same name.
+
+        """
+        self._functions: tuple[Function, ...] = tuple(functions)
+        tool_params: list[ChatCompletionToolParam] = ToolHelpers.from_functions(
+            list(self._functions)
+        )
+        self._tool_params: tuple[ChatCompletionToolParam, ...] = tuple(tool_params)
+        self._names: tuple[str, ...] = tuple(
+            tool_param["function"]["name"] for tool_param in tool_params
+        )
+        self._tool_bytes: tuple[bytes, ...] = tuple(
+            json.dumps(tool_param).encode() for tool_param in tool_params
+        )
+        self._indices: dict[str, int] = {}
+        self._views: dict[int, ToolCatalogView] = {}
+        self._views_lock = threading.Lock()
+        self._snapshot: SchemaSnapshot | None = None
+
+        for index, name in enumerate(self._names):
+            if name in self._indices:
+                raise ValueError(f"Duplicate tool '{name}'.")
+
+            self._indices[name] = index
+
+    @classmethod
+    def from_function_refs(cls, function_refs: Iterable[Callable]) -> ToolCatalog:
+        """Compile a new catalog by inferring the functions of callables.
+
+        Args:
+            function_refs: The function references of the tools.
+
+        Returns:
+            The compiled catalog.
+
+        """
+        return cls(
+            FunctionInferrer.infer_from_function_reference(f) for f in function_refs
+        )
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """The tool names in catalog order."""
+        return self._names
+
+    @property
+    def tool_params(self) -> tuple[ChatCompletionToolParam, ...]:
+        """The shared tool params in catalog order. Copy them before changes."""
+        return self._tool_params
+
+    @property
+    def tool_json_bytes(self) -> tuple[bytes, ...]:
+        """The tool params serialized as JSON in catalog order."""
+        return self._tool_bytes
+
+    @property
+    def snapshot(self) -> SchemaSnapshot:
+        """The content hashes of the tools, taken on first use.
+
+        Compare it with the snapshot of an earlier deployment, e.g. stored with
+        SchemaSnapshot.to_dict, to find the tools whose schemas changed.
+        """
+        if self._snapshot is None:
+            self._snapshot = SchemaSnapshot.from_functions(self._functions)
+
+        return self._snapshot
+
+    @property
+    def fingerprint(self) -> str:
+        """The Merkle fingerprint of the tool schemas. See snapshot."""
+        return self.snapshot.fingerprint
+
+    def __len__(self) -> int:
+        """Get the number of tools in the catalog."""
+        return len(self._names)
+
+    def __contains__(self, name: object) -> bool:
+        """Check if a tool is in the catalog."""
+        return name in self._indices
+
+    def tool_param(self, name: str) -> ChatCompletionToolParam:
+        """Get the shared tool param of a tool.
+
+        Args:
+            name: The tool name.
+
+        Raises:
+            ValueError: If the tool is not in the catalog.
+
+        Returns:
+            The tool param. It is shared, so copy it before modifying it.
+
+        """
+        return self._tool_params[self.index(name)]
+
+    def index(self, name: str) -> int:
+        """Get the catalog index of a tool.
+
+        Args:
+            name: The tool name.
+
+        Raises:
+            ValueError: If the tool is not in the catalog.
+
+        Returns:
+            The index of the tool.
+
+        """
+        try:
+            return self._indices[name]
+        except KeyError:
+            raise ValueError(f"Unknown tool '{name}'.") from None
+
+    def view(self, names: Iterable[str]) -> ToolCatalogView:
+        """Get the view of a subset of the tools.
+
+        Args:
+            names: The names of the tools in the subset.
+
+        Raises:
+            ValueError: If a tool is not in the catalog.
+
+        Returns:
+            The view, shared with every other view of the same subset.
+
+        """
+        mask: int = 0
+
+        for name in names:
+            mask |= 1 << self.index(name)
+
+        return self.view_from_mask(mask)
+
+    def view_from_mask(self, mask: int) -> ToolCatalogView:
+        """Get the view of a subset of the tools from a bitmask of catalog indices.
+
+        Args:
+            mask: A bitmask with bit i set to include the tool at index i.
+
+        Raises:
+            ValueError: If the mask selects an index outside of the catalog.
+
+        Returns:
+            The view, shared with every other view of the same subset.
+
+        """
+        if mask < 0 or mask.bit_length() > len(self._names):
+            raise ValueError("Expected the mask to only select tools in the catalog.")
+
+        view: ToolCatalogView | None = self._views.get(mask)
+
+        if view is None:
+            with self._views_lock:
+                view = self._views.setdefault(mask, ToolCatalogView(self, mask))
+
+        return view
+
+
+class ToolCatalogView:
+    """A subset of the tools of a catalog, referencing the shared tool params."""
+
+    def __init__(self, catalog: ToolCatalog, mask: int) -> None:
+        """Create a new view. Use ToolCatalog.view to get interned views.
+
+        Args:
+            catalog: The catalog the view selects tools from.
+            mask: A bitmask with bit i set to include the tool at index i.
+
+        """
+        self.catalog: ToolCatalog = catalog
+        self.mask: int = mask
+        self._tools_json_bytes: bytes | None = None
+
+    @property
+    def names(self) -> list[str]:
+        """The tool names in catalog order."""
+        return [self.catalog.names[index] for index in self._iter_indices()]
+
+    @property
+    def tool_params(self) -> list[ChatCompletionToolParam]:
+        """The tool params in catalog order. They are shared, so copy before changes."""
+        tool_params: tuple[ChatCompletionToolParam, ...] = self.catalog.tool_params
+
+        return [tool_params[index] for index in self._iter_indices()]
+
+    @property
+    def tools_json_bytes(self) -> bytes:
+        """The tool params serialized as a JSON array, cached after first use."""
+        if self._tools_json_bytes is None:
+            tool_bytes: tuple[bytes, ...] = self.catalog.tool_json_bytes
+            self._tools_json_bytes = (
+                b"[" + b", ".join(tool_bytes[i] for i in self._iter_indices()) + b"]"
+            )
+
+        return self._tools_json_bytes
+
+    def __len__(self) -> int:
+        """Get the number of tools in the view."""
+        return bin(self.mask).count("1")
+
+    def __contains__(self, name: object) -> bool:
+        """Check if a tool is in the view."""
+        return name in self.catalog and bool(
+            self.mask >> self.catalog.index(name) & 1  # type: ignore[arg-type]
+        )
+
+    def _iter_indices(self) -> Iterator[int]:
+        mask: int = self.mask
+
+        while mask:
+            lowest_bit: int = mask & -mask
+            yield lowest_bit.bit_length() - 1
+            mask ^= lowest_bit
@@ -0,0 +1,928 @@
+"""Execute tool calls returned by the model against registered functions."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import inspect
+import json
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
+
+from openai_function_calling.argument_repair import repair_arguments
+from openai_function_calling.enum_policy import (
+    oversized_enum_parameters,
+    validate_enum_arguments,
+)
+from openai_function_calling.function_inferrer import FunctionInferrer
+from openai_function_calling.helper_functions import callable_name, run_awaitable
+from openai_function_calling.instrumentation import increment, span
+from openai_function_calling.pydantic_models import (
+    model_parameters,
+    validate_model_arguments,
+)
+from openai_function_calling.single_flight import call_key
+from openai_function_calling.tool_helpers import ToolHelpers
+from openai_function_calling.tool_limits import (
+    TOOL_POLICY_METADATA_KEY,
+    ToolPolicy,
+    ToolUnavailableError,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Collection, Iterable
+    from types import TracebackType
+
+    from openai.types.chat import ChatCompletionToolParam
+    from typing_extensions import Self
+
+    from openai_function_calling.argument_repair import RepairedArguments
+    from openai_function_calling.function import Function
+    from openai_function_calling.process_pool import ProcessToolPool
+    from openai_function_calling.single_flight import SingleFlight
+    from openai_function_calling.tool_limits import LatencyHistogram
+
+
+class ToolCallResult(NamedTuple):
+    """The result of executing a single tool call."""
+
+    tool_call_id: str
+    name: str
+    content: str
+    is_error: bool = False
+
+    def to_message(self) -> dict[str, str]:
+        """Convert the result to a tool message for the chat completions API.
+
+        Returns:
+            A tool message dict.
+
+        """
+        return {
+            "role": "tool",
+            "tool_call_id": self.tool_call_id,
+            "content": self.content,
+        }
+
+
+class ToolCallError(Exception):
+    """Raised when a tool call cannot be executed."""
+
+
+def get_tool_call_parts(tool_call: Any) -> tuple[str, str, str | dict[str, Any]]:
+    """Get the ID, function name and arguments of a tool call.
+
+    Args:
+        tool_call: A tool call dict or an OpenAI tool call object.
+
+    Returns:
+        A tuple of the tool call ID, the function name and the raw arguments.
+
+    """
+    if isinstance(tool_call, dict):
+        function: dict[str, Any] = tool_call["function"]
+        return tool_call.get("id", ""), function["name"], function.get("arguments", "")
+
+    return tool_call.id, tool_call.function.name, tool_call.function.arguments
+
+
+def serialize_tool_result(result: Any) -> str:
+    """Serialize the return value of a tool to message content.
+
+    Args:
+        result: The value returned by the tool.
+
+    Returns:
+        The string as is, otherwise the value serialized as JSON.
+
+    """
+    if isinstance(result, str):
+        return result
+
+    return json.dumps(result, default=str)
+
+
+def serialize_tool_error(error: BaseException) -> str:
+    """Serialize an error raised while running a tool to message content.
+
+    Args:
+        error: The raised error.
+
+    Returns:
+        A JSON object with an 'error' description, and 'retry_after_seconds'\
+            when a tool is temporarily unavailable.
+
+    """
+    content: dict[str, Any] = {"error": f"{type(error).__name__}: {error}"}
+
+    if (
+        isinstance(error, ToolUnavailableError)
+        and error.retry_after_seconds is not None
+    ):
+        content["retry_after_seconds"] = round(error.retry_after_seconds, 3)
+
+    return json.dumps(content)
+
+
+class _ToolEntry(NamedTuple):
+    """A registered tool."""
+
+    function_reference: Callable
+    policy: ToolPolicy
+    idempotent: bool
+    function: Function | None
+
+
+class _Registrations:
+    """An immutable set of registered tools with the caches derived from it.
+
+    The first read after tools are registered publishes a new instance, so a
+    call that read the previous one keeps a consistent view of its tools and
+    only fills its caches. Filling a cache entry is a single dict assignment.
+    """
+
+    def __init__(
+        self,
+        entries: dict[str, _ToolEntry],
+        previous: _Registrations | None = None,
+    ) -> None:
+        """Create new registrations, keeping the caches of unchanged tools.
+
+        Args:
+            entries: The registered tools by name.
+            previous: The registrations these replace.
+
+        """
+        self.entries: dict[str, _ToolEntry] = entries
+        self.functions: dict[str, Function] = {
+            name: entry.function
+            for name, entry in entries.items()
+            if entry.function is not None
+        }
+        self.model_parameters: dict[str, dict[str, type]] = {}
+        self.enum_parameters: dict[str, dict[str, Collection[Any]]] = {}
+        self.tool_params: list[ChatCompletionToolParam] | None = None
+        self.tools_json_bytes: bytes | None = None
+
+        if previous is None:
+            return
+
+        for cache, previous_cache in (
+            (self.functions, previous.functions),
+            (self.model_parameters, previous.model_parameters),
+            (self.enum_parameters, previous.enum_parameters),
+        ):
+            cache.update(
+                (name, value)
+                for name, value in list(previous_cache.items())
+                if entries.get(name) is previous.entries[name]
+            )
+
+
+class ToolExecutor:
+    """Route tool calls by name to registered callables and run them.
+
+    Calls read the registered tools without locks. Registering tools only
+    invalidates the current registrations, and the next read publishes a new
+    immutable set of them at once, so tools can be registered while calls are
+    running in other threads.
+    """
+
+    def __init__(
+        self,
+        tools: Mapping[str, Callable] | Iterable[Callable] | None = None,
+        *,
+        max_workers: int | None = None,
+        repair_arguments: bool = False,
+        single_flight: SingleFlight | None = None,
+    ) -> None:
+        """Create a new tool executor.
+
+        Args:
+            tools: Callables to register, either keyed by tool name or named after\
+                their function name.
+            max_workers: The maximum number of threads used to run tool calls\
+                concurrently.
+            repair_arguments: If malformed JSON arguments should be repaired\
+                locally, guided by the function definition of the tool.
+            single_flight: Deduplicates identical calls of idempotent tools, both\
+                within a response and across calls in flight. Share one between\
+                executors to deduplicate calls of concurrent conversations.
+
+        """
+        self._entries: dict[str, _ToolEntry] = {}
+        self._published: _Registrations = _Registrations({})
+        self._registrations: _Registrations | None = self._published
+        self._register_lock = threading.Lock()
+        self.max_workers: int | None = max_workers
+        self.repair_arguments: bool = repair_arguments
+        self.single_flight: SingleFlight | None = single_flight
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._thread_pool_lock = threading.Lock()
+
+        if tools is None:
+            return
+
+        if isinstance(tools, Mapping):
+            self._publish(
+                dict(
+                    self._entry(function_reference, name=name)
+                    for name, function_reference in tools.items()
+                )
+            )
+        else:
+            self._publish(
+                dict(self._entry(function_reference) for function_reference in tools)
+            )
+
+    @property
+    def names(self) -> list[str]:
+        """The names of the registered tools."""
+        return list(self._current().entries)
+
+    def register(
+        self,
+        function_reference: Callable,
+        *,
+        name: str | None = None,
+        function: Function | None = None,
+        idempotent: bool = False,
+        process_pool: ProcessToolPool | None = None,
+        policy: ToolPolicy | None = None,
+    ) -> None:
+        """Register a callable as a tool.
+
+        Args:
+            function_reference: The callable to run for the tool.
+            name: The tool name. Defaults to the name of the callable, or of the\
+                wrapped function of a partial.
+            function: The function definition of the tool. Inferred from the\
+                callable when first needed if not given.
+            idempotent: If the tool is free of side effects, so it is safe to run\
+                more than once or speculatively.
+            process_pool: A pool to run the tool in, for CPU-bound module level\
+                functions. The tool otherwise runs in the calling thread.
+            policy: The concurrency limit and circuit breaker of the tool.\
+                Defaults to the policy in the function metadata, otherwise calls\
+                are only timed.
+
+        """
+        name, entry = self._entry(
+            function_reference,
+            name=name,
+            function=function,
+            idempotent=idempotent,
+            process_pool=process_pool,
+            policy=policy,
+        )
+        self._publish({name: entry})
+
+    def _entry(
+        self,
+        function_reference: Callable,
+        *,
+        name: str | None = None,
+        function: Function | None = None,
+        idempotent: bool = False,
+        process_pool: ProcessToolPool | None = None,
+        policy: ToolPolicy | None = None,
+    ) -> tuple[str, _ToolEntry]:
+        """Create the entry of a tool. See register for the arguments."""
+        name = name or callable_name(function_reference)
+
+        if process_pool is not None:
+            function_reference = process_pool.tool(function_reference)
+
+        if function is not None:
+            policy = policy or function.metadata.get(TOOL_POLICY_METADATA_KEY)
+
+        return name, _ToolEntry(
+            function_reference, policy or ToolPolicy(), idempotent, function
+        )
+
+    def _publish(self, entries: Mapping[str, _ToolEntry]) -> None:
+        """Add or replace tools, invalidating the current registrations.
+
+        Args:
+            entries: The entries of the tools by name.
+
+        """
+        with self._register_lock:
+            self._entries.update(entries)
+            self._registrations = None
+
+    def _current(self) -> _Registrations:
+        """Get the current registrations, publishing new ones if needed.
+
+        New registrations are built on the first read after tools were added,
+        so registering many tools one by one copies them once.
+
+        Returns:
+            The registrations.
+
+        """
+        registrations: _Registrations | None = self._registrations
+
+        if registrations is None:
+            with self._register_lock:
+                registrations = self._registrations
+
+                if registrations is None:
+                    registrations = self._registrations = self._published = (
+                        _Registrations(dict(self._entries), self._published)
+                    )
+
+        return registrations
+
+    def register_instance(self, instance: object, *, idempotent: bool = False) -> None:
+        """Register the public methods of an object as tools.
+
+        The function definitions are inferred once per class and shared, so
+        registering a new instance of the same class only binds its methods.
+
+        Args:
+            instance: The object whose methods to register.
+            idempotent: If the methods are free of side effects, so they are safe\
+                to run more than once or speculatively.
+
+        """
+        self._publish(
+            dict(
+                self._entry(
+                    method, name=function.name, function=function, idempotent=idempotent
+                )
+                for function, method in FunctionInferrer.infer_from_instance(instance)
+            )
+        )
+
+    @property
+    def latency_histograms(self) -> dict[str, LatencyHistogram]:
+        """The histograms of call durations by tool name."""
+        return {
+            name: entry.policy.latency_histogram
+            for name, entry in self._current().entries.items()
+        }
+
+    def policy(self, name: str) -> ToolPolicy:
+        """Get the policy applied to the calls of a tool.
+
+        Args:
+            name: The tool name.
+
+        Raises:
+            ToolCallError: If no tool is registered with the name.
+
+        Returns:
+            The policy.
+
+        """
+        return self._get_entry(self._current(), name).policy
+
+    def get(self, name: str) -> Callable:
+        """Get the callable registered for a tool.
+
+        Args:
+            name: The tool name.
+
+        Raises:
+            ToolCallError: If no tool is registered with the name.
+
+        Returns:
+            The registered callable.
+
+        """
+        return self._get_entry(self._current(), name).function_reference
+
+    @staticmethod
+    def _get_entry(registrations: _Registrations, name: str) -> _ToolEntry:
+        try:
+            return registrations.entries[name]
+        except KeyError:
+            raise ToolCallError(f"Unknown tool '{name}'.") from None
+
+    def function(self, name: str) -> Function:
+        """Get the function definition of a tool, inferring it on first use.
+
+        Args:
+            name: The tool name.
+
+        Returns:
+            The function definition.
+
+        """
+        return self._function(self._current(), name)
+
+    def _function(self, registrations: _Registrations, name: str) -> Function:
+        function: Function | None = registrations.functions.get(name)
+
+        if function is None:
+            function = FunctionInferrer.infer_from_function_reference(
+                self._get_entry(registrations, name).function_reference
+            )
+            function = registrations.functions.setdefault(name, function)
+
+        return function
+
+    @property
+    def tool_params(self) -> list[ChatCompletionToolParam]:
+        """The tool params of the registered tools, built once and shared."""
+        registrations: _Registrations = self._current()
+        tool_params: list[ChatCompletionToolParam] | None = registrations.tool_params
+
+        if tool_params is None:
+            tool_params = registrations.tool_params = ToolHelpers.from_functions(
+                [self._function(registrations, name) for name in registrations.entries]
+            )
+
+        return tool_params
+
+    @property
+    def tools_json_bytes(self) -> bytes:
+        """The tool params serialized as a JSON array, built once and shared."""
+        registrations: _Registrations = self._current()
+        tools_json_bytes: bytes | None = registrations.tools_json_bytes
+
+        if tools_json_bytes is None:
+            tools_json_bytes = registrations.tools_json_bytes = json.dumps(
+                self.tool_params
+            ).encode()
+
+        return tools_json_bytes
+
+    def warmup(self, *, freeze_gc: bool = False) -> int:
+        """Infer and serialize the definitions of every registered tool now.
+
+        Call it in the master process of a pre-fork server, such as gunicorn
+        with preload_app, so workers inherit the definitions and the Pydantic
+        model and enum parameters of every tool instead of each finding them on
+        its first request.
+
+        Args:
+            freeze_gc: If the garbage collector should move every object into a\
+                permanent generation. It then no longer writes to inherited\
+                objects, so their memory pages stay shared between forked\
+                workers. No collection runs first, since freeing objects right\
+                before forking leaves holes in shared pages that later\
+                allocations write to.
+
+        Returns:
+            The number of tools warmed up.
+
+        """
+        registrations: _Registrations = self._current()
+        tool_count: int = len(registrations.entries)
+
+        with span("ToolExecutor.warmup", tool_count=tool_count):
+            self.tools_json_bytes  # noqa: B018
+
+            for name in registrations.entries:
+                self._validated_parameters(registrations, name)
+
+            if freeze_gc:
+                gc.freeze()
+
+        return tool_count
+
+    def is_idempotent(self, name: str) -> bool:
+        """Check if a tool was registered as idempotent.
+
+        Args:
+            name: The tool name.
+
+        Returns:
+            If the tool is idempotent.
+
+        """
+        entry: _ToolEntry | None = self._current().entries.get(name)
+
+        return entry is not None and entry.idempotent
+
+    def decode_arguments(
+        self,
+        name: str,
+        arguments: str | Mapping[str, Any],
+    ) -> dict[str, Any]:
+        """Decode the arguments of a tool call.
+
+        When argument repair is enabled, every repair applied increments the\
+        'tool_call.arguments_repaired' counter.
+
+        Args:
+            name: The tool name.
+            arguments: The JSON encoded arguments or an already decoded mapping.
+
+        Raises:
+            ToolCallError: If the arguments are not a JSON object.
+
+        Returns:
+            The decoded keyword arguments.
+
+        """
+        if not isinstance(arguments, str):
+            return dict(arguments)
+
+        if self.repair_arguments:
+            return self._repair_arguments(name, arguments)
+
+        if not arguments.strip():
+            return {}
+
+        try:
+            decoded: Any = json.loads(arguments)
+        except json.JSONDecodeError as error:
+            raise ToolCallError(f"Invalid tool call arguments: {error}") from error
+
+        if not isinstance(decoded, dict):
+            raise ToolCallError("Expected tool call arguments to be a JSON object.")
+
+        return decoded
+
+    def _repair_arguments(self, name: str, arguments: str) -> dict[str, Any]:
+        registrations: _Registrations = self._current()
+        function: Function | None = (
+            self._function(registrations, name)
+            if name in registrations.entries
+            else None
+        )
+
+        try:
+            repaired: RepairedArguments = repair_arguments(arguments, function)
+        except ValueError as error:
+            raise ToolCallError(f"Invalid tool call arguments: {error}") from error
+
+        for repair in repaired.repairs:
+            increment("tool_call.arguments_repaired", tool=name, kind=repair.kind.value)
+
+        return repaired.arguments
+
+    def execute(self, name: str, arguments: str | Mapping[str, Any]) -> Any:
+        """Run a tool and return its raw result.
+
+        Coroutine functions are run to completion in a new event loop.
+
+        Args:
+            name: The tool name.
+            arguments: The JSON encoded arguments or an already decoded mapping.
+
+        Returns:
+            The value returned by the tool.
+
+        """
+        with span("ToolExecutor.execute", tool=name):
+            entry: _ToolEntry = self._get_entry(self._current(), name)
+            decoded_arguments: dict[str, Any] = self.decode_arguments(name, arguments)
+
+            if self.single_flight is not None and entry.idempotent:
+                return self.single_flight.run(
+                    call_key(name, decoded_arguments),
+                    self._run,
+                    name,
+                    decoded_arguments,
+                )
+
+            return self._run(name, decoded_arguments)
+
+    async def aexecute(self, name: str, arguments: str | Mapping[str, Any]) -> Any:
+        """Run a tool from an event loop and return its raw result.
+
+        Coroutine functions are awaited and other callables run in a thread.
+
+        Args:
+            name: The tool name.
+            arguments: The JSON encoded arguments or an already decoded mapping.
+
+        Returns:
+            The value returned by the tool.
+
+        """
+        with span("ToolExecutor.aexecute", tool=name):
+            entry: _ToolEntry = self._get_entry(self._current(), name)
+            decoded_arguments: dict[str, Any] = self.decode_arguments(name, arguments)
+
+            if self.single_flight is not None and entry.idempotent:
+                return await self.single_flight.arun(
+                    call_key(name, decoded_arguments),
+                    self._arun,
+                    name,
+                    decoded_arguments,
+                )
+
+            return await self._arun(name, decoded_arguments)
+
+    def _validate_arguments(
+        self, registrations: _Registrations, name: str, arguments: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Validate arguments the schema of the tool does not fully constrain.
+
+        Arguments of Pydantic model typed parameters are validated into models
+        and arguments of enums left out of the schema by the enum policy of
+        FunctionInferrer are checked against all values of the enum.
+
+        Args:
+            registrations: The registrations the tool is called from.
+            name: The tool name.
+            arguments: The decoded arguments.
+
+        Raises:
+            ToolCallError: If an argument does not validate against its model or\
+                is not a value of its enum.
+
+        Returns:
+            The arguments to call the tool with.
+
+        """
+        models, enums = self._validated_parameters(registrations, name)
+
+        try:
+            validate_enum_arguments(arguments, enums)
+
+            return validate_model_arguments(arguments, models) if models else arguments
+        except ValueError as error:
+            raise ToolCallError(str(error)) from error
+
+    @staticmethod
+    def _validated_parameters(
+        registrations: _Registrations, name: str
+    ) -> tuple[dict[str, type], dict[str, Collection[Any]]]:
+        """Get the parameters of a tool that are validated beyond its schema.
+
+        Args:
+            registrations: The registrations the tool is called from.
+            name: The tool name.
+
+        Returns:
+            The model classes and the allowed enum values by parameter name,\
+                found once per registered tool.
+
+        """
+        function_reference: Callable = registrations.entries[name].function_reference
+        models: dict[str, type] | None = registrations.model_parameters.get(name)
+        enums: dict[str, Collection[Any]] | None = registrations.enum_parameters.get(
+            name
+        )
+
+        if models is None:
+            models = registrations.model_parameters[name] = model_parameters(
+                function_reference
+            )
+
+        if enums is None:
+            enums = registrations.enum_parameters[name] = oversized_enum_parameters(
+                function_reference, FunctionInferrer.enum_policy
+            )
+
+        return models, enums
+
+    def _run(self, name: str, arguments: dict[str, Any]) -> Any:
+        registrations: _Registrations = self._current()
+        entry: _ToolEntry = self._get_entry(registrations, name)
+        function_reference: Callable = entry.function_reference
+        arguments = self._validate_arguments(registrations, name, arguments)
+
+        with entry.policy.guard(name):
+            result: Any = function_reference(**arguments)
+
+            if inspect.isawaitable(result):
+                result = run_awaitable(result)
+
+        return result
+
+    async def _arun(self, name: str, arguments: dict[str, Any]) -> Any:
+        registrations: _Registrations = self._current()
+        entry: _ToolEntry = self._get_entry(registrations, name)
+        function_reference: Callable = entry.function_reference
+        arguments = self._validate_arguments(registrations, name, arguments)
+
+        async with entry.policy.aguard(name):
+            if inspect.iscoroutinefunction(function_reference):
+                return await function_reference(**arguments)
+
+            result: Any = await asyncio.to_thread(function_reference, **arguments)
+
+            if inspect.isawaitable(result):
+                result = await result
+
+        return result
+
+    def execute_tool_call(self, tool_call: Any) -> ToolCallResult:
+        """Run a tool call, capturing errors in the result.
+
+        Args:
+            tool_call: A tool call dict or an OpenAI tool call object.
+
+        Returns:
+            The tool call result.
+
+        """
+        tool_call_id: str = _tool_call_id(tool_call)
+        name: str = ""
+
+        try:
+            tool_call_id, name, arguments = get_tool_call_parts(tool_call)
+            result: Any = self.execute(name, arguments)
+        except Exception as error:  # noqa: BLE001
+            return ToolCallResult(tool_call_id, name, serialize_tool_error(error), True)  # noqa: FBT003
+
+        return ToolCallResult(tool_call_id, name, serialize_tool_result(result))
+
+    async def aexecute_tool_call(self, tool_call: Any) -> ToolCallResult:
+        """Run a tool call from an event loop, capturing errors in the result.
+
+        Args:
+            tool_call: A tool call dict or an OpenAI tool call object.
+
+        Returns:
+            The tool call result.
+
+        """
+        tool_call_id: str = _tool_call_id(tool_call)
+        name: str = ""
+
+        try:
+            tool_call_id, name, arguments = get_tool_call_parts(tool_call)
+            result: Any = await self.aexecute(name, arguments)
+        except Exception as error:  # noqa: BLE001
+            return ToolCallResult(tool_call_id, name, serialize_tool_error(error), True)  # noqa: FBT003
+
+        return ToolCallResult(tool_call_id, name, serialize_tool_result(result))
+
+    def execute_tool_calls(self, tool_calls: Iterable[Any]) -> list[ToolCallResult]:
+        """Run independent tool calls concurrently in a thread pool.
+
+        Args:
+            tool_calls: Tool call dicts or OpenAI tool call objects.
+
+        Returns:
+            The tool call results in the same order as the tool calls.
+
+        """
+        tool_calls = list(tool_calls)
+        unique_tool_calls, indices = self._deduplicate(tool_calls)
+
+        if len(unique_tool_calls) <= 1:
+            results: list[ToolCallResult] = [
+                self.execute_tool_call(tool_call) for tool_call in unique_tool_calls
+            ]
+        else:
+            results = list(
+                self.thread_pool.map(self.execute_tool_call, unique_tool_calls)
+            )
+
+        return _expand_results(tool_calls, results, indices)
+
+    async def aexecute_tool_calls(
+        self,
+        tool_calls: Iterable[Any],
+    ) -> list[ToolCallResult]:
+        """Run independent tool calls concurrently on the event loop.
+
+        Args:
+            tool_calls: Tool call dicts or OpenAI tool call objects.
+
+        Returns:
+            The tool call results in the same order as the tool calls.
+
+        """
+        tool_calls = list(tool_calls)
+        unique_tool_calls, indices = self._deduplicate(tool_calls)
+        results: list[ToolCallResult] = list(
+            await asyncio.gather(
+                *(self.aexecute_tool_call(tool_call) for tool_call in unique_tool_calls)
+            )
+        )
+
+        return _expand_results(tool_calls, results, indices)
+
+    def _deduplicate(self, tool_calls: list[Any]) -> tuple[list[Any], list[int]]:
+        """Leave out calls of idempotent tools that repeat an earlier call.
+
+        Args:
+            tool_calls: The tool calls of a response.
+
+        Returns:
+            The tool calls to run, and for each tool call the index of the call\
+                to run for it.
+
+        """
+        if self.single_flight is None:
+            return tool_calls, list(range(len(tool_calls)))
+
+        unique_tool_calls: list[Any] = []
+        indices: list[int] = []
+        unique_indices: dict[str, int] = {}
+
+        for tool_call in tool_calls:
+            key: str | None = self._tool_call_key(tool_call)
+
+            if key is not None and key in unique_indices:
+                indices.append(unique_indices[key])
+                continue
+
+            if key is not None:
+                unique_indices[key] = len(unique_tool_calls)
+
+            indices.append(len(unique_tool_calls))
+            unique_tool_calls.append(tool_call)
+
+        self.single_flight.record_within_response(
+            len(tool_calls) - len(unique_tool_calls)
+        )
+
+        return unique_tool_calls, indices
+
+    def _tool_call_key(self, tool_call: Any) -> str | None:
+        try:
+            _, name, arguments = get_tool_call_parts(tool_call)
+        except (AttributeError, KeyError, TypeError):
+            return None
+
+        if not self.is_idempotent(name):
+            return None
+
+        try:
+            decoded_arguments: Any = (
+                json.loads(arguments or "{}")
+                if isinstance(arguments, str)
+                else arguments
+            )
+        except ValueError:
+            return None
+
+        if not isinstance(decoded_arguments, dict):
+            return None
+
+        return call_key(name, decoded_arguments)
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        """The thread pool used to run tool calls concurrently."""
+        thread_pool: ThreadPoolExecutor | None = self._thread_pool
+
+        if thread_pool is None:
+            # Threads using the executor for the first time create one pool.
+            with self._thread_pool_lock:
+                thread_pool = self._thread_pool
+
+                if thread_pool is None:
+                    thread_pool = self._thread_pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="tool-executor",
+                    )
+
+        return thread_pool
+
+    def close(self) -> None:
+        """Shut down the thread pool."""
+        with self._thread_pool_lock:
+            thread_pool: ThreadPoolExecutor | None = self._thread_pool
+            self._thread_pool = None
+
+        if thread_pool is not None:
+            thread_pool.shutdown()
+
+    def __enter__(self) -> Self:
+        """Use the executor as a context manager that closes on exit."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the executor."""
+        self.close()
+
+
+def _expand_results(
+    tool_calls: list[Any], results: list[ToolCallResult], indices: list[int]
+) -> list[ToolCallResult]:
+    """Give every tool call the result of the call run for it, under its own ID."""
+    expanded: list[ToolCallResult] = []
+    seen: set[int] = set()
+
+    for tool_call, index in zip(tool_calls, indices):
+        result: ToolCallResult = results[index]
+
+        if index not in seen:
+            seen.add(index)
+            expanded.append(result)
+            continue
+
+        tool_call_id: str = _tool_call_id(tool_call)
+        expanded.append(
+            result
+            if result.tool_call_id == tool_call_id
+            else result._replace(tool_call_id=tool_call_id)
+        )
+
+    return expanded
+
+
+def _tool_call_id(tool_call: Any) -> str:
+    if isinstance(tool_call, dict):
+        return tool_call.get("id", "")
+
+    return getattr(tool_call, "id", "")
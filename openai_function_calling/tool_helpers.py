@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Callable, cast
+import json
+import os
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Callable, cast
 
 from openai.types.shared_params import FunctionDefinition
 
 from openai_function_calling.function_inferrer import FunctionInferrer
+from openai_function_calling.helper_functions import json_digest
+from openai_function_calling.instrumentation import span
 
 if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable, Iterator
+
     from openai.types.chat import ChatCompletionToolParam
 
     from openai_function_calling.function import Function, FunctionDict
@@ -28,11 +35,20 @@ class ToolHelpers:
             A list of OpenAI chat completion tool parameters.
 
         """
-        json_schemas: list[FunctionDict] = [f.to_json_schema() for f in functions]
-        tool_params: list[ChatCompletionToolParam] = [
-            ToolHelpers.json_schema_to_tool_param(json_schema)
-            for json_schema in json_schemas
-        ]
+        with span(
+            "ToolHelpers.from_functions", tool_count=len(functions)
+        ) as current_span:
+            json_schemas: list[FunctionDict] = [f.to_json_schema() for f in functions]
+            tool_params: list[ChatCompletionToolParam] = [
+                ToolHelpers.json_schema_to_tool_param(json_schema)
+                for json_schema in json_schemas
+            ]
+
+            if current_span.recording:
+                current_span.set_attribute(
+                    "schema_size_bytes", len(json.dumps(tool_params))
+                )
+
         return tool_params
 
     @staticmethod
@@ -53,6 +69,88 @@ class ToolHelpers:
         ]
         return ToolHelpers.from_functions(functions)
 
+    @staticmethod
+    def iter_from_functions(
+        functions: Iterable[Function],
+    ) -> Iterator[ChatCompletionToolParam]:
+        """Lazily create OpenAI chat completion tool params from function definitions.
+
+        Args:
+            functions: Function definition objects, e.g. from a generator.
+
+        Yields:
+            The OpenAI chat completion tool parameter of each function.
+
+        """
+        for function in functions:
+            yield ToolHelpers.json_schema_to_tool_param(function.to_json_schema())
+
+    @staticmethod
+    def iter_infer_from_function_refs(
+        function_refs: Iterable[Callable],
+    ) -> Iterator[ChatCompletionToolParam]:
+        """Lazily create OpenAI chat completion tool params from function references.
+
+        Args:
+            function_refs: Function references, e.g. from a generator.
+
+        Returns:
+            An iterator of the OpenAI chat completion tool parameter of each function.
+
+        """
+        return ToolHelpers.iter_from_functions(
+            FunctionInferrer.infer_from_function_reference(f) for f in function_refs
+        )
+
+    @staticmethod
+    def write_tool_params(
+        tool_params: Iterable[ChatCompletionToolParam],
+        output: IO[bytes] | str | os.PathLike[str],
+    ) -> int:
+        """Stream tool params to a file or socket as a JSON array.
+
+        Only one tool param is serialized at a time, so peak memory does not grow
+        with the number of tools when they come from a generator.
+
+        Args:
+            tool_params: The tool params, e.g. from iter_from_functions.
+            output: A binary stream, e.g. an open file or socket.makefile("wb"),\
+                or a path to write to.
+
+        Returns:
+            The number of bytes written.
+
+        """
+        if isinstance(output, (str, os.PathLike)):
+            with Path(output).open("wb") as file:
+                return ToolHelpers.write_tool_params(tool_params, file)
+
+        stream: IO[bytes] = cast("IO[bytes]", output)
+        size: int = stream.write(b"[")
+        separator: bytes = b""
+
+        for tool_param in tool_params:
+            size += stream.write(separator + json.dumps(tool_param).encode())
+            separator = b", "
+
+        return size + stream.write(b"]")
+
+    @staticmethod
+    def fingerprint(tool_params: Iterable[ChatCompletionToolParam]) -> str:
+        """Get a fingerprint identifying a tool list, e.g. for cache keys.
+
+        Tool lists with the same tools in the same order have the same
+        fingerprint, regardless of the key order within each tool.
+
+        Args:
+            tool_params: The tool params.
+
+        Returns:
+            The SHA-256 hex digest of the tool params as canonical JSON.
+
+        """
+        return json_digest(list(tool_params))
+
     @staticmethod
     def json_schema_to_tool_param(json_schema: FunctionDict) -> ChatCompletionToolParam:
         """Convert a JSON schema object to an OpenAI chat completion tool parameter.
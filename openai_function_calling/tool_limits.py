@@ -0,0 +1,509 @@
+"""Adaptive concurrency limits, circuit breakers and latency histograms for tools."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from enum import Enum
+from typing import TYPE_CHECKING, Callable, NoReturn
+
+from openai_function_calling.instrumentation import increment
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import AsyncIterator, Iterator, Sequence
+
+TOOL_POLICY_METADATA_KEY: str = "tool_policy"
+"""The Function.metadata key of the ToolPolicy a ToolExecutor applies to the tool."""
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+"""The default upper bounds in seconds of the latency histogram buckets."""
+
+
+class ToolUnavailableError(Exception):
+    """Raised instead of running a tool that is overloaded or failing."""
+
+    def __init__(self, message: str, retry_after_seconds: float | None = None) -> None:
+        """Create a new error.
+
+        Args:
+            message: The error message.
+            retry_after_seconds: The time after which the tool may accept calls.
+
+        """
+        super().__init__(message)
+        self.retry_after_seconds: float | None = retry_after_seconds
+
+
+class ConcurrencyLimitError(ToolUnavailableError):
+    """Raised when a tool is already running its maximum number of calls."""
+
+
+class CircuitOpenError(ToolUnavailableError):
+    """Raised when the circuit breaker of a tool is open."""
+
+
+class CircuitState(str, Enum):
+    """The states of a circuit breaker."""
+
+    CLOSED = "closed"
+    """Calls run normally."""
+    OPEN = "open"
+    """Calls fail fast until the reset timeout passes."""
+    HALF_OPEN = "half_open"
+    """A single trial call runs to decide if the breaker closes again."""
+
+
+class AdaptiveConcurrencyLimit:
+    """A concurrency limit adapted with additive increase, multiplicative decrease.
+
+    Every successful call within the latency target raises the limit by
+    increase / limit, so about increase per limit calls. Every failed call or
+    call slower than the target multiplies the limit by backoff_ratio.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = 4,
+        *,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        latency_target_seconds: float | None = None,
+        increase: float = 1.0,
+        backoff_ratio: float = 0.5,
+        max_wait_seconds: float = 0.0,
+    ) -> None:
+        """Create a new limit.
+
+        Args:
+            initial_limit: The starting number of concurrent calls.
+            min_limit: The lowest the limit can decrease to.
+            max_limit: The highest the limit can increase to.
+            latency_target_seconds: Calls slower than this decrease the limit.\
+                Only failed calls decrease the limit if not set.
+            increase: The amount the limit grows per limit successful calls.
+            backoff_ratio: The factor the limit is multiplied by to decrease it.
+            max_wait_seconds: How long a call waits for a free slot before it is\
+                rejected. Calls are rejected right away by default, so they do\
+                not hold up workers needed by other tools.
+
+        Raises:
+            ValueError: If the limits or ratio are out of range.
+
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial_limit <= max_limit.")
+
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("Expected the backoff ratio to be between 0 and 1.")
+
+        self.min_limit: float = min_limit
+        self.max_limit: float = max_limit
+        self.latency_target_seconds: float | None = latency_target_seconds
+        self.increase: float = increase
+        self.backoff_ratio: float = backoff_ratio
+        self.max_wait_seconds: float = max_wait_seconds
+        self._limit: float = initial_limit
+        self._in_flight: int = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """The current number of calls allowed to run at once."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """The number of calls running."""
+        return self._in_flight
+
+    def acquire(self, timeout: float = 0.0) -> bool:
+        """Take a slot for a call.
+
+        Args:
+            timeout: How long to wait for a free slot in seconds.
+
+        Returns:
+            If a slot was taken. Release it with release when the call ends.
+
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._in_flight < int(self._limit), timeout
+            ):
+                return False
+
+            self._in_flight += 1
+
+        return True
+
+    def release(
+        self, latency_seconds: float, *, failed: bool = False, cancelled: bool = False
+    ) -> None:
+        """Free the slot of a finished call and adapt the limit to its outcome.
+
+        Args:
+            latency_seconds: The duration of the call.
+            failed: If the call raised an error.
+            cancelled: If the call was cancelled or interrupted, which says\
+                nothing about the tool, so the limit is kept.
+
+        """
+        with self._condition:
+            self._in_flight -= 1
+
+            if cancelled:
+                pass
+            elif failed or (
+                self.latency_target_seconds is not None
+                and latency_seconds > self.latency_target_seconds
+            ):
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+            else:
+                self._limit = min(
+                    self.max_limit, self._limit + self.increase / self._limit
+                )
+
+            self._condition.notify_all()
+
+
+class CircuitBreaker:
+    """Fail calls fast after consecutive failures until a reset timeout passes."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30.0,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create a new closed circuit breaker.
+
+        Args:
+            failure_threshold: The consecutive failures that open the breaker.
+            reset_timeout_seconds: How long the breaker stays open before a\
+                trial call is allowed.
+            clock: The monotonic clock used to time the reset timeout.
+
+        """
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout_seconds: float = reset_timeout_seconds
+        self.clock: Callable[[], float] = clock
+        self._state: CircuitState = CircuitState.CLOSED
+        self._failures: int = 0
+        self._opened_at: float = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        """The current state of the breaker."""
+        return self._state
+
+    def allow(self) -> None:
+        """Check if a call may run.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half open with a trial\
+                call already running.
+
+        """
+        with self._lock:
+            if self._state is CircuitState.CLOSED:
+                return
+
+            retry_after: float = (
+                self._opened_at + self.reset_timeout_seconds - self.clock()
+            )
+
+            if self._state is CircuitState.OPEN and retry_after <= 0:
+                self._state = CircuitState.HALF_OPEN
+                return
+
+        raise CircuitOpenError(
+            "The tool is failing and temporarily unavailable.",
+            max(retry_after, 0.0),
+        )
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+
+    def record_cancelled(self) -> None:
+        """Let the next call be the trial if the trial call was cancelled."""
+        with self._lock:
+            if self._state is CircuitState.HALF_OPEN:
+                self._state = CircuitState.OPEN
+                self._opened_at = self.clock() - self.reset_timeout_seconds
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the breaker at the threshold."""
+        with self._lock:
+            self._failures += 1
+
+            if (
+                self._state is CircuitState.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = CircuitState.OPEN
+                self._opened_at = self.clock()
+
+
+class LatencyHistogram:
+    """Count call durations in fixed buckets."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        """Create an empty histogram.
+
+        Args:
+            buckets: The increasing upper bounds of the buckets in seconds. A\
+                last bucket without an upper bound is added.
+
+        """
+        self.buckets: tuple[float, ...] = tuple(buckets)
+        self.counts: list[int] = [0] * (len(self.buckets) + 1)
+        self.count: int = 0
+        self.total_seconds: float = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def mean_seconds(self) -> float:
+        """The mean duration in seconds."""
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Add a duration to the histogram.
+
+        Args:
+            seconds: The duration.
+
+        """
+        index: int = bisect.bisect_left(self.buckets, seconds)
+
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_seconds += seconds
+
+    def quantile(self, quantile: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls in.
+
+        Args:
+            quantile: The quantile between 0 and 1, e.g. 0.99.
+
+        Returns:
+            The bucket upper bound in seconds, infinity for the last bucket or\
+                0 if the histogram is empty.
+
+        """
+        rank: float = quantile * self.count
+        seen: int = 0
+
+        for index, count in enumerate(self.counts):
+            seen += count
+
+            if count and seen >= rank:
+                return (
+                    self.buckets[index] if index < len(self.buckets) else float("inf")
+                )
+
+        return 0.0
+
+
+class ToolPolicy:
+    """The concurrency limit, circuit breaker and latency histogram of a tool."""
+
+    def __init__(
+        self,
+        concurrency_limit: AdaptiveConcurrencyLimit | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        latency_histogram: LatencyHistogram | None = None,
+    ) -> None:
+        """Create a new policy. Calls are only timed if no limits are given.
+
+        Args:
+            concurrency_limit: The limit of concurrent calls of the tool.
+            circuit_breaker: The breaker failing calls fast when the tool fails.
+            latency_histogram: The histogram of call durations.
+
+        """
+        self.concurrency_limit: AdaptiveConcurrencyLimit | None = concurrency_limit
+        self.circuit_breaker: CircuitBreaker | None = circuit_breaker
+        self.latency_histogram: LatencyHistogram = (
+            latency_histogram or LatencyHistogram()
+        )
+
+    @contextmanager
+    def guard(self, name: str) -> Iterator[None]:
+        """Run a call of the tool within the limits of the policy.
+
+        Args:
+            name: The tool name, used in errors and counters.
+
+        Raises:
+            ToolUnavailableError: If the breaker is open or the limit is reached.
+
+        Yields:
+            Nothing. The call runs in the context.
+
+        """
+        self._admit(name)
+
+        if self.concurrency_limit is not None and not self.concurrency_limit.acquire(
+            self.concurrency_limit.max_wait_seconds
+        ):
+            self._reject_concurrency(name)
+
+        with self._timed():
+            yield
+
+    @asynccontextmanager
+    async def aguard(self, name: str) -> AsyncIterator[None]:
+        """Run a call of the tool from an event loop within the limits of the policy.
+
+        Args:
+            name: The tool name, used in errors and counters.
+
+        Raises:
+            ToolUnavailableError: If the breaker is open or the limit is reached.
+
+        Yields:
+            Nothing. The call runs in the context.
+
+        """
+        self._admit(name)
+        limit: AdaptiveConcurrencyLimit | None = self.concurrency_limit
+
+        if limit is not None and not (
+            limit.acquire()
+            or (limit.max_wait_seconds > 0 and await self._await_slot(limit))
+        ):
+            self._reject_concurrency(name)
+
+        with self._timed():
+            yield
+
+    async def _await_slot(self, limit: AdaptiveConcurrencyLimit) -> bool:
+        """Wait for a free slot in a thread without blocking the event loop.
+
+        Args:
+            limit: The concurrency limit to take a slot of.
+
+        Raises:
+            asyncio.CancelledError: If the call is cancelled while it waits. A\
+                slot the thread takes is freed again, even after it is taken.
+
+        Returns:
+            If a slot was taken.
+
+        """
+        # The thread cannot be stopped, so it and a cancelled caller agree under
+        # the lock on which of them frees a slot the caller no longer uses.
+        lock = threading.Lock()
+        acquired: bool = False
+        abandoned: bool = False
+
+        def acquire() -> bool:
+            nonlocal acquired
+            taken: bool = limit.acquire(limit.max_wait_seconds)
+
+            with lock:
+                if taken and abandoned:
+                    limit.release(0.0, cancelled=True)
+                    return False
+
+                acquired = taken
+
+            return taken
+
+        try:
+            return await asyncio.to_thread(acquire)
+        except asyncio.CancelledError:
+            with lock:
+                abandoned = True
+
+                if acquired:
+                    limit.release(0.0, cancelled=True)
+
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_cancelled()
+
+            raise
+
+    def _admit(self, name: str) -> None:
+        if self.circuit_breaker is None:
+            return
+
+        try:
+            self.circuit_breaker.allow()
+        except CircuitOpenError:
+            increment("tool_call.rejected", tool=name, reason="circuit_open")
+            raise
+
+    def _reject_concurrency(self, name: str) -> NoReturn:
+        increment("tool_call.rejected", tool=name, reason="concurrency_limit")
+
+        # A half open breaker admitted this call as its trial. Reopen it, so it
+        # admits a new trial after the reset timeout instead of none at all.
+        if (
+            self.circuit_breaker is not None
+            and self.circuit_breaker.state is CircuitState.HALF_OPEN
+        ):
+            self.circuit_breaker.record_failure()
+
+        raise ConcurrencyLimitError(
+            f"The tool is already running {self.concurrency_limit.limit} calls."  # type: ignore[union-attr]
+        )
+
+    @contextmanager
+    def _timed(self) -> Iterator[None]:
+        start: float = time.perf_counter()
+
+        try:
+            yield
+        except Exception:
+            self._record(time.perf_counter() - start, failed=True)
+            raise
+        except BaseException:
+            # Cancelled or interrupted, e.g. by a timeout of the caller, which
+            # says nothing about the tool, so only the slot is freed.
+            if self.concurrency_limit is not None:
+                self.concurrency_limit.release(
+                    time.perf_counter() - start, cancelled=True
+                )
+
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_cancelled()
+
+            raise
+
+        self._record(time.perf_counter() - start, failed=False)
+
+    def _record(self, latency: float, *, failed: bool) -> None:
+        self.latency_histogram.observe(latency)
+
+        if self.concurrency_limit is not None:
+            self.concurrency_limit.release(latency, failed=failed)
+
+        if self.circuit_breaker is not None:
+            if failed:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
@@ -0,0 +1,192 @@
+"""Run the call model, run tools and call again loop until the model answers."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
+
+from openai_function_calling.instrumentation import span
+from openai_function_calling.tool_executor import ToolCallResult, ToolExecutor
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable, Mapping
+
+    from openai.types.chat import ChatCompletionToolParam
+
+
+class ToolLoopResult(NamedTuple):
+    """The outcome of running a tool loop."""
+
+    messages: list[Any]
+    """The message history, which is the same list that was passed in."""
+
+    final_message: dict[str, Any]
+    """The last assistant message."""
+
+    iterations: int
+    """The number of requests made to the model."""
+
+    tool_calls: int
+    """The number of tool calls executed."""
+
+    completed: bool
+    """If the model answered without tool calls before the iteration limit."""
+
+
+class ToolLoop:
+    """Call the model, run its tool calls and call it again until it answers.
+
+    The message history is only ever appended to in place, so a round trip costs
+    one request and the new messages rather than a copy of the whole history.
+    Independent tool calls from a single response run concurrently.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        tools: ToolExecutor | Mapping[str, Callable] | Iterable[Callable],
+        *,
+        model: str,
+        max_iterations: int = 10,
+        tool_params: list[ChatCompletionToolParam] | None = None,
+        request_options: dict[str, Any] | None = None,
+    ) -> None:
+        """Create a new tool loop.
+
+        Args:
+            client: A client with a `chat.completions.create` method, such as the\
+                OpenAI or AsyncOpenAI clients. Responses may be objects or dicts.
+            tools: A tool executor, or callables to create one from.
+            model: The model to request.
+            max_iterations: The maximum number of requests made in a single run.
+            tool_params: The tool parameters to send. Defaults to the tool params\
+                of the executor, which are inferred once and shared.
+            request_options: Extra request parameters, e.g. temperature.
+
+        Raises:
+            ValueError: If the maximum number of iterations is not positive.
+
+        """
+        if max_iterations <= 0:
+            raise ValueError(
+                "Expected the maximum number of iterations to be positive."
+            )
+
+        self.client: Any = client
+        self.executor: ToolExecutor = (
+            tools if isinstance(tools, ToolExecutor) else ToolExecutor(tools)
+        )
+        self.model: str = model
+        self.max_iterations: int = max_iterations
+        self.tool_params: list[ChatCompletionToolParam] = (
+            tool_params if tool_params is not None else self.executor.tool_params
+        )
+        self.request_options: dict[str, Any] = request_options or {}
+
+    def run(self, messages: list[Any]) -> ToolLoopResult:
+        """Run the loop with a synchronous client.
+
+        Args:
+            messages: The message history. New messages are appended in place.
+
+        Returns:
+            The loop result.
+
+        """
+        iterations: int = 0
+        tool_calls: int = 0
+        message: dict[str, Any] = {}
+
+        with span("ToolLoop.run") as current_span:
+            while iterations < self.max_iterations:
+                iterations += 1
+                message = self._append_response(
+                    messages,
+                    self.client.chat.completions.create(**self._request(messages)),
+                )
+
+                if not message.get("tool_calls"):
+                    break
+
+                results: list[ToolCallResult] = self.executor.execute_tool_calls(
+                    message["tool_calls"]
+                )
+                tool_calls += len(results)
+                messages.extend(result.to_message() for result in results)
+
+            current_span.set_attribute("iterations", iterations)
+
+        return self._result(messages, message, iterations, tool_calls)
+
+    async def arun(self, messages: list[Any]) -> ToolLoopResult:
+        """Run the loop with an asynchronous client.
+
+        Args:
+            messages: The message history. New messages are appended in place.
+
+        Returns:
+            The loop result.
+
+        """
+        iterations: int = 0
+        tool_calls: int = 0
+        message: dict[str, Any] = {}
+
+        with span("ToolLoop.arun") as current_span:
+            while iterations < self.max_iterations:
+                iterations += 1
+                response: Any = await self.client.chat.completions.create(
+                    **self._request(messages)
+                )
+                message = self._append_response(messages, response)
+
+                if not message.get("tool_calls"):
+                    break
+
+                results: list[ToolCallResult] = await self.executor.aexecute_tool_calls(
+                    message["tool_calls"]
+                )
+                tool_calls += len(results)
+                messages.extend(result.to_message() for result in results)
+
+            current_span.set_attribute("iterations", iterations)
+
+        return self._result(messages, message, iterations, tool_calls)
+
+    def _request(self, messages: list[Any]) -> dict[str, Any]:
+        return {
+            **self.request_options,
+            "model": self.model,
+            "messages": messages,
+            "tools": self.tool_params,
+        }
+
+    @staticmethod
+    def _append_response(messages: list[Any], response: Any) -> dict[str, Any]:
+        """Append the assistant message of a response and return it as a dict."""
+        message: Any = (
+            response["choices"][0]["message"]
+            if isinstance(response, dict)
+            else response.choices[0].message
+        )
+
+        if not isinstance(message, dict):
+            message = message.model_dump(exclude_none=True)
+
+        messages.append(message)
+
+        return message
+
+    @staticmethod
+    def _result(
+        messages: list[Any],
+        message: dict[str, Any],
+        iterations: int,
+        tool_calls: int,
+    ) -> ToolLoopResult:
+        return ToolLoopResult(
+            messages=messages,
+            final_message=message,
+            iterations=iterations,
+            tool_calls=tool_calls,
+            completed=not message.get("tool_calls"),
+        )
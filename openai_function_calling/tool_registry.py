@@ -0,0 +1,341 @@
+"""Register tools with a decorator at import time and infer them when needed.
+
+The @tool decorator only records a reference to the callable, so importing
+modules with many tools stays fast. The function definition of a tool is
+inferred the first time it is requested, or ahead of time by a warmup that
+can run in a background thread. The OpenAI client library is only imported
+once tool params or an executor are requested.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, Callable, TypeVar, overload
+
+from openai_function_calling.function_inferrer import FunctionInferrer
+from openai_function_calling.helper_functions import callable_name
+from openai_function_calling.instrumentation import increment, span
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable
+
+    from openai.types.chat import ChatCompletionToolParam
+
+    from openai_function_calling.function import Function
+    from openai_function_calling.tool_executor import ToolExecutor
+
+_CallableT = TypeVar("_CallableT", bound="Callable[..., Any]")
+
+
+class RegisteredTool:
+    """A callable registered as a tool, with its definition inferred on first use."""
+
+    def __init__(
+        self,
+        function_reference: Callable,
+        *,
+        name: str | None = None,
+        description: str | None = None,
+        strict: bool | None = None,
+        cacheable: bool = False,
+    ) -> None:
+        """Create a new registered tool without inferring its definition.
+
+        Args:
+            function_reference: The callable to run for the tool.
+            name: The tool name. Defaults to the name of the callable, or of the\
+                wrapped function of a partial.
+            description: The tool description. Defaults to the description\
+                inferred from the docstring.
+            strict: If the function should enforce strict parameters.
+            cacheable: If the tool is free of side effects, so its results can be\
+                reused and it is safe to run more than once or speculatively.
+
+        """
+        self.function_reference: Callable = function_reference
+        self.name: str = name or callable_name(function_reference)
+        self.description: str | None = description
+        self.strict: bool | None = strict
+        self.cacheable: bool = cacheable
+        self._function: Function | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_inferred(self) -> bool:
+        """If the function definition was inferred already."""
+        return self._function is not None
+
+    @property
+    def function(self) -> Function:
+        """The function definition, inferred once on first use and shared."""
+        if self._function is None:
+            with self._lock:
+                if self._function is None:
+                    self._function = self._infer()
+
+        return self._function
+
+    def _infer(self) -> Function:
+        increment("tool_registry.inferred")
+        function: Function = FunctionInferrer.infer_from_function_reference(
+            self.function_reference
+        )
+        function.name = self.name
+
+        if self.description is not None:
+            function.description = self.description
+
+        if self.strict is not None:
+            function.strict = self.strict
+
+        return function
+
+
+class ToolRegistry:
+    """An ordered collection of tools registered with the @tool decorator.
+
+    Reads use an immutable snapshot of the tools without taking a lock. Adding
+    a tool only invalidates the snapshot, and the next read publishes a new
+    one, so registering many tools at import time copies the tools once.
+    """
+
+    def __init__(self) -> None:
+        """Create a new empty registry."""
+        self._tools: dict[str, RegisteredTool] = {}
+        self._snapshot: dict[str, RegisteredTool] | None = {}
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> list[str]:
+        """The names of the registered tools in registration order."""
+        return list(self._published())
+
+    def __len__(self) -> int:
+        """Get the number of registered tools."""
+        return len(self._published())
+
+    def __contains__(self, name: object) -> bool:
+        """Check if a tool is registered with the name."""
+        return name in self._published()
+
+    def add(self, registered_tool: RegisteredTool) -> None:
+        """Add a tool, replacing a tool of the same name.
+
+        Args:
+            registered_tool: The tool to add.
+
+        """
+        with self._lock:
+            self._tools[registered_tool.name] = registered_tool
+            self._snapshot = None
+
+    def get(self, name: str) -> RegisteredTool:
+        """Get a registered tool.
+
+        Args:
+            name: The tool name.
+
+        Raises:
+            ValueError: If no tool is registered with the name.
+
+        Returns:
+            The registered tool.
+
+        """
+        return self._get(self._published(), name)
+
+    def functions(self, names: Iterable[str] | None = None) -> list[Function]:
+        """Get the function definitions of tools, inferring those not inferred yet.
+
+        Args:
+            names: The names of the tools. Defaults to every registered tool.
+
+        Raises:
+            ValueError: If no tool is registered with a name.
+
+        Returns:
+            The function definitions. They are shared, so copy them before\
+                changes.
+
+        """
+        tools: dict[str, RegisteredTool] = self._published()
+
+        return [self._get(tools, name).function for name in self._names(tools, names)]
+
+    def tool_params(
+        self, names: Iterable[str] | None = None
+    ) -> list[ChatCompletionToolParam]:
+        """Get the tool params of tools, inferring those not inferred yet.
+
+        Args:
+            names: The names of the tools. Defaults to every registered tool.
+
+        Raises:
+            ValueError: If no tool is registered with a name.
+
+        Returns:
+            The OpenAI chat completion tool params.
+
+        """
+        from openai_function_calling.tool_helpers import ToolHelpers
+
+        return ToolHelpers.from_functions(self.functions(names))
+
+    def executor(
+        self, names: Iterable[str] | None = None, **kwargs: Any
+    ) -> ToolExecutor:
+        """Create a tool executor with registered tools.
+
+        Cacheable tools are registered as idempotent.
+
+        Args:
+            names: The names of the tools. Defaults to every registered tool.
+            kwargs: The keyword arguments of ToolExecutor.
+
+        Raises:
+            ValueError: If no tool is registered with a name.
+
+        Returns:
+            The tool executor.
+
+        """
+        from openai_function_calling.tool_executor import ToolExecutor
+
+        tools: dict[str, RegisteredTool] = self._published()
+        executor = ToolExecutor(**kwargs)
+
+        for name in self._names(tools, names):
+            registered_tool: RegisteredTool = self._get(tools, name)
+            executor.register(
+                registered_tool.function_reference,
+                name=name,
+                function=registered_tool.function,
+                idempotent=registered_tool.cacheable,
+            )
+
+        return executor
+
+    def warmup(self, *, background: bool = False) -> threading.Thread | None:
+        """Infer the function definitions of every tool not inferred yet.
+
+        Args:
+            background: If inference should run in a daemon thread, so startup\
+                continues while it runs. Tools requested meanwhile are inferred\
+                by whichever thread gets to them first.
+
+        Returns:
+            The started thread to join if running in the background, else None.
+
+        """
+        if not background:
+            self._warmup()
+            return None
+
+        thread = threading.Thread(
+            target=self._warmup, name="tool-registry-warmup", daemon=True
+        )
+        thread.start()
+
+        return thread
+
+    def _warmup(self) -> None:
+        registered_tools: list[RegisteredTool] = list(self._published().values())
+
+        with span("ToolRegistry.warmup", tool_count=len(registered_tools)):
+            for registered_tool in registered_tools:
+                registered_tool.function  # noqa: B018
+
+    def _published(self) -> dict[str, RegisteredTool]:
+        """Get the current snapshot of the tools, publishing one if needed.
+
+        Returns:
+            The tools by name. The dict is never changed, so do not change it.
+
+        """
+        snapshot: dict[str, RegisteredTool] | None = self._snapshot
+
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshot
+
+                if snapshot is None:
+                    snapshot = self._snapshot = dict(self._tools)
+
+        return snapshot
+
+    @staticmethod
+    def _get(tools: dict[str, RegisteredTool], name: str) -> RegisteredTool:
+        try:
+            return tools[name]
+        except KeyError:
+            raise ValueError(f"Unknown tool '{name}'.") from None
+
+    @staticmethod
+    def _names(
+        tools: dict[str, RegisteredTool], names: Iterable[str] | None
+    ) -> Iterable[str]:
+        return tools if names is None else names
+
+
+default_registry: ToolRegistry = ToolRegistry()
+"""The registry the @tool decorator adds tools to by default."""
+
+
+@overload
+def tool(function_reference: _CallableT, /) -> _CallableT: ...
+
+
+@overload
+def tool(
+    *,
+    name: str | None = None,
+    description: str | None = None,
+    strict: bool | None = None,
+    cacheable: bool = False,
+    registry: ToolRegistry | None = None,
+) -> Callable[[_CallableT], _CallableT]: ...
+
+
+def tool(
+    function_reference: Callable | None = None,
+    /,
+    *,
+    name: str | None = None,
+    description: str | None = None,
+    strict: bool | None = None,
+    cacheable: bool = False,
+    registry: ToolRegistry | None = None,
+) -> Any:
+    """Register a callable as a tool without inferring its definition yet.
+
+    Use it bare, as @tool, or with options, as @tool(name="...").
+
+    Args:
+        function_reference: The callable, when used without options.
+        name: The tool name. Defaults to the name of the callable.
+        description: The tool description. Defaults to the description inferred\
+            from the docstring.
+        strict: If the function should enforce strict parameters.
+        cacheable: If the tool is free of side effects, so its results can be\
+            reused and it is safe to run more than once or speculatively.
+        registry: The registry to add the tool to. Defaults to default_registry.
+
+    Returns:
+        The callable unchanged, or a decorator that registers it.
+
+    """
+
+    def decorator(decorated: _CallableT) -> _CallableT:
+        (default_registry if registry is None else registry).add(
+            RegisteredTool(
+                decorated,
+                name=name,
+                description=description,
+                strict=strict,
+                cacheable=cacheable,
+            )
+        )
+
+        return decorated
+
+    return decorator if function_reference is None else decorator(function_reference)
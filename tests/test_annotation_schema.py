@@ -0,0 +1,188 @@
+"""Test mapping annotations to compact JSON schemas."""
+
+import json
+from enum import Enum
+from typing import Any, Dict, List, Literal, Optional, Union  # noqa: UP035
+
+import pytest
+
+from openai_function_calling import Function, FunctionInferrer, annotation_schema
+from openai_function_calling.annotation_schema import annotation_to_json_schema
+from openai_function_calling.strict_schema import to_strict_function_schema
+
+
+class Color(Enum):
+    RED = "red"
+    GREEN = "green"
+
+
+class Unsupported:
+    pass
+
+
+def paint(
+    color: Literal["red", "green"],
+    finish: Optional[Literal["matte", "gloss"]],  # noqa: FA100
+    coats: Union[int, Literal["auto"], None] = None,  # noqa: FA100
+) -> None:
+    """Paint a wall.
+
+    Args:
+        color: The paint color.
+        finish: The paint finish.
+        coats: The number of coats.
+
+    """
+
+
+@pytest.mark.parametrize(
+    ("annotation", "expected_schema"),
+    [
+        (Optional[int], {"type": ["integer", "null"]}),
+        (Literal["a", "b"], {"type": "string", "enum": ["a", "b"]}),
+        (Literal[1, "x"], {"type": ["integer", "string"], "enum": [1, "x"]}),
+        (
+            Union[Literal["a"], Literal["b"], None],  # noqa: PYI030
+            {"type": ["string", "null"], "enum": ["a", "b", None]},
+        ),
+        (Union[Literal["a"], str], {"type": "string"}),  # noqa: PYI051
+        (Union[int, str, None], {"type": ["integer", "string", "null"]}),
+        (
+            Union[List[int], str, None],  # noqa: UP006
+            {"type": ["array", "string", "null"], "items": {"type": "integer"}},
+        ),
+        (Union[Dict[str, int], bool], {"type": ["object", "boolean"]}),  # noqa: UP006
+        (
+            Union[Literal["a", "b"], int],
+            {"anyOf": [{"type": "string", "enum": ["a", "b"]}, {"type": "integer"}]},
+        ),
+        (
+            Union[List[int], List[str], None],  # noqa: UP006
+            {
+                "anyOf": [
+                    {"type": "array", "items": {"type": "integer"}},
+                    {"type": "array", "items": {"type": "string"}},
+                    {"type": "null"},
+                ]
+            },
+        ),
+        (
+            Optional[Color],
+            {"type": ["string", "null"], "enum": ["red", "green", None]},
+        ),
+        (Literal[None], {"type": "null"}),
+        (Optional[Unsupported], {"type": "null"}),
+        (Any, {"type": "null"}),
+    ],
+)
+def test_annotation_to_json_schema(annotation: object, expected_schema: dict) -> None:
+    assert annotation_to_json_schema(annotation) == expected_schema
+
+
+def test_annotation_to_json_schema_is_memoized() -> None:
+    annotation: object = Union[int, Literal["auto"], None]
+
+    assert annotation_to_json_schema(annotation) is annotation_to_json_schema(
+        annotation
+    )
+
+
+def test_memoized_annotations_are_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(annotation_schema, "_SCHEMAS", {})
+    monkeypatch.setattr(annotation_schema, "_SCHEMAS_MAX_SIZE", 2)
+
+    for value in ("a", "b", "c"):
+        annotation_to_json_schema(Literal[value])
+
+    assert list(annotation_schema._SCHEMAS) == [Literal["b"], Literal["c"]]  # noqa: SLF001
+
+
+def test_unhashable_literals_are_mapped_without_memoizing() -> None:
+    annotation: object = Literal[1, 2]
+    annotation.__hash__ = None  # type: ignore[attr-defined]
+
+    assert annotation_to_json_schema(Literal[1, 2]) == {
+        "type": "integer",
+        "enum": [1, 2],
+    }
+
+
+def test_lists_in_unions_need_an_item_type() -> None:
+    with pytest.raises(ValueError, match="item type"):
+        annotation_to_json_schema(Optional[list])
+
+
+def test_inferred_union_parameters_are_smaller_than_one_branch_per_member() -> None:
+    function: Function = FunctionInferrer.infer_from_function_reference(paint)
+    properties: dict = function.to_json_schema()["parameters"]["properties"]
+
+    assert properties == {
+        "color": {
+            "type": "string",
+            "description": "The paint color.",
+            "enum": ["red", "green"],
+        },
+        "finish": {
+            "type": ["string", "null"],
+            "description": "The paint finish.",
+            "enum": ["matte", "gloss", None],
+        },
+        "coats": {
+            "anyOf": [
+                {"type": "integer"},
+                {"type": "string", "enum": ["auto"]},
+                {"type": "null"},
+            ],
+            "description": "The number of coats.",
+        },
+    }
+    assert sorted(function.required_parameters) == ["color", "finish"]
+
+    # One anyOf branch per member, as a direct translation of the annotations.
+    one_branch_per_member: dict = {
+        "color": {
+            "anyOf": [
+                {"type": "string", "enum": ["red"]},
+                {"type": "string", "enum": ["green"]},
+            ]
+        },
+        "finish": {
+            "anyOf": [
+                {"type": "string", "enum": ["matte"]},
+                {"type": "string", "enum": ["gloss"]},
+                {"type": "null"},
+            ]
+        },
+        "coats": {
+            "anyOf": [
+                {"type": "integer"},
+                {"type": "string", "enum": ["auto"]},
+                {"type": "null"},
+            ]
+        },
+    }
+    sizes: dict[str, tuple[int, int]] = {
+        name: (
+            len(json.dumps(schema)),
+            len(
+                json.dumps(
+                    {
+                        key: value
+                        for key, value in properties[name].items()
+                        if key != "description"
+                    }
+                )
+            ),
+        )
+        for name, schema in one_branch_per_member.items()
+    }
+
+    assert sizes["color"][1] < sizes["color"][0]
+    assert sizes["finish"][1] < sizes["finish"][0]
+    assert sizes["coats"][1] == sizes["coats"][0]
+
+    strict_schema = to_strict_function_schema(function.to_json_schema())
+
+    assert strict_schema["parameters"]["properties"]["coats"]["anyOf"][2] == {
+        "type": "null"
+    }
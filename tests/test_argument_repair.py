@@ -0,0 +1,238 @@
+"""Test the repair of malformed tool call arguments."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from openai_function_calling import Function, Parameter
+from openai_function_calling.argument_repair import (
+    ArgumentRepair,
+    RepairedArguments,
+    RepairKind,
+    repair_arguments,
+)
+from openai_function_calling.instrumentation import (
+    MetricsCollector,
+    add_hook,
+    remove_hook,
+)
+from openai_function_calling.tool_executor import ToolCallError, ToolExecutor
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+CORPUS_PATH: Path = Path(__file__).parent / "data" / "malformed_tool_arguments.jsonl"
+CORPUS: list[dict[str, Any]] = [
+    json.loads(line) for line in CORPUS_PATH.read_text().splitlines()
+]
+
+SEARCH_FLIGHTS = Function(
+    name="search_flights",
+    description="Search for flights.",
+    parameters=[
+        Parameter("origin", "string"),
+        Parameter("destination", "string"),
+        Parameter("passengers", "integer"),
+        Parameter("cabin", "string", enum=["economy", "business", "first"]),
+        Parameter("nonstop", "boolean"),
+        Parameter("max_price", "number"),
+        Parameter("dates", "array", array_item_type="string"),
+        Parameter("notes", "string"),
+    ],
+    required_parameters=["origin", "destination"],
+)
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=[case["name"] for case in CORPUS])
+def test_repairs_corpus(case: dict[str, Any]) -> None:
+    repaired: RepairedArguments = repair_arguments(case["arguments"], SEARCH_FLIGHTS)
+
+    assert repaired.arguments == case["expected"]
+    assert [repair.kind.value for repair in repaired.repairs] == case["repairs"]
+
+
+def test_corpus_repair_rate() -> None:
+    strict: int = 0
+    repaired: int = 0
+
+    for case in CORPUS:
+        with contextlib.suppress(json.JSONDecodeError):
+            strict += json.loads(case["arguments"]) == case["expected"]
+
+        repaired += (
+            repair_arguments(case["arguments"], SEARCH_FLIGHTS).arguments
+            == case["expected"]
+        )
+
+    assert strict < len(CORPUS) // 2
+    assert repaired == len(CORPUS)
+
+
+def test_valid_arguments_are_not_repaired() -> None:
+    repaired: RepairedArguments = repair_arguments(
+        '{"origin": "SFO", "destination": "JFK", "passengers": 2}', SEARCH_FLIGHTS
+    )
+
+    assert repaired == RepairedArguments(
+        {"origin": "SFO", "destination": "JFK", "passengers": 2}, ()
+    )
+    assert not repaired.repaired
+
+
+def test_empty_arguments_decode_to_empty_object() -> None:
+    assert repair_arguments("  ") == RepairedArguments({}, ())
+
+
+def test_repair_reports_details() -> None:
+    repaired: RepairedArguments = repair_arguments(
+        '{"origin": "SFO", "passengers": "2",}', SEARCH_FLIGHTS
+    )
+
+    assert repaired.repaired
+    assert repaired.repairs == (
+        ArgumentRepair(RepairKind.TRAILING_COMMA, "at position 36"),
+        ArgumentRepair(RepairKind.COERCED_TYPE, "'passengers': '2' -> 2"),
+    )
+
+
+@pytest.mark.parametrize(
+    ("arguments", "expected", "kinds"),
+    [
+        ('{"a": 1,, "b": 2}', {"a": 1, "b": 2}, [RepairKind.TRAILING_COMMA]),
+        ('{"a": [1]]}', {"a": [1]}, [RepairKind.SURROUNDING_TEXT]),
+        ("{'a': 'say \"hi\"'}", {"a": 'say "hi"'}, [RepairKind.SINGLE_QUOTES]),
+        ('{"a": "x\\ny", "b": true,}', {"a": "x\ny", "b": True}, ["trailing_comma"]),
+        ('{"unit": deg celsius}', {"unit": "deg celsius"}, ["unquoted_string"]),
+        ('{"unit": xyz', {"unit": "xyz"}, ["unquoted_string", "unclosed_brackets"]),
+    ],
+)
+def test_repairs(arguments: str, expected: dict[str, Any], kinds: list[str]) -> None:
+    repaired: RepairedArguments = repair_arguments(arguments)
+
+    assert repaired.arguments == expected
+    assert [repair.kind for repair in repaired.repairs] == kinds
+
+
+def test_stringified_integer_for_number_is_coerced() -> None:
+    assert repair_arguments('{"max_price": "450"}', SEARCH_FLIGHTS).arguments == {
+        "max_price": 450
+    }
+
+
+@pytest.mark.parametrize(
+    ("arguments", "expected"),
+    [
+        ('{"days": "5"}', {"days": 5}),
+        ('{"days": null}', {"days": None}),
+        ('{"days": "soon"}', {"days": "soon"}),
+        ('{"limit": "10"}', {"limit": "10"}),
+        ('{"limit": 10}', {"limit": 10}),
+        ('{"exact": "true"}', {"exact": True}),
+        ('{"tags": "[\\"a\\"]"}', {"tags": ["a"]}),
+        ('{"tags": ["1", 2]}', {"tags": ["1", "2"]}),
+    ],
+)
+def test_values_of_nullable_and_union_types_are_coerced(
+    arguments: str, expected: dict[str, Any]
+) -> None:
+    function = Function(
+        name="search",
+        description="Search.",
+        parameters=[
+            Parameter("days", ["integer", "null"]),
+            Parameter("limit", ["integer", "string"]),
+            Parameter("exact", ["boolean", "null"]),
+            Parameter("tags", ["array", "null"], array_item_type="string"),
+        ],
+    )
+
+    assert repair_arguments(arguments, function).arguments == expected
+
+
+def test_values_are_not_coerced_without_function() -> None:
+    assert repair_arguments('{"passengers": "2"}').arguments == {"passengers": "2"}
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        '{"passengers": "two"}',
+        '{"max_price": "NaN"}',
+        '{"max_price": "cheap"}',
+        '{"dates": "2024-05-01"}',
+        '{"dates": "{}"}',
+        '{"cabin": "premium"}',
+        '{"nonstop": "maybe"}',
+        '{"max_price": 1.5}',
+    ],
+)
+def test_values_that_cannot_be_coerced_are_kept(arguments: str) -> None:
+    repaired: RepairedArguments = repair_arguments(arguments, SEARCH_FLIGHTS)
+
+    assert repaired == RepairedArguments(json.loads(arguments), ())
+
+
+@pytest.mark.parametrize(
+    ("arguments", "message"),
+    [
+        ("no arguments", "no JSON object"),
+        ("[1, 2]", "Expected tool call arguments to be a JSON object."),
+        ('{"origin": @}', "unexpected character '@'"),
+        ('{"origin": "SFO", 1}', "Could not repair tool call arguments"),
+        ("{:", "expected a key before ':' at position 1"),
+        ('{"origin": "SFO", : 1', "expected a key before ':' at position 18"),
+        ('[{"origin"::', "expected a key before ':' at position 11"),
+    ],
+)
+def test_unrepairable_arguments_raise(arguments: str, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        repair_arguments(arguments, SEARCH_FLIGHTS)
+
+
+@pytest.fixture
+def collector() -> Iterator[MetricsCollector]:
+    metrics_collector = MetricsCollector()
+    add_hook(metrics_collector)
+    yield metrics_collector
+    remove_hook(metrics_collector)
+
+
+def search_flights(origin: str, destination: str, passengers: int = 1) -> str:
+    """Search for flights."""
+    return f"{passengers} x {origin}-{destination}"
+
+
+def test_executor_repairs_arguments(collector: MetricsCollector) -> None:
+    executor = ToolExecutor([search_flights], repair_arguments=True)
+
+    result: Any = executor.execute(
+        "search_flights", "{'origin': 'SFO', 'destination': 'JFK', 'passengers': '2'"
+    )
+
+    assert result == "2 x SFO-JFK"
+    assert collector.counters["tool_call.arguments_repaired"] == 3
+
+
+def test_executor_repairs_without_function_of_unknown_tool() -> None:
+    executor = ToolExecutor(repair_arguments=True)
+
+    assert executor.decode_arguments("unknown", '{"a": "1",}') == {"a": "1"}
+
+
+def test_executor_wraps_repair_errors() -> None:
+    executor = ToolExecutor([search_flights], repair_arguments=True)
+
+    with pytest.raises(ToolCallError, match="Invalid tool call arguments"):
+        executor.decode_arguments("search_flights", "nothing to see")
+
+
+def test_executor_does_not_repair_by_default() -> None:
+    executor = ToolExecutor([search_flights])
+
+    with pytest.raises(ToolCallError, match="Invalid tool call arguments"):
+        executor.decode_arguments("search_flights", '{"origin": "SFO",}')
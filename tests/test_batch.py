@@ -0,0 +1,343 @@
+"""Test the Batch API helpers."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from openai_function_calling.batch import (
+    BatchProcessingStats,
+    BatchRequestWriter,
+    BatchResultProcessor,
+)
+from openai_function_calling.function import Function
+from openai_function_calling.function_inferrer import FunctionInferrer
+from openai_function_calling.tool_executor import ToolExecutor
+from openai_function_calling.tool_helpers import ToolHelpers
+
+
+def get_current_weather(location: str, unit: str) -> str:
+    """Get the current weather and return a summary."""
+    return f"It is currently sunny in {location} and 75 degrees {unit}."
+
+
+get_current_weather_function: Function = FunctionInferrer.infer_from_function_reference(
+    get_current_weather
+)
+
+
+def _messages(index: int) -> list[dict]:
+    return [{"role": "user", "content": f"What's the weather in city {index}?"}]
+
+
+def _read_lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_write_creates_valid_batch_request_lines(tmp_path: Path) -> None:
+    writer = BatchRequestWriter.from_functions(
+        tmp_path / "batch.jsonl",
+        [get_current_weather_function],
+        "gpt-4o-mini",
+        request_options={"temperature": 0},
+    )
+
+    paths: list[Path] = writer.write(_messages(i) for i in range(3))
+    lines: list[dict] = _read_lines(paths[0])
+
+    assert paths == [tmp_path / "batch-00000.jsonl"]
+    assert len(lines) == 3
+    assert lines[0] == {
+        "custom_id": "request-0",
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": "gpt-4o-mini",
+            "temperature": 0,
+            "messages": _messages(0),
+            "tools": ToolHelpers.from_functions([get_current_weather_function]),
+        },
+    }
+
+
+def test_write_uses_given_custom_ids(tmp_path: Path) -> None:
+    writer = BatchRequestWriter(tmp_path / "batch.jsonl", [], "gpt-4o-mini")
+
+    paths: list[Path] = writer.write([("first", _messages(0))])
+
+    assert _read_lines(paths[0])[0]["custom_id"] == "first"
+
+
+def test_write_splits_files_by_line_limit(tmp_path: Path) -> None:
+    writer = BatchRequestWriter(
+        tmp_path / "batch.jsonl", [], "gpt-4o-mini", max_lines_per_file=2
+    )
+
+    paths: list[Path] = writer.write(_messages(i) for i in range(5))
+
+    assert [len(_read_lines(path)) for path in paths] == [2, 2, 1]
+    assert paths[2].name == "batch-00002.jsonl"
+
+
+def test_write_splits_files_by_size_limit(tmp_path: Path) -> None:
+    writer = BatchRequestWriter(tmp_path / "batch.jsonl", [], "gpt-4o-mini")
+    line_size: int = len(writer.format_line("request-0", _messages(0)))
+    writer.max_bytes_per_file = line_size * 2 + 1
+
+    paths: list[Path] = writer.write(_messages(i) for i in range(3))
+
+    assert len(paths) == 2
+    assert all(path.stat().st_size <= writer.max_bytes_per_file for path in paths)
+
+
+def test_write_raises_for_line_larger_than_file_limit(tmp_path: Path) -> None:
+    writer = BatchRequestWriter(
+        tmp_path / "batch.jsonl", [], "gpt-4o-mini", max_bytes_per_file=10
+    )
+
+    with pytest.raises(ValueError, match="larger than the file size limit"):
+        writer.write([_messages(0)])
+
+
+def test_write_without_requests_creates_no_files(tmp_path: Path) -> None:
+    writer = BatchRequestWriter(tmp_path / "batch.jsonl", [], "gpt-4o-mini")
+
+    assert writer.write([]) == []
+
+
+def test_writer_rejects_non_positive_limits(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="file limits to be positive"):
+        BatchRequestWriter(
+            tmp_path / "batch.jsonl", [], "gpt-4o-mini", max_lines_per_file=0
+        )
+
+
+def get_forecast(days: int) -> list[int]:
+    """Get the forecast temperatures."""
+    return [75] * days
+
+
+def _result_line(custom_id: str, tool_calls: list[dict], status_code: int = 200) -> str:
+    return json.dumps(
+        {
+            "id": f"batch_req_{custom_id}",
+            "custom_id": custom_id,
+            "response": {
+                "status_code": status_code,
+                "body": {
+                    "choices": [
+                        {"message": {"role": "assistant", "tool_calls": tool_calls}}
+                    ]
+                },
+            },
+            "error": None,
+        }
+    )
+
+
+def _forecast_call(tool_call_id: str, days: int) -> dict:
+    return {
+        "id": tool_call_id,
+        "type": "function",
+        "function": {"name": "get_forecast", "arguments": json.dumps({"days": days})},
+    }
+
+
+def _write_results(path: Path, count: int) -> None:
+    path.write_text(
+        "\n".join(
+            _result_line(f"request-{i}", [_forecast_call(f"call_{i}", 1)])
+            for i in range(count)
+        )
+        + "\n"
+    )
+
+
+def test_process_executes_tool_calls_and_writes_results(tmp_path: Path) -> None:
+    input_path: Path = tmp_path / "results.jsonl"
+    output_path: Path = tmp_path / "output.jsonl"
+    input_path.write_text(
+        "\n".join(
+            [
+                _result_line(
+                    "request-0",
+                    [_forecast_call("call_0", 1), _forecast_call("call_1", 2)],
+                ),
+                _result_line("request-1", [], status_code=500),
+                json.dumps({"custom_id": "request-2", "error": {"code": "failed"}}),
+                "",
+                "{invalid",
+                _result_line(
+                    "request-3",
+                    [
+                        {
+                            "id": "call_3",
+                            "function": {"name": "missing", "arguments": ""},
+                        }
+                    ],
+                ),
+            ]
+        )
+    )
+
+    stats: BatchProcessingStats = BatchResultProcessor(
+        ToolExecutor([get_forecast]), chunk_size=2
+    ).process(input_path, output_path)
+    lines: list[dict] = _read_lines(output_path)
+
+    assert stats.lines == 6
+    assert stats.tool_calls == 3
+    assert stats.errors == 4
+    assert stats.lines_per_second > 0
+    assert lines[0] == {
+        "custom_id": "request-0",
+        "tool_call_id": "call_0",
+        "name": "get_forecast",
+        "content": "[75]",
+        "is_error": False,
+    }
+    assert lines[1]["content"] == "[75, 75]"
+    assert lines[2] == {
+        "custom_id": "request-1",
+        "error": "Request failed with status 500.",
+    }
+    assert lines[3] == {"custom_id": "request-2", "error": '{"code": "failed"}'}
+    assert lines[4]["error"].startswith("Invalid output line")
+    assert lines[5]["is_error"] is True
+    assert not (tmp_path / "output.jsonl.checkpoint").exists()
+
+
+def test_process_maps_malformed_result_lines_to_errors(tmp_path: Path) -> None:
+    input_path: Path = tmp_path / "results.jsonl"
+    output_path: Path = tmp_path / "output.jsonl"
+    input_path.write_text(
+        "\n".join(
+            json.dumps(line)
+            for line in [
+                {"custom_id": "no-body", "response": {"status_code": 200}},
+                {
+                    "custom_id": "no-message",
+                    "response": {"status_code": 200, "body": {"choices": [{}]}},
+                },
+                {"custom_id": "no-status", "response": {"body": {}}},
+                {"custom_id": "not-an-object", "response": []},
+                ["not", "an", "object"],
+            ]
+        )
+        + "\n"
+        + _result_line("request-5", [_forecast_call("call_5", 1)])
+    )
+
+    stats: BatchProcessingStats = BatchResultProcessor(
+        ToolExecutor([get_forecast])
+    ).process(input_path, output_path)
+    lines: list[dict] = _read_lines(output_path)
+
+    assert stats.errors == 5
+    assert [line["custom_id"] for line in lines] == [
+        "no-body",
+        "no-message",
+        "no-status",
+        "not-an-object",
+        "",
+        "request-5",
+    ]
+    assert all(line["error"].startswith("Invalid output line") for line in lines[:2])
+    assert lines[2]["error"] == "Request failed with status None."
+    assert lines[3]["error"] == "Invalid output line: expected a response object."
+    assert lines[4]["error"] == "Invalid output line: expected a JSON object."
+    assert lines[5]["content"] == "[75]"
+
+
+def test_process_maps_malformed_tool_calls_to_errors(tmp_path: Path) -> None:
+    input_path: Path = tmp_path / "results.jsonl"
+    output_path: Path = tmp_path / "output.jsonl"
+    input_path.write_text(
+        _result_line(
+            "request-0",
+            [
+                _forecast_call("call_0", 1),
+                {"id": "call_1"},
+                {"id": "call_2", "function": {"name": "get_forecast", "arguments": 1}},
+                "not-a-tool-call",
+            ],
+        )
+        + "\n"
+        + json.dumps(
+            {
+                "custom_id": "request-1",
+                "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"message": {"tool_calls": {"id": "x"}}}]},
+                },
+            }
+        )
+    )
+
+    stats: BatchProcessingStats = BatchResultProcessor(
+        ToolExecutor([get_forecast])
+    ).process(input_path, output_path)
+    lines: list[dict] = _read_lines(output_path)
+
+    assert stats.tool_calls == 1
+    assert stats.errors == 4
+    assert lines[0]["content"] == "[75]"
+    assert lines[1] == {
+        "custom_id": "request-0",
+        "error": "Invalid tool call: expected a function with a name.",
+    }
+    assert lines[2]["error"] == (
+        "Invalid tool call: expected the arguments to be a string or object."
+    )
+    assert lines[3]["error"] == "Invalid tool call: expected a function with a name."
+    assert lines[4] == {
+        "custom_id": "request-1",
+        "error": "Invalid output line: expected the tool calls to be a list.",
+    }
+
+
+def test_process_resumes_from_checkpoint_after_crash(tmp_path: Path) -> None:
+    input_path: Path = tmp_path / "results.jsonl"
+    output_path: Path = tmp_path / "output.jsonl"
+    checkpoint_path: Path = tmp_path / "progress.json"
+    _write_results(input_path, 5)
+    calls: list[int] = []
+
+    def crashing_forecast(days: int) -> list[int]:
+        calls.append(days)
+
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+
+        return [75] * days
+
+    crashing_processor = BatchResultProcessor(
+        ToolExecutor({"get_forecast": crashing_forecast}), max_workers=1, chunk_size=2
+    )
+
+    with pytest.raises(KeyboardInterrupt):
+        crashing_processor.process(
+            input_path, output_path, checkpoint_path=checkpoint_path
+        )
+
+    assert len(_read_lines(output_path)) == 2
+    assert checkpoint_path.exists()
+
+    stats: BatchProcessingStats = BatchResultProcessor(
+        ToolExecutor([get_forecast]), chunk_size=2
+    ).process(input_path, output_path, checkpoint_path=checkpoint_path)
+
+    assert stats.lines == 3
+    assert [line["custom_id"] for line in _read_lines(output_path)] == [
+        f"request-{i}" for i in range(5)
+    ]
+    assert not checkpoint_path.exists()
+
+
+def test_processor_rejects_non_positive_chunk_size() -> None:
+    with pytest.raises(ValueError, match="chunk size to be positive"):
+        BatchResultProcessor(ToolExecutor(), chunk_size=0)
+
+
+def test_processing_stats_with_no_elapsed_time_has_zero_throughput() -> None:
+    assert BatchProcessingStats(0, 0, 0, 0.0).lines_per_second == 0.0
@@ -0,0 +1,202 @@
+"""Test the docstring parsing backends."""
+
+import pytest
+from docstring_parser import parser
+
+from openai_function_calling.docstring_parsing import (
+    DocstringBackend,
+    ParsedDocstring,
+    ParsedParameter,
+    clear_docstring_cache,
+    parse_docstring,
+)
+
+GOOGLE_DOCSTRING = """Sum two values.
+
+    A longer description
+    of the function.
+
+    Args:
+        a (int): The first
+            value to sum.
+        b: The second value to sum.
+        c (str, optional): An optional value. Defaults to "x".
+        *args: Extra values.
+        d:
+
+    Returns:
+        The sum of the two values.
+
+    """
+
+NUMPY_DOCSTRING = """Sum two values.
+
+    Parameters
+    ----------
+    a : int
+        The first
+        value to sum.
+    b : str, optional
+    c
+        The third value.
+
+    Returns
+    -------
+    int
+        The sum.
+
+    """
+
+SAMPLE_DOCSTRINGS: list[str] = [
+    GOOGLE_DOCSTRING,
+    NUMPY_DOCSTRING,
+    "Only a short description.",
+    """
+    Description on the second line
+    continuing here.
+    """,
+    """Sum.
+
+    Args:
+        a: The first.
+
+            Extra paragraph.
+        b: The second.
+
+    Raises:
+        ValueError: If something is wrong.
+
+    """,
+]
+
+
+def _comparable(parsed: ParsedDocstring) -> tuple:
+    return (parsed.short_description, parsed.params)
+
+
+@pytest.mark.parametrize("docstring", SAMPLE_DOCSTRINGS)
+def test_native_backend_matches_docstring_parser(docstring: str) -> None:
+    native: ParsedDocstring = parse_docstring(docstring, DocstringBackend.NATIVE)
+    reference: ParsedDocstring = parse_docstring(
+        docstring, DocstringBackend.DOCSTRING_PARSER
+    )
+
+    assert _comparable(native) == _comparable(reference)
+
+
+def test_native_backend_parses_google_parameters() -> None:
+    parsed: ParsedDocstring = parse_docstring(GOOGLE_DOCSTRING, "native")
+
+    assert parsed.short_description == "Sum two values."
+    assert parsed.long_description == "A longer description\nof the function."
+    assert parsed.params[0] == ParsedParameter("a", "int", "The first\nvalue to sum.")
+    assert parsed.params[2] == ParsedParameter(
+        "c", "str", 'An optional value. Defaults to "x".'
+    )
+    assert parsed.params[3].name == "*args"
+
+
+def test_native_backend_parses_numpy_parameters() -> None:
+    parsed: ParsedDocstring = parse_docstring(NUMPY_DOCSTRING, "native")
+
+    assert parsed.params == (
+        ParsedParameter("a", "int", "The first\nvalue to sum."),
+        ParsedParameter("b", "str", None),
+        ParsedParameter("c", None, "The third value."),
+    )
+
+
+def test_auto_backend_falls_back_for_rest_style() -> None:
+    docstring = """Do something.
+
+    :param a: The first value.
+    :type a: int
+    """
+
+    parsed: ParsedDocstring = parse_docstring(docstring, DocstringBackend.AUTO)
+    reference = parser.parse(docstring)
+
+    assert parsed.params == (ParsedParameter("a", "int", "The first value."),)
+    assert parsed.params[0].name == reference.params[0].arg_name
+
+
+def test_auto_backend_falls_back_for_mixed_styles() -> None:
+    docstring = """Do something.
+
+    Args:
+        a: The first value.
+
+    Returns
+    -------
+    int
+        A value.
+    """
+
+    parsed: ParsedDocstring = parse_docstring(docstring, DocstringBackend.AUTO)
+    native: ParsedDocstring = parse_docstring(docstring, DocstringBackend.NATIVE)
+
+    assert parsed.params == _parse_with_reference(docstring)
+    assert native.params == (ParsedParameter("a", None, "The first value."),)
+
+
+def test_auto_backend_falls_back_for_unrecognized_parameter_lines() -> None:
+    docstring = """Do something.
+
+    Args:
+        not a parameter line
+    """
+
+    native: ParsedDocstring = parse_docstring(docstring, DocstringBackend.NATIVE)
+    parsed: ParsedDocstring = parse_docstring(docstring, DocstringBackend.AUTO)
+
+    assert native.params == ()
+    assert parsed.params == _parse_with_reference(docstring)
+
+
+def test_native_backend_skips_unrecognized_entries_and_continuations() -> None:
+    docstring = """Do something.
+
+    Args:
+        not a parameter line
+            orphaned continuation
+        a: The first value.
+    """
+
+    assert parse_docstring(docstring, "native").params == (
+        ParsedParameter("a", None, "The first value."),
+    )
+
+
+def test_parse_docstring_memoizes_results() -> None:
+    clear_docstring_cache()
+
+    first: ParsedDocstring = parse_docstring(GOOGLE_DOCSTRING)
+    second: ParsedDocstring = parse_docstring(GOOGLE_DOCSTRING)
+
+    assert first is second
+
+
+def test_parse_docstring_evicts_oldest_entry_when_full(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    clear_docstring_cache()
+    monkeypatch.setattr(
+        "openai_function_calling.docstring_parsing._PARSE_CACHE_MAX_SIZE", 1
+    )
+
+    first: ParsedDocstring = parse_docstring("First.")
+    parse_docstring("Second.")
+
+    assert parse_docstring("First.") is not first
+
+
+def test_parse_docstring_rejects_unknown_backend() -> None:
+    with pytest.raises(ValueError, match="is not a valid DocstringBackend"):
+        parse_docstring("Docstring.", "unknown")
+
+
+def _parse_with_reference(docstring: str) -> tuple[ParsedParameter, ...]:
+    return tuple(
+        ParsedParameter(p.arg_name, p.type_name, p.description)
+        for p in parser.parse(docstring).params
+    )
@@ -0,0 +1,185 @@
+"""Test the handling of oversized enums."""
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import Optional
+
+import pytest
+
+from openai_function_calling import FunctionInferrer
+from openai_function_calling.annotation_schema import enum_values
+from openai_function_calling.enum_policy import (
+    EnumOverflow,
+    EnumPolicy,
+    oversized_enum_parameters,
+    values_pattern,
+)
+from openai_function_calling.instrumentation import (
+    MetricsCollector,
+    add_hook,
+    remove_hook,
+)
+from openai_function_calling.tool_executor import ToolCallError, ToolExecutor
+
+Sku = Enum("Sku", {f"SKU_{index}": f"SKU-{index:04d}" for index in range(300)})
+Code = Enum(
+    "Code", {f"CODE_{index}": "x" * (index % 3) + str(index) for index in range(300)}
+)
+
+
+def order(sku: Sku, code: Optional[Code] = None, quantity: int = 1) -> str:  # noqa: UP007
+    """Order an item.
+
+    Args:
+        sku: The item to order.
+        code: The discount code.
+        quantity: The number of items.
+
+    """
+    return f"{quantity} x {sku}"
+
+
+@pytest.mark.parametrize(
+    ("values", "pattern"),
+    [
+        (["SKU-0042", "SKU-17"], "^[A-Z]{3}-[0-9]{2,4}$"),
+        (["us-east-1", "eu-west-2"], "^[a-z]{2}-[a-z]{4}-[0-9]$"),
+        (["a.b", "c.dd"], r"^[a-z]\.[a-z]{1,2}$"),
+        (["a1", "1a"], None),
+        ([1, 2], None),
+        ([""], None),
+    ],
+)
+def test_values_pattern(values: list, pattern: str | None) -> None:
+    assert values_pattern(values) == pattern
+
+
+def test_oversized_enums_are_replaced_by_a_pattern_or_description() -> None:
+    properties: dict = FunctionInferrer.infer_from_function_reference(
+        order
+    ).to_json_schema()["parameters"]["properties"]
+
+    assert properties["sku"] == {
+        "type": "string",
+        "description": "The item to order.",
+        "pattern": "^[A-Z]{3}-[0-9]{4}$",
+    }
+    assert properties["code"] == {
+        "type": ["string", "null"],
+        "description": "The discount code. One of 300 values, e.g. '0', 'x1', 'xx2'.",
+    }
+
+
+def test_enum_policy_is_configurable(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        FunctionInferrer,
+        "enum_policy",
+        EnumPolicy(overflow=EnumOverflow.DESCRIPTION, examples=1),
+    )
+    properties: dict = FunctionInferrer.infer_from_function_reference(
+        order
+    ).to_json_schema()["parameters"]["properties"]
+
+    assert properties["sku"]["description"] == (
+        "The item to order. One of 300 values, e.g. 'SKU-0000'."
+    )
+    assert "pattern" not in properties["sku"]
+
+    monkeypatch.setattr(FunctionInferrer, "enum_policy", EnumPolicy(1000))
+    properties = FunctionInferrer.infer_from_function_reference(order).to_json_schema()[
+        "parameters"
+    ]["properties"]
+
+    assert len(properties["sku"]["enum"]) == 300
+    assert oversized_enum_parameters(order, FunctionInferrer.enum_policy) == {}
+
+
+def test_enum_values_are_extracted_once_per_class() -> None:
+    class Region(Enum):
+        EAST = "east"
+        WEST = "west"
+
+    collector = MetricsCollector()
+    add_hook(collector)
+
+    try:
+        first: tuple = enum_values(Region)
+        second: tuple = enum_values(Region)
+    finally:
+        remove_hook(collector)
+
+    assert first is second
+    assert first == ("east", "west")
+    assert collector.counters == {"enum_cache.miss": 1, "enum_cache.hit": 1}
+
+
+def test_executor_checks_arguments_of_oversized_enums() -> None:
+    executor = ToolExecutor([order])
+
+    assert executor.execute("order", {"sku": "SKU-0299", "code": None}) == (
+        "1 x SKU-0299"
+    )
+
+    with pytest.raises(
+        ToolCallError, match="expected one of 300 values, got 'SKU-0300'"
+    ):
+        executor.execute("order", '{"sku": "SKU-0300"}')
+
+    with pytest.raises(ToolCallError, match="Invalid argument 'code'"):
+        executor.execute("order", {"sku": "SKU-0001", "code": ["x1"]})
+
+
+def test_executor_runs_tools_returning_lists_without_an_item_type() -> None:
+    def list_regions(prefix: str) -> list:
+        """List the regions with a prefix.
+
+        Args:
+            prefix: The region prefix.
+
+        """
+        return [f"{prefix}-1"]
+
+    executor = ToolExecutor([list_regions])
+
+    assert oversized_enum_parameters(list_regions, FunctionInferrer.enum_policy) == {}
+    assert executor.execute("list_regions", {"prefix": "eu"}) == ["eu-1"]
+
+
+def test_oversized_enums_of_unhashable_values(monkeypatch: pytest.MonkeyPatch) -> None:
+    shape_enum = Enum("Shape", {"POINT": {"x": 1}, "LINE": {"x": 2}, "PLANE": {"x": 3}})
+
+    def draw(shape: Enum, color: str = "black") -> str:
+        """Draw a shape.
+
+        Args:
+            shape: The points of the shape.
+            color: The color to draw with.
+
+        """
+        return f"{shape['x']} points in {color}"
+
+    draw.__annotations__ = {"shape": shape_enum, "color": str, "return": str}
+    monkeypatch.setattr(FunctionInferrer, "enum_policy", EnumPolicy(2, examples=1))
+    properties: dict = FunctionInferrer.infer_from_function_reference(
+        draw
+    ).to_json_schema()["parameters"]["properties"]
+
+    assert properties["shape"] == {
+        "type": "object",
+        "description": "The points of the shape. One of 3 values, e.g. {'x': 1}.",
+    }
+    assert oversized_enum_parameters(draw, FunctionInferrer.enum_policy) == {
+        "shape": ({"x": 1}, {"x": 2}, {"x": 3})
+    }
+
+    def unresolved(value: Missing) -> None:  # noqa: F821
+        """Take a value of an undefined type."""
+
+    assert oversized_enum_parameters(unresolved, FunctionInferrer.enum_policy) == {}
+
+    executor = ToolExecutor([draw])
+
+    assert executor.execute("draw", {"shape": {"x": 2}, "color": "red"}) == (
+        "2 points in red"
+    )
@@ -375,3 +375,321 @@ def test_function_without_strict_excludes_strict_in_output() -> None:
     func_dict: FunctionDict = func.to_json_schema()
 
     assert "strict" not in func_dict
+
+
+def test_strict_function_outputs_strict_mode_schema() -> None:
+    func = Function(
+        name="example_function",
+        description="An example function",
+        parameters=[
+            Parameter(name="a", type=JsonSchemaType.STRING),
+            Parameter(name="b", type=JsonSchemaType.STRING, enum=["x", "y"]),
+        ],
+        required_parameters=["a"],
+        strict=True,
+    )
+
+    assert func.to_json_schema() == {
+        "name": "example_function",
+        "description": "An example function",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "a": {"type": "string"},
+                "b": {"type": ["string", "null"], "enum": ["x", "y", None]},
+            },
+            "required": ["a", "b"],
+            "additionalProperties": False,
+        },
+        "strict": True,
+    }
+
+
+def test_strict_function_caches_schema_until_changed() -> None:
+    func = Function(
+        name="example_function",
+        description="An example function",
+        parameters=[Parameter(name="a", type=JsonSchemaType.STRING)],
+        strict=True,
+    )
+
+    first: FunctionDict = func.to_json_schema()
+
+    assert func.to_json_schema() is first
+
+    func.parameters.append(Parameter(name="b", type=JsonSchemaType.INTEGER))
+    changed: FunctionDict = func.to_json_schema()
+
+    assert changed is not first
+    assert changed["parameters"]["required"] == ["a", "b"]
+
+
+def test_strict_function_schema_changes_with_object_schema_and_any_of() -> None:
+    address = Parameter(
+        name="address",
+        type=JsonSchemaType.OBJECT,
+        object_schema={"properties": {"street": {"type": "string"}}},
+    )
+    coats = Parameter(
+        name="coats",
+        type=["integer", "string"],
+        any_of=[{"type": "integer"}, {"type": "string", "enum": ["auto"]}],
+    )
+    func = Function(
+        name="example_function",
+        description="An example function",
+        parameters=[address, coats],
+        strict=True,
+    )
+    func.to_json_schema()
+
+    address.object_schema = {"properties": {"city": {"type": "string"}}}
+    coats.any_of = [{"type": "integer"}, {"type": "null"}]
+    properties: dict = func.to_json_schema()["parameters"]["properties"]
+
+    assert list(properties["address"]["properties"]) == ["city"]
+    assert properties["coats"]["anyOf"][1] == {"type": "null"}
+
+
+def test_strict_function_schema_changes_with_additional_properties() -> None:
+    func = Function(
+        name="example_function",
+        description="An example function",
+        parameters=[Parameter(name="a", type=JsonSchemaType.STRING)],
+        strict=True,
+    )
+    func.to_json_schema()
+
+    func.additional_properties = {"type": "string"}
+
+    with pytest.raises(ValueError, match="object at parameters to declare"):
+        func.to_json_schema()
+
+
+def test_strict_function_rejects_any_type() -> None:
+    with pytest.raises(ValueError, match="strict mode with the parameter 'a'"):
+        Function(
+            name="example_function",
+            description="An example function",
+            parameters=[Parameter(name="a", type=JsonSchemaType.ANY)],
+            strict=True,
+        )
+
+
+@pytest.mark.parametrize(
+    "func",
+    [
+        Function(name="no_parameters", description="No parameters."),
+        Function(
+            name="example_function",
+            description="An example function",
+            parameters=[
+                Parameter(name="a", type=JsonSchemaType.STRING, description="A."),
+                Parameter(name="b", type=JsonSchemaType.STRING, enum=["x", "y"]),
+                Parameter(
+                    name="c",
+                    type=JsonSchemaType.ARRAY,
+                    array_item_type=JsonSchemaType.NUMBER,
+                ),
+            ],
+            required_parameters=["a"],
+        ),
+        Function(
+            name="strict_function",
+            description="A strict function",
+            parameters=[
+                Parameter(name="a", type=JsonSchemaType.INTEGER),
+                Parameter(
+                    name="b",
+                    type=JsonSchemaType.ARRAY,
+                    array_item_type=JsonSchemaType.STRING,
+                ),
+            ],
+            required_parameters=["a"],
+            strict=True,
+        ),
+        Function(name="not_strict", description="Not strict.", strict=False),
+        Function(name="no_description", description=""),
+        Function(
+            name="union",
+            description="A union.",
+            parameters=[
+                Parameter(
+                    name="a",
+                    type=["integer", "string"],
+                    any_of=[{"type": "integer"}, {"type": "string", "enum": ["x"]}],
+                    description="A.",
+                ),
+            ],
+        ),
+    ],
+)
+def test_from_json_schema_round_trips(func: Function) -> None:
+    json_schema: FunctionDict = func.to_json_schema()
+
+    assert Function.from_json_schema(json_schema).to_json_schema() == json_schema
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [
+        {"type": "object", "properties": {}, "additionalProperties": False},
+        {
+            "type": "object",
+            "properties": {"a": {"type": "string"}},
+            "required": ["a"],
+            "additionalProperties": {"type": "integer"},
+        },
+    ],
+)
+def test_from_json_schema_keeps_additional_properties(parameters: dict) -> None:
+    json_schema: dict = {"name": "f", "description": "F.", "parameters": parameters}
+    func: Function = Function.from_json_schema(json_schema)
+
+    assert func.to_json_schema() == json_schema
+    assert func.content_hash != Function("f", "F.", func.parameters).content_hash
+
+
+def test_from_json_schema_keeps_empty_required_parameters_of_strict_schemas() -> None:
+    json_schema: dict = {
+        "name": "f",
+        "description": "F.",
+        "parameters": {
+            "type": "object",
+            "properties": {},
+            "required": [],
+            "additionalProperties": False,
+        },
+        "strict": True,
+    }
+
+    assert Function.from_json_schema(json_schema).to_json_schema() == json_schema
+
+
+def test_from_json_schema_rejects_empty_required_parameters() -> None:
+    json_schema: dict = {
+        "name": "f",
+        "description": "F.",
+        "parameters": {"type": "object", "properties": {}, "required": []},
+    }
+
+    with pytest.raises(ValueError, match="to be left out instead of empty"):
+        Function.from_json_schema(json_schema)
+
+    assert (
+        "required"
+        not in (
+            Function.from_json_schema(json_schema, validate=False).to_json_schema()[
+                "parameters"
+            ]
+        )
+    )
+
+
+def test_from_json_schema_defaults_missing_fields() -> None:
+    func: Function = Function.from_json_schema(
+        {"name": "example_function"}, validate=False
+    )
+
+    assert func.description == ""
+    assert func.parameters == []
+    assert func.required_parameters == []
+    assert func.strict is None
+
+
+@pytest.mark.parametrize(
+    ("json_schema", "message"),
+    [
+        ({"name": "f", "examples": []}, r"function schema: \['examples'\]"),
+        (
+            {"name": "f", "parameters": {"type": "object", "$defs": {}}},
+            r"function parameters schema: \['\$defs'\]",
+        ),
+        (
+            {"name": "f", "parameters": {"type": "array"}},
+            "Expected the function parameters to be an object.",
+        ),
+        (
+            {"name": "f", "description": "F.", "parameters": {}},
+            "Expected the function parameters to be an object.",
+        ),
+        (
+            {"name": "f", "description": "F.", "parameters": {"type": "object"}},
+            "Expected the function parameters to have 'properties'.",
+        ),
+        (
+            {"name": "f", "parameters": {"type": "object", "properties": {}}},
+            "Expected the function to have a 'description'.",
+        ),
+        ({"name": "f", "description": "F."}, "to have a 'parameters'"),
+        (
+            {
+                "name": "f",
+                "description": "F.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {"a": {"type": "string", "description": ""}},
+                },
+            },
+            "Expected the 'description' of parameter 'a' to be left out",
+        ),
+    ],
+)
+def test_from_json_schema_rejects_unsupported_schemas(
+    json_schema: dict, message: str
+) -> None:
+    with pytest.raises(ValueError, match=message):
+        Function.from_json_schema(json_schema)
+
+    Function.from_json_schema(json_schema, validate=False)
+
+
+def test_metadata_is_not_part_of_the_json_schema() -> None:
+    function = Function("lookup", "Look up a value.", metadata={"owner": "search"})
+
+    assert function.metadata == {"owner": "search"}
+    assert "metadata" not in function.to_json_schema()
+    assert Function("lookup", "").metadata == {}
+
+
+def test_content_hash_covers_the_schema_but_not_metadata() -> None:
+    def build(**kwargs: object) -> Function:
+        return Function(
+            "get_current_weather",
+            "Get the current weather.",
+            [
+                Parameter("location", JsonSchemaType.STRING),
+                Parameter("unit", JsonSchemaType.STRING, enum=["c", "f"]),
+            ],
+            ["location"],
+            **kwargs,  # type: ignore[arg-type]
+        )
+
+    function: Function = build()
+    content_hash: str = function.content_hash
+
+    assert build(metadata={"owner": "weather"}).content_hash == content_hash
+    assert build(strict=True).content_hash != content_hash
+
+    function.parameters[1].enum.append("k")  # type: ignore[union-attr]
+
+    assert function.content_hash != content_hash
+
+    function.parameters[1].enum.pop()  # type: ignore[union-attr]
+
+    assert function.content_hash == content_hash
+
+    function.required_parameters = ["location", "unit"]
+
+    assert function.content_hash != content_hash
+
+
+def test_merge_keeps_the_order_of_required_parameters() -> None:
+    function = Function(
+        "f", "", [Parameter("b", "string"), Parameter("a", "string")], ["b"]
+    )
+    function.merge(
+        Function("f", "", [Parameter("a", "string"), Parameter("c", "string")], ["c"])
+    )
+
+    assert function.required_parameters == ["b", "c"]
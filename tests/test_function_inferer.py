@@ -1,13 +1,16 @@
 """Test the function inferrer class."""
 
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Optional
+from typing import Any, Callable, Literal, Optional
 
 import pytest
 
-from openai_function_calling import FunctionInferrer
+from openai_function_calling import DocstringBackend, FunctionInferrer
 from openai_function_calling.function import Function
+from openai_function_calling.function_inferrer import injected_parameters
 from openai_function_calling.json_schema_type import JsonSchemaType
 
 
@@ -302,3 +305,287 @@ def test_infer_from_function_reference_with_optional_parameters_not_included_in_
         get_local_places_with_optional_location
     )
     assert function.required_parameters == []
+
+
+@pytest.mark.parametrize("backend", list(DocstringBackend))
+def test_infer_from_function_reference_with_each_docstring_backend(
+    monkeypatch: pytest.MonkeyPatch, backend: DocstringBackend
+) -> None:
+    monkeypatch.setattr(FunctionInferrer, "docstring_backend", backend)
+
+    function: Function = FunctionInferrer.infer_from_function_reference(
+        fully_documented_sum
+    )
+
+    assert function.description == "Sum two values."
+    assert function.parameters[0].description == "The first value to sum."
+
+
+class WeatherService:
+    """A service whose public methods are tools."""
+
+    unit: str = "celsius"
+
+    def __init__(self, api_key: str) -> None:
+        """Create a new service."""
+        self.api_key: str = api_key
+
+    def get_weather(self, location: str, days: int = 1) -> str:
+        """Get the weather forecast.
+
+        Args:
+            location: The city to get the weather of.
+            days: The number of days to forecast.
+
+        """
+        return f"{self.api_key}: sunny in {location} for {days} days"
+
+    @classmethod
+    def get_unit(cls, *, short: bool) -> str:
+        """Get the temperature unit."""
+        return cls.unit[0] if short else cls.unit
+
+    @staticmethod
+    def convert(value: float) -> float:
+        """Convert Celsius to Fahrenheit."""
+        return value * 9 / 5 + 32
+
+    @property
+    def name(self) -> str:
+        """Not a method."""
+        return "weather"
+
+    def _private(self) -> None:
+        """Not a tool."""
+
+
+class ExtendedWeatherService(WeatherService):
+    """A subclass that overrides and adds methods."""
+
+    def get_weather(self, location: str) -> str:  # type: ignore[override]
+        """Get today's weather."""
+        return f"sunny in {location}"
+
+    def get_alerts(self, region: str) -> list[str]:
+        """Get the weather alerts."""
+        return [region]
+
+
+def test_functions_inferred_from_one_annotation_do_not_share_enums() -> None:
+    def to_celsius(value: float, unit: Literal["c", "f", "kelvin"]) -> float:
+        """Convert a temperature to celsius."""
+        return value
+
+    def to_fahrenheit(value: float, unit: Literal["c", "f", "kelvin"]) -> float:
+        """Convert a temperature to fahrenheit."""
+        return value
+
+    celsius: Function = FunctionInferrer.infer_from_function_reference(to_celsius)
+    celsius.parameters[1].enum.append("rankine")
+    fahrenheit: Function = FunctionInferrer.infer_from_function_reference(to_fahrenheit)
+
+    assert fahrenheit.parameters[1].enum == ["c", "f", "kelvin"]
+
+
+def test_infer_from_class_leaves_out_self_and_cls() -> None:
+    functions: dict[str, Function] = FunctionInferrer.infer_from_class(WeatherService)
+
+    assert list(functions) == ["get_weather", "get_unit", "convert"]
+    assert functions["get_weather"].to_json_schema() == {
+        "name": "get_weather",
+        "description": "Get the weather forecast.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "The city to get the weather of.",
+                },
+                "days": {
+                    "type": "integer",
+                    "description": "The number of days to forecast.",
+                },
+            },
+            "required": ["location"],
+        },
+    }
+    assert [p.name for p in functions["get_unit"].parameters] == ["short"]
+    assert functions["get_unit"].required_parameters == ["short"]
+    assert [p.name for p in functions["convert"].parameters] == ["value"]
+
+
+def test_infer_from_class_caches_per_class(monkeypatch: pytest.MonkeyPatch) -> None:
+    first: dict[str, Function] = FunctionInferrer.infer_from_class(WeatherService)
+    subclass: dict[str, Function] = FunctionInferrer.infer_from_class(
+        ExtendedWeatherService
+    )
+    monkeypatch.setattr(
+        FunctionInferrer,
+        "infer_from_function_reference",
+        pytest.fail,
+    )
+
+    second: dict[str, Function] = FunctionInferrer.infer_from_class(WeatherService)
+
+    assert second == first
+    assert second["get_weather"] is first["get_weather"]
+    assert list(subclass) == ["get_weather", "get_unit", "convert", "get_alerts"]
+    assert subclass["get_weather"].required_parameters == ["location"]
+    assert [p.name for p in subclass["get_weather"].parameters] == ["location"]
+    assert FunctionInferrer.infer_from_class(ExtendedWeatherService) == subclass
+
+
+def test_infer_from_instance_binds_cached_functions() -> None:
+    first_functions, first_methods = zip(
+        *FunctionInferrer.infer_from_instance(WeatherService("a"))
+    )
+    second_functions, second_methods = zip(
+        *FunctionInferrer.infer_from_instance(WeatherService("b"))
+    )
+
+    assert all(a is b for a, b in zip(first_functions, second_functions))
+    assert first_methods[0]("Paris") == "a: sunny in Paris for 1 days"
+    assert second_methods[0]("Paris") == "b: sunny in Paris for 1 days"
+    assert second_methods[1](short=True) == "c"
+    assert second_methods[2](100) == 212
+
+
+def get_orders(
+    session: object, tenant_id: str, customer_id: str, limit: int = 10
+) -> list:
+    """Get the orders of a customer.
+
+    Args:
+        session: The database session.
+        tenant_id: The tenant of the customer.
+        customer_id: The customer to get the orders of.
+        limit: The maximum number of orders.
+
+    """
+    return [session, tenant_id, customer_id][:limit]
+
+
+@injected_parameters("session")
+def get_invoices(session: object, customer_id: str) -> list:
+    """Get the invoices of a customer."""
+    return [session, customer_id]
+
+
+def _parameter_names(function: Function) -> list[str]:
+    return [parameter.name for parameter in function.parameters]
+
+
+def test_infer_from_partial_leaves_out_bound_parameters() -> None:
+    function: Function = FunctionInferrer.infer_from_function_reference(
+        functools.partial(get_orders, object(), tenant_id="acme")
+    )
+
+    assert function.name == "get_orders"
+    assert function.description == "Get the orders of a customer."
+    assert _parameter_names(function) == ["customer_id", "limit"]
+    assert function.required_parameters == ["customer_id"]
+
+
+def test_infer_from_wrapper_reuses_cached_inference(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    first: Function = FunctionInferrer.infer_from_function_reference(
+        functools.partial(get_orders, object(), "acme")
+    )
+    monkeypatch.setattr(FunctionInferrer, "_infer", pytest.fail)
+
+    second: Function = FunctionInferrer.infer_from_function_reference(
+        functools.partial(get_orders, object(), "other")
+    )
+    third: Function = FunctionInferrer.infer_from_wrapper(
+        get_orders, injected_parameters=["session", "tenant_id", "limit"]
+    )
+
+    assert second is not first
+    assert second.to_json_schema() == first.to_json_schema()
+    assert _parameter_names(third) == ["customer_id"]
+
+
+def test_threads_inferring_the_same_wrapped_function_get_equal_definitions() -> None:
+    def get_refunds(session: object, customer_id: str) -> list:
+        """Get the refunds of a customer.
+
+        Args:
+            session: The database session.
+            customer_id: The customer ID.
+
+        """
+        return []
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        functions: list[Function] = list(
+            pool.map(
+                lambda _: FunctionInferrer.infer_from_function_reference(
+                    functools.partial(get_refunds, object())
+                ),
+                range(32),
+            )
+        )
+
+    assert len({id(function.parameters[0]) for function in functions}) == 32
+    assert all(
+        function.to_json_schema() == functions[0].to_json_schema()
+        for function in functions
+    )
+    assert _parameter_names(functions[0]) == ["customer_id"]
+
+
+def test_infer_from_wrapper_returns_definitions_independent_of_the_cache() -> None:
+    first: Function = FunctionInferrer.infer_from_function_reference(get_invoices)
+    first.parameters[0].description = "Changed."
+    first.parameters[0].enum = ["c_1"]
+
+    second: Function = FunctionInferrer.infer_from_function_reference(get_invoices)
+
+    assert second.parameters[0].description is None
+    assert second.parameters[0].enum is None
+
+
+def test_infer_from_class_of_builtin_and_slotted_classes() -> None:
+    class Slotted:
+        __slots__ = ()
+
+        def ping(self, message: str) -> str:
+            """Reply to a message."""
+            return message
+
+    assert _parameter_names(FunctionInferrer.infer_from_class(Slotted)["ping"]) == [
+        "message"
+    ]
+    assert FunctionInferrer.infer_from_class(int) == {}
+
+
+def test_infer_from_wrapper_with_declared_injected_parameters() -> None:
+    def with_session(function_reference: Callable) -> Callable:
+        @injected_parameters("session")
+        @functools.wraps(function_reference)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return function_reference("session", *args, **kwargs)
+
+        return wrapper
+
+    assert _parameter_names(
+        FunctionInferrer.infer_from_function_reference(get_invoices)
+    ) == ["customer_id"]
+    assert _parameter_names(
+        FunctionInferrer.infer_from_function_reference(with_session(get_orders))
+    ) == ["tenant_id", "customer_id", "limit"]
+
+
+def test_infer_from_wrapper_rejects_unknown_injected_parameters() -> None:
+    with pytest.raises(ValueError, match="Unknown injected parameter 'db'"):
+        FunctionInferrer.infer_from_wrapper(get_orders, injected_parameters=["db"])
+
+
+def test_infer_from_wrapper_of_uncacheable_callable() -> None:
+    function: Function = FunctionInferrer.infer_from_wrapper(
+        functools.partial(str.replace, "text", count=1)
+    )
+
+    assert function.name == "replace"
+    assert _parameter_names(function) == ["old", "new"]
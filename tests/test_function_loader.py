@@ -0,0 +1,109 @@
+"""Test bulk loading of functions from schema files."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from openai_function_calling import Function, JsonSchemaType, Parameter
+from openai_function_calling.function_loader import (
+    functions_from_json_schemas,
+    load_functions,
+)
+from openai_function_calling.tool_helpers import ToolHelpers
+
+
+def _functions(count: int) -> list[Function]:
+    return [
+        Function(
+            name=f"tool_{i}",
+            description=f"Tool number {i}.",
+            parameters=[
+                Parameter("query", JsonSchemaType.STRING, "The query."),
+                Parameter("order", JsonSchemaType.STRING, enum=["asc", "desc"]),
+            ],
+            required_parameters=["query"],
+        )
+        for i in range(count)
+    ]
+
+
+def _schemas(functions: list[Function]) -> list[dict]:
+    return [dict(function.to_json_schema()) for function in functions]
+
+
+def test_load_functions_from_json_lines(tmp_path: Path) -> None:
+    schemas: list[dict] = _schemas(_functions(3))
+    path: Path = tmp_path / "tools.jsonl"
+    path.write_text(
+        "\n".join(json.dumps(schema) for schema in schemas) + "\n\n", encoding="utf-8"
+    )
+
+    functions: list[Function] = list(load_functions(path))
+
+    assert [function.to_json_schema() for function in functions] == schemas
+
+
+def test_load_functions_from_empty_json_lines(tmp_path: Path) -> None:
+    path: Path = tmp_path / "tools.ndjson"
+    path.touch()
+
+    assert list(load_functions(path)) == []
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1024 * 1024])
+def test_load_functions_from_json_array(tmp_path: Path, chunk_size: int) -> None:
+    functions: list[Function] = _functions(20)
+    path: Path = tmp_path / "tools.json"
+    ToolHelpers.write_tool_params(ToolHelpers.iter_from_functions(functions), path)
+
+    loaded: list[Function] = list(load_functions(path, chunk_size=chunk_size))
+
+    assert [function.to_json_schema() for function in loaded] == _schemas(functions)
+
+
+def test_load_functions_from_empty_json_array(tmp_path: Path) -> None:
+    path: Path = tmp_path / "tools.json"
+    path.write_text(" [\n ] ", encoding="utf-8")
+
+    assert list(load_functions(path)) == []
+
+
+def test_load_functions_from_single_schema(tmp_path: Path) -> None:
+    schema: dict = _schemas(_functions(1))[0]
+    path: Path = tmp_path / "tool.json"
+    path.write_text(json.dumps(schema, indent=2), encoding="utf-8")
+
+    assert [f.to_json_schema() for f in load_functions(path, chunk_size=8)] == [schema]
+
+
+@pytest.mark.parametrize("text", ['[{"name": "a"},', '[{"name": "a"}, {"na'])
+def test_load_functions_rejects_unterminated_arrays(tmp_path: Path, text: str) -> None:
+    path: Path = tmp_path / "tools.json"
+    path.write_text(text, encoding="utf-8")
+    functions = load_functions(path, chunk_size=4)
+
+    assert next(functions).name == "a"
+
+    with pytest.raises(ValueError, match="Invalid JSON array of schemas"):
+        next(functions)
+
+
+def test_load_functions_is_lazy(tmp_path: Path) -> None:
+    path: Path = tmp_path / "tools.jsonl"
+    path.write_text('{"name": "a"}\nnot json\n', encoding="utf-8")
+    functions = load_functions(path)
+
+    assert next(functions).name == "a"
+
+    with pytest.raises(json.JSONDecodeError):
+        next(functions)
+
+
+def test_functions_from_json_schemas_validates_when_asked() -> None:
+    schemas: list[dict] = [{"name": "a", "parameters": {"type": "object"}, "x": 1}]
+
+    assert [f.name for f in functions_from_json_schemas(schemas)] == ["a"]
+
+    with pytest.raises(ValueError, match="Unsupported keys"):
+        list(functions_from_json_schemas(schemas, validate=True))
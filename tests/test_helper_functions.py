@@ -1,8 +1,18 @@
 """Helper function tests."""
 
+import asyncio
+import functools
+from typing import Optional, Union, get_origin
+
 import pytest
 
-from openai_function_calling.helper_functions import python_type_to_json_schema_type
+from openai_function_calling.helper_functions import (
+    UNION_TYPES,
+    ChatNamespace,
+    callable_name,
+    python_type_to_json_schema_type,
+    run_awaitable,
+)
 from openai_function_calling.json_schema_type import JsonSchemaType
 
 
@@ -44,3 +54,26 @@ def test_dict() -> None:
 
 def test_list() -> None:
     assert python_type_to_json_schema_type("list") == JsonSchemaType.ARRAY.value
+
+
+def test_callable_name_looks_through_partials() -> None:
+    assert callable_name(functools.partial(functools.partial(max, 1), 2)) == "max"
+
+
+def test_run_awaitable_returns_the_result() -> None:
+    async def double(value: int) -> int:
+        return value * 2
+
+    assert run_awaitable(double(2)) == 4
+    assert run_awaitable(asyncio.sleep(0, result="done")) == "done"
+
+
+def test_union_types_include_optional() -> None:
+    assert get_origin(Optional[int]) in UNION_TYPES
+    assert get_origin(Union[int, str]) in UNION_TYPES
+
+
+def test_chat_namespace_exposes_create() -> None:
+    chat = ChatNamespace(dict)
+
+    assert chat.completions.create(model="gpt-4o") == {"model": "gpt-4o"}
@@ -0,0 +1,208 @@
+"""Test the instrumentation hooks."""
+
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from openai_function_calling.docstring_parsing import clear_docstring_cache
+from openai_function_calling.function_inferrer import FunctionInferrer
+from openai_function_calling.instrumentation import (
+    MetricsCollector,
+    OpenTelemetryHook,
+    Span,
+    add_hook,
+    increment,
+    is_enabled,
+    remove_hook,
+    span,
+)
+from openai_function_calling.tool_helpers import ToolHelpers
+
+
+def get_current_weather(location: str, unit: str) -> str:
+    """Get the current weather.
+
+    Args:
+        location: The location to get the weather for.
+        unit: The temperature unit.
+
+    """
+    return f"It is sunny in {location} and 75 degrees {unit}."
+
+
+@pytest.fixture
+def collector() -> Iterator[MetricsCollector]:
+    metrics_collector = MetricsCollector()
+    add_hook(metrics_collector)
+    yield metrics_collector
+    remove_hook(metrics_collector)
+
+
+def test_span_without_hooks_returns_shared_noop_span() -> None:
+    assert not is_enabled()
+    assert span("first") is span("second")
+    assert span("first").recording is False
+
+    with span("noop") as current_span:
+        current_span.set_attribute("key", "value")
+
+
+def test_span_with_hook_reports_duration_and_attributes(
+    collector: MetricsCollector,
+) -> None:
+    with span("operation", size=1) as current_span:
+        current_span.set_attribute("extra", "value")
+
+    statistics = collector.spans["operation"]
+
+    assert is_enabled()
+    assert isinstance(current_span, Span)
+    assert statistics.count == 1
+    assert statistics.mean_seconds >= 0
+    assert statistics.last_attributes == {"size": 1, "extra": "value"}
+
+
+def test_span_duration_ignores_wall_clock_adjustments(
+    collector: MetricsCollector, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    wall_clock: Iterator[int] = iter([10_000_000_000, 0])
+    counter: Iterator[int] = iter([5_000, 7_000])
+    monkeypatch.setattr(time, "time_ns", lambda: next(wall_clock))
+    monkeypatch.setattr(time, "perf_counter_ns", lambda: next(counter))
+
+    with span("adjusted") as current_span:
+        pass
+
+    assert isinstance(current_span, Span)
+    assert current_span.start_time_ns == 10_000_000_000
+    assert current_span.end_time_ns == 10_000_002_000
+    assert collector.spans["adjusted"].total_seconds == 2e-6
+
+
+def test_span_records_error_attribute(collector: MetricsCollector) -> None:
+    with pytest.raises(RuntimeError), span("failing"):
+        raise RuntimeError
+
+    assert collector.spans["failing"].last_attributes["error"] == "RuntimeError"
+
+
+def test_increment_reports_counters(collector: MetricsCollector) -> None:
+    increment("counter")
+    increment("counter", 2)
+
+    assert collector.counters == {"counter": 3}
+
+
+def test_infer_from_function_reference_reports_sub_step_spans(
+    collector: MetricsCollector,
+) -> None:
+    FunctionInferrer.infer_from_function_reference(get_current_weather)
+
+    assert {
+        "FunctionInferrer.infer_from_function_reference",
+        "FunctionInferrer.infer_from_annotations",
+        "FunctionInferrer.infer_from_docstring",
+        "FunctionInferrer.infer_from_inspection",
+        "FunctionInferrer.merge",
+    } <= set(collector.spans)
+
+
+def test_docstring_cache_hits_and_misses_are_counted(
+    collector: MetricsCollector,
+) -> None:
+    clear_docstring_cache()
+
+    FunctionInferrer.infer_from_function_reference(get_current_weather)
+    FunctionInferrer.infer_from_function_reference(get_current_weather)
+
+    assert collector.counters["docstring_cache.miss"] == 1
+    assert collector.counters["docstring_cache.hit"] == 1
+
+
+def test_serialization_spans_report_schema_size(collector: MetricsCollector) -> None:
+    function = FunctionInferrer.infer_from_function_reference(get_current_weather)
+
+    ToolHelpers.from_functions([function])
+
+    assert (
+        collector.spans["Function.to_json_schema"].last_attributes["schema_size_bytes"]
+        > 0
+    )
+    tool_helper_attributes = collector.spans["ToolHelpers.from_functions"]
+    assert tool_helper_attributes.last_attributes["tool_count"] == 1
+
+
+def test_metrics_collector_reset_clears_metrics(collector: MetricsCollector) -> None:
+    increment("counter")
+
+    with span("operation"):
+        pass
+
+    collector.reset()
+
+    assert collector.spans == {}
+    assert collector.counters == {}
+
+
+def test_remove_hook_that_is_not_registered_raises_value_error() -> None:
+    with pytest.raises(ValueError, match="Cannot remove a hook"):
+        remove_hook(MetricsCollector())
+
+
+def test_open_telemetry_hook_exports_spans_and_counters() -> None:
+    tracer = MagicMock()
+    meter = MagicMock()
+    hook = OpenTelemetryHook(tracer=tracer, meter=meter)
+    add_hook(hook)
+
+    try:
+        with span("operation", key="value"):
+            pass
+
+        increment("counter", 2)
+        increment("counter")
+    finally:
+        remove_hook(hook)
+
+    start_kwargs = tracer.start_span.call_args.kwargs
+    end_kwargs = tracer.start_span.return_value.end.call_args.kwargs
+
+    assert tracer.start_span.call_args.args == ("operation",)
+    assert start_kwargs["attributes"] == {"key": "value"}
+    assert end_kwargs["end_time"] >= start_kwargs["start_time"]
+    meter.create_counter.assert_called_once_with("counter")
+    assert meter.create_counter.return_value.add.call_count == 2
+
+
+def test_open_telemetry_hook_creates_one_counter_per_name_across_threads() -> None:
+    meter = MagicMock()
+    created: list[str] = []
+
+    def create_counter(name: str) -> MagicMock:
+        time.sleep(0.01)
+        created.append(name)
+        return MagicMock()
+
+    meter.create_counter.side_effect = create_counter
+    hook = OpenTelemetryHook(meter=meter)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: hook.on_counter("counter", 1, {}), range(8)))
+
+    assert created == ["counter"]
+
+
+def test_open_telemetry_hook_without_exporters_ignores_events() -> None:
+    hook = OpenTelemetryHook()
+    add_hook(hook)
+
+    try:
+        with span("operation"):
+            increment("counter")
+    finally:
+        remove_hook(hook)
+
+    assert not is_enabled()
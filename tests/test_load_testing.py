@@ -0,0 +1,93 @@
+"""Test the load generator."""
+
+from collections.abc import Iterator
+
+import pytest
+
+from openai_function_calling.load_testing import (
+    LoadTestReport,
+    run_load_test,
+    run_tool_cycle,
+)
+from openai_function_calling.mock_server import (
+    MockChatCompletionsServer,
+    MockServerClient,
+)
+from openai_function_calling.tool_executor import ToolExecutor
+from openai_function_calling.tool_helpers import ToolHelpers
+
+
+def get_current_weather(location: str, unit: str = "fahrenheit") -> str:
+    """Get the current weather and return a summary."""
+    return f"It is currently sunny in {location} and 75 degrees {unit}."
+
+
+TOOLS = ToolHelpers.infer_from_function_refs([get_current_weather])
+MESSAGES: list[dict] = [{"role": "user", "content": "What's the weather?"}]
+
+
+@pytest.fixture
+def server() -> Iterator[MockChatCompletionsServer]:
+    with MockChatCompletionsServer(seed=0) as mock_server:
+        yield mock_server
+
+
+def test_run_tool_cycle_executes_tools_and_sends_follow_up(
+    server: MockChatCompletionsServer,
+) -> None:
+    history: list[dict] = run_tool_cycle(
+        MockServerClient(server.base_url),
+        ToolExecutor([get_current_weather]),
+        TOOLS,
+        MESSAGES,
+    )
+
+    assert [message["role"] for message in history] == [
+        "user",
+        "assistant",
+        "tool",
+        "assistant",
+    ]
+    assert history[2]["content"].startswith("It is currently sunny")
+    assert len(MESSAGES) == 1
+
+
+def test_run_load_test_reports_latency_and_throughput(
+    server: MockChatCompletionsServer,
+) -> None:
+    report: LoadTestReport = run_load_test(
+        MockServerClient(server.base_url),
+        ToolExecutor([get_current_weather]),
+        TOOLS,
+        MESSAGES,
+        cycles=20,
+        concurrency=4,
+    )
+
+    assert report.cycles == 20
+    assert report.errors == 0
+    assert report.throughput > 0
+    assert 0 < report.p50 <= report.p99
+    assert "20 cycles" in report.summary()
+    assert server.request_count == 40
+
+
+def test_run_load_test_counts_failed_cycles(server: MockChatCompletionsServer) -> None:
+    client = MockServerClient(server.base_url.replace("/v1", "/unknown"))
+
+    report: LoadTestReport = run_load_test(
+        client, ToolExecutor(), TOOLS, MESSAGES, cycles=3, concurrency=1
+    )
+
+    assert report.cycles == 0
+    assert report.errors == 3
+    assert report.p99 == 0.0
+
+
+def test_report_percentiles_use_nearest_rank() -> None:
+    report = LoadTestReport(4, 0, 0.0, (0.4, 0.1, 0.3, 0.2))
+
+    assert report.percentile(50) == 0.2
+    assert report.percentile(0) == 0.1
+    assert report.p99 == 0.4
+    assert report.throughput == 0.0
@@ -0,0 +1,216 @@
+"""Test the mock chat completions server."""
+
+import http.client
+import json
+import random
+from collections.abc import Iterator
+
+import pytest
+
+from openai_function_calling.mock_server import (
+    MockChatCompletionsServer,
+    MockServerClient,
+    generate_arguments,
+    generate_value,
+)
+from openai_function_calling.tool_helpers import ToolHelpers
+
+
+def get_current_weather(location: str, unit: str = "fahrenheit") -> str:
+    """Get the current weather and return a summary."""
+    return f"It is currently sunny in {location} and 75 degrees {unit}."
+
+
+TOOLS = ToolHelpers.infer_from_function_refs([get_current_weather])
+MESSAGES: list[dict] = [{"role": "user", "content": "What's the weather?"}]
+
+
+@pytest.fixture
+def server() -> Iterator[MockChatCompletionsServer]:
+    with MockChatCompletionsServer(seed=0) as mock_server:
+        yield mock_server
+
+
+@pytest.fixture
+def client(server: MockChatCompletionsServer) -> MockServerClient:
+    return MockServerClient(server.base_url)
+
+
+def test_server_returns_tool_calls_from_request_tools(
+    server: MockChatCompletionsServer, client: MockServerClient
+) -> None:
+    response: dict = client.chat.completions.create(
+        model="mock", messages=MESSAGES, tools=TOOLS
+    )
+    choice: dict = response["choices"][0]
+    tool_call: dict = choice["message"]["tool_calls"][0]
+
+    assert response["object"] == "chat.completion"
+    assert choice["finish_reason"] == "tool_calls"
+    assert tool_call["function"]["name"] == "get_current_weather"
+    assert "location" in json.loads(tool_call["function"]["arguments"])
+    assert server.request_count == 1
+    assert server.requests[0]["messages"] == MESSAGES
+
+
+def test_server_returns_final_message_after_tool_results(
+    client: MockServerClient,
+) -> None:
+    response: dict = client.chat.completions.create(
+        model="mock",
+        messages=[*MESSAGES, {"role": "tool", "tool_call_id": "1", "content": "ok"}],
+        tools=TOOLS,
+    )
+
+    assert response["choices"][0]["message"] == {
+        "role": "assistant",
+        "content": "Done.",
+    }
+    assert response["choices"][0]["finish_reason"] == "stop"
+
+
+def test_server_returns_scripted_responses_in_order() -> None:
+    scripted: list[dict] = [
+        {"tool_calls": [{"name": "lookup", "arguments": '{"id": 1}'}]},
+        {"content": "Finished."},
+    ]
+
+    with MockChatCompletionsServer(
+        scripted_responses=scripted, latency_seconds=0.001
+    ) as server:
+        client = MockServerClient(server.base_url)
+        first: dict = client.chat.completions.create(model="mock", messages=[])
+        second: dict = client.chat.completions.create(model="mock", messages=[])
+        third: dict = client.chat.completions.create(model="mock", messages=[])
+
+    assert first["choices"][0]["message"]["tool_calls"][0]["function"] == {
+        "name": "lookup",
+        "arguments": '{"id": 1}',
+    }
+    assert second["choices"][0]["message"]["content"] == "Finished."
+    assert third["choices"][0]["message"]["tool_calls"][0]["function"]["name"] == (
+        "lookup"
+    )
+
+
+def test_server_streams_tool_call_deltas() -> None:
+    with MockChatCompletionsServer(
+        seed=0, stream_chunk_size=4, stream_chunk_delay_seconds=0.001
+    ) as server:
+        client = MockServerClient(server.base_url)
+        chunks: list[dict] = list(
+            client.chat.completions.create(
+                model="mock", messages=MESSAGES, tools=TOOLS, stream=True
+            )
+        )
+
+    deltas: list[dict] = [chunk["choices"][0]["delta"] for chunk in chunks]
+    arguments: str = "".join(
+        delta["tool_calls"][0]["function"]["arguments"]
+        for delta in deltas
+        if "tool_calls" in delta
+    )
+
+    assert chunks[0]["object"] == "chat.completion.chunk"
+    assert deltas[1]["tool_calls"][0]["function"]["name"] == "get_current_weather"
+    assert "location" in json.loads(arguments)
+    assert chunks[-1]["choices"][0]["finish_reason"] == "tool_calls"
+
+
+def test_server_streams_content_deltas(client: MockServerClient) -> None:
+    chunks: list[dict] = list(
+        client.chat.completions.create(model="mock", messages=MESSAGES, stream=True)
+    )
+
+    content: str = "".join(
+        chunk["choices"][0]["delta"].get("content") or "" for chunk in chunks
+    )
+
+    assert content == "Done."
+
+
+def test_server_applies_latency_jitter() -> None:
+    server = MockChatCompletionsServer(latency_seconds=0.1, latency_jitter_seconds=0.1)
+
+    try:
+        assert 0.1 <= server.response_delay() <= 0.2
+    finally:
+        server.stop()
+
+
+def test_server_rejects_unknown_paths(server: MockChatCompletionsServer) -> None:
+    client = MockServerClient(server.base_url.replace("/v1", "/unknown"))
+
+    with pytest.raises(RuntimeError, match="status 404"):
+        client.chat.completions.create(model="mock", messages=[])
+
+    with pytest.raises(RuntimeError, match="status 404"):
+        client.chat.completions.create(model="mock", messages=[], stream=True)
+
+
+def test_server_rejects_invalid_json(server: MockChatCompletionsServer) -> None:
+    client = MockServerClient(server.base_url)
+    connection = http.client.HTTPConnection(client.host, client.port)
+    connection.request("POST", client.path, b"{invalid")
+
+    assert connection.getresponse().status == 400
+    connection.close()
+
+
+def test_client_discards_connection_after_connection_error() -> None:
+    server = MockChatCompletionsServer()
+    client = MockServerClient(server.base_url)
+    server.stop()
+
+    with pytest.raises(ConnectionRefusedError):
+        client.chat.completions.create(model="mock", messages=MESSAGES)
+
+    assert client._local.connection is None  # noqa: SLF001
+
+
+def test_server_works_with_the_openai_client(server: MockChatCompletionsServer) -> None:
+    openai = pytest.importorskip("openai")
+    openai_client = openai.OpenAI(base_url=server.base_url, api_key="mock")
+
+    response = openai_client.chat.completions.create(
+        model="mock", messages=MESSAGES, tools=TOOLS
+    )
+    stream = openai_client.chat.completions.create(
+        model="mock", messages=MESSAGES, tools=TOOLS, stream=True
+    )
+
+    assert response.choices[0].message.tool_calls is not None
+    assert [chunk.choices[0].finish_reason for chunk in stream][-1] == "tool_calls"
+
+
+def test_generate_arguments_includes_required_parameters() -> None:
+    rng = random.Random(0)  # noqa: S311
+    schema: dict = {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "count": {"type": "integer"},
+            "score": {"type": "number"},
+            "enabled": {"type": "boolean"},
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "unit": {"type": "string", "enum": ["celsius"]},
+        },
+        "required": ["name", "count", "score", "enabled", "tags", "unit"],
+    }
+
+    arguments: dict = generate_arguments(schema, rng)
+
+    assert isinstance(arguments["name"], str)
+    assert isinstance(arguments["count"], int)
+    assert isinstance(arguments["score"], float)
+    assert isinstance(arguments["enabled"], bool)
+    assert len(arguments["tags"]) == 2
+    assert arguments["unit"] == "celsius"
+
+
+def test_generate_value_handles_objects_type_lists_and_unknown_types() -> None:
+    rng = random.Random(0)  # noqa: S311
+
+    assert generate_value({"type": "object"}, rng) == {}
+    assert generate_value({"type": ["null"]}, rng) is None
+    assert generate_value({}, rng) is None
@@ -202,3 +202,160 @@ def test_merge_with_invalid_type_raises_type_error() -> None:
 
     with pytest.raises(TypeError):
         parameter.merge(1)  # type: ignore
+
+
+@pytest.mark.parametrize(
+    "parameter",
+    [
+        Parameter("a", JsonSchemaType.STRING),
+        Parameter("a", JsonSchemaType.STRING, "A string.", enum=["x", "y"]),
+        Parameter("a", JsonSchemaType.ARRAY, array_item_type=JsonSchemaType.INTEGER),
+        Parameter("a", ["array", "null"], array_item_type="string"),
+        Parameter(
+            "a",
+            ["integer", "null"],
+            any_of=[{"type": "integer"}, {"type": "null"}],
+        ),
+        Parameter(
+            "a",
+            JsonSchemaType.OBJECT,
+            object_schema={"properties": {}, "required": []},
+        ),
+    ],
+)
+def test_from_json_schema_round_trips(parameter: Parameter) -> None:
+    json_schema: ParameterDict = parameter.to_json_schema()
+
+    assert Parameter.from_json_schema("a", json_schema) == parameter
+    assert Parameter.from_json_schema("a", json_schema).to_json_schema() == json_schema
+
+
+def test_from_json_schema_rejects_unsupported_keys() -> None:
+    with pytest.raises(ValueError, match=r"parameter 'a': \['minimum'\]"):
+        Parameter.from_json_schema("a", {"type": "integer", "minimum": 0})
+
+
+@pytest.mark.parametrize(
+    "items",
+    [
+        {"type": "string", "enum": ["x", "y"]},
+        {"type": "object", "properties": {"id": {"type": "integer"}}},
+        {"anyOf": [{"type": "string"}, {"type": "integer"}]},
+    ],
+)
+def test_from_json_schema_rejects_items_it_cannot_keep(items: dict) -> None:
+    with pytest.raises(ValueError, match="'items' of parameter 'a' to only have"):
+        Parameter.from_json_schema("a", {"type": "array", "items": items})
+
+
+def test_from_json_schema_requires_a_type_or_any_of() -> None:
+    with pytest.raises(ValueError, match="Expected the schema of parameter 'a'"):
+        Parameter.from_json_schema("a", {"description": "No type."})
+
+    with pytest.raises(ValueError, match="Expected the schema of parameter 'a'"):
+        Parameter.from_json_schema("a", {"description": "No type."}, validate=False)
+
+
+@pytest.mark.parametrize(
+    ("json_schema", "message"),
+    [
+        ({"type": "string", "description": ""}, "'description' of parameter 'a'"),
+        ({"type": "string", "enum": []}, "'enum' of parameter 'a'"),
+        (
+            {"type": "integer", "anyOf": [{"type": "integer"}]},
+            "a 'type' or an 'anyOf', not both",
+        ),
+    ],
+)
+def test_from_json_schema_rejects_schemas_it_cannot_write_back(
+    json_schema: dict, message: str
+) -> None:
+    with pytest.raises(ValueError, match=message):
+        Parameter.from_json_schema("a", json_schema)
+
+    assert Parameter.from_json_schema("a", json_schema, validate=False)
+
+
+def test_from_json_schema_ignores_unsupported_keys_without_validation() -> None:
+    parameter: Parameter = Parameter.from_json_schema(
+        "a", {"type": "integer", "minimum": 0}, validate=False
+    )
+
+    assert parameter == Parameter("a", JsonSchemaType.INTEGER)
+
+
+def test_object_schema_is_merged_into_json_schema() -> None:
+    object_schema: dict = {
+        "properties": {"street": {"type": "string"}},
+        "required": ["street"],
+    }
+    parameter = Parameter("address", JsonSchemaType.OBJECT, object_schema=object_schema)
+
+    assert parameter.to_json_schema() == {"type": "object", **object_schema}
+    assert (
+        Parameter.from_json_schema("address", parameter.to_json_schema()) == parameter
+    )
+
+
+@pytest.mark.parametrize(
+    ("parameter_type", "object_schema", "message"),
+    [
+        (JsonSchemaType.STRING, {"properties": {}}, "type is not set to 'object'"),
+        (JsonSchemaType.OBJECT, {"title": "Address"}, "only have the keys"),
+    ],
+)
+def test_object_schema_is_validated(
+    parameter_type: JsonSchemaType, object_schema: dict, message: str
+) -> None:
+    with pytest.raises(ValueError, match=message):
+        Parameter("address", parameter_type, object_schema=object_schema)
+
+
+def test_any_of_replaces_the_type_in_json_schema() -> None:
+    any_of: list = [
+        {"type": "integer"},
+        {"type": "string", "enum": ["auto"]},
+        {"type": "null"},
+    ]
+    parameter = Parameter(
+        "coats", ["integer", "string", "null"], description="Coats.", any_of=any_of
+    )
+
+    assert parameter.to_json_schema() == {"anyOf": any_of, "description": "Coats."}
+    assert Parameter.from_json_schema("coats", parameter.to_json_schema()) == parameter
+
+
+def test_any_of_cannot_be_combined_with_enum() -> None:
+    with pytest.raises(ValueError, match="since 'any_of' is set"):
+        Parameter("coats", "string", enum=["auto"], any_of=[{"type": "string"}])
+
+
+def test_pattern_is_added_to_json_schema() -> None:
+    parameter = Parameter("sku", ["string", "null"], pattern="^[A-Z]{3}$")
+
+    assert parameter.to_json_schema() == {
+        "type": ["string", "null"],
+        "pattern": "^[A-Z]{3}$",
+    }
+    assert Parameter.from_json_schema("sku", parameter.to_json_schema()) == parameter
+
+    with pytest.raises(ValueError, match="type is not set to 'string'"):
+        Parameter("count", "integer", pattern="^[0-9]$")
+
+
+def test_content_hash_is_cached_until_the_parameter_changes() -> None:
+    parameter = Parameter("unit", JsonSchemaType.STRING, "The unit.", enum=["c"])
+    content_hash: str = parameter.content_hash
+
+    assert parameter.content_hash is content_hash
+    assert (
+        Parameter("unit", JsonSchemaType.STRING, "The unit.", enum=["c"]).content_hash
+        == content_hash
+    )
+    assert Parameter("unit", JsonSchemaType.STRING, enum=["c"]).content_hash != (
+        content_hash
+    )
+
+    parameter.description = "The temperature unit."
+
+    assert parameter.content_hash != content_hash
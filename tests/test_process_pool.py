@@ -0,0 +1,147 @@
+"""Test running tools in a process pool."""
+
+from __future__ import annotations
+
+import array
+import asyncio
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from openai_function_calling.instrumentation import (
+    MetricsCollector,
+    add_hook,
+    remove_hook,
+)
+from openai_function_calling.process_pool import (
+    ProcessToolPool,
+    SharedBuffer,
+    _read_shared_buffer,
+    _run_tool,
+    _worker_tools,
+    get_import_path,
+)
+from openai_function_calling.tool_executor import ToolExecutor
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+def count_primes(limit: int) -> int:
+    """Count the prime numbers below a limit.
+
+    Args:
+        limit: The exclusive upper bound.
+
+    """
+    return sum(all(n % d for d in range(2, int(n**0.5) + 1)) for n in range(2, limit))
+
+
+def reverse(data: bytes) -> bytes:
+    """Reverse a byte payload."""
+    return data[::-1]
+
+
+def double(values: array.array) -> array.array:
+    """Double every value of an array."""
+    return array.array(values.typecode, (value * 2 for value in values))
+
+
+async def get_pid() -> int:
+    """Get the process id of the worker."""
+    await asyncio.sleep(0)
+    return os.getpid()
+
+
+def loaded_tools() -> list[str]:
+    """Get the tools imported by the worker."""
+    return sorted(_worker_tools)
+
+
+def fail() -> None:
+    """Fail every time."""
+    raise RuntimeError("Tool failed.")
+
+
+@pytest.fixture(scope="module")
+def pool() -> Iterator[ProcessToolPool]:
+    with ProcessToolPool(
+        [get_import_path(count_primes)], max_workers=2, shared_memory_threshold=16
+    ) as pool:
+        yield pool
+
+
+def test_executor_runs_registered_tools_in_the_pool(pool: ProcessToolPool) -> None:
+    executor = ToolExecutor()
+    executor.register(count_primes, process_pool=pool)
+    executor.register(get_pid, process_pool=pool)
+
+    assert executor.names == ["count_primes", "get_pid"]
+    assert executor.function("count_primes").required_parameters == ["limit"]
+    assert executor.execute("count_primes", '{"limit": 100}') == 25
+    assert executor.execute("get_pid", "{}") != os.getpid()
+
+
+def test_workers_import_tools_at_startup(pool: ProcessToolPool) -> None:
+    assert pool.warmup() >= 1
+    assert pool.import_paths[0] == "tests.test_process_pool:count_primes"
+    assert "tests.test_process_pool:count_primes" in pool.tool(loaded_tools)()
+
+
+def test_large_payloads_use_shared_memory(pool: ProcessToolPool) -> None:
+    collector = MetricsCollector()
+    add_hook(collector)
+
+    try:
+        assert pool.tool(reverse)(data=b"0123456789" * 10) == b"9876543210" * 10
+        assert pool.tool(reverse)(data=bytearray(b"ab" * 8)) == bytearray(b"ba" * 8)
+        assert pool.tool(reverse)(data=b"small") == b"llams"
+        assert pool.tool(double)(values=array.array("d", range(4))) == array.array(
+            "d", [0, 2, 4, 6]
+        )
+    finally:
+        remove_hook(collector)
+
+    assert collector.counters["process_pool.shared_memory_bytes"] == (100 + 16 + 32) * 2
+
+
+def test_tool_errors_are_raised_in_the_caller(pool: ProcessToolPool) -> None:
+    executor = ToolExecutor()
+    executor.register(fail, process_pool=pool)
+
+    result = executor.execute_tool_call(
+        {"id": "call_1", "function": {"name": "fail", "arguments": "{}"}}
+    )
+
+    assert result.content == '{"error": "RuntimeError: Tool failed."}'
+
+
+def test_run_tool_resolves_tools_lazily() -> None:
+    result = _run_tool("tests.test_process_pool:reverse", {"data": b"abc"}, 2)
+
+    assert isinstance(result, SharedBuffer)
+    assert _read_shared_buffer(result, unlink=True) == b"cba"
+    assert _run_tool(get_import_path(get_pid), {}, 2) == os.getpid()
+
+
+def test_get_import_path_rejects_local_functions() -> None:
+    def local_tool() -> None:
+        """Not importable."""
+
+    with pytest.raises(ValueError, match="Expected an importable module level"):
+        get_import_path(local_tool)
+
+
+@pytest.mark.parametrize("import_path", ["module", ":function", "module:"])
+def test_pool_rejects_invalid_import_paths(import_path: str) -> None:
+    with pytest.raises(ValueError, match="Expected an import path"):
+        ProcessToolPool([import_path])
+
+
+def test_tool_from_import_path(pool: ProcessToolPool) -> None:
+    tool = pool.tool("tests.test_process_pool:count_primes")
+
+    assert tool.__name__ == "count_primes"
+    assert tool.import_path == "tests.test_process_pool:count_primes"
+    assert tool(limit=10) == 4
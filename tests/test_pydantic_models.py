@@ -0,0 +1,256 @@
+"""Test the support for Pydantic model parameters."""
+
+import functools
+import json
+import subprocess
+import sys
+from typing import Optional, Union
+
+import pytest
+from pydantic import BaseModel, Field
+
+from openai_function_calling import Function, FunctionInferrer
+from openai_function_calling.instrumentation import (
+    MetricsCollector,
+    add_hook,
+    remove_hook,
+)
+from openai_function_calling.pydantic_models import (
+    is_model,
+    model_object_schema,
+    model_parameters,
+)
+from openai_function_calling.strict_schema import to_strict_function_schema
+from openai_function_calling.tool_executor import ToolCallError, ToolExecutor
+
+
+class Address(BaseModel):
+    """A postal address."""
+
+    street: str
+    city: str = Field(description="The city name.")
+
+
+class Order(BaseModel):
+    """An order to ship."""
+
+    title: str
+    quantity: int = 1
+    shipping: Address = Field(description="Where to ship the order.")
+    billing: Optional[Address] = None  # noqa: FA100
+
+
+class Node(BaseModel):
+    """A node of a tree."""
+
+    children: list["Node"] = []
+
+
+def place_order(order: Order, express: bool = False) -> str:  # noqa: FBT001, FBT002
+    """Place an order.
+
+    Args:
+        order: The order to place.
+        express: If the order should ship express.
+
+    """
+    return f"{order.quantity} x {order.title} to {order.shipping.city}" + (
+        " (express)" if express else ""
+    )
+
+
+ADDRESS_SCHEMA: dict = {
+    "properties": {
+        "street": {"type": "string"},
+        "city": {"description": "The city name.", "type": "string"},
+    },
+    "required": ["street", "city"],
+    "type": "object",
+}
+
+
+def test_model_object_schema_inlines_nested_models_without_titles() -> None:
+    schema: dict = model_object_schema(Order)
+
+    assert schema == {
+        "properties": {
+            "title": {"type": "string"},
+            "quantity": {"type": "integer"},
+            "shipping": {**ADDRESS_SCHEMA, "description": "Where to ship the order."},
+            "billing": {
+                "anyOf": [
+                    {**ADDRESS_SCHEMA, "description": "A postal address."},
+                    {"type": "null"},
+                ],
+            },
+        },
+        "required": ["title", "shipping"],
+    }
+
+
+def test_model_object_schema_is_generated_once_per_class() -> None:
+    class Item(BaseModel):
+        name: str
+
+    collector = MetricsCollector()
+    add_hook(collector)
+
+    try:
+        first: dict = model_object_schema(Item)
+        second: dict = model_object_schema(Item)
+    finally:
+        remove_hook(collector)
+
+    assert first == second
+    assert first is not second
+    assert collector.counters == {
+        "model_schema_cache.miss": 1,
+        "model_schema_cache.hit": 1,
+    }
+
+
+def test_model_object_schema_maps_tuples_to_items() -> None:
+    class Span(BaseModel):
+        bounds: tuple[int, int] = (0, 1)
+        label: tuple[int, str]
+        empty: tuple[()] = ()
+
+    assert model_object_schema(Span)["properties"] == {
+        "bounds": {
+            "items": {"type": "integer"},
+            "maxItems": 2,
+            "minItems": 2,
+            "type": "array",
+        },
+        "label": {
+            "items": {"anyOf": [{"type": "integer"}, {"type": "string"}]},
+            "maxItems": 2,
+            "minItems": 2,
+            "type": "array",
+        },
+        "empty": {"maxItems": 0, "minItems": 0, "type": "array"},
+    }
+
+
+def test_importing_the_package_does_not_import_pydantic() -> None:
+    code: str = (
+        "import sys, openai_function_calling; sys.exit('pydantic' in sys.modules)"
+    )
+
+    assert subprocess.run([sys.executable, "-c", code], check=False).returncode == 0  # noqa: S603
+
+
+def test_model_object_schema_rejects_recursive_models() -> None:
+    with pytest.raises(ValueError, match="recursive references, got 'Node'"):
+        model_object_schema(Node)
+
+
+def test_inference_converts_model_parameters_to_object_schemas() -> None:
+    function: Function = FunctionInferrer.infer_from_function_reference(place_order)
+    schema: dict = function.to_json_schema()["parameters"]["properties"]["order"]
+
+    assert schema["type"] == "object"
+    assert schema["description"] == "The order to place."
+    assert schema["required"] == ["title", "shipping"]
+    assert schema["properties"]["shipping"]["properties"]["city"] == {
+        "description": "The city name.",
+        "type": "string",
+    }
+    assert (
+        Function.from_json_schema(function.to_json_schema()).to_json_schema()
+        == function.to_json_schema()
+    )
+
+    strict_schema = to_strict_function_schema(function.to_json_schema())
+    order_schema: dict = strict_schema["parameters"]["properties"]["order"]
+
+    assert order_schema["additionalProperties"] is False
+    assert order_schema["required"] == ["title", "quantity", "shipping", "billing"]
+
+
+def test_model_parameters_finds_model_typed_parameters() -> None:
+    assert is_model(Order)
+    assert not is_model(dict)
+    assert model_parameters(place_order) == {"order": Order}
+    assert model_parameters(functools.partial(place_order, express=True)) == {
+        "order": Order
+    }
+    assert model_parameters(print) == {}
+
+    def unresolved(value: "Missing") -> None:  # noqa: F821
+        """Take a value of an undefined type."""
+
+    assert model_parameters(unresolved) == {}
+
+
+def test_executor_validates_arguments_into_models() -> None:
+    executor = ToolExecutor([place_order])
+    arguments: dict = {
+        "order": {
+            "title": "Lamp",
+            "quantity": 2,
+            "shipping": {"street": "1 Main St", "city": "Boston"},
+        },
+        "express": True,
+    }
+
+    assert (
+        executor.execute("place_order", json.dumps(arguments))
+        == "2 x Lamp to Boston (express)"
+    )
+    assert (
+        executor.execute(
+            "place_order",
+            {"order": Order.model_validate(arguments["order"])},
+        )
+        == "2 x Lamp to Boston"
+    )
+
+
+def set_billing(
+    billing: Optional[Address],  # noqa: FA100
+    either: Union[Address, Order, None] = None,  # noqa: FA100
+) -> str:
+    """Set the billing address.
+
+    Args:
+        billing: The billing address, or None to remove it.
+        either: An address or an order.
+
+    """
+    return (
+        "removed" if billing is None else f"{type(billing).__name__} in {billing.city}"
+    )
+
+
+def test_executor_validates_arguments_of_optional_models() -> None:
+    executor = ToolExecutor([set_billing])
+    address: dict = {"street": "1 Main St", "city": "Boston"}
+
+    assert model_parameters(set_billing) == {"billing": Address}
+    assert executor.execute("set_billing", {"billing": address}) == (
+        "Address in Boston"
+    )
+    assert executor.execute("set_billing", {"billing": None}) == "removed"
+
+    with pytest.raises(ToolCallError, match="Invalid argument 'billing'"):
+        executor.execute("set_billing", {"billing": {"street": "1 Main St"}})
+
+
+def test_executor_reports_invalid_model_arguments() -> None:
+    executor = ToolExecutor([place_order])
+
+    with pytest.raises(ToolCallError, match="Invalid argument 'order'"):
+        executor.execute("place_order", {"order": {"title": "Lamp"}})
+
+    result = executor.execute_tool_call(
+        {
+            "id": "call_1",
+            "function": {"name": "place_order", "arguments": '{"order": []}'},
+        }
+    )
+
+    assert result.is_error
+    assert (
+        "ToolCallError: Invalid argument 'order'" in json.loads(result.content)["error"]
+    )
@@ -0,0 +1,348 @@
+"""Test the chat completion response cache."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+import openai
+import pytest
+
+from openai_function_calling.mock_server import (
+    AsyncMockServerClient,
+    MockChatCompletionsServer,
+    MockServerClient,
+)
+from openai_function_calling.response_cache import (
+    AsyncCachedChatClient,
+    CachedChatClient,
+    CacheEntry,
+    MemoryCacheStorage,
+    ResponseCache,
+    ResponseCacheStats,
+    SqliteCacheStorage,
+    cache_key,
+)
+from openai_function_calling.tool_helpers import ToolHelpers
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+def get_current_weather(location: str) -> str:
+    """Get the current weather."""
+    return f"It is sunny in {location}."
+
+
+def get_forecast(location: str) -> str:
+    """Get the weather forecast."""
+    return f"It will rain in {location}."
+
+
+TOOLS = ToolHelpers.infer_from_function_refs([get_current_weather])
+MESSAGES: list[dict] = [{"role": "user", "content": "What's the weather?"}]
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        """Create a clock at time 0."""
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        """Get the current time."""
+        return self.now
+
+
+@pytest.fixture
+def server() -> Iterator[MockChatCompletionsServer]:
+    with MockChatCompletionsServer(seed=0) as mock_server:
+        yield mock_server
+
+
+def _request(**kwargs: object) -> dict:
+    return {"model": "mock", "messages": MESSAGES, "temperature": 0, **kwargs}
+
+
+def _wait_for_refresh(cache: ResponseCache, key: str, created_at: float) -> None:
+    deadline: float = time.monotonic() + 5
+
+    # Wait for the refreshed response, then for the refresh to release its claim.
+    while (
+        cache.storage.get(key).created_at != created_at  # type: ignore[union-attr]
+        or not cache.start_refresh(key)
+    ):
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+    cache.finish_refresh(key)
+
+
+def test_cache_key_covers_request_and_tool_fingerprint() -> None:
+    key: str = cache_key(_request(tools=TOOLS))
+
+    assert key == cache_key({**_request(tools=TOOLS), "timeout": 5, "stream": False})
+    assert key != cache_key(_request())
+    assert key != cache_key(
+        _request(tools=ToolHelpers.infer_from_function_refs([get_forecast]))
+    )
+    assert key != cache_key(_request(tools=TOOLS, tool_choice="none"))
+    assert key != cache_key(_request(tools=TOOLS, model="other"))
+
+
+def test_repeated_requests_are_answered_from_the_cache(
+    server: MockChatCompletionsServer,
+) -> None:
+    cache = ResponseCache()
+    client = CachedChatClient(MockServerClient(server.base_url), cache)
+
+    first: dict = client.chat.completions.create(**_request(tools=TOOLS))
+    second: dict = client.chat.completions.create(**_request(tools=TOOLS))
+    client.chat.completions.create(
+        **_request(tools=ToolHelpers.infer_from_function_refs([get_forecast]))
+    )
+
+    assert first == second
+    assert server.request_count == 2
+    assert cache.stats == ResponseCacheStats(hits=1, stale_hits=0, misses=2, bypassed=0)
+    assert cache.stats.hit_rate == pytest.approx(1 / 3)
+
+
+def test_streaming_and_sampled_requests_bypass_the_cache(
+    server: MockChatCompletionsServer,
+) -> None:
+    cache = ResponseCache()
+    client = CachedChatClient(MockServerClient(server.base_url), cache)
+
+    for _ in range(2):
+        client.chat.completions.create(**_request(temperature=0.7))
+        client.chat.completions.create(**_request(n=2))
+        list(client.chat.completions.create(**_request(stream=True)))
+
+    assert server.request_count == 6
+    assert cache.stats == ResponseCacheStats(0, 0, 0, 6)
+    assert cache.stats.hit_rate == 0.0
+
+    sampled_cache = ResponseCache(deterministic_only=False)
+    assert sampled_cache.is_cacheable(_request(temperature=0.7))
+
+
+def test_expired_responses_are_served_stale_while_revalidating(
+    server: MockChatCompletionsServer,
+) -> None:
+    clock = FakeClock()
+    cache = ResponseCache(
+        ttl_seconds=10, stale_while_revalidate_seconds=10, clock=clock
+    )
+    client = CachedChatClient(MockServerClient(server.base_url), cache)
+
+    client.chat.completions.create(**_request())
+    clock.now = 15
+    stale: dict = client.chat.completions.create(**_request())
+    _wait_for_refresh(cache, cache_key(_request()), 15)
+
+    assert stale["object"] == "chat.completion"
+    assert cache.stats.stale_hits == 1
+
+    # The background refresh stored a fresh response, so this is a hit.
+    client.chat.completions.create(**_request())
+
+    assert cache.stats.hits == 1
+    assert server.request_count == 2
+
+    clock.now = 100
+    client.chat.completions.create(**_request())
+
+    assert server.request_count == 3
+    assert cache.stats.misses == 2
+
+
+def test_refresh_requests_the_history_of_the_stale_request() -> None:
+    class RecordingClient:
+        """A client that holds refreshes until released."""
+
+        def __init__(self) -> None:
+            """Create a client."""
+            self.message_counts: list[int] = []
+            self.released = threading.Event()
+            self.chat = self
+            self.completions = self
+
+        def create(self, **kwargs: Any) -> dict:
+            """Answer with the number of messages of the request."""
+            if self.message_counts:
+                self.released.wait(5)
+
+            self.message_counts.append(len(kwargs["messages"]))
+
+            return {"id": f"{len(kwargs['messages'])} messages"}
+
+    clock = FakeClock()
+    cache = ResponseCache(ttl_seconds=1, stale_while_revalidate_seconds=5, clock=clock)
+    recording_client = RecordingClient()
+    client = CachedChatClient(recording_client, cache)
+    request: dict = _request(messages=[*MESSAGES])
+    key: str = cache_key(request)
+    client.chat.completions.create(**request)
+    clock.now = 2
+
+    assert client.chat.completions.create(**request)["id"] == "1 messages"
+
+    # The conversation goes on, as in a tool loop, while the refresh runs.
+    request["messages"].append({"role": "assistant", "content": "It is sunny."})
+    recording_client.released.set()
+    _wait_for_refresh(cache, key, 2)
+
+    assert recording_client.message_counts == [1, 1]
+    assert cache.lookup(key)[1]["id"] == "1 messages"
+
+
+def test_failed_refresh_keeps_the_stale_response() -> None:
+    class FailingClient:
+        """A client whose requests fail after the first."""
+
+        def __init__(self) -> None:
+            """Create a client."""
+            self.calls: int = 0
+            self.chat = self
+            self.completions = self
+
+        def create(self, **kwargs: object) -> dict:
+            """Return a response the first time and fail afterwards."""
+            self.calls += 1
+
+            if self.calls > 1:
+                raise RuntimeError("Service unavailable.")
+
+            return {"id": "first", **kwargs}
+
+    clock = FakeClock()
+    cache = ResponseCache(ttl_seconds=1, stale_while_revalidate_seconds=5, clock=clock)
+    failing_client = FailingClient()
+    client = CachedChatClient(failing_client, cache)
+    client.chat.completions.create(**_request())
+    clock.now = 2
+
+    assert client.chat.completions.create(**_request())["id"] == "first"
+
+    deadline: float = time.monotonic() + 5
+
+    while cache.start_refresh(cache_key(_request())) is False:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+    assert failing_client.calls == 2
+
+
+def test_openai_client_gets_chat_completion_objects_on_hits(
+    server: MockChatCompletionsServer,
+) -> None:
+    client = CachedChatClient(
+        openai.OpenAI(base_url=server.base_url, api_key="mock"), ResponseCache()
+    )
+
+    first = client.chat.completions.create(**_request(tools=TOOLS))
+    second = client.chat.completions.create(**_request(tools=TOOLS))
+
+    assert isinstance(second, openai.types.chat.ChatCompletion)
+    assert second == first
+    assert server.request_count == 1
+
+
+def test_sqlite_storage_persists_between_caches(
+    server: MockChatCompletionsServer, tmp_path: Path
+) -> None:
+    path: Path = tmp_path / "responses.sqlite"
+    mock_client = MockServerClient(server.base_url)
+
+    CachedChatClient(mock_client, ResponseCache(SqliteCacheStorage(path))).create(
+        **_request(tools=TOOLS)
+    )
+    storage = SqliteCacheStorage(path, max_entries=1)
+    cache = ResponseCache(storage)
+    CachedChatClient(mock_client, cache).create(**_request(tools=TOOLS))
+
+    assert server.request_count == 1
+    assert cache.stats.hits == 1
+
+    storage.set("other", CacheEntry("{}", time.time() + 1))
+
+    assert len(storage) == 1
+    assert storage.get("other") is not None
+
+    storage.delete("other")
+
+    assert storage.get("other") is None
+    storage.close()
+
+
+def test_memory_storage_evicts_least_recently_used() -> None:
+    storage = MemoryCacheStorage(max_entries=2)
+
+    storage.set("a", CacheEntry("a", 0))
+    storage.set("b", CacheEntry("b", 0))
+    storage.get("a")
+    storage.set("c", CacheEntry("c", 0))
+
+    assert storage.get("b") is None
+    assert len(storage) == 2
+
+    storage.delete("a")
+
+    assert storage.get("a") is None
+    assert storage.get("c") == CacheEntry("c", 0)
+
+
+def test_async_client_caches_and_revalidates(
+    server: MockChatCompletionsServer,
+) -> None:
+    clock = FakeClock()
+    cache = ResponseCache(
+        ttl_seconds=10, stale_while_revalidate_seconds=10, clock=clock
+    )
+    client = AsyncCachedChatClient(AsyncMockServerClient(server.base_url), cache)
+
+    async def main() -> None:
+        await client.chat.completions.create(**_request())
+        await client.chat.completions.create(**_request())
+        await client.chat.completions.create(**_request(temperature=1))
+        clock.now = 15
+        await client.chat.completions.create(**_request())
+        await asyncio.gather(*client._refresh_tasks)  # noqa: SLF001
+
+    asyncio.run(main())
+
+    assert server.request_count == 3
+    assert cache.stats == ResponseCacheStats(1, 1, 1, 1)
+
+
+def test_async_refresh_errors_are_counted() -> None:
+    class FailingClient:
+        """An async client whose requests fail."""
+
+        def __init__(self) -> None:
+            """Create a client."""
+            self.chat = self
+            self.completions = self
+
+        async def create(self, **kwargs: object) -> dict:
+            """Fail."""
+            raise RuntimeError(kwargs)
+
+    clock = FakeClock()
+    cache = ResponseCache(ttl_seconds=1, stale_while_revalidate_seconds=5, clock=clock)
+    cache.store(cache_key(_request()), {"id": "stale"})
+    clock.now = 2
+    client = AsyncCachedChatClient(FailingClient(), cache)
+
+    async def main() -> dict:
+        response: dict = await client.chat.completions.create(**_request())
+        await asyncio.gather(*client._refresh_tasks)  # noqa: SLF001
+        return response
+
+    assert asyncio.run(main()) == {"id": "stale"}
+    assert cache.start_refresh(cache_key(_request()))
@@ -0,0 +1,99 @@
+"""Test fingerprinting and diffing tool schemas."""
+
+import json
+
+import pytest
+
+from openai_function_calling import Function, JsonSchemaType, Parameter
+from openai_function_calling.schema_snapshot import (
+    SchemaDiff,
+    SchemaSnapshot,
+    ToolChange,
+)
+from openai_function_calling.tool_catalog import ToolCatalog
+
+
+def _functions(count: int) -> list[Function]:
+    return [
+        Function(
+            name=f"tool_{i}",
+            description=f"Tool number {i}.",
+            parameters=[
+                Parameter("value", JsonSchemaType.STRING),
+                Parameter("limit", JsonSchemaType.INTEGER),
+            ],
+            required_parameters=["value"],
+        )
+        for i in range(count)
+    ]
+
+
+def test_fingerprint_does_not_depend_on_the_tool_order() -> None:
+    functions: list[Function] = _functions(50)
+    snapshot: SchemaSnapshot = SchemaSnapshot.from_functions(functions)
+
+    assert len(snapshot) == 50
+    assert snapshot == SchemaSnapshot.from_functions(reversed(functions))
+    assert hash(snapshot) == hash(SchemaSnapshot.from_functions(functions))
+    assert snapshot != SchemaSnapshot.from_functions(functions[:49])
+    assert snapshot != snapshot.fingerprint
+    assert SchemaSnapshot.from_functions([]).fingerprint == (
+        SchemaSnapshot({}).fingerprint
+    )
+    assert snapshot.tool_hashes("tool_3").content_hash == functions[3].content_hash
+    assert snapshot.tool_hashes("tool_3").parameters == {
+        "value": functions[3].parameters[0].content_hash,
+        "limit": functions[3].parameters[1].content_hash,
+    }
+
+
+def test_diff_reports_added_removed_and_changed_tools() -> None:
+    old: SchemaSnapshot = SchemaSnapshot.from_functions(_functions(300))
+    functions: list[Function] = _functions(301)[1:]
+    functions[0].parameters[0].description = "The value."
+    functions[1].parameters.pop()
+    functions[1].parameters.append(Parameter("offset", JsonSchemaType.INTEGER))
+    functions[2].description = "A renamed tool."
+    new: SchemaSnapshot = SchemaSnapshot.from_functions(functions)
+
+    assert old.diff(new) == SchemaDiff(
+        added=["tool_300"],
+        removed=["tool_0"],
+        changed=[
+            ToolChange("tool_1", [], [], ["value"]),
+            ToolChange("tool_2", ["offset"], ["limit"], []),
+            ToolChange("tool_3", [], [], []),
+        ],
+    )
+    assert new.diff(old).added == ["tool_0"]
+    assert old.diff(SchemaSnapshot.from_functions(_functions(300))).is_empty
+    assert not old.diff(new).is_empty
+
+
+def test_snapshots_are_stored_as_json() -> None:
+    snapshot: SchemaSnapshot = SchemaSnapshot.from_functions(_functions(5))
+    stored: dict = json.loads(json.dumps(snapshot.to_dict()))
+
+    assert stored["fingerprint"] == snapshot.fingerprint
+    assert SchemaSnapshot.from_dict(stored) == snapshot
+    assert SchemaSnapshot.from_dict(stored).names == snapshot.names
+
+    with pytest.raises(ValueError, match="snapshot of version 1, got 2"):
+        SchemaSnapshot.from_dict({**stored, "version": 2})
+
+
+def test_snapshot_errors() -> None:
+    with pytest.raises(ValueError, match="Duplicate tool 'tool_0'"):
+        SchemaSnapshot.from_functions(_functions(1) * 2)
+
+    with pytest.raises(ValueError, match="Unknown tool 'missing'"):
+        SchemaSnapshot.from_functions([]).tool_hashes("missing")
+
+
+def test_catalog_snapshot_is_taken_once() -> None:
+    catalog = ToolCatalog(_functions(3))
+
+    assert catalog.snapshot is catalog.snapshot
+    assert (
+        catalog.fingerprint == SchemaSnapshot.from_functions(_functions(3)).fingerprint
+    )
@@ -0,0 +1,298 @@
+"""Test deduplicating identical tool calls."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from openai_function_calling.single_flight import (
+    SingleFlight,
+    SingleFlightStats,
+    call_key,
+)
+from openai_function_calling.tool_executor import ToolExecutor
+
+
+def _tool_call(tool_call_id: str, name: str, arguments: str) -> dict:
+    return {"id": tool_call_id, "function": {"name": name, "arguments": arguments}}
+
+
+def _wait_for_waiters(single_flight: SingleFlight, count: int) -> None:
+    deadline: float = time.monotonic() + 5
+
+    while single_flight.stats.in_flight < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_call_key_is_canonical() -> None:
+    assert call_key("lookup", {"a": 1, "b": [2]}) == call_key(
+        "lookup", {"b": [2], "a": 1}
+    )
+    assert call_key("lookup", {"a": 1}) != call_key("lookup", {"a": "1"})
+
+
+def test_identical_calls_within_a_response_run_once() -> None:
+    calls: list[str] = []
+
+    def lookup(query: str) -> str:
+        """Look up a query."""
+        calls.append(query)
+        return f"result for {query}"
+
+    def notify(message: str) -> None:
+        """Send a notification."""
+        calls.append(message)
+
+    single_flight = SingleFlight()
+    executor = ToolExecutor(single_flight=single_flight)
+    executor.register(lookup, idempotent=True)
+    executor.register(notify)
+
+    results = executor.execute_tool_calls(
+        [
+            _tool_call("call_1", "lookup", '{"query": "a"}'),
+            _tool_call("call_2", "lookup", '{ "query":"a" }'),
+            _tool_call("call_3", "lookup", '{"query": "b"}'),
+            _tool_call("call_4", "notify", '{"message": "hi"}'),
+            _tool_call("call_5", "notify", '{"message": "hi"}'),
+            _tool_call("call_6", "lookup", "not json"),
+            _tool_call("call_7", "lookup", "[]"),
+            {"id": "call_8"},
+        ]
+    )
+
+    assert sorted(calls) == ["a", "b", "hi", "hi"]
+    assert [result.tool_call_id for result in results] == [
+        "call_1",
+        "call_2",
+        "call_3",
+        "call_4",
+        "call_5",
+        "call_6",
+        "call_7",
+        "call_8",
+    ]
+    assert results[1].content == "result for a"
+    assert results[5].is_error
+    assert results[6].is_error
+    assert results[7].is_error
+    assert single_flight.stats == SingleFlightStats(
+        executed=2, within_response=1, in_flight=0
+    )
+
+
+def test_identical_calls_in_flight_share_one_run() -> None:
+    release = threading.Event()
+    calls: list[str] = []
+
+    def lookup(query: str) -> str:
+        """Look up a query slowly."""
+        calls.append(query)
+        release.wait(5)
+        return f"result for {query}"
+
+    single_flight = SingleFlight()
+    executor = ToolExecutor(single_flight=single_flight)
+    executor.register(lookup, idempotent=True)
+    results: list[str] = []
+    threads: list[threading.Thread] = [
+        threading.Thread(
+            target=lambda: results.append(executor.execute("lookup", '{"query": "a"}'))
+        )
+        for _ in range(4)
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    _wait_for_waiters(single_flight, 3)
+    release.set()
+
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["a"]
+    assert results == ["result for a"] * 4
+    assert single_flight.stats == SingleFlightStats(
+        executed=1, within_response=0, in_flight=3
+    )
+
+
+def test_async_calls_in_flight_share_one_run_with_threads() -> None:
+    started = threading.Event()
+    release = threading.Event()
+    calls: list[str] = []
+
+    def lookup(query: str) -> str:
+        """Look up a query slowly."""
+        calls.append(query)
+        started.set()
+        release.wait(5)
+        return f"result for {query}"
+
+    async def alookup(query: str) -> str:
+        """Look up a query slowly from an event loop."""
+        calls.append(query)
+        await asyncio.sleep(0.01)
+        return f"async result for {query}"
+
+    single_flight = SingleFlight()
+    executor = ToolExecutor(single_flight=single_flight)
+    executor.register(lookup, idempotent=True)
+    executor.register(alookup, idempotent=True)
+    thread = threading.Thread(target=executor.execute, args=("lookup", {"query": "a"}))
+    thread.start()
+    started.wait(5)
+
+    async def main() -> list[str]:
+        waiter = asyncio.ensure_future(executor.aexecute("lookup", {"query": "a"}))
+        results: list[str] = await asyncio.gather(
+            executor.aexecute("alookup", {"query": "b"}),
+            executor.aexecute("alookup", {"query": "b"}),
+        )
+        release.set()
+
+        return [*results, await waiter]
+
+    results: list[str] = asyncio.run(main())
+    thread.join()
+
+    assert sorted(calls) == ["a", "b"]
+    assert results == ["async result for b", "async result for b", "result for a"]
+    assert single_flight.stats.in_flight == 2
+
+
+def test_errors_are_shared_with_waiters() -> None:
+    single_flight = SingleFlight()
+    release = threading.Event()
+    errors: list[BaseException] = []
+
+    def fail() -> None:
+        release.wait(5)
+        raise RuntimeError("Lookup failed.")
+
+    def call() -> None:
+        try:
+            single_flight.run("key", fail)
+        except RuntimeError as error:
+            errors.append(error)
+
+    threads: list[threading.Thread] = [threading.Thread(target=call) for _ in range(2)]
+
+    for thread in threads:
+        thread.start()
+
+    _wait_for_waiters(single_flight, 1)
+    release.set()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 2
+    assert errors[0] is errors[1]
+
+
+def test_async_errors_are_raised_and_calls_can_run_again() -> None:
+    single_flight = SingleFlight()
+
+    async def fail() -> None:
+        raise RuntimeError("Lookup failed.")
+
+    with pytest.raises(RuntimeError, match="Lookup failed"):
+        asyncio.run(single_flight.arun("key", fail))
+
+    assert single_flight.run("key", lambda: "ran again") == "ran again"
+    assert single_flight.stats.executed == 2
+
+
+def test_waiters_run_the_call_themselves_when_it_is_cancelled() -> None:
+    single_flight = SingleFlight()
+
+    async def main() -> tuple[str, int]:
+        started = asyncio.Event()
+        runs: list[int] = []
+
+        async def lookup() -> str:
+            runs.append(1)
+
+            if len(runs) == 1:
+                started.set()
+                await asyncio.sleep(10)
+
+            return "result"
+
+        leader = asyncio.ensure_future(single_flight.arun("key", lookup))
+        await started.wait()
+        waiter = asyncio.ensure_future(single_flight.arun("key", lookup))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        return await waiter, len(runs)
+
+    assert asyncio.run(main()) == ("result", 2)
+    assert single_flight.run("key", lambda: "ran again") == "ran again"
+
+
+def test_cancelled_waiters_do_not_cancel_the_call_of_others() -> None:
+    single_flight = SingleFlight()
+
+    async def main() -> list[str]:
+        release = asyncio.Event()
+
+        async def lookup() -> str:
+            await release.wait()
+            return "result"
+
+        tasks: list[asyncio.Task[str]] = [
+            asyncio.ensure_future(single_flight.arun("key", lookup)) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        tasks[1].cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await tasks[1]
+
+        return [await tasks[0], await tasks[2]]
+
+    assert asyncio.run(main()) == ["result", "result"]
+    assert single_flight.stats == SingleFlightStats(1, 0, 2)
+
+
+def test_async_tool_calls_deduplicate_within_a_response() -> None:
+    single_flight = SingleFlight()
+    calls: list[str] = []
+
+    async def lookup(query: str) -> str:
+        """Look up a query."""
+        calls.append(query)
+        return query
+
+    executor = ToolExecutor(single_flight=single_flight)
+    executor.register(lookup, idempotent=True)
+
+    results = asyncio.run(
+        executor.aexecute_tool_calls(
+            [
+                _tool_call("call_1", "lookup", '{"query": "a"}'),
+                {
+                    "id": "call_2",
+                    "function": {"name": "lookup", "arguments": {"query": "a"}},
+                },
+            ]
+        )
+    )
+
+    assert calls == ["a"]
+    assert [(r.tool_call_id, r.content) for r in results] == [
+        ("call_1", "a"),
+        ("call_2", "a"),
+    ]
+    assert single_flight.stats.within_response == 1
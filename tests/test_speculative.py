@@ -0,0 +1,208 @@
+"""Test speculative tool execution during streaming."""
+
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from openai_function_calling.mock_server import (
+    MockChatCompletionsServer,
+    MockServerClient,
+)
+from openai_function_calling.speculative import (
+    SpeculationStats,
+    SpeculativeToolRunner,
+    parse_complete_arguments,
+)
+from openai_function_calling.tool_executor import ToolCallResult, ToolExecutor
+
+
+def get_current_weather(location: str, unit: str = "fahrenheit") -> str:
+    """Get the current weather and return a summary."""
+    return f"It is currently sunny in {location} and 75 degrees {unit}."
+
+
+@pytest.mark.parametrize(
+    ("partial_arguments", "expected"),
+    [
+        ("", None),
+        ("{", None),
+        ('{"location": "Bos', None),
+        ('{"location"', None),
+        ('{"location": "Boston"', {"location": "Boston"}),
+        ('{"location": "Boston", "unit": "cel', {"location": "Boston"}),
+        ('{"a": 1, "b": 2', {"a": 1}),
+        ('{"a": [1, 2], "b": tru', {"a": [1, 2]}),
+        ('{"a": true ', {"a": True}),
+        ('{"a": {"b": 1}', {"a": {"b": 1}}),
+        ('{"a": "x, \\"y\\"", "b', {"a": 'x, "y"'}),
+        ('{"a": 1}', {"a": 1}),
+        ('{"a": 1} trailing', {"a": 1}),
+        ("[1, 2]", None),
+    ],
+)
+def test_parse_complete_arguments(
+    partial_arguments: str, expected: dict[str, Any] | None
+) -> None:
+    assert parse_complete_arguments(partial_arguments) == expected
+
+
+def _stream(
+    arguments: str, name: str = "get_current_weather", chunk_size: int = 4
+) -> list[dict[str, Any]]:
+    server = MockChatCompletionsServer(
+        scripted_responses=[{"tool_calls": [{"name": name, "arguments": arguments}]}],
+        stream_chunk_size=chunk_size,
+    )
+    server.stop()
+
+    return list(server.stream_completion(server.create_completion({})))
+
+
+def test_run_stream_reuses_matching_speculation() -> None:
+    executor = ToolExecutor()
+    executor.register(get_current_weather, idempotent=True)
+    runner = SpeculativeToolRunner(executor)
+
+    results: list[ToolCallResult] = runner.run_stream(_stream('{"location": "Boston"}'))
+
+    assert [result.content for result in results] == [
+        "It is currently sunny in Boston and 75 degrees fahrenheit."
+    ]
+    assert runner.stats == SpeculationStats(started=1, hits=1, misses=0)
+
+
+def test_run_stream_repeats_when_arguments_change() -> None:
+    calls: list[tuple[str, str]] = []
+    lock = threading.Lock()
+
+    def get_weather(location: str, unit: str = "fahrenheit") -> str:
+        """Get the current weather."""
+        with lock:
+            calls.append((location, unit))
+
+        return f"{location} {unit}"
+
+    executor = ToolExecutor()
+    executor.register(get_weather, idempotent=True)
+    runner = SpeculativeToolRunner(executor)
+
+    results: list[ToolCallResult] = runner.run_stream(
+        _stream('{"location": "Boston", "unit": "celsius"}', name="get_weather")
+    )
+
+    assert results[0].content == "Boston celsius"
+    assert runner.stats == SpeculationStats(started=1, hits=0, misses=1)
+    assert ("Boston", "celsius") in calls
+
+
+def test_run_stream_waits_for_non_idempotent_tools() -> None:
+    executor = ToolExecutor({"get_current_weather": get_current_weather})
+    runner = SpeculativeToolRunner(executor)
+
+    results: list[ToolCallResult] = runner.run_stream(_stream('{"location": "Boston"}'))
+
+    assert results[0].content == (
+        "It is currently sunny in Boston and 75 degrees fahrenheit."
+    )
+    assert runner.stats == SpeculationStats(started=0, hits=0, misses=0)
+
+
+def test_run_stream_reports_errors_of_speculative_runs() -> None:
+    def lookup(key: str) -> str:
+        """Look up a key."""
+        raise KeyError(key)
+
+    executor = ToolExecutor()
+    executor.register(lookup, idempotent=True)
+    runner = SpeculativeToolRunner(executor)
+
+    results: list[ToolCallResult] = runner.run_stream(
+        _stream('{"key": "a"}', name="lookup")
+    )
+
+    assert results[0].is_error
+    assert results[0].content == '{"error": "KeyError: \'a\'"}'
+    assert runner.stats.hits == 1
+
+
+def test_run_stream_handles_invalid_final_arguments() -> None:
+    executor = ToolExecutor()
+    executor.register(get_current_weather, idempotent=True)
+    runner = SpeculativeToolRunner(executor)
+
+    results: list[ToolCallResult] = runner.run_stream(
+        _stream('{"location": "Boston", "unit": }')
+    )
+
+    assert results[0].is_error
+    assert runner.stats == SpeculationStats(started=1, hits=0, misses=1)
+
+
+def test_feed_accepts_chunk_objects() -> None:
+    executor = ToolExecutor()
+    executor.register(get_current_weather, idempotent=True)
+    runner = SpeculativeToolRunner(executor)
+    function = SimpleNamespace(name="get_current_weather", arguments='{"location"')
+    delta = SimpleNamespace(
+        tool_calls=[SimpleNamespace(index=0, id="call_1", function=function)]
+    )
+
+    runner.feed(SimpleNamespace(choices=[SimpleNamespace(delta=delta)]))
+    runner.feed(SimpleNamespace(choices=[SimpleNamespace(delta=None)]))
+    runner.feed(
+        {
+            "choices": [
+                {
+                    "delta": {
+                        "tool_calls": [
+                            {"index": 0, "function": {"arguments": ': "Paris"}'}}
+                        ]
+                    }
+                }
+            ]
+        }
+    )
+
+    assert runner.tool_calls == [
+        {
+            "id": "call_1",
+            "type": "function",
+            "function": {
+                "name": "get_current_weather",
+                "arguments": '{"location": "Paris"}',
+            },
+        }
+    ]
+    assert runner.finish()[0].tool_call_id == "call_1"
+    assert runner.stats.hits == 1
+
+
+def test_run_stream_with_mock_server_client() -> None:
+    executor = ToolExecutor()
+    executor.register(get_current_weather, idempotent=True)
+
+    with MockChatCompletionsServer(seed=0, tool_calls_per_response=3) as server:
+        client = MockServerClient(server.base_url)
+        tools: list[dict[str, Any]] = [
+            {"type": "function", "function": executor.function(name).to_json_schema()}
+            for name in executor.names
+        ]
+        stream = client.chat.completions.create(
+            model="mock",
+            messages=[{"role": "user", "content": "Weather?"}],
+            tools=tools,
+            stream=True,
+        )
+        runner = SpeculativeToolRunner(executor)
+        results: list[ToolCallResult] = runner.run_stream(stream)
+
+    assert len(results) == 3
+    assert [result.tool_call_id for result in results] == [
+        tool_call["id"] for tool_call in runner.tool_calls
+    ]
+    assert runner.stats.started == 3
+    assert not any(result.is_error for result in results)
@@ -0,0 +1,281 @@
+"""Test the strict mode schema transformer."""
+
+import dataclasses
+import enum
+from typing import Any
+
+import pytest
+
+from openai_function_calling import Function, FunctionInferrer, Parameter
+from openai_function_calling.strict_schema import (
+    make_strict,
+    to_strict_function_schema,
+    validate_strict_schema,
+)
+
+
+class Unit(enum.Enum):
+    """A temperature unit."""
+
+    CELSIUS = "celsius"
+    FAHRENHEIT = "fahrenheit"
+
+
+@dataclasses.dataclass
+class Location:
+    """A location."""
+
+    city: str
+
+
+def get_weather(
+    location: str,
+    unit: Unit = Unit.FAHRENHEIT,
+    days: int = 1,
+    hourly: bool = False,  # noqa: FBT001, FBT002
+) -> str:
+    """Get the weather.
+
+    Args:
+        location: The city and state.
+        unit: The temperature unit.
+        days: The number of days.
+        hourly: If the forecast should be hourly.
+
+    """
+    return f"{location} {unit} {days} {hourly}"
+
+
+def test_make_strict_rewrites_objects() -> None:
+    schema: dict[str, Any] = {
+        "type": "object",
+        "properties": {
+            "location": {"type": "string"},
+            "unit": {"type": "string", "enum": ["celsius", "fahrenheit"]},
+            "days": {"type": ["integer"]},
+            "tags": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["location"],
+    }
+
+    assert make_strict(schema) == {
+        "type": "object",
+        "properties": {
+            "location": {"type": "string"},
+            "unit": {
+                "type": ["string", "null"],
+                "enum": ["celsius", "fahrenheit", None],
+            },
+            "days": {"type": ["integer", "null"]},
+            "tags": {"type": ["array", "null"], "items": {"type": "string"}},
+        },
+        "required": ["location", "unit", "days", "tags"],
+        "additionalProperties": False,
+    }
+    assert schema["required"] == ["location"]
+
+
+def test_make_strict_rewrites_nested_schemas() -> None:
+    address: dict[str, Any] = {
+        "type": "object",
+        "properties": {"city": {"type": "string"}},
+    }
+    schema: dict[str, Any] = {
+        "type": "object",
+        "properties": {
+            "home": {"$ref": "#/$defs/Address"},
+            "work": {"anyOf": [{"$ref": "#/$defs/Address"}, {"type": "string"}]},
+            "stops": {"type": "array", "items": address},
+            "note": {"anyOf": [{"type": "string"}, {"type": "null"}]},
+            "any": {"type": "null"},
+            "either": {"type": ["string", "null"]},
+        },
+        "$defs": {"Address": address},
+        "required": ["stops"],
+    }
+
+    strict_schema: dict[str, Any] = make_strict(schema)
+    strict_address: dict[str, Any] = {
+        "type": "object",
+        "properties": {"city": {"type": ["string", "null"]}},
+        "required": ["city"],
+        "additionalProperties": False,
+    }
+
+    assert strict_schema["properties"] == {
+        "home": {"anyOf": [{"$ref": "#/$defs/Address"}, {"type": "null"}]},
+        "work": {
+            "anyOf": [
+                {"$ref": "#/$defs/Address"},
+                {"type": "string"},
+                {"type": "null"},
+            ]
+        },
+        "stops": {"type": "array", "items": strict_address},
+        "note": {"anyOf": [{"type": "string"}, {"type": "null"}]},
+        "any": {"type": "null"},
+        "either": {"type": ["string", "null"]},
+    }
+    assert strict_schema["$defs"] == {"Address": strict_address}
+    validate_strict_schema(strict_schema)
+
+
+@pytest.mark.parametrize(
+    ("schema", "message"),
+    [
+        ({"type": "array", "items": {"type": "string"}}, "root schema to be an object"),
+        ({"type": "object", "properties": {}}, "'additionalProperties' to be false"),
+        (
+            {
+                "type": "object",
+                "properties": {"a": {"type": "string"}},
+                "additionalProperties": False,
+            },
+            "every property to be required",
+        ),
+        (
+            make_strict(
+                {"type": "object", "properties": {"a": {"type": "any"}}},
+            ),
+            r"parameters\.a: unsupported type 'any'",
+        ),
+        (
+            make_strict({"type": "object", "properties": {"a": {}}}),
+            r"parameters\.a: expected a type",
+        ),
+        (
+            {
+                "type": "object",
+                "properties": {},
+                "additionalProperties": False,
+                "$defs": {"A": {"type": "object"}},
+                "anyOf": [{"type": "object"}],
+            },
+            r"parameters\.anyOf\[0\]: .*parameters\.\$defs\.A",
+        ),
+        (
+            {
+                "type": "object",
+                "properties": {"a": {"type": "string", "default": "b"}},
+                "required": ["a"],
+                "additionalProperties": False,
+            },
+            r"parameters\.a: unsupported keyword 'default'",
+        ),
+        (
+            make_strict(
+                {
+                    "type": "object",
+                    "properties": {
+                        "a": {
+                            "type": "array",
+                            "prefixItems": [{"type": "string"}],
+                            "items": {"type": "string"},
+                        },
+                    },
+                },
+            ),
+            r"parameters\.a: unsupported keyword 'prefixItems'",
+        ),
+        (
+            make_strict(
+                {
+                    "type": "object",
+                    "properties": {
+                        "a": {"allOf": [{"type": "object", "properties": {}}]},
+                        "b": {"oneOf": [{"type": "any"}, {"type": "string"}]},
+                    },
+                },
+            ),
+            r"parameters\.a: unsupported keyword 'allOf'; "
+            r"parameters\.b\.oneOf\[0\]: unsupported type 'any'$",
+        ),
+        (
+            {
+                "type": "object",
+                "properties": {},
+                "additionalProperties": False,
+                "allOf": [{"type": "object", "properties": {"a": {"type": "x"}}}],
+            },
+            r"parameters\.allOf\[0\]: expected 'additionalProperties'",
+        ),
+    ],
+)
+def test_validate_strict_schema_raises(schema: dict[str, Any], message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        validate_strict_schema(schema)
+
+
+def test_to_strict_function_schema() -> None:
+    function = Function(
+        "get_weather",
+        "Get the weather.",
+        [Parameter("location", "string"), Parameter("days", "integer")],
+        ["location"],
+    )
+
+    strict_schema: Any = to_strict_function_schema(function.to_json_schema())
+
+    assert strict_schema["strict"] is True
+    assert strict_schema["parameters"]["required"] == ["location", "days"]
+    assert strict_schema["parameters"]["properties"]["days"] == {
+        "type": ["integer", "null"]
+    }
+
+
+def test_inferred_strict_functions_are_accepted() -> None:
+    function: Function = FunctionInferrer.infer_from_function_reference(get_weather)
+    function.strict = True
+
+    schema: Any = function.to_json_schema()
+
+    validate_strict_schema(schema["parameters"])
+    assert schema["strict"] is True
+    assert schema["parameters"]["properties"]["days"]["type"] == ["integer", "null"]
+
+
+def add_stop(place: Location, tags: dict[str, int]) -> None:
+    """Add a stop to the route.
+
+    Args:
+        place: A structured location.
+        tags: Counts by tag.
+
+    """
+
+
+@pytest.mark.parametrize(
+    ("schema", "path"),
+    [
+        ({"type": "object"}, r"parameters\.place"),
+        (
+            {"type": "object", "additionalProperties": {"type": "integer"}},
+            r"parameters\.place",
+        ),
+        (
+            {"type": "object", "properties": {}, "additionalProperties": True},
+            r"parameters\.place",
+        ),
+        (
+            {"type": "array", "items": {"type": ["object", "null"]}},
+            r"parameters\.place\[\]",
+        ),
+        (
+            {"anyOf": [{"type": "string"}, {"type": "object"}]},
+            r"parameters\.place\.anyOf\[1\]",
+        ),
+    ],
+)
+def test_make_strict_rejects_free_form_objects(
+    schema: dict[str, Any], path: str
+) -> None:
+    with pytest.raises(ValueError, match=f"object at {path} to declare"):
+        make_strict({"type": "object", "properties": {"place": schema}})
+
+
+def test_strict_functions_with_free_form_parameters_raise() -> None:
+    function: Function = FunctionInferrer.infer_from_function_reference(add_stop)
+    function.strict = True
+
+    with pytest.raises(ValueError, match="strict mode does not support free-form"):
+        function.to_json_schema()
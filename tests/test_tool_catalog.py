@@ -0,0 +1,122 @@
+"""Test the shared tool catalog and its views."""
+
+import json
+import threading
+
+import pytest
+
+from openai_function_calling import Function, JsonSchemaType, Parameter
+from openai_function_calling.tool_catalog import ToolCatalog, ToolCatalogView
+from openai_function_calling.tool_helpers import ToolHelpers
+
+
+def _functions(count: int) -> list[Function]:
+    return [
+        Function(
+            name=f"tool_{i}",
+            description=f"Tool number {i}.",
+            parameters=[Parameter("value", JsonSchemaType.STRING)],
+            required_parameters=["value"],
+        )
+        for i in range(count)
+    ]
+
+
+def get_current_weather(location: str) -> str:
+    """Get the current weather."""
+    return f"It is sunny in {location}."
+
+
+def test_catalog_compiles_tool_params() -> None:
+    functions: list[Function] = _functions(3)
+    catalog = ToolCatalog(functions)
+
+    assert len(catalog) == 3
+    assert catalog.names == ("tool_0", "tool_1", "tool_2")
+    assert list(catalog.tool_params) == ToolHelpers.from_functions(functions)
+    assert catalog.tool_json_bytes[1] == json.dumps(catalog.tool_params[1]).encode()
+    assert catalog.tool_param("tool_2") is catalog.tool_params[2]
+    assert catalog.index("tool_1") == 1
+    assert "tool_1" in catalog
+    assert "missing" not in catalog
+
+
+def test_catalog_from_function_refs() -> None:
+    catalog: ToolCatalog = ToolCatalog.from_function_refs([get_current_weather])
+
+    assert catalog.names == ("get_current_weather",)
+
+
+def test_catalog_rejects_duplicate_names() -> None:
+    with pytest.raises(ValueError, match="Duplicate tool 'tool_0'."):
+        ToolCatalog(_functions(1) + _functions(1))
+
+
+def test_view_shares_tool_params() -> None:
+    catalog = ToolCatalog(_functions(5))
+
+    view: ToolCatalogView = catalog.view(["tool_3", "tool_1"])
+
+    assert view.names == ["tool_1", "tool_3"]
+    assert len(view) == 2
+    assert view.mask == 0b1010
+    assert view.tool_params[0] is catalog.tool_params[1]
+    assert view.tool_params[1] is catalog.tool_params[3]
+    assert "tool_1" in view
+    assert "tool_2" not in view
+    assert "missing" not in view
+
+
+def test_view_caches_tools_json_bytes() -> None:
+    catalog = ToolCatalog(_functions(5))
+    view: ToolCatalogView = catalog.view(["tool_0", "tool_4"])
+
+    tools_json_bytes: bytes = view.tools_json_bytes
+
+    assert tools_json_bytes == json.dumps(view.tool_params).encode()
+    assert view.tools_json_bytes is tools_json_bytes
+
+
+def test_views_of_the_same_subset_are_interned() -> None:
+    catalog = ToolCatalog(_functions(5))
+
+    assert catalog.view(["tool_0", "tool_2"]) is catalog.view(["tool_2", "tool_0"])
+    assert catalog.view(["tool_0", "tool_2"]) is catalog.view_from_mask(0b101)
+    assert catalog.view([]).tools_json_bytes == b"[]"
+
+
+def test_views_are_interned_across_threads() -> None:
+    catalog = ToolCatalog(_functions(64))
+    views: list[ToolCatalogView] = []
+    barrier = threading.Barrier(8)
+
+    def get_view() -> None:
+        barrier.wait()
+        views.append(catalog.view(["tool_7", "tool_63"]))
+
+    threads: list[threading.Thread] = [
+        threading.Thread(target=get_view) for _ in range(8)
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert all(view is views[0] for view in views)
+
+
+def test_view_rejects_unknown_tools() -> None:
+    catalog = ToolCatalog(_functions(2))
+
+    with pytest.raises(ValueError, match="Unknown tool 'missing'."):
+        catalog.view(["tool_0", "missing"])
+
+
+@pytest.mark.parametrize("mask", [-1, 0b100])
+def test_view_from_mask_rejects_masks_outside_catalog(mask: int) -> None:
+    catalog = ToolCatalog(_functions(2))
+
+    with pytest.raises(ValueError, match="only select tools in the catalog"):
+        catalog.view_from_mask(mask)
@@ -0,0 +1,369 @@
+"""Test the tool executor class."""
+
+import asyncio
+import functools
+import gc
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from openai_function_calling import tool_executor
+from openai_function_calling.tool_executor import (
+    ToolCallError,
+    ToolCallResult,
+    ToolExecutor,
+    get_tool_call_parts,
+    serialize_tool_result,
+)
+
+
+def get_current_weather(location: str, unit: str = "fahrenheit") -> str:
+    """Get the current weather and return a summary."""
+    return f"It is currently sunny in {location} and 75 degrees {unit}."
+
+
+def get_forecast(days: int) -> list[int]:
+    """Get the forecast temperatures."""
+    return [75] * days
+
+
+async def get_humidity(location: str) -> dict:
+    """Get the current humidity."""
+    await asyncio.sleep(0)
+    return {"location": location, "humidity": 0.5}
+
+
+def failing_tool() -> None:
+    """Fail every time."""
+    raise RuntimeError("Tool failed.")
+
+
+def _tool_call(name: str, arguments: dict, tool_call_id: str = "call_1") -> dict:
+    return {
+        "id": tool_call_id,
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(arguments)},
+    }
+
+
+@pytest.fixture
+def executor() -> ToolExecutor:
+    return ToolExecutor([get_current_weather, get_forecast, get_humidity, failing_tool])
+
+
+def test_executor_registers_tools_by_function_name(executor: ToolExecutor) -> None:
+    assert executor.names == [
+        "get_current_weather",
+        "get_forecast",
+        "get_humidity",
+        "failing_tool",
+    ]
+
+
+def test_executor_registers_tools_by_mapping_key() -> None:
+    executor = ToolExecutor({"weather": get_current_weather})
+
+    assert executor.get("weather") is get_current_weather
+
+
+def test_execute_runs_tool_with_json_arguments(executor: ToolExecutor) -> None:
+    assert executor.execute("get_forecast", '{"days": 2}') == [75, 75]
+
+
+def test_execute_runs_tool_with_mapping_arguments(executor: ToolExecutor) -> None:
+    assert executor.execute("get_forecast", {"days": 1}) == [75]
+
+
+def test_execute_with_empty_arguments_uses_defaults() -> None:
+    def get_default_unit(unit: str = "celsius") -> str:
+        return unit
+
+    executor = ToolExecutor([get_default_unit])
+
+    assert executor.execute("get_default_unit", " ") == "celsius"
+
+
+def test_execute_runs_coroutine_tools(executor: ToolExecutor) -> None:
+    assert executor.execute("get_humidity", {"location": "Boston"}) == {
+        "location": "Boston",
+        "humidity": 0.5,
+    }
+
+
+def test_execute_unknown_tool_raises_tool_call_error(executor: ToolExecutor) -> None:
+    with pytest.raises(ToolCallError, match="Unknown tool 'missing'"):
+        executor.execute("missing", {})
+
+
+@pytest.mark.parametrize(
+    ("arguments", "message"),
+    [("{invalid", "Invalid tool call arguments"), ("[1]", "to be a JSON object")],
+)
+def test_execute_invalid_arguments_raises_tool_call_error(
+    executor: ToolExecutor, arguments: str, message: str
+) -> None:
+    with pytest.raises(ToolCallError, match=message):
+        executor.execute("get_forecast", arguments)
+
+
+def test_execute_tool_call_returns_result(executor: ToolExecutor) -> None:
+    result: ToolCallResult = executor.execute_tool_call(
+        _tool_call("get_current_weather", {"location": "Boston"})
+    )
+
+    assert result == ToolCallResult(
+        "call_1",
+        "get_current_weather",
+        "It is currently sunny in Boston and 75 degrees fahrenheit.",
+    )
+    assert result.to_message() == {
+        "role": "tool",
+        "tool_call_id": "call_1",
+        "content": result.content,
+    }
+
+
+def test_execute_tool_call_accepts_tool_call_objects(executor: ToolExecutor) -> None:
+    tool_call = SimpleNamespace(
+        id="call_2",
+        function=SimpleNamespace(name="get_forecast", arguments='{"days": 1}'),
+    )
+
+    assert executor.execute_tool_call(tool_call).content == "[75]"
+
+
+def test_execute_tool_call_captures_errors(executor: ToolExecutor) -> None:
+    result: ToolCallResult = executor.execute_tool_call(_tool_call("failing_tool", {}))
+
+    assert result.is_error
+    assert json.loads(result.content) == {"error": "RuntimeError: Tool failed."}
+
+
+def test_execute_tool_call_captures_malformed_tool_calls(
+    executor: ToolExecutor,
+) -> None:
+    result: ToolCallResult = executor.execute_tool_call({"id": "call_2"})
+    async_result: ToolCallResult = asyncio.run(
+        executor.aexecute_tool_call({"id": "call_2"})
+    )
+
+    assert result == async_result
+    assert result.is_error
+    assert json.loads(result.content) == {"error": "KeyError: 'function'"}
+    assert result.tool_call_id == "call_2"
+
+
+def test_execute_tool_calls_runs_concurrently_in_order(executor: ToolExecutor) -> None:
+    with executor:
+        results: list[ToolCallResult] = executor.execute_tool_calls(
+            [
+                _tool_call("get_forecast", {"days": 1}, "call_1"),
+                _tool_call("get_forecast", {"days": 2}, "call_2"),
+                _tool_call("failing_tool", {}, "call_3"),
+            ]
+        )
+
+    assert [result.tool_call_id for result in results] == ["call_1", "call_2", "call_3"]
+    assert [result.is_error for result in results] == [False, False, True]
+
+
+def test_aexecute_tool_calls_runs_sync_and_async_tools(
+    executor: ToolExecutor,
+) -> None:
+    results: list[ToolCallResult] = asyncio.run(
+        executor.aexecute_tool_calls(
+            [
+                _tool_call("get_forecast", {"days": 1}, "call_1"),
+                _tool_call("get_humidity", {"location": "Boston"}, "call_2"),
+                _tool_call("missing", {}, "call_3"),
+            ]
+        )
+    )
+
+    assert results[0].content == "[75]"
+    assert json.loads(results[1].content)["humidity"] == 0.5
+    assert results[2].is_error
+
+
+def test_aexecute_awaits_awaitables_returned_by_sync_tools() -> None:
+    def returns_awaitable() -> object:
+        return get_humidity("Boston")
+
+    executor = ToolExecutor([returns_awaitable])
+
+    assert asyncio.run(executor.aexecute("returns_awaitable", {}))["humidity"] == 0.5
+
+
+def test_get_tool_call_parts_defaults_missing_values() -> None:
+    assert get_tool_call_parts({"function": {"name": "tool"}}) == ("", "tool", "")
+
+
+def test_serialize_tool_result_serializes_non_strings_as_json() -> None:
+    assert serialize_tool_result("text") == "text"
+    assert serialize_tool_result({"a": 1}) == '{"a": 1}'
+
+
+class Calculator:
+    """A service whose public methods are tools."""
+
+    def __init__(self, offset: int) -> None:
+        """Create a new calculator."""
+        self.offset: int = offset
+
+    def add(self, a: int, b: int) -> int:
+        """Add two numbers and the offset."""
+        return a + b + self.offset
+
+
+def test_register_instance_registers_bound_methods() -> None:
+    executor = ToolExecutor()
+
+    executor.register_instance(Calculator(10), idempotent=True)
+
+    assert executor.names == ["add"]
+    assert executor.is_idempotent("add")
+    assert sorted(executor.function("add").required_parameters) == ["a", "b"]
+    assert executor.execute("add", '{"a": 1, "b": 2}') == 13
+
+
+def test_register_partial_uses_wrapped_function_name() -> None:
+    executor = ToolExecutor([functools.partial(get_current_weather, unit="celsius")])
+
+    assert executor.names == ["get_current_weather"]
+    assert [p.name for p in executor.function("get_current_weather").parameters] == [
+        "location"
+    ]
+    assert executor.execute("get_current_weather", '{"location": "Paris"}') == (
+        "It is currently sunny in Paris and 75 degrees celsius."
+    )
+
+
+def test_warmup_builds_shared_tool_params() -> None:
+    executor = ToolExecutor([get_current_weather, get_forecast])
+
+    assert executor.warmup() == 2
+
+    tool_params: list = executor.tool_params
+
+    assert [tool_param["function"]["name"] for tool_param in tool_params] == [
+        "get_current_weather",
+        "get_forecast",
+    ]
+    assert executor.tool_params is tool_params
+    assert json.loads(executor.tools_json_bytes) == tool_params
+
+    executor.register(get_humidity)
+
+    assert len(executor.tool_params) == 3
+    assert b"get_humidity" in executor.tools_json_bytes
+
+
+def test_register_keeps_the_inferred_functions_of_other_tools() -> None:
+    executor = ToolExecutor([get_current_weather, get_forecast])
+    forecast_function = executor.function("get_forecast")
+
+    executor.register(get_humidity)
+
+    assert executor.function("get_forecast") is forecast_function
+
+    executor.register(get_forecast)
+
+    assert executor.function("get_forecast") is not forecast_function
+
+
+def test_registering_tools_one_by_one_publishes_them_once(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    published: list[int] = []
+
+    class CountingRegistrations(tool_executor._Registrations):  # noqa: SLF001
+        def __init__(self, entries: dict, previous: object = None) -> None:
+            published.append(len(entries))
+            super().__init__(entries, previous)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(tool_executor, "_Registrations", CountingRegistrations)
+    executor = ToolExecutor()
+
+    for index in range(100):
+        executor.register(get_forecast, name=f"forecast_{index}")
+
+    assert len(executor.names) == 100
+    assert executor.execute("forecast_99", {"days": 1}) == [75]
+    assert published == [0, 100]  # The empty registrations, then all tools.
+
+
+def test_tools_are_registered_while_other_threads_execute_calls() -> None:
+    executor = ToolExecutor([get_forecast])
+    started = threading.Barrier(5)
+
+    def call_tools() -> list:
+        started.wait()
+        return [
+            (executor.execute("get_forecast", {"days": 1}), len(executor.tool_params))
+            for _ in range(200)
+        ]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(call_tools) for _ in range(4)]
+        started.wait()
+
+        for index in range(50):
+            executor.register(get_current_weather, name=f"weather_{index}")
+
+        results: list = [result for future in futures for result in future.result()]
+
+    assert all(result == [75] for result, _ in results)
+    assert all(1 <= tool_count <= 51 for _, tool_count in results)
+    assert len(executor.names) == 51
+    assert len(executor.tool_params) == 51
+
+
+def test_threads_using_the_executor_first_share_one_thread_pool(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    created: list[ThreadPoolExecutor] = []
+
+    def slow_thread_pool(**kwargs: object) -> ThreadPoolExecutor:
+        time.sleep(0.01)
+        created.append(ThreadPoolExecutor(**kwargs))  # type: ignore[arg-type]
+        return created[-1]
+
+    monkeypatch.setattr(tool_executor, "ThreadPoolExecutor", slow_thread_pool)
+    executor = ToolExecutor([get_forecast])
+
+    with ThreadPoolExecutor(8) as pool:
+        thread_pools = list(pool.map(lambda _: executor.thread_pool, range(8)))
+
+    executor.close()
+
+    assert len(created) == 1
+    assert all(thread_pool is created[0] for thread_pool in thread_pools)
+    assert executor._thread_pool is None  # noqa: SLF001
+
+
+def test_warmup_finds_the_validated_parameters_of_every_tool() -> None:
+    executor = ToolExecutor([get_current_weather, get_forecast])
+    executor.warmup()
+    registrations = executor._current()  # noqa: SLF001
+
+    assert set(registrations.model_parameters) == set(executor.names)
+    assert set(registrations.enum_parameters) == set(executor.names)
+
+
+def test_warmup_freezes_the_garbage_collector(monkeypatch: pytest.MonkeyPatch) -> None:
+    executor = ToolExecutor([get_current_weather])
+    collections: list[int] = []
+    monkeypatch.setattr(gc, "collect", lambda *_: collections.append(1))
+
+    try:
+        executor.warmup(freeze_gc=True)
+
+        assert collections == []
+
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
@@ -1,5 +1,8 @@
 """Test the tool wrapper class."""
 
+import io
+import json
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 from openai_function_calling.function import Function
@@ -101,3 +104,73 @@ def test_infer_from_function_refs_dicts_function_is_dict() -> None:
     )[0]
 
     assert isinstance(tool_param["function"], dict)
+
+
+def get_tomorrows_weather(location: str) -> str:
+    """Get the weather for tomorrow and return a summary."""
+    return f"Tomorrow it will be rainy in {location}."
+
+
+def test_iter_from_functions_is_lazy() -> None:
+    iterator = ToolHelpers.iter_from_functions(iter([get_current_weather_schema]))
+
+    assert not isinstance(iterator, list)
+    assert list(iterator) == ToolHelpers.from_functions([get_current_weather_schema])
+
+
+def test_iter_infer_from_function_refs_matches_infer_from_function_refs() -> None:
+    function_refs: list = [get_current_weather, get_tomorrows_weather]
+
+    assert list(
+        ToolHelpers.iter_infer_from_function_refs(iter(function_refs))
+    ) == ToolHelpers.infer_from_function_refs(function_refs)
+
+
+def test_write_tool_params_streams_json_array() -> None:
+    function_refs: list = [get_current_weather, get_tomorrows_weather]
+    output = io.BytesIO()
+
+    size: int = ToolHelpers.write_tool_params(
+        ToolHelpers.iter_infer_from_function_refs(function_refs), output
+    )
+
+    assert (
+        output.getvalue()
+        == json.dumps(ToolHelpers.infer_from_function_refs(function_refs)).encode()
+    )
+    assert size == len(output.getvalue())
+
+
+def test_write_tool_params_writes_empty_array() -> None:
+    output = io.BytesIO()
+
+    assert ToolHelpers.write_tool_params(iter([]), output) == 2
+    assert output.getvalue() == b"[]"
+
+
+def test_write_tool_params_writes_to_path(tmp_path: Path) -> None:
+    path: Path = tmp_path / "tools.json"
+
+    ToolHelpers.write_tool_params(
+        ToolHelpers.iter_from_functions([get_current_weather_schema]), path
+    )
+
+    assert json.loads(path.read_bytes()) == ToolHelpers.from_functions(
+        [get_current_weather_schema]
+    )
+
+
+def test_fingerprint_identifies_tool_lists() -> None:
+    tool_params: list[ChatCompletionToolParam] = ToolHelpers.from_functions(
+        [get_current_weather_schema]
+    )
+    reordered_keys: list = [json.loads(json.dumps(tool_params[0], sort_keys=True))]
+    other_tool: list = [{"type": "function", "function": {"name": "other"}}]
+
+    assert ToolHelpers.fingerprint(tool_params) == ToolHelpers.fingerprint(
+        reordered_keys
+    )
+    assert ToolHelpers.fingerprint(tool_params) != ToolHelpers.fingerprint(
+        tool_params + other_tool
+    )
+    assert len(ToolHelpers.fingerprint([])) == 64
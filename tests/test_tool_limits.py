@@ -0,0 +1,366 @@
+"""Test the tool concurrency limits, circuit breakers and latency histograms."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from openai_function_calling import Function
+from openai_function_calling.tool_executor import ToolExecutor
+from openai_function_calling.tool_limits import (
+    TOOL_POLICY_METADATA_KEY,
+    AdaptiveConcurrencyLimit,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    LatencyHistogram,
+    ToolPolicy,
+)
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        """Create a clock at time 0."""
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        """Get the current time."""
+        return self.now
+
+
+def _tool_call(name: str, arguments: str = "{}") -> dict:
+    return {"id": "call_1", "function": {"name": name, "arguments": arguments}}
+
+
+def test_limit_increases_additively_and_decreases_multiplicatively() -> None:
+    limit = AdaptiveConcurrencyLimit(2, max_limit=3, latency_target_seconds=0.1)
+
+    for _ in range(4):
+        assert limit.acquire()
+        limit.release(0.01)
+
+    assert limit.limit == 3
+    assert limit.acquire()
+    limit.release(0.5)
+    assert limit.limit == 1
+
+    assert limit.acquire()
+    limit.release(0.01, failed=True)
+    assert limit.limit == 1
+
+
+def test_limit_rejects_or_waits_when_full() -> None:
+    limit = AdaptiveConcurrencyLimit(1)
+
+    assert limit.acquire()
+    assert not limit.acquire()
+    assert limit.in_flight == 1
+
+    timer = threading.Timer(0.01, limit.release, args=(0.01,))
+    timer.start()
+
+    assert limit.acquire(timeout=5)
+    timer.join()
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({"initial_limit": 0}, "min_limit <= initial_limit"),
+        ({"initial_limit": 100}, "initial_limit <= max_limit"),
+        ({"backoff_ratio": 1}, "backoff ratio"),
+    ],
+)
+def test_limit_rejects_invalid_settings(kwargs: dict, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        AdaptiveConcurrencyLimit(**kwargs)
+
+
+def test_circuit_breaker_opens_and_resets() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(2, reset_timeout_seconds=10, clock=clock)
+
+    breaker.record_failure()
+    breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state is CircuitState.OPEN
+
+    clock.now = 4
+
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.allow()
+
+    assert error.value.retry_after_seconds == 6
+
+    clock.now = 10
+    breaker.allow()
+
+    assert breaker.state is CircuitState.HALF_OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    breaker.record_failure()
+    clock.now = 15
+
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    clock.now = 20
+    breaker.allow()
+    breaker.record_success()
+
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_latency_histogram_counts_buckets() -> None:
+    histogram = LatencyHistogram([0.1, 1.0])
+
+    assert histogram.quantile(0.5) == 0.0
+    assert histogram.mean_seconds == 0.0
+
+    for seconds in [0.05, 0.05, 0.5, 5.0]:
+        histogram.observe(seconds)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4
+    assert histogram.mean_seconds == pytest.approx(1.4)
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(0.99) == float("inf")
+
+
+def test_executor_rejects_calls_over_the_limit_without_blocking_other_tools() -> None:
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_lookup() -> str:
+        """Wait for the downstream service."""
+        started.set()
+        release.wait(5)
+        return "done"
+
+    def fast_lookup() -> str:
+        """Answer right away."""
+        return "fast"
+
+    executor = ToolExecutor([fast_lookup])
+    executor.register(
+        slow_lookup, policy=ToolPolicy(concurrency_limit=AdaptiveConcurrencyLimit(1))
+    )
+    thread = threading.Thread(target=executor.execute, args=("slow_lookup", "{}"))
+    thread.start()
+    started.wait(5)
+
+    rejected = executor.execute_tool_call(_tool_call("slow_lookup"))
+    fast = executor.execute_tool_call(_tool_call("fast_lookup"))
+    release.set()
+    thread.join()
+
+    assert rejected.is_error
+    assert json.loads(rejected.content) == {
+        "error": "ConcurrencyLimitError: The tool is already running 1 calls."
+    }
+    assert fast.content == "fast"
+    assert executor.latency_histograms["slow_lookup"].count == 1
+    assert executor.latency_histograms["fast_lookup"].count == 1
+
+
+def test_executor_applies_policy_from_function_metadata() -> None:
+    clock = FakeClock()
+
+    def flaky_lookup(query: str) -> str:
+        """Fail every time."""
+        raise RuntimeError(query)
+
+    policy = ToolPolicy(circuit_breaker=CircuitBreaker(2, 30, clock=clock))
+    function: Function = Function(
+        "flaky_lookup", "", metadata={TOOL_POLICY_METADATA_KEY: policy}
+    )
+    executor = ToolExecutor()
+    executor.register(flaky_lookup, function=function)
+    tool_call: dict = _tool_call("flaky_lookup", '{"query": "a"}')
+
+    assert executor.policy("flaky_lookup") is policy
+    assert executor.execute_tool_call(tool_call).content == json.dumps(
+        {"error": "RuntimeError: a"}
+    )
+    executor.execute_tool_call(tool_call)
+    clock.now = 10
+
+    assert json.loads(executor.execute_tool_call(tool_call).content) == {
+        "error": "CircuitOpenError: The tool is failing and temporarily unavailable.",
+        "retry_after_seconds": 20,
+    }
+    assert policy.latency_histogram.count == 2
+
+
+def test_async_executor_applies_limits() -> None:
+    async def lookup() -> str:
+        """Wait for the downstream service."""
+        await asyncio.sleep(0.01)
+        return "done"
+
+    def blocking_lookup() -> str:
+        """Run in a thread."""
+        return "blocking"
+
+    limit = AdaptiveConcurrencyLimit(1, max_limit=1)
+    executor = ToolExecutor()
+    executor.register(lookup, policy=ToolPolicy(concurrency_limit=limit))
+    executor.register(
+        blocking_lookup,
+        policy=ToolPolicy(circuit_breaker=CircuitBreaker()),
+    )
+
+    results = asyncio.run(
+        executor.aexecute_tool_calls(
+            [_tool_call("lookup"), _tool_call("lookup"), _tool_call("blocking_lookup")]
+        )
+    )
+
+    assert [result.content for result in results] == [
+        "done",
+        json.dumps(
+            {"error": "ConcurrencyLimitError: The tool is already running 1 calls."}
+        ),
+        "blocking",
+    ]
+    assert limit.in_flight == 0
+
+
+def test_concurrency_rejection_reopens_half_open_breaker() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(1, 10, clock=clock)
+    limit = AdaptiveConcurrencyLimit(1)
+    policy = ToolPolicy(concurrency_limit=limit, circuit_breaker=breaker)
+    breaker.record_failure()
+    clock.now = 10
+    limit.acquire()
+
+    with pytest.raises(Exception, match="already running"), policy.guard("tool"):
+        pass  # pragma: no cover
+
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_async_guard_waits_for_a_free_slot() -> None:
+    limit = AdaptiveConcurrencyLimit(1, max_wait_seconds=5)
+    policy = ToolPolicy(concurrency_limit=limit)
+    limit.acquire()
+
+    async def call() -> None:
+        async with policy.aguard("tool"):
+            assert limit.in_flight == 1
+
+    timer = threading.Timer(0.01, limit.release, args=(0.01,))
+    timer.start()
+    asyncio.run(call())
+    timer.join()
+
+    assert limit.in_flight == 0
+    assert policy.latency_histogram.count == 1
+
+
+def test_async_guard_cancelled_while_waiting_frees_the_slot_it_takes() -> None:
+    limit = AdaptiveConcurrencyLimit(1, max_wait_seconds=5)
+    policy = ToolPolicy(concurrency_limit=limit)
+    limit.acquire()
+
+    async def call() -> None:
+        async with policy.aguard("tool"):
+            pytest.fail("The cancelled call should not run.")
+
+    async def cancel_call() -> None:
+        task = asyncio.ensure_future(call())
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        limit.release(0.0)
+
+    asyncio.run(cancel_call())
+
+    assert limit.in_flight == 0
+
+
+def test_async_guard_cancelled_after_taking_a_slot_frees_it() -> None:
+    limit = AdaptiveConcurrencyLimit(1, max_wait_seconds=5)
+    policy = ToolPolicy(concurrency_limit=limit)
+    taken = threading.Event()
+    acquire = limit.acquire
+
+    def acquire_in_thread(timeout: float = 0.0) -> bool:
+        if not timeout:
+            return False
+
+        result: bool = acquire(timeout)
+        taken.set()
+        return result
+
+    limit.acquire = acquire_in_thread  # type: ignore[method-assign]
+
+    async def call() -> None:
+        async with policy.aguard("tool"):
+            pytest.fail("The cancelled call should not run.")
+
+    async def cancel_call() -> None:
+        task = asyncio.ensure_future(call())
+        await asyncio.sleep(0)
+        # Block the event loop, so the call is cancelled before it resumes.
+        taken.wait(5)
+        time.sleep(0.01)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_call())
+
+    assert limit.in_flight == 0
+
+
+def test_cancelled_calls_do_not_count_as_failures() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(1, 10, clock=clock)
+    limit = AdaptiveConcurrencyLimit(4)
+    policy = ToolPolicy(concurrency_limit=limit, circuit_breaker=breaker)
+
+    async def call() -> None:
+        async with policy.aguard("tool"):
+            await asyncio.sleep(10)
+
+    async def cancel_call() -> None:
+        task = asyncio.ensure_future(call())
+        await asyncio.sleep(0)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_call())
+
+    assert breaker.state is CircuitState.CLOSED
+    assert limit.limit == 4
+    assert limit.in_flight == 0
+
+    # A cancelled trial call lets the next call be the trial right away.
+    breaker.record_failure()
+    clock.now = 10
+    asyncio.run(cancel_call())
+
+    assert breaker.state is CircuitState.OPEN
+
+    with policy.guard("tool"):
+        assert breaker.state is CircuitState.HALF_OPEN
+
+    assert breaker.state is CircuitState.CLOSED
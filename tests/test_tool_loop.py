@@ -0,0 +1,133 @@
+"""Test the tool loop runner."""
+
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+
+from openai_function_calling.mock_server import (
+    AsyncMockServerClient,
+    MockChatCompletionsServer,
+    MockServerClient,
+)
+from openai_function_calling.tool_executor import ToolExecutor
+from openai_function_calling.tool_loop import ToolLoop, ToolLoopResult
+
+
+def get_current_weather(location: str, unit: str = "fahrenheit") -> str:
+    """Get the current weather and return a summary."""
+    return f"It is currently sunny in {location} and 75 degrees {unit}."
+
+
+def _messages() -> list[dict]:
+    return [{"role": "user", "content": "What's the weather?"}]
+
+
+@pytest.fixture
+def server() -> Iterator[MockChatCompletionsServer]:
+    with MockChatCompletionsServer(seed=0, tool_calls_per_response=2) as mock_server:
+        yield mock_server
+
+
+def test_run_appends_messages_in_place(server: MockChatCompletionsServer) -> None:
+    messages: list[dict] = _messages()
+    loop = ToolLoop(
+        MockServerClient(server.base_url), [get_current_weather], model="mock"
+    )
+
+    result: ToolLoopResult = loop.run(messages)
+
+    assert result.messages is messages
+    assert [message["role"] for message in messages] == [
+        "user",
+        "assistant",
+        "tool",
+        "tool",
+        "assistant",
+    ]
+    assert result.final_message == {"role": "assistant", "content": "Done."}
+    assert result.iterations == 2
+    assert result.tool_calls == 2
+    assert result.completed
+
+
+def test_run_infers_tool_params_once(server: MockChatCompletionsServer) -> None:
+    loop = ToolLoop(
+        MockServerClient(server.base_url),
+        ToolExecutor({"weather": get_current_weather}),
+        model="mock",
+        request_options={"temperature": 0},
+    )
+
+    loop.run(_messages())
+
+    assert loop.tool_params[0]["function"]["name"] == "get_current_weather"
+    assert server.requests[0]["tools"] == server.requests[1]["tools"]
+    assert server.requests[0]["temperature"] == 0
+
+
+def test_run_stops_at_max_iterations() -> None:
+    scripted: list[dict] = [
+        {
+            "tool_calls": [
+                {"name": "get_current_weather", "arguments": {"location": "x"}}
+            ]
+        }
+    ]
+
+    with MockChatCompletionsServer(scripted_responses=scripted) as server:
+        result: ToolLoopResult = ToolLoop(
+            MockServerClient(server.base_url),
+            [get_current_weather],
+            model="mock",
+            max_iterations=3,
+        ).run(_messages())
+
+    assert result.iterations == 3
+    assert result.tool_calls == 3
+    assert not result.completed
+
+
+def test_run_with_openai_client(server: MockChatCompletionsServer) -> None:
+    openai = pytest.importorskip("openai")
+    client = openai.OpenAI(base_url=server.base_url, api_key="mock")
+
+    result: ToolLoopResult = ToolLoop(client, [get_current_weather], model="mock").run(
+        _messages()
+    )
+
+    assert result.messages[1]["tool_calls"][0]["function"]["name"] == (
+        "get_current_weather"
+    )
+    assert result.final_message["content"] == "Done."
+
+
+def test_arun_with_async_client(server: MockChatCompletionsServer) -> None:
+    loop = ToolLoop(
+        AsyncMockServerClient(server.base_url), [get_current_weather], model="mock"
+    )
+
+    result: ToolLoopResult = asyncio.run(loop.arun(_messages()))
+
+    assert result.iterations == 2
+    assert result.tool_calls == 2
+    assert result.completed
+
+
+def test_arun_with_async_openai_client(server: MockChatCompletionsServer) -> None:
+    openai = pytest.importorskip("openai")
+
+    async def run() -> ToolLoopResult:
+        async with openai.AsyncOpenAI(
+            base_url=server.base_url, api_key="mock"
+        ) as client:
+            return await ToolLoop(client, [get_current_weather], model="mock").arun(
+                _messages()
+            )
+
+    assert asyncio.run(run()).final_message["content"] == "Done."
+
+
+def test_tool_loop_rejects_non_positive_max_iterations() -> None:
+    with pytest.raises(ValueError, match="iterations to be positive"):
+        ToolLoop(None, [], model="mock", max_iterations=0)
@@ -0,0 +1,166 @@
+"""Test registering tools with the @tool decorator."""
+
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from openai_function_calling import tool_registry
+from openai_function_calling.instrumentation import (
+    MetricsCollector,
+    add_hook,
+    remove_hook,
+)
+from openai_function_calling.tool_helpers import ToolHelpers
+from openai_function_calling.tool_registry import ToolRegistry, tool
+
+
+def get_current_weather(location: str, unit: str = "celsius") -> str:
+    """Get the current weather.
+
+    Args:
+        location: The city to get the weather of.
+        unit: The temperature unit.
+
+    """
+    return f"It is 20 degrees {unit} in {location}."
+
+
+def test_decorator_registers_tools_without_inferring_them() -> None:
+    registry = ToolRegistry()
+    collector = MetricsCollector()
+    add_hook(collector)
+
+    try:
+        decorated = tool(registry=registry)(get_current_weather)
+        tool(
+            name="weather_in_fahrenheit",
+            description="Get the weather in Fahrenheit.",
+            strict=True,
+            cacheable=True,
+            registry=registry,
+        )(functools.partial(get_current_weather, unit="fahrenheit"))
+    finally:
+        remove_hook(collector)
+
+    assert decorated is get_current_weather
+    assert registry.names == ["get_current_weather", "weather_in_fahrenheit"]
+    assert len(registry) == 2
+    assert "weather_in_fahrenheit" in registry
+    assert not registry.get("get_current_weather").is_inferred
+    assert collector.counters == {}
+
+
+def test_definitions_are_inferred_once_on_first_request() -> None:
+    registry = ToolRegistry()
+    tool(registry=registry)(get_current_weather)
+    tool(
+        name="weather_in_fahrenheit",
+        description="Get the weather in Fahrenheit.",
+        strict=True,
+        registry=registry,
+    )(functools.partial(get_current_weather, unit="fahrenheit"))
+    collector = MetricsCollector()
+    add_hook(collector)
+
+    try:
+        tool_params = registry.tool_params()
+        registry.tool_params()
+    finally:
+        remove_hook(collector)
+
+    assert collector.counters["tool_registry.inferred"] == 2
+    assert tool_params == ToolHelpers.from_functions(registry.functions())
+    assert registry.functions(["weather_in_fahrenheit"])[0].to_json_schema() == {
+        "name": "weather_in_fahrenheit",
+        "description": "Get the weather in Fahrenheit.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "The city to get the weather of.",
+                },
+            },
+            "required": ["location"],
+            "additionalProperties": False,
+        },
+        "strict": True,
+    }
+
+    with pytest.raises(ValueError, match="Unknown tool 'missing'"):
+        registry.functions(["missing"])
+
+
+def test_bare_decorator_adds_to_the_default_registry(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    registry = ToolRegistry()
+    monkeypatch.setattr(tool_registry, "default_registry", registry)
+
+    @tool
+    def get_time(zone: str) -> str:
+        """Get the current time.
+
+        Args:
+            zone: The time zone.
+
+        """
+        return f"It is noon in {zone}."
+
+    assert registry.names == ["get_time"]
+    assert registry.get("get_time").function_reference is get_time
+
+
+def test_warmup_infers_every_tool_in_the_background() -> None:
+    registry = ToolRegistry()
+    tool(registry=registry)(get_current_weather)
+    tool(name="weather", registry=registry)(get_current_weather)
+
+    thread = registry.warmup(background=True)
+
+    assert thread is not None
+    thread.join()
+    assert all(registry.get(name).is_inferred for name in registry.names)
+    assert registry.warmup() is None
+
+
+def test_executor_registers_cacheable_tools_as_idempotent() -> None:
+    registry = ToolRegistry()
+    tool(registry=registry)(get_current_weather)
+    tool(name="weather", cacheable=True, registry=registry)(get_current_weather)
+
+    executor = registry.executor(max_workers=2)
+
+    assert executor.names == ["get_current_weather", "weather"]
+    assert executor.is_idempotent("weather")
+    assert not executor.is_idempotent("get_current_weather")
+    assert executor.function("weather") is registry.get("weather").function
+    assert executor.execute("weather", '{"location": "Oslo"}') == (
+        "It is 20 degrees celsius in Oslo."
+    )
+    assert registry.executor(["weather"]).names == ["weather"]
+
+
+def test_tools_are_added_while_other_threads_read_the_registry() -> None:
+    registry = ToolRegistry()
+    tool(registry=registry)(get_current_weather)
+    started = threading.Barrier(5)
+
+    def read_tools() -> list[int]:
+        started.wait()
+        return [len(registry.functions()) for _ in range(200)]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(read_tools) for _ in range(4)]
+        started.wait()
+
+        for index in range(50):
+            tool(name=f"weather_{index}", registry=registry)(get_current_weather)
+
+        counts: list[int] = [count for future in futures for count in future.result()]
+
+    assert all(1 <= count <= 51 for count in counts)
+    assert len(registry) == 51
+    assert len(registry.functions()) == 51